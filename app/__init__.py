@@ -6,6 +6,7 @@ from config import config
 from flasgger import Swagger
 from prometheus_client import (
     Counter,
+    Gauge,
     Histogram,
     generate_latest,
     CONTENT_TYPE_LATEST,
@@ -45,6 +46,17 @@ class _MetricProxy:
 REQUEST_COUNT = _MetricProxy("REQUEST_COUNT")
 REQUEST_LATENCY = _MetricProxy("REQUEST_LATENCY")
 API_CALL_DURATION = _MetricProxy("API_CALL_DURATION")
+CACHE_HITS = _MetricProxy("CACHE_HITS")
+CACHE_MISSES = _MetricProxy("CACHE_MISSES")
+CONNECTOR_JOB_DETECTION_LAG = _MetricProxy("CONNECTOR_JOB_DETECTION_LAG")
+STAGE_DURATION = _MetricProxy("STAGE_DURATION")
+COALESCED_REQUESTS = _MetricProxy("COALESCED_REQUESTS")
+ADMISSION_QUEUE_DEPTH = _MetricProxy("ADMISSION_QUEUE_DEPTH")
+ADMISSION_WAIT = _MetricProxy("ADMISSION_WAIT")
+ADMISSION_REJECTED = _MetricProxy("ADMISSION_REJECTED")
+CIRCUIT_BREAKER_STATE = _MetricProxy("CIRCUIT_BREAKER_STATE")
+CIRCUIT_BREAKER_REJECTED = _MetricProxy("CIRCUIT_BREAKER_REJECTED")
+CONNECTOR_HEDGES = _MetricProxy("CONNECTOR_HEDGES")
 
 
 def create_app(config_name=None):
@@ -55,6 +67,11 @@ def create_app(config_name=None):
     app.config.from_object(config[config_name])
     config[config_name].init_app(app)
 
+    # jsonify and request.get_json on orjson when it is installed.
+    from app.backend.fastjson import FastJSONProvider
+
+    app.json = FastJSONProvider(app)
+
     # Configure CORS to allow all origins
     CORS(
         app,
@@ -63,6 +80,8 @@ def create_app(config_name=None):
                 "origins": "*",
                 "methods": ["POST", "GET", "OPTIONS"],
                 "allow_headers": ["Content-Type", "Authorization"],
+                # Let the browser-based client read the stage breakdown.
+                "expose_headers": ["Server-Timing"],
             }
         },
     )
@@ -175,8 +194,94 @@ def create_app(config_name=None):
         "API_CALL_DURATION": _get_or_create(
             "api_call_duration_seconds", Histogram, "API call processing duration"
         ),
+        "CACHE_HITS": _get_or_create(
+            "t2p_cache_hits_total", Counter, "Result cache hits", ["cache"]
+        ),
+        "CACHE_MISSES": _get_or_create(
+            "t2p_cache_misses_total", Counter, "Result cache misses", ["cache"]
+        ),
+        "CONNECTOR_JOB_DETECTION_LAG": _get_or_create(
+            "t2p_connector_job_detection_lag_seconds",
+            Histogram,
+            "Time between a connector job finishing and this service noticing",
+            ["wait_mode"],
+            buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+        ),
+        "STAGE_DURATION": _get_or_create(
+            "t2p_pipeline_stage_duration_seconds",
+            Histogram,
+            "Duration of each generate pipeline stage",
+            ["stage", "provider", "model", "target"],
+            buckets=(
+                0.001,
+                0.0025,
+                0.005,
+                0.01,
+                0.025,
+                0.05,
+                0.1,
+                0.25,
+                0.5,
+                1,
+                2.5,
+                5,
+                10,
+                30,
+                60,
+                120,
+            ),
+        ),
+        "COALESCED_REQUESTS": _get_or_create(
+            "t2p_coalesced_requests_total",
+            Counter,
+            "Single-flight outcomes of coalescable calls",
+            ["name", "outcome"],
+        ),
+        "ADMISSION_QUEUE_DEPTH": _get_or_create(
+            "t2p_admission_queue_depth",
+            Gauge,
+            "Generate calls waiting for an admission slot in this process",
+            ["limit"],
+        ),
+        "ADMISSION_WAIT": _get_or_create(
+            "t2p_admission_wait_seconds",
+            Histogram,
+            "Time generate calls waited for an admission slot",
+            ["limit", "outcome"],
+            buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+        ),
+        "ADMISSION_REJECTED": _get_or_create(
+            "t2p_admission_rejected_total",
+            Counter,
+            "Generate calls rejected by admission control",
+            ["limit", "reason"],
+        ),
+        "CIRCUIT_BREAKER_STATE": _get_or_create(
+            "t2p_circuit_breaker_state",
+            Gauge,
+            "Circuit state last seen by this process (0 closed, 1 half-open, 2 open)",
+            ["name"],
+        ),
+        "CIRCUIT_BREAKER_REJECTED": _get_or_create(
+            "t2p_circuit_breaker_rejected_total",
+            Counter,
+            "Calls refused because the dependency's circuit was open",
+            ["name"],
+        ),
+        "CONNECTOR_HEDGES": _get_or_create(
+            "t2p_connector_hedged_requests_total",
+            Counter,
+            "Hedged connector requests sent, and those that answered first",
+            ["call", "outcome"],
+        ),
     }
     app.extensions = getattr(app, "extensions", {})
     app.extensions["metrics"] = metrics
 
+    # Utilisation of the pooled upstream HTTP session is read at scrape time.
+    from app.backend.http_session import HttpPoolCollector
+
+    if "t2p_http_pool_max_connections" not in REGISTRY._names_to_collectors:
+        REGISTRY.register(HttpPoolCollector())
+
     return app
@@ -1,28 +1,68 @@
+import asyncio
+import json
 import logging
 import os
+import queue
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import wraps
 
 import requests
-from flask import jsonify, make_response, request, send_from_directory
+from flask import (
+    Response,
+    current_app,
+    jsonify,
+    make_response,
+    request,
+    send_from_directory,
+    stream_with_context,
+)
 from flasgger import swag_from
 from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from app.api import api_bp
-from app.__init__ import REQUEST_COUNT, REQUEST_LATENCY
+from app.__init__ import API_CALL_DURATION, REQUEST_COUNT, REQUEST_LATENCY
+from app.backend.admission import AdmissionController, OverloadedError
+from app.backend.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.backend.deadline import DeadlineExceeded, request_deadline
 from app.backend.bpmn_builder import InvalidModelError, raw_response_to_bpmn
+from app.backend.cache import (
+    GenerationCache,
+    TransformCache,
+    generation_key,
+    transform_key,
+)
+from app.backend.jobs import (
+    FAILED,
+    RUNNING,
+    SUCCEEDED,
+    JobStore,
+    JobStoreError,
+    get_job_runner,
+    get_stream_runner,
+)
 from app.backend.connector_client import (
+    AsyncConnectorClient,
     ConnectorClient,
     ConnectorClientError,
     ConnectorError,
 )
-from app.backend.modeltransformer import ModelTransformer
+from app.backend.models_cache import ModelsCache
+from app.backend.modeltransformer import (
+    TRANSFORM_ERRORS,
+    AsyncModelTransformer,
+    ModelTransformer,
+    is_outage,
+)
+from app.backend.singleflight import SingleFlight
+from app.backend.timing import emit, label_pipeline, stage, track_pipeline
 from app.backend.xml_parser import (
+    LAYOUTS,
+    PnmlDocument,
     PnmlStructureError,
-    assign_pnml_coordinates,
-    repair_pnml_connectivity_from_bpmn,
+    UnknownLayoutError,
     sanitize_bpmn_for_transform,
-    validate_pnml_connectivity,
 )
 
 # Module-level logger for routes
@@ -50,9 +90,14 @@ def deprecated(view):
     return wrapper
 
 
-def _error_response(status_code, code, message):
+def _error_body(code, message):
     """Build the standard v2 error body: {"error": {"code", "message"}}."""
-    return jsonify({"error": {"code": code, "message": message}}), status_code
+    return {"error": {"code": code, "message": message}}
+
+
+def _error_response(status_code, code, message):
+    """Build a v2 error response with the standard error body."""
+    return jsonify(_error_body(code, message)), status_code
 
 
 def _removed_api_call_response():
@@ -72,30 +117,170 @@ def _removed_api_call_response():
     return response
 
 
-def _generate_bpmn(authorization, text, provider, model, prompting_strategy=None):
-    raw_response = ConnectorClient().generate(
-        authorization=authorization,
-        user_text=text,
-        provider=provider,
-        model=model,
-        prompting_strategy=prompting_strategy,
+def _connector_breaker():
+    return CircuitBreaker(
+        "connector",
+        failures=ConnectorError,
+        slow_call_seconds=current_app.config.get("CONNECTOR_SLOW_CALL_SECONDS", 150),
+    )
+
+
+def _transformer_breaker():
+    return CircuitBreaker(
+        "transformer",
+        failures=TRANSFORM_ERRORS,
+        slow_call_seconds=current_app.config.get("TRANSFORMER_SLOW_CALL_SECONDS", 20),
+        is_failure=is_outage,
+    )
+
+
+def _generation_lookup(
+    authorization, text, provider, model, prompting_strategy, layout
+):
+    """Return ``(cache, key, cached_bpmn)`` for a generate request.
+
+    ``key`` is ``None`` when the request must not be cached or coalesced.
+    """
+    # Resubmitted text (e.g. the editor's "regenerate" button) is served from
+    # the result cache, and identical requests in flight at the same time share
+    # one connector call. The key includes the credential: the connector, as
+    # the authoritative validator, must have accepted it for the result to be
+    # reused, and requests without one always reach it and get their 401.
+    cache = GenerationCache()
+    key = generation_key(
+        authorization, text, provider, model, prompting_strategy, layout
+    )
+    cached = None
+    if key is not None and cache.enabled:
+        cached = cache.get(key)
+    return cache, key, cached
+
+
+def _build_bpmn(raw_response, cache, key, layout):
+    with stage("bpmn_build"):
+        bpmn_xml = raw_response_to_bpmn(raw_response, layout)
+    if key is not None and cache.enabled:
+        cache.set(key, bpmn_xml)
+    return bpmn_xml
+
+
+def _generate_bpmn(
+    authorization, text, provider, model, prompting_strategy=None, layout="layered"
+):
+    cache, key, cached = _generation_lookup(
+        authorization, text, provider, model, prompting_strategy, layout
+    )
+    if cached is not None:
+        # Cached under the same credential, so the connector accepted these.
+        label_pipeline(provider, model)
+        return cached
+
+    def _generate():
+        with AdmissionController(provider, model).slot(), _connector_breaker().call():
+            with stage("connector"):
+                raw_response = ConnectorClient().generate(
+                    authorization=authorization,
+                    user_text=text,
+                    provider=provider,
+                    model=model,
+                    prompting_strategy=prompting_strategy,
+                )
+        label_pipeline(provider, model)
+        return _build_bpmn(raw_response, cache, key, layout)
+
+    if key is None:
+        return _generate()
+    bpmn_xml = SingleFlight("bpmn").do(key, _generate)
+    # A coalesced result comes from a leader the connector answered.
+    label_pipeline(provider, model)
+    return bpmn_xml
+
+
+async def _generate_bpmn_async(
+    authorization, text, provider, model, prompting_strategy=None, layout="layered"
+):
+    cache, key, cached = _generation_lookup(
+        authorization, text, provider, model, prompting_strategy, layout
     )
-    return raw_response_to_bpmn(raw_response)
+    if cached is not None:
+        label_pipeline(provider, model)
+        return cached
+
+    async def _generate():
+        async with AdmissionController(provider, model).slot_async():
+            with _connector_breaker().call(), stage("connector"):
+                raw_response = await AsyncConnectorClient().generate(
+                    authorization=authorization,
+                    user_text=text,
+                    provider=provider,
+                    model=model,
+                    prompting_strategy=prompting_strategy,
+                )
+        label_pipeline(provider, model)
+        return _build_bpmn(raw_response, cache, key, layout)
+
+    if key is None:
+        return await _generate()
+    bpmn_xml = await SingleFlight("bpmn").do_async(key, _generate)
+    label_pipeline(provider, model)
+    return bpmn_xml
 
 
-def _transform_to_pnml(bpmn_xml):
-    bpmn_xml = sanitize_bpmn_for_transform(bpmn_xml)
+def _transform_input(bpmn_xml):
+    """Return ``(sanitized_bpmn, cache, key, cached_pnml)`` for a transformation."""
+    with stage("sanitize"):
+        bpmn_xml = sanitize_bpmn_for_transform(bpmn_xml)
+    cache = TransformCache()
+    key = transform_key(bpmn_xml, "bpmntopnml") if cache.enabled else None
+    cached = cache.get(key) if key is not None else None
+    return bpmn_xml, cache, key, cached
+
+
+def _transform_to_pnml(bpmn_xml, layout="layered"):
+    bpmn_xml, cache, key, cached = _transform_input(bpmn_xml)
+    if cached is not None:
+        return _postprocess_pnml(cached, bpmn_xml, layout=layout)
     # The incoming BPMN already carries a layout, but the transformer discards
     # it and we recompute coordinates on the PNML below. That double layout is
     # intentional: both paths reuse the same BPMN builder, and the cost is
     # negligible next to the LLM call and transformer round-trip. Avoiding it
     # would mean emitting layout-free BPMN, which the transformer may reject.
-    pnml_xml = ModelTransformer().transform(bpmn_xml, {"direction": "bpmntopnml"})
-    pnml_xml = assign_pnml_coordinates(pnml_xml)
-    pnml_xml = repair_pnml_connectivity_from_bpmn(pnml_xml, bpmn_xml)
-    pnml_xml = assign_pnml_coordinates(pnml_xml)
+    with _transformer_breaker().call(), stage("transformer"):
+        pnml_xml = ModelTransformer().transform(bpmn_xml, {"direction": "bpmntopnml"})
+    return _postprocess_pnml(pnml_xml, bpmn_xml, cache, key, layout)
+
+
+async def _transform_to_pnml_async(bpmn_xml, layout="layered"):
+    bpmn_xml, cache, key, cached = _transform_input(bpmn_xml)
+    if cached is not None:
+        return _postprocess_pnml(cached, bpmn_xml, layout=layout)
+    with _transformer_breaker().call(), stage("transformer"):
+        pnml_xml = await AsyncModelTransformer().transform(
+            bpmn_xml, {"direction": "bpmntopnml"}
+        )
+    return _postprocess_pnml(pnml_xml, bpmn_xml, cache, key, layout)
+
+
+def _postprocess_pnml(pnml_xml, bpmn_xml, cache=None, key=None, layout="layered"):
+    """Lay out and repair transformer output; store it under *key* if given."""
+    # Post-process on a single parsed tree: lay out, repair against the BPMN,
+    # lay out the repaired net again, validate, and serialize once.
+    document = PnmlDocument.parse(pnml_xml)
+    if document is None:
+        logger.warning("Transformer returned PNML that is not XML; skipping layout")
+        return pnml_xml
+    # Only output that parsed as XML is worth replaying for the same model.
+    if key is not None:
+        cache.set(key, pnml_xml)
+    with stage("pnml_layout"):
+        document.assign_coordinates(layout)
+    with stage("pnml_repair"):
+        document.repair_connectivity(bpmn_xml)
+    with stage("pnml_layout"):
+        document.assign_coordinates(layout)
     try:
-        validate_pnml_connectivity(pnml_xml)
+        with stage("pnml_validate"):
+            document.validate_connectivity()
     except PnmlStructureError as exc:
         # Best-effort delivery: return partially repaired PNML instead of
         # failing the request when residual structural issues remain.
@@ -103,7 +288,7 @@ def _transform_to_pnml(bpmn_xml):
             "Returning best-effort PNML with residual connectivity issues",
             extra={"error": str(exc)},
         )
-    return pnml_xml
+    return document.to_string()
 
 
 def _legacy_generate(target):
@@ -130,6 +315,13 @@ def _legacy_generate(target):
         )
         result = _transform_to_pnml(bpmn_xml) if target == "pnml" else bpmn_xml
         return jsonify({"result": result}), 200
+    except (OverloadedError, CircuitOpenError) as e:
+        status = "503"
+        return (
+            jsonify({"error": "Service temporarily unavailable; retry later."}),
+            503,
+            {"Retry-After": str(e.retry_after)},
+        )
     except requests.exceptions.RequestException:
         status = "500"
         logger.exception("Legacy transformation failed")
@@ -209,128 +401,469 @@ def generatePNML():
 # --- v2 API ---------------------------------------------------------------
 
 
-def _v2_generate(target):
-    """Forward a v2 generate request to the connector and produce the requested model.
+def _generate_target(authorization, data, target, endpoint_label):
+    """Run the generate pipeline for *target* and return the model string.
 
-    Request validation — bearer token, JSON body, required fields, and
-    provider/model — is owned by the connector, the authoritative validator for
-    the generate contract (see ``docs/api-contract.md``). This handler does not
-    duplicate those guards: it forwards the ``Authorization`` header and body
-    fields verbatim and relays the connector's responses, including 4xx (e.g.
-    ``401 unauthorized``, ``400 invalid_request``/``invalid_provider``),
-    unchanged.
-
-    The connector returns an LLM BPMN structure which this service converts to
-    BPMN XML. ``target == "pnml"`` then transforms that XML to PNML.
+    ``target == "pnml"`` transforms the BPMN to PNML. If that transformation
+    fails for a few-shot BPMN, the BPMN is regenerated zero-shot and the
+    transformation retried once, unless the transformer's circuit is open.
+    The run must finish within ``REQUEST_DEADLINE_SECONDS``; each upstream
+    call gets only what is left of it. Failures propagate; ``_generate_error``
+    maps them to the v2 error contract.
     """
-    start_time = time.time()
-    endpoint_label = request.path
-    status = "200"
-    try:
-        authorization = request.headers.get("Authorization", "")
-        data = request.get_json(silent=True)
-        if not isinstance(data, dict):
-            data = {}
-
+    layout = _request_layout(data)
+    with request_deadline(current_app.config.get("REQUEST_DEADLINE_SECONDS")):
+        if target == "pnml":
+            # Without a transformer the LLM call would be wasted.
+            _transformer_breaker().check()
         bpmn_xml = _generate_bpmn(
             authorization=authorization,
             text=data.get("text"),
             provider=data.get("provider"),
             model=data.get("model"),
             prompting_strategy=data.get("prompting_strategy"),
+            layout=layout,
         )
+        if target != "pnml":
+            return bpmn_xml
+        emit("bpmn", result=bpmn_xml)
+
+        try:
+            return _transform_to_pnml(bpmn_xml, layout)
+        except TRANSFORM_ERRORS:
+            if data.get("prompting_strategy") != "few_shot":
+                raise
+            # Regenerating is pointless if the failure left the transformer's
+            # circuit open.
+            _transformer_breaker().check()
+            logger.warning(
+                "Few-shot BPMN failed PNML transform, retrying with zero_shot",
+                extra={"endpoint": endpoint_label},
+            )
+            fallback_bpmn_xml = _generate_bpmn(
+                authorization=authorization,
+                text=data.get("text"),
+                provider=data.get("provider"),
+                model=data.get("model"),
+                prompting_strategy="zero_shot",
+                layout=layout,
+            )
+            emit("bpmn", result=fallback_bpmn_xml)
+            return _transform_to_pnml(fallback_bpmn_xml, layout)
+
 
+async def _generate_target_async(authorization, data, target, endpoint_label):
+    """Coroutine form of ``_generate_target`` for the asyncio serving mode."""
+    layout = _request_layout(data)
+    with request_deadline(current_app.config.get("REQUEST_DEADLINE_SECONDS")):
         if target == "pnml":
-            try:
-                result = _transform_to_pnml(bpmn_xml)
-            except requests.exceptions.RequestException:
-                prompting_strategy = data.get("prompting_strategy")
-                if prompting_strategy == "few_shot":
-                    logger.warning(
-                        "Few-shot BPMN failed PNML transform, retrying with zero_shot",
-                        extra={"endpoint": endpoint_label},
-                    )
-                    try:
-                        fallback_bpmn_xml = _generate_bpmn(
-                            authorization=authorization,
-                            text=data.get("text"),
-                            provider=data.get("provider"),
-                            model=data.get("model"),
-                            prompting_strategy="zero_shot",
-                        )
-                        result = _transform_to_pnml(fallback_bpmn_xml)
-                    except requests.exceptions.RequestException:
-                        status = "500"
-                        logger.exception(
-                            "BPMN to PNML transformation failed (few_shot + zero_shot fallback)",
-                            extra={"endpoint": endpoint_label},
-                        )
-                        return _error_response(
-                            500,
-                            "transform_error",
-                            "The BPMN to PNML transformation service failed.",
-                        )
-                else:
-                    status = "500"
-                    logger.exception(
-                        "BPMN to PNML transformation failed",
-                        extra={"endpoint": endpoint_label},
-                    )
-                    return _error_response(
-                        500,
-                        "transform_error",
-                        "The BPMN to PNML transformation service failed.",
-                    )
-        else:
-            result = bpmn_xml
+            # Without a transformer the LLM call would be wasted.
+            _transformer_breaker().check()
+        bpmn_xml = await _generate_bpmn_async(
+            authorization=authorization,
+            text=data.get("text"),
+            provider=data.get("provider"),
+            model=data.get("model"),
+            prompting_strategy=data.get("prompting_strategy"),
+            layout=layout,
+        )
+        if target != "pnml":
+            return bpmn_xml
+        emit("bpmn", result=bpmn_xml)
 
-        logger.info("v2 generate completed", extra={"endpoint": endpoint_label})
-        return jsonify({"result": result}), 200
+        try:
+            return await _transform_to_pnml_async(bpmn_xml, layout)
+        except TRANSFORM_ERRORS:
+            if data.get("prompting_strategy") != "few_shot":
+                raise
+            # Regenerating is pointless if the failure left the transformer's
+            # circuit open.
+            _transformer_breaker().check()
+            logger.warning(
+                "Few-shot BPMN failed PNML transform, retrying with zero_shot",
+                extra={"endpoint": endpoint_label},
+            )
+            fallback_bpmn_xml = await _generate_bpmn_async(
+                authorization=authorization,
+                text=data.get("text"),
+                provider=data.get("provider"),
+                model=data.get("model"),
+                prompting_strategy="zero_shot",
+                layout=layout,
+            )
+            emit("bpmn", result=fallback_bpmn_xml)
+            return await _transform_to_pnml_async(fallback_bpmn_xml, layout)
+
+
+def _request_layout(data):
+    """Return the layout engine named by the request's ``layout`` field.
 
-    except ConnectorClientError as e:
+    Unlike the other fields, ``layout`` is never seen by the connector, so it
+    is validated here, before any upstream call.
+    """
+    layout = data.get("layout") or "layered"
+    if not isinstance(layout, str) or layout not in LAYOUTS:
+        raise UnknownLayoutError(
+            f"Unknown layout {layout!r}; expected one of: {', '.join(LAYOUTS)}."
+        )
+    return layout
+
+
+def _generate_error(exc, endpoint_label):
+    """Map a generate pipeline failure to ``(status_code, error_body)``.
+
+    A connector 4xx is relayed with its own body; every other failure gets the
+    standard ``{"error": {"code", "message"}}`` body. Call it from the
+    ``except`` block handling *exc* so the logged traceback is the right one.
+    """
+    if isinstance(exc, UnknownLayoutError):
+        return 400, _error_body("invalid_request", str(exc))
+    if isinstance(exc, OverloadedError):
+        return 503, _error_body("overloaded", str(exc))
+    if isinstance(exc, CircuitOpenError):
+        return 503, _error_body("upstream_unavailable", str(exc))
+    if isinstance(exc, DeadlineExceeded):
+        logger.warning(
+            "Generate request deadline exceeded", extra={"endpoint": endpoint_label}
+        )
+        return 504, _error_body("deadline_exceeded", str(exc))
+    if isinstance(exc, TRANSFORM_ERRORS):
+        logger.exception(
+            "BPMN to PNML transformation failed",
+            extra={"endpoint": endpoint_label},
+        )
+        return 500, _error_body(
+            "transform_error", "The BPMN to PNML transformation service failed."
+        )
+    if isinstance(exc, ConnectorClientError):
         # The connector rejected the request (e.g. invalid provider/model);
         # relay its status and error body to the client unchanged.
-        status = str(e.status_code)
         logger.info(
             "Relaying connector client error",
-            extra={"endpoint": endpoint_label, "status": e.status_code},
+            extra={"endpoint": endpoint_label, "status": exc.status_code},
         )
-        if isinstance(e.error_body, dict) and "error" in e.error_body:
-            return jsonify(e.error_body), e.status_code
-        return _error_response(
-            e.status_code,
-            "invalid_request",
-            "The request was rejected by the LLM API connector.",
+        if isinstance(exc.error_body, dict) and "error" in exc.error_body:
+            return exc.status_code, exc.error_body
+        return exc.status_code, _error_body(
+            "invalid_request", "The request was rejected by the LLM API connector."
         )
-    except ConnectorError as e:
-        status = "500"
+    if isinstance(exc, ConnectorError):
         logger.exception(
             "Connector call failed",
             extra={"endpoint": endpoint_label},
         )
-        detail = str(e) if str(e) else "The LLM API connector is unavailable."
-        return _error_response(500, "upstream_error", detail)
-    except (InvalidModelError, PnmlStructureError) as e:
-        status = "500"
+        detail = str(exc) if str(exc) else "The LLM API connector is unavailable."
+        return 500, _error_body("upstream_error", detail)
+    if isinstance(exc, (InvalidModelError, PnmlStructureError)):
         logger.warning(
             "Connector returned an invalid process model",
-            extra={"endpoint": endpoint_label, "error": str(e)},
+            extra={"endpoint": endpoint_label, "error": str(exc)},
         )
-        return _error_response(
-            500,
+        return 500, _error_body(
             "invalid_model",
             "The LLM API connector returned a process model that could not be processed.",
         )
-    except Exception:
-        status = "500"
-        logger.exception("Unexpected error in v2 generate")
-        return _error_response(500, "internal_error", "An unexpected error occurred.")
-    finally:
-        duration = time.time() - start_time
-        REQUEST_COUNT.labels(
-            method="POST", endpoint=endpoint_label, status=status
-        ).inc()
-        REQUEST_LATENCY.labels(method="POST", endpoint=endpoint_label).observe(duration)
+    logger.exception("Unexpected error in v2 generate")
+    return 500, _error_body("internal_error", "An unexpected error occurred.")
+
+
+def _request_data():
+    """Return the JSON request body as a dict; anything else is empty."""
+    data = request.get_json(silent=True)
+    return data if isinstance(data, dict) else {}
+
+
+def _v2_generate(target):
+    """Forward a v2 generate request to the connector and produce the requested model.
+
+    Request validation — bearer token, JSON body, required fields, and
+    provider/model — is owned by the connector, the authoritative validator for
+    the generate contract (see ``docs/api-contract.md``). This handler does not
+    duplicate those guards: it forwards the ``Authorization`` header and body
+    fields verbatim and relays the connector's responses, including 4xx (e.g.
+    ``401 unauthorized``, ``400 invalid_request``/``invalid_provider``),
+    unchanged.
+
+    The connector returns an LLM BPMN structure which this service converts to
+    BPMN XML. ``target == "pnml"`` then transforms that XML to PNML.
+
+    A client accepting ``text/event-stream`` or ``application/x-ndjson`` gets
+    the progress stream of ``_v2_generate_stream`` instead.
+    """
+    media_type = _stream_media_type()
+    if media_type is not None:
+        return _v2_generate_stream(target, media_type)
+
+    start_time = time.time()
+    endpoint_label = request.path
+    status = "200"
+    data = _request_data()
+    with track_pipeline() as timings:
+        try:
+            result = _generate_target(
+                request.headers.get("Authorization", ""),
+                data,
+                target,
+                endpoint_label,
+            )
+            logger.info("v2 generate completed", extra={"endpoint": endpoint_label})
+            response = make_response(jsonify({"result": result}), 200)
+        except Exception as e:
+            response = _generate_failure_response(e, endpoint_label)
+            status = str(response.status_code)
+        finally:
+            duration = time.time() - start_time
+            REQUEST_COUNT.labels(
+                method="POST", endpoint=endpoint_label, status=status
+            ).inc()
+            REQUEST_LATENCY.labels(method="POST", endpoint=endpoint_label).observe(
+                duration
+            )
+
+    return _with_timings(response, timings, target)
+
+
+async def _v2_generate_async(target):
+    """Coroutine form of ``_v2_generate``, served by the ASGI app (app/asgi.py)."""
+    media_type = _stream_media_type()
+    if media_type is not None:
+        return _v2_generate_stream_async(target, media_type)
+
+    start_time = time.time()
+    endpoint_label = request.path
+    status = "200"
+    data = _request_data()
+    with track_pipeline() as timings:
+        try:
+            result = await _generate_target_async(
+                request.headers.get("Authorization", ""),
+                data,
+                target,
+                endpoint_label,
+            )
+            logger.info("v2 generate completed", extra={"endpoint": endpoint_label})
+            response = make_response(jsonify({"result": result}), 200)
+        except Exception as e:
+            response = _generate_failure_response(e, endpoint_label)
+            status = str(response.status_code)
+        finally:
+            duration = time.time() - start_time
+            REQUEST_COUNT.labels(
+                method="POST", endpoint=endpoint_label, status=status
+            ).inc()
+            REQUEST_LATENCY.labels(method="POST", endpoint=endpoint_label).observe(
+                duration
+            )
+
+    return _with_timings(response, timings, target)
+
+
+# Media types that switch /v2/generate/* to a progress stream.
+_STREAM_MEDIA_TYPES = ("text/event-stream", "application/x-ndjson")
+# Seconds between SSE keep-alive comments while no stage is reporting.
+_STREAM_KEEPALIVE_SECONDS = 15
+
+
+def _stream_media_type():
+    """Return the streaming media type the client prefers, or ``None`` for JSON."""
+    best = request.accept_mimetypes.best_match(
+        ("application/json",) + _STREAM_MEDIA_TYPES
+    )
+    return best if best in _STREAM_MEDIA_TYPES else None
+
+
+def _format_event(media_type, event, data):
+    if media_type == "text/event-stream":
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"event": event, **data}) + "\n"
+
+
+def _stream_response(body, media_type):
+    response = Response(body, mimetype=media_type)
+    response.headers["Cache-Control"] = "no-cache"
+    # Keep reverse proxies from buffering the events.
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _stream_failure(exc, endpoint_label):
+    """Map *exc* to the final ``error`` event and its metric status."""
+    status_code, body = _generate_error(exc, endpoint_label)
+    return str(status_code), ("error", {"status": status_code, **body})
+
+
+def _stream_finish(final, status, timings, target, endpoint_label, start_time):
+    """Record a streamed request's metrics; return *final* with its timings."""
+    REQUEST_COUNT.labels(method="POST", endpoint=endpoint_label, status=status).inc()
+    REQUEST_LATENCY.labels(method="POST", endpoint=endpoint_label).observe(
+        time.time() - start_time
+    )
+    API_CALL_DURATION.observe(timings.total)
+    timings.observe(target)
+    final[1]["timings"] = timings.milliseconds()
+    return final
+
+
+_STREAM_INTERNAL_ERROR = (
+    "error",
+    {"status": 500, **_error_body("internal_error", "An unexpected error occurred.")},
+)
+
+
+class _StreamClosed(Exception):
+    """Raised in a streamed run at its next stage once the client has gone."""
+
+
+def _v2_generate_stream(target, media_type):
+    """Run the generate pipeline on a pool thread and stream its progress events.
+
+    Events are ``stage`` (a stage started or finished), ``bpmn`` (the BPMN of
+    a PNML request, as soon as it is built) and finally either ``result`` or
+    ``error`` with the body the JSON endpoint would have returned and the
+    stage timings. The HTTP status is 200 and failures are reported in the
+    ``error`` event, unless the ``STREAM_MAX_CONCURRENCY`` streams of this
+    worker are all running: then the request is refused with ``503``. A
+    client that disconnects stops the run at its next stage.
+    """
+    start_time = time.time()
+    endpoint_label = request.path
+    runner = get_stream_runner()
+    if not runner.reserve():
+        REQUEST_COUNT.labels(method="POST", endpoint=endpoint_label, status="503").inc()
+        error = _error_body("overloaded", "Too many streams in flight; retry later.")
+        response = make_response(jsonify(error), 503)
+        response.headers["Retry-After"] = "5"
+        return response
+
+    data = _request_data()
+    authorization = request.headers.get("Authorization", "")
+    app = current_app._get_current_object()
+    events = queue.Queue()
+    closed = threading.Event()
+
+    def _listen(*event):
+        if closed.is_set():
+            raise _StreamClosed()
+        events.put(event)
+
+    def _run():
+        final = _STREAM_INTERNAL_ERROR
+        try:
+            with app.app_context():
+                with track_pipeline(_listen) as timings:
+                    try:
+                        result = _generate_target(
+                            authorization, data, target, endpoint_label
+                        )
+                        logger.info(
+                            "v2 generate completed", extra={"endpoint": endpoint_label}
+                        )
+                        status, final = "200", ("result", {"result": result})
+                    except _StreamClosed:
+                        logger.info(
+                            "v2 generate stream closed by the client",
+                            extra={"endpoint": endpoint_label},
+                        )
+                        # Nobody reads this event; 499 is nginx's "client
+                        # closed request".
+                        status, final = "499", ("error", {"status": 499})
+                    except Exception as e:
+                        status, final = _stream_failure(e, endpoint_label)
+                final = _stream_finish(
+                    final, status, timings, target, endpoint_label, start_time
+                )
+        except Exception:
+            logger.exception("Unexpected error in v2 generate stream")
+        finally:
+            events.put(final)
+
+    runner.run(_run)
+
+    def _stream():
+        try:
+            while True:
+                try:
+                    event, payload = events.get(timeout=_STREAM_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    if media_type == "text/event-stream":
+                        yield ": keep-alive\n\n"
+                    continue
+                yield _format_event(media_type, event, payload)
+                if event in ("result", "error"):
+                    return
+        finally:
+            # Closed early when the client disconnects.
+            closed.set()
+
+    return _stream_response(_stream(), media_type)
+
+
+def _v2_generate_stream_async(target, media_type):
+    """Coroutine-mode ``_v2_generate_stream``: the pipeline runs as a task."""
+    start_time = time.time()
+    endpoint_label = request.path
+    data = _request_data()
+    authorization = request.headers.get("Authorization", "")
+    events = asyncio.Queue()
+
+    async def _run():
+        final = _STREAM_INTERNAL_ERROR
+        try:
+            with track_pipeline(lambda *event: events.put_nowait(event)) as timings:
+                try:
+                    result = await _generate_target_async(
+                        authorization, data, target, endpoint_label
+                    )
+                    logger.info(
+                        "v2 generate completed", extra={"endpoint": endpoint_label}
+                    )
+                    status, final = "200", ("result", {"result": result})
+                except Exception as e:
+                    status, final = _stream_failure(e, endpoint_label)
+            final = _stream_finish(
+                final, status, timings, target, endpoint_label, start_time
+            )
+        except Exception:
+            logger.exception("Unexpected error in v2 generate stream")
+        finally:
+            events.put_nowait(final)
+
+    # Created inside the request context, so the task runs with it.
+    task = asyncio.get_running_loop().create_task(_run())
+
+    async def _stream():
+        while True:
+            try:
+                event, payload = await asyncio.wait_for(
+                    events.get(), _STREAM_KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                if media_type == "text/event-stream" and not task.done():
+                    yield ": keep-alive\n\n"
+                continue
+            yield _format_event(media_type, event, payload)
+            if event in ("result", "error"):
+                return
+
+    return _stream_response(_stream(), media_type)
+
+
+def _generate_failure_response(exc, endpoint_label):
+    status_code, body = _generate_error(exc, endpoint_label)
+    response = make_response(jsonify(body), status_code)
+    if isinstance(exc, (OverloadedError, CircuitOpenError)):
+        response.headers["Retry-After"] = str(exc.retry_after)
+    return response
+
+
+def _with_timings(response, timings, target):
+    """Record the pipeline timings and expose them as ``Server-Timing``."""
+    API_CALL_DURATION.observe(timings.total)
+    timings.observe(target)
+    if current_app.config.get("SERVER_TIMING_ENABLED", True):
+        response.headers["Server-Timing"] = timings.server_timing()
+        response.headers["Timing-Allow-Origin"] = "*"
+    return response
 
 
 @api_bp.route("/v2/generate/bpmn", methods=["POST"])
@@ -356,6 +889,11 @@ def _v2_generate(target):
                                 "enum": ["zero_shot", "few_shot"],
                                 "default": "zero_shot",
                             },
+                            "layout": {
+                                "type": "string",
+                                "enum": ["layered", "sugiyama"],
+                                "default": "layered",
+                            },
                         },
                     }
                 }
@@ -363,19 +901,33 @@ def _v2_generate(target):
         },
         "responses": {
             "200": {
-                "description": "Generation successful",
+                "description": (
+                    "Generation successful. With `Accept: text/event-stream` or "
+                    "`Accept: application/x-ndjson` the response is a progress "
+                    "stream of `stage` events and a final `result` or `error` "
+                    "event."
+                ),
                 "content": {
                     "application/json": {
                         "schema": {
                             "type": "object",
                             "properties": {"result": {"type": "string"}},
                         }
-                    }
+                    },
+                    "text/event-stream": {"schema": {"type": "string"}},
+                    "application/x-ndjson": {"schema": {"type": "string"}},
                 },
             },
             "400": {"description": "Invalid request"},
             "401": {"description": "Unauthorized"},
             "500": {"description": "Internal or upstream error"},
+            "503": {
+                "description": (
+                    "Overloaded, or the connector or transformer is unavailable; "
+                    "retry after `Retry-After` seconds"
+                )
+            },
+            "504": {"description": "Request deadline exceeded"},
         },
     }
 )
@@ -406,6 +958,11 @@ def v2_generate_bpmn():
                                 "enum": ["zero_shot", "few_shot"],
                                 "default": "zero_shot",
                             },
+                            "layout": {
+                                "type": "string",
+                                "enum": ["layered", "sugiyama"],
+                                "default": "layered",
+                            },
                         },
                     }
                 }
@@ -413,19 +970,33 @@ def v2_generate_bpmn():
         },
         "responses": {
             "200": {
-                "description": "Generation successful",
+                "description": (
+                    "Generation successful. With `Accept: text/event-stream` or "
+                    "`Accept: application/x-ndjson` the response is a progress "
+                    "stream of `stage` events and a final `result` or `error` "
+                    "event."
+                ),
                 "content": {
                     "application/json": {
                         "schema": {
                             "type": "object",
                             "properties": {"result": {"type": "string"}},
                         }
-                    }
+                    },
+                    "text/event-stream": {"schema": {"type": "string"}},
+                    "application/x-ndjson": {"schema": {"type": "string"}},
                 },
             },
             "400": {"description": "Invalid request"},
             "401": {"description": "Unauthorized"},
             "500": {"description": "Internal, upstream, or transform error"},
+            "503": {
+                "description": (
+                    "Overloaded, or the connector or transformer is unavailable; "
+                    "retry after `Retry-After` seconds"
+                )
+            },
+            "504": {"description": "Request deadline exceeded"},
         },
     }
 )
@@ -433,12 +1004,372 @@ def v2_generate_pnml():
     return _v2_generate("pnml")
 
 
+def _run_generate_job(app, job_id, authorization, data, target):
+    """Execute one accepted generation job on a background worker thread."""
+    endpoint_label = "/v2/jobs/generate"
+    with app.app_context():
+        store = JobStore()
+        try:
+            store.update(job_id, RUNNING)
+            with track_pipeline() as timings:
+                try:
+                    result = _generate_target(
+                        authorization, data, target, endpoint_label
+                    )
+                except Exception as e:
+                    _, body = _generate_error(e, endpoint_label)
+                    store.update(job_id, FAILED, error=body["error"])
+                else:
+                    store.update(job_id, SUCCEEDED, result=result)
+                    logger.info("v2 generate job completed", extra={"job_id": job_id})
+            timings.observe(target)
+        except JobStoreError:
+            logger.exception("Failed to record job state", extra={"job_id": job_id})
+
+
+def _job_representation(job_id, job):
+    representation = {
+        "job_id": job_id,
+        "status": job["status"],
+        "target": job["target"],
+    }
+    if job["status"] == SUCCEEDED:
+        representation["result"] = job.get("result")
+    elif job["status"] == FAILED:
+        representation["error"] = job.get("error")
+    return representation
+
+
+_JOB_REQUEST_SCHEMA = {
+    "type": "object",
+    "required": ["text", "provider", "model"],
+    "properties": {
+        "text": {"type": "string"},
+        "provider": {"type": "string"},
+        "model": {"type": "string"},
+        "prompting_strategy": {
+            "type": "string",
+            "enum": ["zero_shot", "few_shot"],
+            "default": "zero_shot",
+        },
+        "layout": {
+            "type": "string",
+            "enum": ["layered", "sugiyama"],
+            "default": "layered",
+        },
+        "target": {"type": "string", "enum": ["bpmn", "pnml"], "default": "bpmn"},
+    },
+}
+
+_JOB_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "job_id": {"type": "string"},
+        "status": {
+            "type": "string",
+            "enum": ["queued", "running", "succeeded", "failed"],
+        },
+        "target": {"type": "string"},
+        "result": {"type": "string"},
+        "error": {
+            "type": "object",
+            "properties": {
+                "code": {"type": "string"},
+                "message": {"type": "string"},
+            },
+        },
+    },
+}
+
+
+@api_bp.route("/v2/jobs/generate", methods=["POST"])
+@swag_from(
+    {
+        "tags": ["v2"],
+        "summary": "Submit a generation job",
+        "description": (
+            "Queue a BPMN or PNML generation and return immediately. Poll "
+            "GET /v2/jobs/{job_id} for the result."
+        ),
+        "security": [{"bearerAuth": []}],
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": _JOB_REQUEST_SCHEMA}},
+        },
+        "responses": {
+            "202": {
+                "description": "Job accepted",
+                "content": {"application/json": {"schema": _JOB_SCHEMA}},
+            },
+            "400": {"description": "Invalid target"},
+            "503": {"description": "Too many jobs in flight"},
+            "500": {"description": "Internal error"},
+        },
+    }
+)
+def v2_submit_generate_job():
+    start_time = time.time()
+    status = "202"
+    try:
+        data = _request_data()
+        target = data.get("target") or "bpmn"
+        if target not in ("bpmn", "pnml"):
+            status = "400"
+            return _error_response(
+                400, "invalid_request", "Field 'target' must be 'bpmn' or 'pnml'."
+            )
+
+        # Record the job only once the pool has room for it, so a rejected
+        # submission leaves nothing behind.
+        runner = get_job_runner()
+        if not runner.reserve():
+            status = "503"
+            error = _error_body(
+                "overloaded", "Too many generation jobs in flight; retry later."
+            )
+            response = make_response(jsonify(error), 503)
+            response.headers["Retry-After"] = "5"
+            return response
+        authorization = request.headers.get("Authorization", "")
+        try:
+            job_id = JobStore().create(target, authorization)
+        except BaseException:
+            runner.cancel()
+            raise
+        runner.run(
+            _run_generate_job,
+            current_app._get_current_object(),
+            job_id,
+            authorization,
+            data,
+            target,
+        )
+
+        response = make_response(
+            jsonify({"job_id": job_id, "status": "queued", "target": target}), 202
+        )
+        response.headers["Location"] = f"/v2/jobs/{job_id}"
+        return response
+    except JobStoreError:
+        status = "500"
+        logger.exception("Failed to create generation job")
+        return _error_response(500, "internal_error", "The job store is unavailable.")
+    finally:
+        duration = time.time() - start_time
+        REQUEST_COUNT.labels(
+            method="POST", endpoint="/v2/jobs/generate", status=status
+        ).inc()
+        REQUEST_LATENCY.labels(method="POST", endpoint="/v2/jobs/generate").observe(
+            duration
+        )
+
+
+@api_bp.route("/v2/jobs/<job_id>", methods=["GET"])
+@swag_from(
+    {
+        "tags": ["v2"],
+        "summary": "Get a generation job",
+        "description": "Return the state of a job and, once finished, its result or error.",
+        "security": [{"bearerAuth": []}],
+        "parameters": [
+            {
+                "name": "job_id",
+                "in": "path",
+                "required": True,
+                "schema": {"type": "string"},
+            }
+        ],
+        "responses": {
+            "200": {
+                "description": "Job state",
+                "content": {"application/json": {"schema": _JOB_SCHEMA}},
+            },
+            "404": {
+                "description": "Unknown or expired job, or submitted with another credential"
+            },
+            "500": {"description": "Internal error"},
+        },
+    }
+)
+def v2_get_generate_job(job_id):
+    start_time = time.time()
+    status = "200"
+    try:
+        job = JobStore().get(job_id, request.headers.get("Authorization", ""))
+        if job is None:
+            status = "404"
+            return _error_response(404, "not_found", "Unknown or expired job.")
+
+        response = make_response(jsonify(_job_representation(job_id, job)), 200)
+        if job["status"] not in (SUCCEEDED, FAILED):
+            response.headers["Retry-After"] = "1"
+        return response
+    except JobStoreError:
+        status = "500"
+        logger.exception("Failed to read generation job", extra={"job_id": job_id})
+        return _error_response(500, "internal_error", "The job store is unavailable.")
+    finally:
+        duration = time.time() - start_time
+        REQUEST_COUNT.labels(
+            method="GET", endpoint="/v2/jobs/{id}", status=status
+        ).inc()
+        REQUEST_LATENCY.labels(method="GET", endpoint="/v2/jobs/{id}").observe(duration)
+
+
+def _run_batch_item(app, authorization, index, item):
+    """Generate one batch item on a pool thread and return its NDJSON record."""
+    endpoint_label = "/v2/generate/batch"
+    if not isinstance(item, dict):
+        return {
+            "index": index,
+            "status": 400,
+            **_error_body("invalid_request", "Each item must be a JSON object."),
+        }
+    target = item.get("target") or "bpmn"
+    if target not in ("bpmn", "pnml"):
+        return {
+            "index": index,
+            "status": 400,
+            **_error_body(
+                "invalid_request", "Field 'target' must be 'bpmn' or 'pnml'."
+            ),
+        }
+
+    with app.app_context():
+        with track_pipeline() as timings:
+            try:
+                result = _generate_target(authorization, item, target, endpoint_label)
+                record = {"index": index, "status": 200, "result": result}
+            except Exception as e:
+                status_code, body = _generate_error(e, endpoint_label)
+                record = {"index": index, "status": status_code, **body}
+        timings.observe(target)
+    return record
+
+
+@api_bp.route("/v2/generate/batch", methods=["POST"])
+@swag_from(
+    {
+        "tags": ["v2"],
+        "summary": "Generate a batch of models",
+        "description": (
+            "Generate BPMN or PNML for many process descriptions in one request. "
+            "Items run concurrently and one NDJSON record is streamed per item as "
+            "soon as it finishes, in completion order; a failed item does not "
+            "affect the others."
+        ),
+        "security": [{"bearerAuth": []}],
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["items"],
+                        "properties": {
+                            "items": {"type": "array", "items": _JOB_REQUEST_SCHEMA}
+                        },
+                    }
+                }
+            },
+        },
+        "responses": {
+            "200": {
+                "description": "One JSON record per line and item",
+                "content": {
+                    "application/x-ndjson": {
+                        "schema": {
+                            "type": "object",
+                            "properties": {
+                                "index": {"type": "integer"},
+                                "status": {"type": "integer"},
+                                "result": {"type": "string"},
+                                "error": _JOB_SCHEMA["properties"]["error"],
+                            },
+                        }
+                    }
+                },
+            },
+            "400": {"description": "Missing, empty or oversized 'items' list"},
+        },
+    }
+)
+def v2_generate_batch():
+    start_time = time.time()
+    endpoint_label = "/v2/generate/batch"
+    data = request.get_json(silent=True)
+    items = data.get("items") if isinstance(data, dict) else None
+    max_items = current_app.config.get("BATCH_MAX_ITEMS", 500)
+    if not isinstance(items, list) or not items or len(items) > max_items:
+        REQUEST_COUNT.labels(method="POST", endpoint=endpoint_label, status="400").inc()
+        return _error_response(
+            400,
+            "invalid_request",
+            f"Field 'items' must be a list of 1 to {max_items} items.",
+        )
+
+    app = current_app._get_current_object()
+    authorization = request.headers.get("Authorization", "")
+    concurrency = min(
+        max(1, current_app.config.get("BATCH_MAX_CONCURRENCY", 8)), len(items)
+    )
+
+    def _stream():
+        executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="t2p-batch"
+        )
+        try:
+            futures = {
+                executor.submit(_run_batch_item, app, authorization, index, item): index
+                for index, item in enumerate(items)
+            }
+            for future in as_completed(futures):
+                try:
+                    record = future.result()
+                except Exception:
+                    logger.exception("Unexpected error in v2 batch item")
+                    record = {
+                        "index": futures[future],
+                        "status": 500,
+                        **_error_body(
+                            "internal_error", "An unexpected error occurred."
+                        ),
+                    }
+                yield json.dumps(record) + "\n"
+        finally:
+            # A client that disconnects mid-stream cancels the items not yet started.
+            executor.shutdown(wait=False, cancel_futures=True)
+            REQUEST_COUNT.labels(
+                method="POST", endpoint=endpoint_label, status="200"
+            ).inc()
+            REQUEST_LATENCY.labels(method="POST", endpoint=endpoint_label).observe(
+                time.time() - start_time
+            )
+
+    logger.info(
+        "v2 batch accepted", extra={"items": len(items), "concurrency": concurrency}
+    )
+    return Response(stream_with_context(_stream()), mimetype="application/x-ndjson")
+
+
 @api_bp.route("/v2/models", methods=["GET"])
 @swag_from(
     {
         "tags": ["v2"],
         "summary": "List available models",
-        "description": "List provider/model pairs advertised by the connector.",
+        "description": (
+            "List provider/model pairs advertised by the connector. The list "
+            "is cached and carries an ETag; send it back in If-None-Match to "
+            "get 304 Not Modified when the list has not changed."
+        ),
+        "parameters": [
+            {
+                "name": "If-None-Match",
+                "in": "header",
+                "required": False,
+                "schema": {"type": "string"},
+            }
+        ],
         "responses": {
             "200": {
                 "description": "Available models",
@@ -462,7 +1393,9 @@ def v2_generate_pnml():
                     }
                 },
             },
+            "304": {"description": "Models list unchanged since the given ETag"},
             "500": {"description": "Upstream or internal error"},
+            "503": {"description": "Connector unavailable and no cached list"},
         },
     }
 )
@@ -470,8 +1403,16 @@ def v2_models():
     start_time = time.time()
     status = "200"
     try:
-        models = ConnectorClient().list_models()
-        return jsonify({"models": models}), 200
+        cache = ModelsCache()
+        entry = cache.get(_list_models)
+        response = _models_response(cache, entry)
+        status = str(response.status_code)
+        return response
+    except CircuitOpenError as e:
+        status = "503"
+        response = make_response(_error_response(503, "upstream_unavailable", str(e)))
+        response.headers["Retry-After"] = str(e.retry_after)
+        return response
     except ConnectorError as e:
         status = "500"
         logger.error("Failed to fetch models from connector", extra={"error": str(e)})
@@ -488,6 +1429,65 @@ def v2_models():
         REQUEST_LATENCY.labels(method="GET", endpoint="/v2/models").observe(duration)
 
 
+async def _v2_models_async():
+    """Coroutine form of ``v2_models``, served by the ASGI app (app/asgi.py)."""
+    start_time = time.time()
+    status = "200"
+    try:
+        cache = ModelsCache()
+        entry = await cache.get_async(_list_models_async)
+        response = _models_response(cache, entry)
+        status = str(response.status_code)
+        return response
+    except CircuitOpenError as e:
+        status = "503"
+        response = make_response(_error_response(503, "upstream_unavailable", str(e)))
+        response.headers["Retry-After"] = str(e.retry_after)
+        return response
+    except ConnectorError as e:
+        status = "500"
+        logger.error("Failed to fetch models from connector", extra={"error": str(e)})
+        return _error_response(
+            500, "upstream_error", "The LLM API connector could not be reached."
+        )
+    except Exception:
+        status = "500"
+        logger.exception("Unexpected error in v2 models")
+        return _error_response(500, "internal_error", "An unexpected error occurred.")
+    finally:
+        duration = time.time() - start_time
+        REQUEST_COUNT.labels(method="GET", endpoint="/v2/models", status=status).inc()
+        REQUEST_LATENCY.labels(method="GET", endpoint="/v2/models").observe(duration)
+
+
+def _list_models():
+    with _connector_breaker().call():
+        return ConnectorClient().list_models()
+
+
+async def _list_models_async():
+    with _connector_breaker().call():
+        return await AsyncConnectorClient().list_models()
+
+
+def _models_response(cache, entry):
+    """Build the models response with its validators; 304 if the client's matches."""
+    response = make_response(jsonify({"models": entry.models}), 200)
+    response.set_etag(entry.etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = cache.max_age(entry)
+    return response.make_conditional(request)
+
+
+# Coroutine views the ASGI app serves natively, by (method, path); every other
+# request goes through the WSGI app. Each mirrors the sync view on that route.
+ASYNC_ROUTES = {
+    ("POST", "/v2/generate/bpmn"): lambda: _v2_generate_async("bpmn"),
+    ("POST", "/v2/generate/pnml"): lambda: _v2_generate_async("pnml"),
+    ("GET", "/v2/models"): _v2_models_async,
+}
+
+
 @api_bp.route("/v2/health", methods=["GET"])
 @swag_from(
     {
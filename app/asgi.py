@@ -0,0 +1,181 @@
+import asyncio
+import io
+import logging
+import sys
+
+from app.api.routes import ASYNC_ROUTES
+from app.backend.http_session import close_async_client
+
+# Module-level logger for this module
+logger = logging.getLogger(__name__)
+
+
+def _environ(scope, body):
+    """Build a WSGI environ for an ASGI HTTP *scope* with the full request *body*."""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    root_path = scope.get("root_path", "")
+    path = scope["path"]
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path) :]
+
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        # WSGI carries paths as latin-1 decoded bytes.
+        "SCRIPT_NAME": root_path.encode("utf-8").decode("latin-1"),
+        "PATH_INFO": path.encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            name = f"HTTP_{name}"
+        environ[name] = f"{environ[name]},{value}" if name in environ else value
+    return environ
+
+
+async def _read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+def _encode_headers(headers):
+    return [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in headers
+    ]
+
+
+class AsgiApp:
+    """ASGI front for the Flask app: the asyncio serving mode.
+
+    ``ASYNC_ROUTES`` (the v2 generate and models endpoints) run as coroutines
+    on the event loop and await the connector and transformer through
+    ``httpx``, so a worker keeps as many upstream calls in flight as
+    ``ASYNC_HTTP_MAX_CONNECTIONS`` allows instead of one per thread. They run
+    inside a regular Flask request context, so ``before_request`` and
+    ``after_request`` hooks (CORS among them) apply as under WSGI. A handler
+    may return a response whose body is an async generator; its chunks are
+    sent as they are produced.
+
+    Every other request is handed to the WSGI app on a worker thread. Select
+    this mode with ``SERVER_MODE=asgi`` in ``boot.sh``.
+    """
+
+    def __init__(self, flask_app, routes=None):
+        self.flask_app = flask_app
+        self.routes = ASYNC_ROUTES if routes is None else routes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            raise ValueError(f"Unsupported ASGI scope type {scope['type']!r}")
+
+        environ = _environ(scope, await _read_body(receive))
+        handler = self.routes.get((scope["method"], scope["path"]))
+        if handler is None:
+            await self._call_wsgi(environ, send)
+        else:
+            await self._call_async(handler, environ, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await close_async_client()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _call_async(self, handler, environ, send):
+        app = self.flask_app
+        with app.request_context(environ):
+            try:
+                rv = app.preprocess_request()
+                if rv is None:
+                    rv = await handler()
+                response = app.make_response(rv)
+            except Exception as e:
+                response = app.make_response(app.handle_exception(e))
+            response = app.process_response(response)
+            # Progress streams are async generators; everything else is buffered.
+            stream = response.response
+            if hasattr(stream, "__aiter__"):
+                body = b""
+            else:
+                stream, body = None, response.get_data()
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": _encode_headers(response.headers.items()),
+            }
+        )
+        if stream is not None:
+            async for chunk in stream:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode("utf-8")
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+        await send({"type": "http.response.body", "body": body})
+
+    async def _call_wsgi(self, environ, send):
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started["status"] = int(status.split(" ", 1)[0])
+            started["headers"] = headers
+
+        result = await asyncio.to_thread(self.flask_app, environ, start_response)
+        try:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": started["status"],
+                    "headers": _encode_headers(started["headers"]),
+                }
+            )
+            # Pull chunks on a thread so streamed WSGI bodies never block the loop.
+            chunks = iter(result)
+            while True:
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    break
+                if chunk:
+                    await send(
+                        {"type": "http.response.body", "body": chunk, "more_body": True}
+                    )
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            close = getattr(result, "close", None)
+            if close is not None:
+                await asyncio.to_thread(close)
+
+
+def create_asgi_app(flask_app):
+    """Return the ASGI application serving *flask_app* (see ``AsgiApp``)."""
+    return AsgiApp(flask_app)
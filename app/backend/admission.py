@@ -0,0 +1,355 @@
+import asyncio
+import functools
+import logging
+import math
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+
+from flask import current_app
+from redis.exceptions import RedisError, WatchError
+
+from app import ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTED, ADMISSION_WAIT
+from app.backend.cache import KEY_PREFIX
+from app.backend.deadline import DeadlineExceeded, remaining
+from app.backend.redis_client import get_redis
+from app.backend.timing import stage
+
+# Module-level logger for this module
+logger = logging.getLogger(__name__)
+
+# How often a queued call re-checks the shared Redis semaphore. Slots freed in
+# this process wake local waiters immediately.
+_POLL_SECONDS = 0.05
+# Token of a slot counted only in this process (Redis disabled or failing).
+_LOCAL = "local"
+
+
+class OverloadedError(Exception):
+    """Raised when a generate call is not admitted.
+
+    The route layer maps this to ``503 overloaded`` with a ``Retry-After``
+    header of ``retry_after`` seconds.
+    """
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@functools.lru_cache(maxsize=8)
+def parse_limits(spec):
+    """Parse ``ADMISSION_LIMITS`` (``"openai/gpt-4o=2,anthropic=8"``) into a dict.
+
+    Malformed entries are logged and skipped.
+    """
+    limits = {}
+    for entry in (spec or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, _, value = entry.rpartition("=")
+        try:
+            limits[name.strip()] = max(1, int(value))
+        except ValueError:
+            logger.warning("Ignoring malformed admission limit", extra={"entry": entry})
+    return limits
+
+
+class _Scope:
+    """Slots held and calls queued for one limit scope in this process.
+
+    ``users`` counts the calls holding, waiting for or trying to take a slot;
+    the scope is dropped when it falls to zero, so scopes named by client
+    input do not pile up.
+    """
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.users = 0
+
+
+class AdmissionController:
+    """Bound the connector calls in flight per provider and model.
+
+    A call takes a slot of its scope before reaching the connector and gives
+    it back when done. The scope is the most specific ``ADMISSION_LIMITS``
+    entry matching the request (``provider/model``, then ``provider``); its
+    value is the limit. Other requests are limited per ``provider/model`` to
+    ``ADMISSION_MAX_CONCURRENCY``. Metrics are labelled with the matching
+    entry, or ``default``, so client input never becomes a label value.
+
+    With Redis, slots are shared by every gunicorn worker: a sorted set
+    ``t2p:admission:<scope>`` holds one member per slot, scored by the time its
+    lease (``ADMISSION_LEASE_SECONDS``) runs out so a crashed worker's slots
+    come back. Without Redis, or if it fails, limits apply per process.
+
+    A call that finds its scope full waits up to
+    ``ADMISSION_QUEUE_TIMEOUT_SECONDS`` for a slot, behind at most
+    ``ADMISSION_MAX_QUEUE`` other waiters of this process. Beyond either
+    bound it is rejected with ``OverloadedError`` instead of holding a worker
+    thread, so a slow provider cannot starve the other endpoints. A request
+    deadline ending sooner cuts the wait short with ``DeadlineExceeded``.
+    """
+
+    _scopes = {}
+    _scopes_lock = threading.Lock()
+
+    def __init__(self, provider, model):
+        config = current_app.config
+        self.enabled = bool(config.get("ADMISSION_ENABLED", False))
+        limits = parse_limits(config.get("ADMISSION_LIMITS", ""))
+        pair = f"{provider or ''}/{model or ''}"
+        if pair in limits:
+            self.label = self.scope = pair
+        elif provider in limits:
+            self.label = self.scope = provider
+        else:
+            self.label, self.scope = "default", pair
+        self.limit = limits.get(
+            self.scope, int(config.get("ADMISSION_MAX_CONCURRENCY", 4))
+        )
+        self.max_queue = int(config.get("ADMISSION_MAX_QUEUE", 4))
+        self.timeout = float(config.get("ADMISSION_QUEUE_TIMEOUT_SECONDS", 10))
+        self.lease = float(config.get("ADMISSION_LEASE_SECONDS", 300))
+        self.client = get_redis() if self.enabled else None
+
+    @contextmanager
+    def slot(self):
+        """Hold a slot of this scope for the duration of the block."""
+        if not self.enabled:
+            yield
+            return
+        state = self._checkout()
+        try:
+            with stage("admission"):
+                token = self._acquire(state)
+            try:
+                yield
+            finally:
+                self._release(state, token)
+        finally:
+            self._checkin(state)
+
+    @asynccontextmanager
+    async def slot_async(self):
+        """Coroutine form of ``slot``: queued calls wait without blocking the loop."""
+        if not self.enabled:
+            yield
+            return
+        state = self._checkout()
+        try:
+            with stage("admission"):
+                token = await self._acquire_async(state)
+            try:
+                yield
+            finally:
+                self._release(state, token)
+        finally:
+            self._checkin(state)
+
+    # --- acquisition --------------------------------------------------------
+
+    def _checkout(self):
+        """Return this scope's state, registering the caller as a user."""
+        with self._scopes_lock:
+            state = self._scopes.get(self.scope)
+            if state is None:
+                state = self._scopes[self.scope] = _Scope()
+            state.users += 1
+            return state
+
+    def _checkin(self, state):
+        """Unregister the caller; drop the scope once nobody uses it."""
+        with self._scopes_lock:
+            state.users -= 1
+            if state.users == 0:
+                del self._scopes[self.scope]
+
+    def _acquire(self, state):
+        started = time.monotonic()
+        token = self._try_acquire(state)
+        if token is not None:
+            self._admitted(started)
+            return token
+
+        self._enqueue(state, started)
+        give_up_at, by_deadline = self._give_up_at(started)
+        try:
+            while True:
+                # The Redis round trip is made without the lock, so it does
+                # not hold up the local waiters and releases of this scope.
+                token = self._try_acquire_shared_or_local()
+                with state.cond:
+                    # A local slot is taken under the lock, so a local
+                    # release cannot slip in between the check and the wait.
+                    if token == _LOCAL:
+                        token = self._try_acquire_local(state)
+                    if token is not None:
+                        self._admitted(started)
+                        return token
+                    wait = give_up_at - time.monotonic()
+                    if wait <= 0:
+                        self._give_up(by_deadline, started)
+                    # Local slots are freed with notify(); Redis slots may be
+                    # freed by another worker, which only polling notices.
+                    if self.client is not None:
+                        wait = min(wait, _POLL_SECONDS)
+                    state.cond.wait(wait)
+        finally:
+            self._dequeue(state)
+
+    async def _acquire_async(self, state):
+        started = time.monotonic()
+        token = self._try_acquire(state)
+        if token is not None:
+            self._admitted(started)
+            return token
+
+        self._enqueue(state, started)
+        give_up_at, by_deadline = self._give_up_at(started)
+        try:
+            while True:
+                wait = give_up_at - time.monotonic()
+                if wait <= 0:
+                    self._give_up(by_deadline, started)
+                await asyncio.sleep(min(wait, _POLL_SECONDS))
+                token = self._try_acquire(state)
+                if token is not None:
+                    self._admitted(started)
+                    return token
+        finally:
+            self._dequeue(state)
+
+    def _try_acquire(self, state):
+        """Take a slot if one is free; return its token or ``None``."""
+        token = self._try_acquire_shared_or_local()
+        if token != _LOCAL:
+            return token
+        with state.cond:
+            return self._try_acquire_local(state)
+
+    def _try_acquire_shared_or_local(self):
+        """Take a Redis slot; return its token, ``None`` if the scope is full,
+        or ``_LOCAL`` if the slot is to be counted in this process instead.
+        """
+        if self.client is None:
+            return _LOCAL
+        try:
+            return self._try_acquire_shared()
+        except RedisError as e:
+            logger.warning(
+                "Admission semaphore unavailable; limiting per process",
+                extra={"scope": self.scope, "error": str(e)},
+            )
+            return _LOCAL
+
+    def _try_acquire_local(self, state):
+        """Take a slot counted in this process; the caller holds ``state.cond``."""
+        if state.active >= self.limit:
+            return None
+        state.active += 1
+        return _LOCAL
+
+    def _key(self):
+        return f"{KEY_PREFIX}:admission:{self.scope}"
+
+    def _try_acquire_shared(self):
+        key = self._key()
+        token = uuid.uuid4().hex
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                now = time.time()
+                # Members scored at or below *now* hold expired leases.
+                if pipe.zcount(key, f"({now}", "+inf") >= self.limit:
+                    return None
+                pipe.multi()
+                pipe.zremrangebyscore(key, "-inf", now)
+                pipe.zadd(key, {token: now + self.lease})
+                pipe.expire(key, math.ceil(self.lease))
+                pipe.execute()
+            except WatchError:
+                # Another worker changed the set; the next poll tries again.
+                return None
+        return token
+
+    def _release(self, state, token):
+        if token == _LOCAL:
+            with state.cond:
+                state.active -= 1
+                state.cond.notify()
+            return
+        try:
+            self.client.zrem(self._key(), token)
+        except RedisError as e:
+            logger.warning(
+                "Admission release failed; the slot frees when its lease ends",
+                extra={"scope": self.scope, "error": str(e)},
+            )
+        with state.cond:
+            state.cond.notify()
+
+    # --- queue bookkeeping --------------------------------------------------
+
+    def _enqueue(self, state, started):
+        with state.cond:
+            if state.waiting >= self.max_queue:
+                full = True
+            else:
+                full = False
+                state.waiting += 1
+        if full:
+            self._reject("queue_full", started)
+        ADMISSION_QUEUE_DEPTH.labels(limit=self.label).inc()
+
+    def _dequeue(self, state):
+        with state.cond:
+            state.waiting -= 1
+        ADMISSION_QUEUE_DEPTH.labels(limit=self.label).dec()
+
+    def _give_up_at(self, started):
+        """Return ``(when, by_deadline)``: when a queued call stops waiting.
+
+        That is ``ADMISSION_QUEUE_TIMEOUT_SECONDS`` after *started*, or the end
+        of the request deadline if it comes first (then *by_deadline* is set).
+        """
+        left = remaining()
+        give_up_at = started + self.timeout
+        if left is not None and time.monotonic() + left < give_up_at:
+            return time.monotonic() + left, True
+        return give_up_at, False
+
+    def _give_up(self, by_deadline, started):
+        if by_deadline:
+            self._reject("deadline", started, DeadlineExceeded())
+        self._reject("timeout", started)
+
+    def _admitted(self, started):
+        ADMISSION_WAIT.labels(limit=self.label, outcome="admitted").observe(
+            time.monotonic() - started
+        )
+
+    def _reject(self, reason, started, error=None):
+        """Count a call that is not admitted and raise *error*.
+
+        Without *error*, an ``OverloadedError`` is raised.
+        """
+        ADMISSION_WAIT.labels(limit=self.label, outcome="rejected").observe(
+            time.monotonic() - started
+        )
+        ADMISSION_REJECTED.labels(limit=self.label, reason=reason).inc()
+        logger.warning(
+            "Generate call rejected by admission control",
+            extra={"scope": self.scope, "reason": reason},
+        )
+        if error is not None:
+            raise error
+        raise OverloadedError(
+            "Too many generate calls in flight for this provider and model; "
+            "retry later.",
+            retry_after=max(1, math.ceil(self.timeout)),
+        )
@@ -1,9 +1,17 @@
-import json
+import operator
+import re
 
+from app.backend import fastjson
 from app.backend.xml_parser import json_to_bpmn
 
 # Element groups that carry id/type/name entries (everything except flows).
 _NODE_GROUPS = ("events", "tasks", "gateways")
+_GROUPS = _NODE_GROUPS + ("flows",)
+# The fields the BPMN writer reads from each node and flow, in one lookup.
+_NODE_FIELDS = operator.itemgetter("id", "type", "name")
+_FLOW_FIELDS = operator.itemgetter("id", "source", "target")
+# Task and gateway types become tags (UserTask -> <userTask>).
+_TAG_RE = re.compile(r"[A-Za-z_][\w.-]*\Z", re.ASCII)
 
 
 class InvalidModelError(ValueError):
@@ -17,35 +25,92 @@ class InvalidModelError(ValueError):
 def _decode(raw_response):
     """Parse the connector's reply into a logical process model (a dict)."""
     try:
-        return json.loads(raw_response)
-    except (json.JSONDecodeError, TypeError) as exc:
+        return fastjson.loads(raw_response)
+    except (ValueError, TypeError) as exc:
         raise InvalidModelError("Connector response is not valid JSON.") from exc
 
 
 def _verify(model):
-    """Catch the one inconsistency the connector's schema cannot express.
+    """Check that *model* is a process model ``json_to_bpmn`` can build.
 
-    The provider's structured output already guarantees the shape (the four
-    lists and each element's fields), so this does not re-check that. A per-field
-    schema cannot guarantee a *cross-reference*, so the only check here is that
-    every flow connects nodes that actually exist.
+    The provider's structured output is meant to guarantee the shape, but
+    when it does not, the writer fails deep inside with a ``KeyError`` or
+    ``IndexError`` after the layout has run. So this checks everything the
+    writer relies on, in one pass over the elements: the four lists, each
+    element's fields as strings, non-empty unique ids (nodes and flows share
+    the document's id space), task and gateway types that are valid tag
+    names, and flows that connect nodes that exist. The first problem found
+    raises ``InvalidModelError``.
     """
-    node_ids = {el["id"] for group in _NODE_GROUPS for el in model[group]}
-    for flow in model["flows"]:
-        for end in ("source", "target"):
-            if flow[end] not in node_ids:
+    if not isinstance(model, dict):
+        raise InvalidModelError("Process model is not a JSON object.")
+    for group in _GROUPS:
+        if not isinstance(model.get(group), list):
+            raise InvalidModelError(f"Process model has no '{group}' list.")
+
+    node_ids = set()
+    tags = set()  # task and gateway types already checked
+    for group in _NODE_GROUPS:
+        # An event's type is looked up, the others become the element's tag.
+        typed = group != "events"
+        for position, element in enumerate(model[group]):
+            try:
+                node_id, node_type, name = _NODE_FIELDS(element)
+            except (KeyError, TypeError):
+                raise InvalidModelError(
+                    f"{group}[{position}] needs an 'id', a 'type' and a 'name'."
+                ) from None
+            if not (
+                type(node_id) is str
+                and type(node_type) is str
+                and type(name) is str
+                and node_id
+            ):
                 raise InvalidModelError(
-                    f"Flow '{flow['id']}' references an unknown node '{flow[end]}'."
+                    f"{group}[{position}] has an empty or non-string field."
                 )
+            if typed and node_type not in tags:
+                if not _TAG_RE.match(node_type):
+                    raise InvalidModelError(
+                        f"{group}[{position}] has an invalid type '{node_type}'."
+                    )
+                tags.add(node_type)
+            if node_id in node_ids:
+                raise InvalidModelError(f"Duplicate id '{node_id}'.")
+            node_ids.add(node_id)
+
+    flow_ids = set()
+    for position, flow in enumerate(model["flows"]):
+        try:
+            flow_id, source, target = _FLOW_FIELDS(flow)
+        except (KeyError, TypeError):
+            raise InvalidModelError(
+                f"flows[{position}] needs an 'id', a 'source' and a 'target'."
+            ) from None
+        if not (type(flow_id) is str and flow_id):
+            raise InvalidModelError(f"flows[{position}] has an empty or non-string id.")
+        if flow_id in flow_ids or flow_id in node_ids:
+            raise InvalidModelError(f"Duplicate id '{flow_id}'.")
+        flow_ids.add(flow_id)
+        try:
+            dangling = source not in node_ids or target not in node_ids
+        except TypeError:  # an unhashable end is not a node id either
+            dangling = True
+        if dangling:
+            end = target if isinstance(source, str) and source in node_ids else source
+            raise InvalidModelError(
+                f"Flow '{flow_id}' references an unknown node '{end}'."
+            )
 
 
-def raw_response_to_bpmn(raw_response):
+def raw_response_to_bpmn(raw_response, layout="layered"):
     """Turn the connector's reply into BPMN XML: decode -> verify -> build.
 
-    Raises ``InvalidModelError`` if the reply is not JSON, or if a flow
-    references a node that does not exist; the route maps that to an
-    ``invalid_model`` response.
+    Raises ``InvalidModelError`` if the reply is not JSON or not a well-formed
+    model (see ``_verify``), before any layout or XML work; the route maps
+    that to an ``invalid_model`` response. *layout* names the engine that
+    lays out the diagram (see ``xml_parser.LAYOUTS``).
     """
     model = _decode(raw_response)
     _verify(model)
-    return json_to_bpmn(model)
+    return json_to_bpmn(model, layout)
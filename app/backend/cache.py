@@ -0,0 +1,188 @@
+import hashlib
+import json
+import logging
+import time
+import unicodedata
+import xml.etree.ElementTree as ET
+
+from flask import current_app
+from redis.exceptions import RedisError
+
+from app import CACHE_HITS, CACHE_MISSES
+from app.backend.redis_client import get_redis
+
+# Module-level logger for this module
+logger = logging.getLogger(__name__)
+
+# Prefix shared by every key this service writes to Redis.
+KEY_PREFIX = "t2p"
+
+
+def normalize_text(text):
+    """Normalize process text so trivially different submissions share a key.
+
+    Applies Unicode NFC, collapses runs of whitespace and strips the ends. Case
+    is preserved: it can change what the LLM produces (e.g. task names).
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def fingerprint(*parts):
+    """Return a stable SHA-256 hex digest over a sequence of JSON-able parts."""
+    payload = json.dumps(parts, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def generation_key(
+    credential, text, provider, model, prompting_strategy, layout="layered"
+):
+    """Content-addressed key of a generate request, or ``None`` if uncacheable.
+
+    *credential* is the request's ``Authorization`` header. It is part of the
+    (hashed) key, so a result is only ever served to the credential the
+    connector generated it for; without one the request is uncacheable.
+    Only string text is cacheable; anything else is left for the connector to
+    reject. ``prompting_strategy=None`` is the connector's zero-shot default.
+    The cached BPMN carries its diagram, so the layout engine is part of the key.
+    """
+    if not credential or not isinstance(text, str) or not text.strip():
+        return None
+    return fingerprint(
+        credential,
+        normalize_text(text),
+        provider,
+        model,
+        prompting_strategy or "zero_shot",
+        layout,
+    )
+
+
+def transform_key(bpmn_xml, direction):
+    """Content-addressed key of a transformer call, or ``None`` if uncacheable.
+
+    The BPMN is reduced to its C14N 2.0 form with whitespace-only text dropped
+    and namespace prefixes renamed in document order, so attribute order,
+    prefix choice (``bpmn:`` vs. a default namespace vs. ElementTree's ``ns0:``)
+    and indentation do not split entries. Input that is not well-formed XML is
+    left uncached.
+    """
+    if not isinstance(bpmn_xml, str):
+        return None
+    try:
+        canonical = ET.canonicalize(
+            xml_data=bpmn_xml, strip_text=True, rewrite_prefixes=True
+        )
+    except ET.ParseError:
+        return None
+    return fingerprint(canonical, direction)
+
+
+class RedisCache:
+    """Namespaced string cache in Redis with a TTL and bounded LRU eviction.
+
+    Each entry is stored under ``t2p:<name>:<key>`` with ``EX ttl``. A sorted
+    set ``t2p:<name>:lru`` scores every key by its last access time; when it
+    grows past ``max_entries`` the least recently used keys are deleted. The
+    index keeps the bound independent of the server's ``maxmemory-policy``.
+
+    Redis failures never propagate: a read error is a miss and a write error is
+    dropped, so an unavailable Redis only costs the cache, not the request.
+    """
+
+    def __init__(self, name, client, ttl, max_entries):
+        self.name = name
+        self.client = client
+        self.ttl = int(ttl)
+        self.max_entries = int(max_entries)
+        self._index_key = f"{KEY_PREFIX}:{name}:lru"
+
+    @property
+    def enabled(self):
+        return self.client is not None and self.ttl > 0 and self.max_entries > 0
+
+    def _entry_key(self, key):
+        return f"{KEY_PREFIX}:{self.name}:{key}"
+
+    def get(self, key):
+        """Return the cached string for *key*, or ``None`` on a miss."""
+        if not self.enabled:
+            return None
+        entry_key = self._entry_key(key)
+        try:
+            value = self.client.get(entry_key)
+            if value is not None:
+                self.client.zadd(self._index_key, {entry_key: time.time()})
+        except RedisError as e:
+            logger.warning(
+                "Cache read failed", extra={"cache": self.name, "error": str(e)}
+            )
+            value = None
+
+        if value is None:
+            CACHE_MISSES.labels(cache=self.name).inc()
+            return None
+        CACHE_HITS.labels(cache=self.name).inc()
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def set(self, key, value):
+        """Store *value* under *key* and evict least recently used overflow."""
+        if not self.enabled:
+            return
+        entry_key = self._entry_key(key)
+        now = time.time()
+        try:
+            pipe = self.client.pipeline()
+            pipe.set(entry_key, value, ex=self.ttl)
+            pipe.zadd(self._index_key, {entry_key: now})
+            # Entries untouched for a full TTL have expired on their own.
+            pipe.zremrangebyscore(self._index_key, "-inf", now - self.ttl)
+            pipe.zcard(self._index_key)
+            size = pipe.execute()[-1]
+
+            overflow = size - self.max_entries
+            if overflow > 0:
+                stale = self.client.zrange(self._index_key, 0, overflow - 1)
+                pipe = self.client.pipeline()
+                pipe.delete(*stale)
+                pipe.zrem(self._index_key, *stale)
+                pipe.execute()
+        except RedisError as e:
+            logger.warning(
+                "Cache write failed", extra={"cache": self.name, "error": str(e)}
+            )
+
+
+class GenerationCache(RedisCache):
+    """Cache of generated BPMN XML keyed on the generate request fingerprint.
+
+    Configured by ``GENERATE_CACHE_ENABLED``, ``GENERATE_CACHE_TTL_SECONDS`` and
+    ``GENERATE_CACHE_MAX_ENTRIES``; disabled when Redis is disabled.
+    """
+
+    def __init__(self):
+        config = current_app.config
+        client = get_redis() if config.get("GENERATE_CACHE_ENABLED", False) else None
+        super().__init__(
+            "bpmn",
+            client,
+            ttl=config.get("GENERATE_CACHE_TTL_SECONDS", 86400),
+            max_entries=config.get("GENERATE_CACHE_MAX_ENTRIES", 10000),
+        )
+
+
+class TransformCache(RedisCache):
+    """Cache of transformer output keyed on the canonical sanitized BPMN.
+
+    Configured by ``TRANSFORM_CACHE_ENABLED``, ``TRANSFORM_CACHE_TTL_SECONDS``
+    and ``TRANSFORM_CACHE_MAX_ENTRIES``; disabled when Redis is disabled.
+    """
+
+    def __init__(self):
+        config = current_app.config
+        client = get_redis() if config.get("TRANSFORM_CACHE_ENABLED", False) else None
+        super().__init__(
+            "pnml",
+            client,
+            ttl=config.get("TRANSFORM_CACHE_TTL_SECONDS", 86400),
+            max_entries=config.get("TRANSFORM_CACHE_MAX_ENTRIES", 10000),
+        )
@@ -0,0 +1,268 @@
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import current_app
+from redis.exceptions import RedisError
+
+from app import CIRCUIT_BREAKER_REJECTED, CIRCUIT_BREAKER_STATE
+from app.backend.cache import KEY_PREFIX
+from app.backend.redis_client import get_redis
+
+# Module-level logger for this module
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+# Values of the t2p_circuit_breaker_state gauge.
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+# The failure-rate window is counted in this many buckets.
+_BUCKETS = 6
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open.
+
+    The route layer maps this to ``503 upstream_unavailable`` with a
+    ``Retry-After`` header of ``retry_after`` seconds.
+    """
+
+    def __init__(self, name, retry_after):
+        super().__init__(f"The {name} is unavailable; retry later.")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class _LocalStore:
+    """Breaker state of this process, used when Redis is disabled or failing."""
+
+    _breakers = {}
+    _lock = threading.Lock()
+
+    def __init__(self, name):
+        with self._lock:
+            self.data = self._breakers.setdefault(
+                name,
+                {"state": CLOSED, "opened_at": 0.0, "probe_until": 0.0, "buckets": {}},
+            )
+
+    def get_state(self):
+        with self._lock:
+            return self.data["state"], self.data["opened_at"]
+
+    def set_state(self, state, opened_at):
+        with self._lock:
+            self.data.update(state=state, opened_at=opened_at)
+            if state == CLOSED:
+                self.data["buckets"].clear()
+
+    def claim_probe(self, ttl):
+        now = time.time()
+        with self._lock:
+            if self.data["probe_until"] > now:
+                return False
+            self.data["probe_until"] = now + ttl
+            return True
+
+    def release_probe(self):
+        with self._lock:
+            self.data["probe_until"] = 0.0
+
+    def add(self, bucket, failed, oldest):
+        """Count one call in *bucket*; return ``(calls, failures)`` since *oldest*."""
+        with self._lock:
+            buckets = self.data["buckets"]
+            counts = buckets.setdefault(bucket, [0, 0])
+            counts[0] += 1
+            counts[1] += int(failed)
+            for stale in [b for b in buckets if b < oldest]:
+                del buckets[stale]
+            return (
+                sum(c[0] for c in buckets.values()),
+                sum(c[1] for c in buckets.values()),
+            )
+
+
+class _RedisStore:
+    """Breaker state shared by every gunicorn worker.
+
+    ``t2p:breaker:<name>`` is a hash of ``state`` and ``opened_at``,
+    ``<key>:probe`` marks a half-open probe in flight and ``<key>:<bucket>``
+    hashes count ``calls`` and ``failures`` per window bucket.
+    """
+
+    def __init__(self, name, client, ttl):
+        self.key = f"{KEY_PREFIX}:breaker:{name}"
+        self.client = client
+        self.ttl = ttl
+
+    def get_state(self):
+        raw = self.client.hgetall(self.key)
+        state = raw.get(b"state", CLOSED.encode()).decode("utf-8")
+        return state, float(raw.get(b"opened_at", 0))
+
+    def set_state(self, state, opened_at):
+        pipe = self.client.pipeline()
+        pipe.hset(self.key, mapping={"state": state, "opened_at": opened_at})
+        pipe.expire(self.key, self.ttl)
+        if state == CLOSED:
+            for bucket in self.client.scan_iter(f"{self.key}:[0-9]*"):
+                pipe.delete(bucket)
+        pipe.execute()
+
+    def claim_probe(self, ttl):
+        return bool(
+            self.client.set(f"{self.key}:probe", "1", nx=True, ex=math.ceil(ttl))
+        )
+
+    def release_probe(self):
+        self.client.delete(f"{self.key}:probe")
+
+    def add(self, bucket, failed, oldest):
+        pipe = self.client.pipeline()
+        pipe.hincrby(f"{self.key}:{bucket}", "calls", 1)
+        pipe.hincrby(f"{self.key}:{bucket}", "failures", int(failed))
+        pipe.expire(f"{self.key}:{bucket}", self.ttl)
+        for b in range(oldest, bucket + 1):
+            pipe.hgetall(f"{self.key}:{b}")
+        counts = pipe.execute()[3:]
+        return (
+            sum(int(c.get(b"calls", 0)) for c in counts),
+            sum(int(c.get(b"failures", 0)) for c in counts),
+        )
+
+
+class CircuitBreaker:
+    """Stop calling a failing dependency (the connector or the transformer).
+
+    While **closed**, calls go through and their outcomes are counted over
+    the last ``CIRCUIT_BREAKER_WINDOW_SECONDS``. A call fails if it raises one
+    of *failures* for which *is_failure*, if given, holds, or if it takes
+    *slow_call_seconds* or longer. Once at least
+    ``CIRCUIT_BREAKER_MIN_CALLS`` calls were counted and the share of failed
+    ones reaches ``CIRCUIT_BREAKER_FAILURE_RATE``, the circuit **opens**:
+    calls raise ``CircuitOpenError`` without reaching the dependency.
+
+    After ``CIRCUIT_BREAKER_OPEN_SECONDS`` the circuit is **half-open**: one
+    call (the probe) is let through while the others are still refused. A
+    successful probe closes the circuit and clears its counts; a failed one
+    opens it again.
+
+    State is kept in Redis so all workers share one circuit per dependency;
+    without Redis, or if it fails, each process keeps its own.
+    """
+
+    def __init__(self, name, failures, slow_call_seconds, is_failure=None):
+        config = current_app.config
+        self.name = name
+        self.failures = failures
+        self.is_failure = is_failure
+        self.slow_call_seconds = slow_call_seconds
+        self.enabled = bool(config.get("CIRCUIT_BREAKER_ENABLED", False))
+        self.window = float(config.get("CIRCUIT_BREAKER_WINDOW_SECONDS", 60))
+        self.min_calls = int(config.get("CIRCUIT_BREAKER_MIN_CALLS", 5))
+        self.failure_rate = float(config.get("CIRCUIT_BREAKER_FAILURE_RATE", 0.5))
+        self.open_seconds = float(config.get("CIRCUIT_BREAKER_OPEN_SECONDS", 30))
+        client = get_redis() if self.enabled else None
+        self._local = _LocalStore(name)
+        self._store = self._local
+        if client is not None:
+            ttl = math.ceil(self.window + self.open_seconds + slow_call_seconds)
+            self._store = _RedisStore(name, client, ttl)
+
+    def check(self):
+        """Raise ``CircuitOpenError`` if the circuit is open; claims no probe."""
+        if not self.enabled:
+            return
+        state, opened_at = self._run("get_state")
+        self._observe(state)
+        remaining = opened_at + self.open_seconds - time.time()
+        if state == OPEN and remaining > 0:
+            self._reject(remaining)
+
+    @contextmanager
+    def call(self):
+        """Guard the block as one call to the dependency."""
+        if not self.enabled:
+            yield
+            return
+        probe = self._allow()
+        started = time.monotonic()
+        failed = False
+        try:
+            yield
+        except self.failures as e:
+            failed = self.is_failure is None or self.is_failure(e)
+            raise
+        finally:
+            failed = failed or time.monotonic() - started >= self.slow_call_seconds
+            self._record(failed, probe)
+
+    # --- state machine --------------------------------------------------------
+
+    def _allow(self):
+        """Return whether the call is the half-open probe; raise if refused."""
+        state, opened_at = self._run("get_state")
+        self._observe(state)
+        if state == CLOSED:
+            return False
+        remaining = opened_at + self.open_seconds - time.time()
+        if state == OPEN and remaining > 0:
+            self._reject(remaining)
+        # A probe that never reports back frees its claim when the claim
+        # expires, letting the next call probe instead.
+        if not self._run("claim_probe", self.open_seconds + self.slow_call_seconds):
+            self._reject(self.open_seconds)
+        self._run("set_state", HALF_OPEN, opened_at)
+        self._observe(HALF_OPEN)
+        logger.info("Circuit half-open; probing", extra={"breaker": self.name})
+        return True
+
+    def _record(self, failed, probe):
+        if probe:
+            self._run("release_probe")
+            if failed:
+                self._open()
+            else:
+                self._run("set_state", CLOSED, 0.0)
+                self._observe(CLOSED)
+                logger.info("Circuit closed", extra={"breaker": self.name})
+            return
+
+        bucket_seconds = self.window / _BUCKETS
+        bucket = int(time.time() // bucket_seconds)
+        calls, failures = self._run("add", bucket, failed, bucket - _BUCKETS + 1)
+        if (
+            failed
+            and calls >= self.min_calls
+            and failures / calls >= self.failure_rate
+            and self._run("get_state")[0] == CLOSED
+        ):
+            self._open()
+
+    def _open(self):
+        self._run("set_state", OPEN, time.time())
+        self._observe(OPEN)
+        logger.warning("Circuit opened", extra={"breaker": self.name})
+
+    def _reject(self, remaining):
+        CIRCUIT_BREAKER_REJECTED.labels(name=self.name).inc()
+        raise CircuitOpenError(self.name, retry_after=max(1, math.ceil(remaining)))
+
+    def _observe(self, state):
+        CIRCUIT_BREAKER_STATE.labels(name=self.name).set(_STATE_VALUES[state])
+
+    def _run(self, method, *args):
+        """Call *method* on the shared store, falling back to the local one."""
+        if self._store is not self._local:
+            try:
+                return getattr(self._store, method)(*args)
+            except RedisError as e:
+                logger.warning(
+                    "Circuit breaker state unavailable; using process-local state",
+                    extra={"breaker": self.name, "error": str(e)},
+                )
+        return getattr(self._local, method)(*args)
@@ -1,14 +1,141 @@
+import asyncio
+import functools
 import logging
+import random
+import threading
 import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from datetime import datetime
+
+import httpx
 import requests
 from flask import current_app
 
+from app import CONNECTOR_HEDGES, CONNECTOR_JOB_DETECTION_LAG
+from app.backend import fastjson
+from app.backend.deadline import DeadlineExceeded, clamp, expired
+from app.backend.http_session import get_async_client, get_session
+
 # Module-level logger for this module
 logger = logging.getLogger(__name__)
 
 # Default timeout (seconds) for connector HTTP calls.
 DEFAULT_TIMEOUT = 60
 
+# Adaptive status polling: the first delay, doubled per poll up to
+# CONNECTOR_ASYNC_POLL_INTERVAL_SECONDS.
+DEFAULT_INITIAL_POLL = 0.1
+
+# Longest time (seconds) a long-poll status request asks the connector to hold.
+DEFAULT_LONG_POLL_WAIT = 25.0
+
+# Values of CONNECTOR_ASYNC_WAIT_MODE; anything else is treated as "adaptive".
+WAIT_MODES = ("fixed", "adaptive", "long_poll")
+
+# Hedging: the hedge delay is the p95 of the last _HEDGE_SAMPLES latencies of
+# a call, once at least _HEDGE_MIN_SAMPLES are known.
+_HEDGE_SAMPLES = 200
+_HEDGE_MIN_SAMPLES = 20
+# Threads running hedged requests of the threaded serving mode.
+_HEDGE_WORKERS = 32
+
+
+def _backoff_delay(attempt, initial_delay, max_delay):
+    """Exponential backoff with equal jitter for the *attempt*-th status poll.
+
+    Half of the step is fixed and half is random, so concurrent requests
+    spread out without any poll waiting much less than the current step.
+    """
+    step = min(max_delay, initial_delay * (2**attempt))
+    return step / 2 + random.uniform(0, step / 2)
+
+
+@functools.lru_cache(maxsize=8)
+def _wait_mode(mode):
+    """Return *mode* if it is one of ``WAIT_MODES``, else ``"adaptive"``.
+
+    An unknown mode is logged once per value.
+    """
+    if mode in WAIT_MODES:
+        return mode
+    logger.warning(
+        "Unknown connector wait mode; waiting adaptively",
+        extra={"wait_mode": mode, "expected": ", ".join(WAIT_MODES)},
+    )
+    return "adaptive"
+
+
+def _retry_after_hint(response, status_data):
+    """Return the connector's suggested delay before the next poll, if any.
+
+    Honours a ``Retry-After`` header given in seconds, then an ``eta_seconds``
+    or ``retry_after_seconds`` field in the status body.
+    """
+    candidates = (
+        response.headers.get("Retry-After"),
+        status_data.get("retry_after_seconds"),
+        status_data.get("eta_seconds"),
+    )
+    for value in candidates:
+        try:
+            hint = float(value)
+        except (TypeError, ValueError):
+            continue
+        if hint >= 0:
+            return hint
+    return None
+
+
+def _completed_at(status_data):
+    """Return the connector's job completion time as epoch seconds, if known.
+
+    Accepts ``completed_at`` or ``finished_at`` as epoch seconds or ISO 8601.
+    """
+    for field in ("completed_at", "finished_at"):
+        value = status_data.get(field)
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, str):
+            try:
+                return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+            except ValueError:
+                continue
+    return None
+
+
+def _observe_detection_lag(status_data, wait_mode):
+    """Record how long a finished connector job waited to be noticed."""
+    completed_at = _completed_at(status_data)
+    if completed_at is None:
+        return
+    CONNECTOR_JOB_DETECTION_LAG.labels(wait_mode=wait_mode).observe(
+        max(0.0, time.time() - completed_at)
+    )
+
+
+def _next_poll_delay(
+    wait_mode, attempt, block, poll_started, response, status_data, wait
+):
+    """Return how long to sleep before the next status poll.
+
+    *wait* holds the ``(poll_interval, initial_delay)`` settings and *block*
+    the seconds a long-poll request asked the connector to hold. A delay the
+    connector suggests is kept between ``initial_delay`` and ``poll_interval``,
+    the bounds of the backoff it replaces.
+    """
+    poll_interval, initial_delay = wait
+    if wait_mode == "fixed":
+        return poll_interval
+    if block and time.time() - poll_started >= block / 2:
+        # The connector held the request: ask again straight away.
+        return 0.0
+    hint = _retry_after_hint(response, status_data)
+    if hint is not None:
+        return min(max(hint, initial_delay), poll_interval)
+    return _backoff_delay(attempt, initial_delay, poll_interval)
+
 
 class ConnectorError(Exception):
     """Raised when the connector is unreachable or returns a server error.
@@ -30,6 +157,314 @@ class ConnectorClientError(Exception):
         super().__init__(f"connector returned {status_code}")
 
 
+def _transport_error(e):
+    """Return the error to raise for the failed connector request *e*.
+
+    A request cut short by the request deadline raises ``DeadlineExceeded``;
+    any other failure means the connector could not be reached.
+    """
+    if expired():
+        return DeadlineExceeded()
+    return ConnectorError(f"Failed to reach the LLM API connector: {e}")
+
+
+class _Latencies:
+    """Recent latencies of one kind of idempotent connector request."""
+
+    def __init__(self):
+        self._samples = deque(maxlen=_HEDGE_SAMPLES)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def hedge_delay(self):
+        """Return how long to wait before hedging: the p95, bounded below."""
+        config = current_app.config
+        minimum = float(config.get("CONNECTOR_HEDGE_MIN_DELAY_SECONDS", 0.05))
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < _HEDGE_MIN_SAMPLES:
+            return max(
+                minimum, float(config.get("CONNECTOR_HEDGE_DEFAULT_DELAY_SECONDS", 1.0))
+            )
+        return max(minimum, samples[int(len(samples) * 0.95)])
+
+    def timed(self, send):
+        started = time.monotonic()
+        response = send()
+        self.add(time.monotonic() - started)
+        return response
+
+    async def timed_async(self, send):
+        started = time.monotonic()
+        response = await send()
+        self.add(time.monotonic() - started)
+        return response
+
+
+# Latencies per hedged call: "models" (GET /models) and "status" (job polls).
+_latencies = {"models": _Latencies(), "status": _Latencies()}
+_hedge_pool = None
+_hedge_pool_lock = threading.Lock()
+
+
+def _get_hedge_pool():
+    global _hedge_pool
+    if _hedge_pool is None:
+        with _hedge_pool_lock:
+            if _hedge_pool is None:
+                _hedge_pool = ThreadPoolExecutor(
+                    max_workers=_HEDGE_WORKERS, thread_name_prefix="t2p-hedge"
+                )
+    return _hedge_pool
+
+
+def _first_success(outcomes):
+    """Pick the result of a hedged request from its finished attempts.
+
+    *outcomes* yields ``(is_hedge, response_or_exception)`` in completion
+    order. The first response below 500 wins; otherwise the last response,
+    or else the first exception, is the result.
+    """
+    response = error = None
+    for is_hedge, outcome in outcomes:
+        if isinstance(outcome, Exception):
+            error = error or outcome
+            continue
+        if outcome.status_code < 500:
+            return is_hedge, outcome
+        response = outcome
+    if response is None:
+        raise error
+    return False, response
+
+
+def _hedged(call, send):
+    """Return ``send()``, hedged with a second attempt if the first is slow.
+
+    With ``CONNECTOR_HEDGING_ENABLED``, *send* (an idempotent request) runs on
+    the hedge pool. If it has not answered after the p95 latency of recent
+    *call* requests, a second identical request is sent and whichever
+    succeeds first is used. The slower attempt is left to finish on its own.
+    """
+    if not current_app.config.get("CONNECTOR_HEDGING_ENABLED", False):
+        return send()
+
+    latencies = _latencies[call]
+    pool = _get_hedge_pool()
+    futures = {pool.submit(copy_context().run, latencies.timed, send): False}
+    done, _ = wait(futures, timeout=latencies.hedge_delay())
+    if not done:
+        futures[pool.submit(copy_context().run, latencies.timed, send)] = True
+        CONNECTOR_HEDGES.labels(call=call, outcome="sent").inc()
+
+    def _outcomes():
+        pending = set(futures)
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                error = future.exception()
+                yield futures[future], error or future.result()
+
+    won, response = _first_success(_outcomes())
+    if won:
+        CONNECTOR_HEDGES.labels(call=call, outcome="won").inc()
+    return response
+
+
+async def _hedged_async(call, send):
+    """Coroutine form of ``_hedged``; the slower attempt is cancelled."""
+    if not current_app.config.get("CONNECTOR_HEDGING_ENABLED", False):
+        return await send()
+
+    latencies = _latencies[call]
+    tasks = {asyncio.ensure_future(latencies.timed_async(send)): False}
+    done, _ = await asyncio.wait(tasks, timeout=latencies.hedge_delay())
+    if not done:
+        tasks[asyncio.ensure_future(latencies.timed_async(send))] = True
+        CONNECTOR_HEDGES.labels(call=call, outcome="sent").inc()
+
+    outcomes = []
+    pending = set(tasks)
+    try:
+        while pending:
+            finished, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in finished:
+                error = task.exception()
+                outcomes.append((tasks[task], error or task.result()))
+                if error is None and task.result().status_code < 500:
+                    pending = ()
+                    break
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    won, response = _first_success(outcomes)
+    if won:
+        CONNECTOR_HEDGES.labels(call=call, outcome="won").inc()
+    return response
+
+
+def _raise_for_client_error(response):
+    """Raise ``ConnectorClientError`` if the connector answered with a 4xx."""
+    if 400 <= response.status_code < 500:
+        try:
+            error_body = response.json()
+        except ValueError:
+            error_body = None
+        raise ConnectorClientError(response.status_code, error_body)
+
+
+def _generate_result(response):
+    """Return ``raw_response`` from a ``POST /generate`` response.
+
+    Works on ``requests`` and ``httpx`` responses alike. The connector's own
+    client errors (4xx) are relayed so the caller can pass them through; 5xx
+    and malformed bodies are an upstream failure.
+    """
+    _raise_for_client_error(response)
+
+    if response.status_code != 200:
+        logger.error(
+            "Connector /generate returned non-200",
+            extra={"status": response.status_code},
+        )
+        raise ConnectorError(
+            f"LLM API connector returned status {response.status_code}"
+        )
+
+    # The envelope carries the whole model as a string: decode it with the
+    # fast backend, as bpmn_builder does the model itself.
+    try:
+        data = fastjson.loads(response.content)
+    except ValueError as e:
+        logger.exception("Connector /generate returned invalid JSON")
+        raise ConnectorError("LLM API connector returned invalid JSON") from e
+
+    raw_response = data.get("raw_response")
+    if raw_response is None:
+        logger.error(
+            "Connector /generate response missing 'raw_response'",
+            extra={"response_keys": list(data.keys())},
+        )
+        raise ConnectorError(
+            "LLM API connector response missing 'raw_response' field"
+        )
+    return raw_response
+
+
+def _submitted_job_id(response):
+    """Return the job id from an internal async submit response."""
+    _raise_for_client_error(response)
+
+    if response.status_code != 202:
+        raise ConnectorError(
+            "LLM API connector internal async submit returned "
+            f"status {response.status_code}"
+        )
+
+    try:
+        submit_data = response.json()
+    except ValueError as e:
+        raise ConnectorError("LLM API connector returned invalid JSON") from e
+
+    job_id = submit_data.get("job_id")
+    if not job_id:
+        raise ConnectorError("LLM API connector async submit missing job_id")
+    return job_id
+
+
+def _job_status(response, wait_mode):
+    """Return ``(raw_response, status_data)`` from an internal job status poll.
+
+    ``raw_response`` is ``None`` while the job is still running; a failed job
+    raises ``ConnectorError``.
+    """
+    _raise_for_client_error(response)
+
+    if response.status_code != 200:
+        raise ConnectorError(
+            "LLM API connector internal async status returned "
+            f"status {response.status_code}"
+        )
+
+    try:
+        status_data = fastjson.loads(response.content)
+    except ValueError as e:
+        raise ConnectorError("LLM API connector returned invalid JSON") from e
+
+    status = status_data.get("status")
+    if status in ("succeeded", "failed"):
+        _observe_detection_lag(status_data, wait_mode)
+    if status == "succeeded":
+        result = status_data.get("result") or {}
+        raw_response = result.get("raw_response")
+        if raw_response is None:
+            raise ConnectorError(
+                "LLM API connector async result missing 'raw_response'"
+            )
+        return raw_response, status_data
+    if status == "failed":
+        error = status_data.get("error") or {}
+        raise ConnectorError(error.get("message") or "LLM provider call failed")
+    return None, status_data
+
+
+def _models_result(response):
+    """Return the models list from a ``GET /models`` response."""
+    if response.status_code != 200:
+        logger.error(
+            "Connector /models returned non-200",
+            extra={"status": response.status_code},
+        )
+        raise ConnectorError(
+            f"LLM API connector returned status {response.status_code}"
+        )
+
+    try:
+        data = response.json()
+    except ValueError as e:
+        logger.exception("Connector /models returned invalid JSON")
+        raise ConnectorError("LLM API connector returned invalid JSON") from e
+
+    models = data.get("models")
+    if models is None:
+        logger.error(
+            "Connector /models response missing 'models'",
+            extra={"response_keys": list(data.keys())},
+        )
+        raise ConnectorError("LLM API connector response missing 'models' field")
+    return models
+
+
+def _generate_payload(user_text, provider, model, prompting_strategy):
+    payload = {"user_text": user_text, "provider": provider, "model": model}
+    if prompting_strategy is not None:
+        payload["prompting_strategy"] = prompting_strategy
+    return payload
+
+
+def _falls_back_to_sync(error):
+    """Whether an internal async failure should degrade to ``/generate``.
+
+    Only when the internal async endpoint is not available on the connector
+    yet (404/405) and ``CONNECTOR_INTERNAL_ASYNC_FALLBACK_TO_SYNC`` allows it.
+    """
+    if not current_app.config.get("CONNECTOR_INTERNAL_ASYNC_FALLBACK_TO_SYNC", True):
+        return False
+    if error.status_code not in (404, 405):
+        return False
+    logger.warning(
+        "Connector internal async unavailable (%s), falling back to /generate",
+        error.status_code,
+    )
+    return True
+
+
 class ConnectorClient:
     """HTTP client for the LLM API connector.
 
@@ -63,9 +498,6 @@ class ConnectorClient:
             malformed response body.
         """
         if current_app.config.get("CONNECTOR_INTERNAL_ASYNC_ENABLED", False):
-            fallback_enabled = current_app.config.get(
-                "CONNECTOR_INTERNAL_ASYNC_FALLBACK_TO_SYNC", True
-            )
             try:
                 return self._generate_via_internal_async(
                     authorization=authorization,
@@ -75,21 +507,8 @@ class ConnectorClient:
                     prompting_strategy=prompting_strategy,
                 )
             except ConnectorClientError as e:
-                # If the internal async endpoint is not available on the
-                # connector yet, degrade to the stable synchronous endpoint.
-                if fallback_enabled and e.status_code in (404, 405):
-                    logger.warning(
-                        "Connector internal async unavailable (%s), falling back to /generate",
-                        e.status_code,
-                    )
-                    return self._generate_sync(
-                        authorization=authorization,
-                        user_text=user_text,
-                        provider=provider,
-                        model=model,
-                        prompting_strategy=prompting_strategy,
-                    )
-                raise
+                if not _falls_back_to_sync(e):
+                    raise
 
         return self._generate_sync(
             authorization=authorization,
@@ -106,9 +525,7 @@ class ConnectorClient:
         url = f"{self.base_url}/generate"
         # Authorization is forwarded verbatim; never log header values.
         headers = {"Authorization": authorization, "Content-Type": "application/json"}
-        payload = {"user_text": user_text, "provider": provider, "model": model}
-        if prompting_strategy is not None:
-            payload["prompting_strategy"] = prompting_strategy
+        payload = _generate_payload(user_text, provider, model, prompting_strategy)
 
         logger.info(
             "Calling connector /generate",
@@ -116,153 +533,133 @@ class ConnectorClient:
         )
         try:
             # verify=False mirrors the existing connector calls in this codebase.
-            response = requests.post(
+            response = get_session().post(
                 url,
                 headers=headers,
                 json=payload,
-                timeout=self.timeout,
+                timeout=clamp(self.timeout),
                 verify=False,
             )
         except requests.exceptions.RequestException as e:
             logger.exception("Connector /generate request failed")
-            raise ConnectorError(f"Failed to reach the LLM API connector: {e}") from e
-
-        # Relay the connector's own client errors (4xx) so the caller can pass
-        # them through; treat 5xx / unreachable as an upstream failure.
-        if 400 <= response.status_code < 500:
-            try:
-                error_body = response.json()
-            except ValueError:
-                error_body = None
-            raise ConnectorClientError(response.status_code, error_body)
-
-        if response.status_code != 200:
-            logger.error(
-                "Connector /generate returned non-200",
-                extra={"status": response.status_code},
-            )
-            raise ConnectorError(
-                f"LLM API connector returned status {response.status_code}"
-            )
-
-        try:
-            data = response.json()
-        except ValueError as e:
-            logger.exception("Connector /generate returned invalid JSON")
-            raise ConnectorError("LLM API connector returned invalid JSON") from e
-
-        raw_response = data.get("raw_response")
-        if raw_response is None:
-            logger.error(
-                "Connector /generate response missing 'raw_response'",
-                extra={"response_keys": list(data.keys())},
-            )
-            raise ConnectorError(
-                "LLM API connector response missing 'raw_response' field"
-            )
-        return raw_response
+            raise _transport_error(e) from e
+
+        return _generate_result(response)
+
+    def _wait_settings(self):
+        """Return the ``CONNECTOR_ASYNC_*`` settings of the status wait loop."""
+        config = current_app.config
+        return {
+            "wait_mode": _wait_mode(config.get("CONNECTOR_ASYNC_WAIT_MODE", "fixed")),
+            "wait": (
+                float(config.get("CONNECTOR_ASYNC_POLL_INTERVAL_SECONDS", 0.5)),
+                float(
+                    config.get(
+                        "CONNECTOR_ASYNC_INITIAL_POLL_SECONDS", DEFAULT_INITIAL_POLL
+                    )
+                ),
+            ),
+            "long_poll_wait": float(
+                config.get("CONNECTOR_ASYNC_LONG_POLL_SECONDS", DEFAULT_LONG_POLL_WAIT)
+            ),
+            "max_wait": float(config.get("CONNECTOR_ASYNC_MAX_WAIT_SECONDS", 120)),
+        }
+
+    def _poll_request(self, settings, remaining):
+        """Return ``(params, timeout, block)`` for the next status request."""
+        params = None
+        timeout = min(self.timeout, max(1.0, remaining))
+        block = 0.0
+        if settings["wait_mode"] == "long_poll":
+            # Ask the connector to hold the status request until the job
+            # is terminal or ``wait`` seconds have passed.
+            block = min(settings["long_poll_wait"], remaining)
+            params = {"wait": f"{block:.3f}"}
+            timeout += block
+        return params, timeout, block
 
     def _generate_via_internal_async(
         self, authorization, user_text, provider, model, prompting_strategy=None
     ):
-        """Submit to internal async endpoint and poll until terminal state."""
+        """Submit to internal async endpoint and wait until terminal state.
+
+        ``CONNECTOR_ASYNC_WAIT_MODE`` selects how the job status is awaited:
+
+        - ``"fixed"``: poll every ``CONNECTOR_ASYNC_POLL_INTERVAL_SECONDS``.
+        - ``"adaptive"``: poll after ``CONNECTOR_ASYNC_INITIAL_POLL_SECONDS``,
+          doubling with jitter up to the fixed interval, or after the delay
+          the connector suggests via ``Retry-After``/``eta_seconds``.
+        - ``"long_poll"``: pass ``wait=<seconds>`` so the connector holds the
+          status request until the job finishes; a connector that answers
+          early is polled adaptively instead.
+
+        Any other mode is logged and treated as ``"adaptive"``.
+        """
         submit_url = f"{self.base_url}/internal/jobs/generate"
         headers = {"Authorization": authorization, "Content-Type": "application/json"}
-        payload = {"user_text": user_text, "provider": provider, "model": model}
-        if prompting_strategy is not None:
-            payload["prompting_strategy"] = prompting_strategy
+        payload = _generate_payload(user_text, provider, model, prompting_strategy)
 
         try:
-            submit_response = requests.post(
+            submit_response = get_session().post(
                 submit_url,
                 headers=headers,
                 json=payload,
-                timeout=self.timeout,
+                timeout=clamp(self.timeout),
                 verify=False,
             )
         except requests.exceptions.RequestException as e:
             logger.exception("Connector internal async submit failed")
-            raise ConnectorError(f"Failed to reach the LLM API connector: {e}") from e
-
-        if 400 <= submit_response.status_code < 500:
-            try:
-                error_body = submit_response.json()
-            except ValueError:
-                error_body = None
-            raise ConnectorClientError(submit_response.status_code, error_body)
-
-        if submit_response.status_code != 202:
-            raise ConnectorError(
-                "LLM API connector internal async submit returned "
-                f"status {submit_response.status_code}"
-            )
-
-        try:
-            submit_data = submit_response.json()
-        except ValueError as e:
-            raise ConnectorError("LLM API connector returned invalid JSON") from e
+            raise _transport_error(e) from e
 
-        job_id = submit_data.get("job_id")
-        if not job_id:
-            raise ConnectorError("LLM API connector async submit missing job_id")
+        job_id = _submitted_job_id(submit_response)
 
         status_url = f"{self.base_url}/internal/jobs/{job_id}"
-        poll_interval = float(
-            current_app.config.get("CONNECTOR_ASYNC_POLL_INTERVAL_SECONDS", 0.5)
-        )
-        max_wait = float(current_app.config.get("CONNECTOR_ASYNC_MAX_WAIT_SECONDS", 120))
-        deadline = time.time() + max_wait
+        settings = self._wait_settings()
+        # The wait ends at the request deadline if that comes first.
+        deadline = time.time() + clamp(settings["max_wait"])
+        attempt = 0
 
         while time.time() < deadline:
             remaining = deadline - time.time()
             if remaining <= 0:
                 break
 
+            params, timeout, block = self._poll_request(settings, remaining)
+            poll_started = time.time()
             try:
-                status_response = requests.get(
+                send = functools.partial(
+                    get_session().get,
                     status_url,
-                    timeout=min(self.timeout, max(1.0, remaining)),
+                    params=params,
+                    timeout=timeout,
                     verify=False,
                 )
+                # Long-poll requests are slow by design; never hedge them.
+                status_response = send() if block else _hedged("status", send)
             except requests.exceptions.RequestException as e:
                 logger.exception("Connector internal async status poll failed")
-                raise ConnectorError(
-                    f"Failed to reach the LLM API connector: {e}"
-                ) from e
-
-            if 400 <= status_response.status_code < 500:
-                try:
-                    error_body = status_response.json()
-                except ValueError:
-                    error_body = None
-                raise ConnectorClientError(status_response.status_code, error_body)
-
-            if status_response.status_code != 200:
-                raise ConnectorError(
-                    "LLM API connector internal async status returned "
-                    f"status {status_response.status_code}"
-                )
+                raise _transport_error(e) from e
 
-            try:
-                status_data = status_response.json()
-            except ValueError as e:
-                raise ConnectorError("LLM API connector returned invalid JSON") from e
-
-            status = status_data.get("status")
-            if status == "succeeded":
-                result = status_data.get("result") or {}
-                raw_response = result.get("raw_response")
-                if raw_response is None:
-                    raise ConnectorError(
-                        "LLM API connector async result missing 'raw_response'"
-                    )
+            raw_response, status_data = _job_status(
+                status_response, settings["wait_mode"]
+            )
+            if raw_response is not None:
                 return raw_response
-            if status == "failed":
-                error = status_data.get("error") or {}
-                raise ConnectorError(error.get("message") or "LLM provider call failed")
 
-            time.sleep(poll_interval)
+            delay = _next_poll_delay(
+                settings["wait_mode"],
+                attempt,
+                block,
+                poll_started,
+                status_response,
+                status_data,
+                settings["wait"],
+            )
+            attempt += 1
+            time.sleep(max(0.0, min(delay, deadline - time.time())))
 
+        if expired():
+            raise DeadlineExceeded()
         raise ConnectorError("Timed out waiting for LLM API connector async result")
 
     def list_models(self):
@@ -275,31 +672,153 @@ class ConnectorClient:
 
         logger.debug("Calling connector /models", extra={"url": url})
         try:
-            response = requests.get(url, timeout=self.timeout, verify=False)
+            response = _hedged(
+                "models",
+                functools.partial(
+                    get_session().get, url, timeout=clamp(self.timeout), verify=False
+                ),
+            )
         except requests.exceptions.RequestException as e:
             logger.exception("Connector /models request failed")
-            raise ConnectorError(f"Failed to reach the LLM API connector: {e}") from e
+            raise _transport_error(e) from e
+
+        return _models_result(response)
+
+
+class AsyncConnectorClient(ConnectorClient):
+    """``ConnectorClient`` for the asyncio serving mode (see ``app/asgi.py``).
+
+    Same contract, errors and ``CONNECTOR_*`` settings as the synchronous
+    client, but ``generate`` and ``list_models`` are coroutines on the shared
+    ``httpx.AsyncClient``, so a waiting LLM call holds no thread.
+    """
+
+    async def generate(
+        self, authorization, user_text, provider, model, prompting_strategy=None
+    ):
+        """Async ``ConnectorClient.generate``."""
+        if current_app.config.get("CONNECTOR_INTERNAL_ASYNC_ENABLED", False):
+            try:
+                return await self._generate_via_internal_async(
+                    authorization=authorization,
+                    user_text=user_text,
+                    provider=provider,
+                    model=model,
+                    prompting_strategy=prompting_strategy,
+                )
+            except ConnectorClientError as e:
+                if not _falls_back_to_sync(e):
+                    raise
 
-        if response.status_code != 200:
-            logger.error(
-                "Connector /models returned non-200",
-                extra={"status": response.status_code},
+        return await self._generate_sync(
+            authorization=authorization,
+            user_text=user_text,
+            provider=provider,
+            model=model,
+            prompting_strategy=prompting_strategy,
+        )
+
+    async def _generate_sync(
+        self, authorization, user_text, provider, model, prompting_strategy=None
+    ):
+        url = f"{self.base_url}/generate"
+        # Authorization is forwarded verbatim; never log header values.
+        headers = {"Authorization": authorization, "Content-Type": "application/json"}
+        payload = _generate_payload(user_text, provider, model, prompting_strategy)
+
+        logger.info(
+            "Calling connector /generate",
+            extra={"url": url, "provider": provider, "model": model},
+        )
+        try:
+            response = await get_async_client().post(
+                url, headers=headers, json=payload, timeout=clamp(self.timeout)
             )
-            raise ConnectorError(
-                f"LLM API connector returned status {response.status_code}"
+        except httpx.HTTPError as e:
+            logger.exception("Connector /generate request failed")
+            raise _transport_error(e) from e
+
+        return _generate_result(response)
+
+    async def _generate_via_internal_async(
+        self, authorization, user_text, provider, model, prompting_strategy=None
+    ):
+        submit_url = f"{self.base_url}/internal/jobs/generate"
+        headers = {"Authorization": authorization, "Content-Type": "application/json"}
+        payload = _generate_payload(user_text, provider, model, prompting_strategy)
+        client = get_async_client()
+
+        try:
+            submit_response = await client.post(
+                submit_url, headers=headers, json=payload, timeout=clamp(self.timeout)
             )
+        except httpx.HTTPError as e:
+            logger.exception("Connector internal async submit failed")
+            raise _transport_error(e) from e
+
+        job_id = _submitted_job_id(submit_response)
 
+        status_url = f"{self.base_url}/internal/jobs/{job_id}"
+        settings = self._wait_settings()
+        # The wait ends at the request deadline if that comes first.
+        deadline = time.time() + clamp(settings["max_wait"])
+        attempt = 0
+
+        while time.time() < deadline:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+
+            params, timeout, block = self._poll_request(settings, remaining)
+            poll_started = time.time()
+            try:
+                send = functools.partial(
+                    client.get, status_url, params=params, timeout=timeout
+                )
+                if block:
+                    status_response = await send()
+                else:
+                    status_response = await _hedged_async("status", send)
+            except httpx.HTTPError as e:
+                logger.exception("Connector internal async status poll failed")
+                raise _transport_error(e) from e
+
+            raw_response, status_data = _job_status(
+                status_response, settings["wait_mode"]
+            )
+            if raw_response is not None:
+                return raw_response
+
+            delay = _next_poll_delay(
+                settings["wait_mode"],
+                attempt,
+                block,
+                poll_started,
+                status_response,
+                status_data,
+                settings["wait"],
+            )
+            attempt += 1
+            await asyncio.sleep(max(0.0, min(delay, deadline - time.time())))
+
+        if expired():
+            raise DeadlineExceeded()
+        raise ConnectorError("Timed out waiting for LLM API connector async result")
+
+    async def list_models(self):
+        """Async ``ConnectorClient.list_models``."""
+        url = f"{self.base_url}/models"
+
+        logger.debug("Calling connector /models", extra={"url": url})
         try:
-            data = response.json()
-        except ValueError as e:
-            logger.exception("Connector /models returned invalid JSON")
-            raise ConnectorError("LLM API connector returned invalid JSON") from e
-
-        models = data.get("models")
-        if models is None:
-            logger.error(
-                "Connector /models response missing 'models'",
-                extra={"response_keys": list(data.keys())},
+            response = await _hedged_async(
+                "models",
+                functools.partial(
+                    get_async_client().get, url, timeout=clamp(self.timeout)
+                ),
             )
-            raise ConnectorError("LLM API connector response missing 'models' field")
-        return models
+        except httpx.HTTPError as e:
+            logger.exception("Connector /models request failed")
+            raise _transport_error(e) from e
+
+        return _models_result(response)
@@ -0,0 +1,61 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Monotonic time by which the request in progress on this thread/task must be
+# answered, if it has a deadline.
+_deadline = ContextVar("t2p_request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's deadline passes before its pipeline finishes.
+
+    The route layer maps this to ``504 deadline_exceeded``.
+    """
+
+    def __init__(self, message="The request deadline was exceeded."):
+        super().__init__(message)
+
+
+@contextmanager
+def request_deadline(seconds):
+    """Give the block *seconds* to finish; ``None`` or ``0`` sets no deadline.
+
+    A deadline already in force is only ever shortened, never extended.
+    """
+    deadline = _deadline.get()
+    if seconds:
+        ends = time.monotonic() + seconds
+        deadline = ends if deadline is None else min(deadline, ends)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """Return the seconds left until the deadline, or ``None`` without one."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def expired():
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def clamp(timeout):
+    """Return *timeout* cut down to the time left before the deadline.
+
+    :raises DeadlineExceeded: if the deadline has already passed, so no
+        upstream call is started that could not finish in time.
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded()
+    return min(timeout, left)
@@ -0,0 +1,86 @@
+"""JSON encoding and decoding on orjson, with the stdlib as the fallback.
+
+orjson is optional: when it is installed, connector replies, the models
+inside them and the API's own request and response bodies go through it;
+without it, everything behaves as with ``json``. ``BACKEND`` names the one
+in use.
+"""
+
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the installed extras
+    orjson = None
+
+BACKEND = "json" if orjson is None else "orjson"
+
+
+def loads(data):
+    """Parse *data*, a ``str`` or UTF-8 ``bytes``.
+
+    Malformed input raises ``ValueError`` (both backends' decode errors
+    subclass it); input of the wrong type raises ``TypeError`` on the stdlib
+    backend and ``ValueError`` on orjson.
+    """
+    if orjson is None:
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, encoding and decoding with orjson if available.
+
+    Output matches ``DefaultJSONProvider`` except that non-ASCII text is
+    written as UTF-8 rather than ``\\u`` escapes: dates, dataclasses,
+    ``Decimal`` and ``__html__`` objects still go through ``default``, keys
+    are sorted when ``sort_keys`` is set and responses are indented in debug
+    mode. Whatever orjson cannot encode, such as integers beyond 64 bits, is
+    left to the stdlib.
+    """
+
+    def _options(self, indent=False):
+        options = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def _dumpb(self, obj, indent=False):
+        """Encode *obj* to bytes, or return ``None`` if orjson cannot."""
+        options = self._options(indent)
+        try:
+            return orjson.dumps(obj, default=self.default, option=options)
+        except orjson.JSONEncodeError:
+            return None
+
+    def dumps(self, obj, **kwargs):
+        # Keyword arguments are json.dumps options; leave those calls to it.
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        data = self._dumpb(obj)
+        if data is None:
+            return super().dumps(obj)
+        return data.decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        data = self._dumpb(obj, indent)
+        if data is None:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(data + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,136 @@
+from array import array
+
+import numpy as np
+
+# Node-kind flags. NODE marks an id the graph was given as a node; ids that
+# only occur as an edge endpoint have kind 0. A PNML id may be both a place
+# and a transition, so kinds are OR-ed together.
+NODE = 1
+PLACE = 2
+TRANSITION = 4
+
+
+class Graph:
+    """A directed multigraph over string ids, interned to ``0..n-1`` once.
+
+    ``ids[v]`` is the id of node ``v`` and ``index`` maps it back; ``kind[v]``
+    holds its flags. Edge ``i`` runs from ``src[i]`` to ``tgt[i]`` in input
+    order, so it can be matched to the element it was read from. Adjacency is
+    kept CSR-style in ``array("i")`` buffers: the successors of ``v`` are
+    ``out_nodes[out_start[v]:out_start[v + 1]]``, in edge order, and its
+    predecessors likewise in ``in_start``/``in_nodes``.
+
+    The graph is built once and not updated; passes that add nodes or edges
+    track the additions themselves.
+    """
+
+    __slots__ = (
+        "ids",
+        "index",
+        "kind",
+        "src",
+        "tgt",
+        "out_start",
+        "out_nodes",
+        "in_start",
+        "in_nodes",
+    )
+
+    def __init__(self, nodes, edges, keep_unknown=False):
+        """Intern *nodes*, ``(id, kind)`` pairs, and *edges*, ``(source, target)``.
+
+        Edges with an endpoint that is not among *nodes* are dropped, unless
+        *keep_unknown* is set: then the endpoint is interned with kind 0.
+        """
+        nodes = list(nodes)
+        ids = [node_id for node_id, _ in nodes]
+        index = {node_id: v for v, node_id in enumerate(ids)}
+        kinds = [kind for _, kind in nodes]
+        if len(index) < len(ids):
+            # Repeated ids: keep the first position, combine the kinds.
+            ids, index, kinds = [], {}, []
+            for node_id, kind in nodes:
+                v = index.setdefault(node_id, len(ids))
+                if v == len(ids):
+                    ids.append(node_id)
+                    kinds.append(0)
+                kinds[v] |= kind
+
+        # Both ends of every edge, source then target.
+        names = [node_id for edge in edges for node_id in edge]
+        ends = list(map(index.get, names))
+        if None in ends:
+            ends = _resolve(ends, names, ids, index, kinds, keep_unknown)
+
+        self.ids = ids
+        self.index = index
+        self.kind = array("B", kinds)
+        ends = array("i", ends)
+        self.src = ends[0::2]
+        self.tgt = ends[1::2]
+        self.out_start, self.out_nodes = _compress(len(ids), self.src, self.tgt)
+        self.in_start, self.in_nodes = _compress(len(ids), self.tgt, self.src)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def successors(self, v):
+        return self.out_nodes[self.out_start[v] : self.out_start[v + 1]]
+
+    def predecessors(self, v):
+        return self.in_nodes[self.in_start[v] : self.in_start[v + 1]]
+
+    def out_degree(self, v):
+        return self.out_start[v + 1] - self.out_start[v]
+
+    def in_degree(self, v):
+        return self.in_start[v + 1] - self.in_start[v]
+
+    def rename(self, mapping):
+        """Give the nodes in *mapping* their new ids, ``{old: new}``.
+
+        Returns ``False``, leaving the graph unchanged, if two nodes would end
+        up with the same id.
+        """
+        ids = [mapping.get(node_id, node_id) for node_id in self.ids]
+        index = {node_id: v for v, node_id in enumerate(ids)}
+        if len(index) < len(ids):
+            return False
+        self.ids, self.index = ids, index
+        return True
+
+    def nodes(self, kind):
+        """Return the nodes carrying every flag of *kind*, in interning order."""
+        return [v for v, flags in enumerate(self.kind) if flags & kind == kind]
+
+
+def _resolve(ends, names, ids, index, kinds, keep_unknown):
+    """Handle the edge *ends* that are not nodes: intern them or drop their edges."""
+    if not keep_unknown:
+        return [
+            end
+            for i in range(0, len(ends), 2)
+            if ends[i] is not None and ends[i + 1] is not None
+            for end in ends[i : i + 2]
+        ]
+    for i, end in enumerate(ends):
+        if end is None:
+            end = ends[i] = index.get(names[i])
+            if end is None:
+                ends[i] = index[names[i]] = len(ids)
+                ids.append(names[i])
+                kinds.append(0)
+    return ends
+
+
+def _compress(n, keys, values):
+    """Group *values* by *keys* (both over ``0..n-1``): return ``(start, items)``.
+
+    Built with NumPy, stored as ``array("i")``: the passes using the graph
+    index it one element at a time, which is much cheaper on an ``array``.
+    """
+    keys = np.frombuffer(keys, dtype=np.intc)
+    start = np.zeros(n + 1, dtype=np.intc)
+    np.cumsum(np.bincount(keys, minlength=n), out=start[1:])
+    items = np.frombuffer(values, dtype=np.intc)[np.argsort(keys, kind="stable")]
+    return array("i", start.tobytes()), array("i", items.tobytes())
@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import os
+import threading
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+
+import httpx
+import requests
+from flask import current_app
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Module-level logger for this module
+logger = logging.getLogger(__name__)
+
+# Defaults mirror the gunicorn setup in boot.sh (4 threads per worker) with
+# headroom for the connector status polls that run alongside generate calls.
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 16
+DEFAULT_RETRIES = 2
+DEFAULT_RETRY_BACKOFF_SECONDS = 0.2
+# In the asyncio serving mode one worker keeps many upstream calls in flight
+# at once, so its connection limit is far above the threaded pool's.
+DEFAULT_ASYNC_MAX_CONNECTIONS = 256
+
+_lock = threading.Lock()
+_session = None
+_session_pid = None
+_async_client = None
+_async_client_loop = None
+
+
+def _build_session(pool_connections, pool_maxsize, retries, backoff):
+    # Only connection-level failures are retried: the request never reached the
+    # peer, so even a POST /generate is safe to resend. Read errors and HTTP
+    # statuses are left to the callers' existing error mapping.
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=0,
+        other=0,
+        backoff_factor=backoff,
+        allowed_methods=None,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # The session is shared by every request thread, so it must not carry
+    # per-caller state: refuse cookies the upstream services may set.
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+
+def get_session():
+    """Return the per-process pooled, keep-alive ``requests.Session``.
+
+    Shared by ``ConnectorClient`` and ``ModelTransformer`` so repeated calls to
+    the connector and transformer reuse established TCP/TLS connections. The
+    session is created on first use from ``HTTP_POOL_CONNECTIONS`` (number of
+    per-host pools), ``HTTP_POOL_MAXSIZE`` (connections kept per host),
+    ``HTTP_RETRIES`` and ``HTTP_RETRY_BACKOFF_SECONDS``, and recreated after a
+    fork so gunicorn workers never share sockets.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is not None and _session_pid == pid:
+        return _session
+
+    with _lock:
+        if _session is None or _session_pid != pid:
+            config = current_app.config
+            pool_connections = config.get(
+                "HTTP_POOL_CONNECTIONS", DEFAULT_POOL_CONNECTIONS
+            )
+            pool_maxsize = config.get("HTTP_POOL_MAXSIZE", DEFAULT_POOL_MAXSIZE)
+            retries = config.get("HTTP_RETRIES", DEFAULT_RETRIES)
+            backoff = config.get(
+                "HTTP_RETRY_BACKOFF_SECONDS", DEFAULT_RETRY_BACKOFF_SECONDS
+            )
+            _session = _build_session(pool_connections, pool_maxsize, retries, backoff)
+            _session_pid = pid
+            logger.debug(
+                "Pooled HTTP session initialized",
+                extra={
+                    "pool_connections": pool_connections,
+                    "pool_maxsize": pool_maxsize,
+                    "retries": retries,
+                },
+            )
+    return _session
+
+
+def get_async_client():
+    """Return the ``httpx.AsyncClient`` shared by the running event loop.
+
+    The asyncio counterpart of ``get_session`` for ``AsyncConnectorClient`` and
+    ``AsyncModelTransformer``. It keeps up to ``ASYNC_HTTP_MAX_CONNECTIONS``
+    connections in total (``HTTP_POOL_MAXSIZE`` of them idle), retries only
+    connection failures (``HTTP_RETRIES``), refuses cookies and skips TLS
+    verification like the synchronous calls. A client is bound to the loop it
+    was created on, so a new loop gets a new client.
+    """
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is not None and _async_client_loop is loop:
+        return _async_client
+
+    config = current_app.config
+    max_connections = config.get(
+        "ASYNC_HTTP_MAX_CONNECTIONS", DEFAULT_ASYNC_MAX_CONNECTIONS
+    )
+    transport = httpx.AsyncHTTPTransport(
+        verify=False,
+        retries=config.get("HTTP_RETRIES", DEFAULT_RETRIES),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=config.get(
+                "HTTP_POOL_MAXSIZE", DEFAULT_POOL_MAXSIZE
+            ),
+        ),
+    )
+    cookies = CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+    _async_client = httpx.AsyncClient(transport=transport, cookies=cookies)
+    _async_client_loop = loop
+    logger.debug(
+        "Async HTTP client initialized", extra={"max_connections": max_connections}
+    )
+    return _async_client
+
+
+async def close_async_client():
+    """Close the event loop's ``httpx.AsyncClient``, e.g. on ASGI shutdown."""
+    global _async_client, _async_client_loop
+    client, _async_client, _async_client_loop = _async_client, None, None
+    if client is not None:
+        await client.aclose()
+
+
+def _pools():
+    """Yield ``(host, pool)`` for every live connection pool of the session."""
+    session = _session
+    if session is None or _session_pid != os.getpid():
+        return
+    seen = set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                yield f"{pool.scheme}://{pool.host}:{pool.port}", pool
+
+
+class HttpPoolCollector:
+    """Prometheus collector exposing utilisation of the pooled HTTP session.
+
+    Reads the urllib3 pools at scrape time, so nothing is recorded on the
+    request path. A pool's queue holds one slot per allowed connection; slots
+    not in the queue are connections currently checked out by a request.
+    """
+
+    def describe(self):
+        return [
+            GaugeMetricFamily("t2p_http_pool_max_connections", "", labels=["host"]),
+            GaugeMetricFamily("t2p_http_pool_in_use_connections", "", labels=["host"]),
+            CounterMetricFamily(
+                "t2p_http_pool_connections_opened", "", labels=["host"]
+            ),
+            CounterMetricFamily("t2p_http_pool_requests", "", labels=["host"]),
+        ]
+
+    def collect(self):
+        max_connections = GaugeMetricFamily(
+            "t2p_http_pool_max_connections",
+            "Connections the pool keeps alive per upstream host",
+            labels=["host"],
+        )
+        in_use = GaugeMetricFamily(
+            "t2p_http_pool_in_use_connections",
+            "Connections currently checked out of the pool",
+            labels=["host"],
+        )
+        opened = CounterMetricFamily(
+            "t2p_http_pool_connections_opened",
+            "New TCP/TLS connections opened by the pool",
+            labels=["host"],
+        )
+        requests_made = CounterMetricFamily(
+            "t2p_http_pool_requests",
+            "Requests sent through the pool",
+            labels=["host"],
+        )
+        for host, pool in _pools():
+            maxsize = pool.pool.maxsize if pool.pool is not None else 0
+            idle = pool.pool.qsize() if pool.pool is not None else 0
+            max_connections.add_metric([host], maxsize)
+            in_use.add_metric([host], max(maxsize - idle, 0))
+            opened.add_metric([host], pool.num_connections)
+            requests_made.add_metric([host], pool.num_requests)
+        return [max_connections, in_use, opened, requests_made]
@@ -0,0 +1,215 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from redis.exceptions import RedisError
+
+from app.backend.cache import KEY_PREFIX, fingerprint
+from app.backend.redis_client import get_redis
+
+# Module-level logger for this module
+logger = logging.getLogger(__name__)
+
+# Job lifecycle: queued -> running -> succeeded | failed.
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobStoreError(Exception):
+    """Raised when job state cannot be read or written.
+
+    The route layer maps this to a ``500 internal_error`` response.
+    """
+
+
+class JobStore:
+    """Generation job state, kept in Redis so any gunicorn worker can answer.
+
+    Each job is a hash ``t2p:job:<id>`` that expires ``JOBS_TTL_SECONDS`` after
+    its last update. When Redis is disabled, state falls back to this process
+    only, which is adequate for the single-process development server; jobs
+    expire there after the same TTL.
+
+    Stored fields are strings: ``status``, ``target``, ``owner``,
+    ``created_at``, ``updated_at`` and, once terminal, ``result`` or ``error``
+    (a JSON-encoded ``{"code", "message"}`` object). The caller's credentials
+    are never stored; ``owner`` is a fingerprint of the submitter's, and only
+    the same credential can read the job back.
+    """
+
+    # Process-local fallback used when Redis is disabled.
+    _memory = {}
+    _memory_lock = threading.Lock()
+
+    def __init__(self):
+        self.client = get_redis()
+        self.ttl = int(current_app.config.get("JOBS_TTL_SECONDS", 3600))
+
+    @staticmethod
+    def _key(job_id):
+        return f"{KEY_PREFIX}:job:{job_id}"
+
+    @staticmethod
+    def _owner(credential):
+        return fingerprint("job-owner", credential or "")
+
+    def create(self, target, credential):
+        """Record a new queued job for *target*, submitted with *credential*
+        (the ``Authorization`` header), and return its id.
+        """
+        job_id = uuid.uuid4().hex
+        now = str(time.time())
+        self._write(
+            job_id,
+            {
+                "status": QUEUED,
+                "target": target,
+                "owner": self._owner(credential),
+                "created_at": now,
+                "updated_at": now,
+            },
+        )
+        return job_id
+
+    def update(self, job_id, status, result=None, error=None):
+        fields = {"status": status, "updated_at": str(time.time())}
+        if result is not None:
+            fields["result"] = result
+        if error is not None:
+            fields["error"] = json.dumps(error)
+        self._write(job_id, fields)
+
+    def get(self, job_id, credential):
+        """Return the job as a dict, or ``None`` if it is unknown or expired.
+
+        A job submitted with another credential than *credential* is reported
+        as unknown, so its id alone does not give its result away.
+        """
+        if self.client is None:
+            with self._memory_lock:
+                entry = self._memory.get(job_id)
+                if entry is None or entry[0] < time.time():
+                    self._memory.pop(job_id, None)
+                    return None
+                fields = dict(entry[1])
+        else:
+            try:
+                raw = self.client.hgetall(self._key(job_id))
+            except RedisError as e:
+                raise JobStoreError(f"Failed to read job state: {e}") from e
+            if not raw:
+                return None
+            fields = {k.decode("utf-8"): v.decode("utf-8") for k, v in raw.items()}
+
+        if fields.get("owner") != self._owner(credential):
+            return None
+        if "error" in fields:
+            fields["error"] = json.loads(fields["error"])
+        return fields
+
+    def _write(self, job_id, fields):
+        if self.client is None:
+            now = time.time()
+            with self._memory_lock:
+                # Jobs nobody polls again are dropped here rather than in get.
+                expired = [k for k, (expiry, _) in self._memory.items() if expiry < now]
+                for key in expired:
+                    del self._memory[key]
+                _, current = self._memory.get(job_id, (0, {}))
+                self._memory[job_id] = (now + self.ttl, {**current, **fields})
+            return
+        try:
+            pipe = self.client.pipeline()
+            pipe.hset(self._key(job_id), mapping=fields)
+            pipe.expire(self._key(job_id), self.ttl)
+            pipe.execute()
+        except RedisError as e:
+            raise JobStoreError(f"Failed to write job state: {e}") from e
+
+
+class JobRunner:
+    """Per-process worker pool that runs generation jobs in the background.
+
+    ``JOBS_MAX_WORKERS`` bounds how many generations run at once and
+    ``JOBS_MAX_PENDING`` bounds how many may be accepted but not yet finished;
+    beyond that ``submit`` refuses new work instead of queueing it unboundedly.
+    A caller with work to do before scheduling takes a slot with ``reserve``
+    first and then hands it to ``run``, or back with ``cancel``.
+    """
+
+    def __init__(self, max_workers, max_pending, thread_name_prefix="t2p-job"):
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=thread_name_prefix
+        )
+
+    def reserve(self):
+        """Take a pending slot; return ``False`` if saturated."""
+        return self._slots.acquire(blocking=False)
+
+    def cancel(self):
+        """Give back a slot taken with ``reserve`` that ``run`` will not use."""
+        self._slots.release()
+
+    def run(self, fn, *args, **kwargs):
+        """Schedule ``fn(*args, **kwargs)`` on a slot taken with ``reserve``."""
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except RuntimeError:
+            self.cancel()
+            raise
+        future.add_done_callback(lambda _: self.cancel())
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedule ``fn(*args, **kwargs)``; return ``False`` if saturated."""
+        if not self.reserve():
+            return False
+        self.run(fn, *args, **kwargs)
+        return True
+
+
+_runner_lock = threading.Lock()
+
+
+def _get_runner(name, **kwargs):
+    """Return the current app's ``JobRunner`` *name*, creating it on first use."""
+    app = current_app._get_current_object()
+    runner = app.extensions.get(name)
+    if runner is None:
+        with _runner_lock:
+            runner = app.extensions.get(name)
+            if runner is None:
+                runner = app.extensions[name] = JobRunner(**kwargs)
+    return runner
+
+
+def get_job_runner():
+    """Return the worker pool of the current app, creating it on first use."""
+    config = current_app.config
+    return _get_runner(
+        "job_runner",
+        max_workers=config.get("JOBS_MAX_WORKERS", 4),
+        max_pending=config.get("JOBS_MAX_PENDING", 32),
+    )
+
+
+def get_stream_runner():
+    """Return the pool running the current app's progress streams.
+
+    It has no queue: ``STREAM_MAX_CONCURRENCY`` streams run at once and any
+    further one is refused.
+    """
+    concurrency = current_app.config.get("STREAM_MAX_CONCURRENCY", 4)
+    return _get_runner(
+        "stream_runner",
+        max_workers=concurrency,
+        max_pending=concurrency,
+        thread_name_prefix="t2p-stream",
+    )
@@ -0,0 +1,473 @@
+"""Sugiyama-style layered layout for process graphs.
+
+``sugiyama_layout`` is the ``sugiyama`` layout engine of the BPMN and PNML
+builders; ``xml_parser._layered_layout`` is the ``layered`` default. It runs
+the classic four phases:
+
+1. cycle breaking: the back edges of a depth-first search from the sources
+   are reversed, so a rework loop runs backwards instead of being appended
+   after the rest of the model;
+2. layering: longest path from the sources, with dummy nodes splitting the
+   edges that span several layers;
+3. crossing reduction: barycenter sweeps, kept for as long as they remove
+   crossings;
+4. coordinate assignment: Brandes–Köpf alignment and compaction in its four
+   directions, balanced by taking the mean of the two median candidates.
+
+Phases 1 and 2 walk the graph once in Python. Phases 3 and 4 work on NumPy
+arrays over all layers at once: with dummy nodes every edge joins adjacent
+layers, so odd layers can be re-sorted against the even ones (and the other
+way round) in one step, and the alignment decisions of Brandes–Köpf within a
+layer reduce to a running maximum.
+"""
+
+import numpy as np
+
+from app.backend.graph import NODE, Graph
+
+# Crossing-reduction rounds; each one re-sorts the odd, then the even layers.
+_ROUNDS = 12
+# Rounds in a row without fewer crossings after which the sweeps stop.
+_PATIENCE = 3
+# Vectorised compaction passes before the rest is left to a longest path.
+_COMPACT_PASSES = 8
+# Crossings are counted by comparing the edges between two layers pairwise
+# unless that means more than this many pairs per edge; wide layers are
+# counted by merging instead.
+_PAIR_LIMIT = 16
+
+
+def sugiyama_layout(
+    elements_by_id, flows, h_gap=80, v_gap=50, x_offset=50, y_offset=50
+):
+    """Assign top-left (x, y) positions using a left-to-right Sugiyama layout.
+
+    Takes and returns the same shapes as ``xml_parser._layered_layout``: each
+    layer is a column, nodes narrower than their column are centred in it.
+
+    Args:
+        elements_by_id: ``{id: {"w": int, "h": int}}`` – node sizes in pixels.
+        flows: list of ``{"source": str, "target": str}`` dicts.
+        h_gap: horizontal gap between adjacent layers (pixels).
+        v_gap: vertical gap between nodes within a layer (pixels).
+        x_offset: left margin (pixels).
+        y_offset: top margin (pixels).
+
+    Returns:
+        ``{id: {"x": int, "y": int, "w": int, "h": int}}`` – top-left corners.
+    """
+    node_ids = list(elements_by_id)
+    if not node_ids:
+        return {}
+    n = len(node_ids)
+    process = Graph(
+        ((nid, NODE) for nid in node_ids),
+        ((flow.get("source", ""), flow.get("target", "")) for flow in flows),
+    )
+    src = np.asarray(process.src, dtype=np.int64)
+    tgt = np.asarray(process.tgt, dtype=np.int64)
+    loops = src == tgt
+    src, tgt = src[~loops], tgt[~loops]
+    sources = np.flatnonzero(np.bincount(tgt, minlength=n) == 0).tolist()
+
+    topological, pre, post = _depth_first(process, sources)
+    # A back edge leads to an ancestor (earlier in pre-, later in postorder).
+    back = (pre[tgt] < pre[src]) & (post[tgt] > post[src])
+    dag_src = np.where(back, tgt, src)
+    dag_tgt = np.where(back, src, tgt)
+    layer = _longest_path_layers(n, topological, dag_src, dag_tgt)
+    graph = _ProperGraph(layer, dag_src, dag_tgt, topological)
+    pos = graph.reduce_crossings()
+
+    sizes = np.array(
+        [(elements_by_id[nid]["w"], elements_by_id[nid]["h"]) for nid in node_ids],
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    widths, node_heights = sizes[:, 0], sizes[:, 1]
+    heights = np.zeros(graph.size)
+    heights[:n] = node_heights
+    centre_y = graph.assign_coordinates(pos, heights, v_gap)
+
+    column_w = np.zeros(int(layer.max()) + 1, dtype=np.int64)
+    np.maximum.at(column_w, layer, widths)
+    column_x = x_offset + np.concatenate(([0], np.cumsum(column_w + h_gap)[:-1]))
+    xs = column_x[layer] + (column_w[layer] - widths) // 2
+    tops = centre_y[:n] - node_heights / 2
+    ys = np.rint(tops + y_offset - tops.min()).astype(np.int64)
+    return {
+        nid: {"x": x, "y": y, "w": w, "h": h}
+        for nid, x, y, w, h in zip(
+            node_ids, xs.tolist(), ys.tolist(), widths.tolist(), node_heights.tolist()
+        )
+    }
+
+
+def _depth_first(process, sources):
+    """Depth-first search over *process*; its back edges are the ones to reverse.
+
+    The search starts from *sources*, the nodes without incoming edges, so
+    the start of a process stays left and its loops become back edges.
+    Returns ``(order, pre, post)``: the nodes in reverse postorder, which is
+    a topological order once the back edges are reversed, and every node's
+    pre- and postorder number.
+    """
+    n = len(process)
+    out_start = process.out_start.tolist()
+    out_nodes = process.out_nodes.tolist()
+    # next_edge[v]: the first edge of v not followed yet.
+    next_edge = out_start[:-1]
+    seen = [False] * n
+    preorder = []
+    postorder = []
+    for root in sources + list(range(n)):
+        if seen[root]:
+            continue
+        seen[root] = True
+        preorder.append(root)
+        stack = [root]
+        while stack:
+            node = stack[-1]
+            edge, end = next_edge[node], out_start[node + 1]
+            while edge < end and seen[out_nodes[edge]]:
+                edge += 1
+            if edge < end:
+                nxt = out_nodes[edge]
+                next_edge[node] = edge + 1
+                seen[nxt] = True
+                preorder.append(nxt)
+                stack.append(nxt)
+            else:
+                next_edge[node] = end
+                postorder.append(stack.pop())
+    pre = np.empty(n, dtype=np.int64)
+    pre[preorder] = np.arange(n)
+    post = np.empty(n, dtype=np.int64)
+    post[postorder] = np.arange(n)
+    postorder.reverse()
+    return postorder, pre, post
+
+
+def _longest_path_layers(n, order, src, tgt):
+    """Layer of every node: the length of the longest path reaching it."""
+    edge_order = np.argsort(src, kind="stable")
+    start = np.r_[0, np.cumsum(np.bincount(src, minlength=n))].tolist()
+    successors = tgt[edge_order].tolist()
+    layer = [0] * n
+    for node in order:
+        nxt_layer = layer[node] + 1
+        for k in range(start[node], start[node + 1]):
+            nxt = successors[k]
+            if layer[nxt] < nxt_layer:
+                layer[nxt] = nxt_layer
+    return np.array(layer, dtype=np.int64)
+
+
+class _ProperGraph:
+    """The layered graph with long edges split by dummy nodes.
+
+    Nodes ``0..n-1`` are the real ones, the rest are dummies. Edge ``i`` runs
+    from ``upper[i]`` in some layer to ``lower[i]`` in the next one.
+    """
+
+    def __init__(self, layer, src, tgt, order):
+        n = len(layer)
+        # Parallel edges, e.g. a loop reversed onto its forward edge, are one.
+        pairs = np.unique(src * n + tgt)
+        src, tgt = pairs // n, pairs % n
+        span = layer[tgt] - layer[src]
+        extra = span - 1
+        first_dummy = n + np.cumsum(extra) - extra
+        dummy_edge = np.repeat(np.arange(len(src)), extra)
+        dummy_step = np.arange(len(dummy_edge)) - np.repeat(first_dummy - n, extra)
+
+        segment_edge = np.repeat(np.arange(len(src)), span)
+        step = np.arange(len(segment_edge)) - np.repeat(np.cumsum(span) - span, span)
+        self.upper = np.where(
+            step == 0, src[segment_edge], first_dummy[segment_edge] + step - 1
+        )
+        self.lower = np.where(
+            step == span[segment_edge] - 1,
+            tgt[segment_edge],
+            first_dummy[segment_edge] + step,
+        )
+        self.layer = np.concatenate((layer, layer[src[dummy_edge]] + dummy_step + 1))
+        self.size = len(self.layer)
+        self.is_dummy = np.arange(self.size) >= n
+
+        # Start from the topological order, so that a branch stays together; a
+        # dummy follows the node its edge leaves from.
+        rank = np.empty(n)
+        rank[order] = np.arange(n)
+        self.initial_key = np.concatenate(
+            (rank, rank[src[dummy_edge]] + (dummy_step + 1) / (span[dummy_edge] + 1))
+        )
+        counts = np.bincount(self.layer)
+        self.layer_start = np.cumsum(counts) - counts
+        self.layer_size = counts
+        self.stride = int(counts.max()) + 1
+
+    def _positions(self, key, pos=None):
+        """Rank every node within its layer by *key*; ties keep order *pos*."""
+        nodes = np.arange(self.size) if pos is None else self._by_position(pos)
+        sort_key = self.layer[nodes] * self.stride + key[nodes]
+        order = nodes[np.argsort(sort_key, kind="stable")]
+        ranks = np.empty(self.size, dtype=np.int64)
+        ranks[order] = np.arange(self.size) - self.layer_start[self.layer[order]]
+        return ranks
+
+    def _by_position(self, pos):
+        """Return the nodes sorted by layer, then by position *pos*."""
+        nodes = np.empty(self.size, dtype=np.int64)
+        nodes[self.layer_start[self.layer] + pos] = np.arange(self.size)
+        return nodes
+
+    # --- crossing reduction ---------------------------------------------------
+
+    def crossings(self, pos):
+        """Count the pairs of edges that cross for the in-layer order *pos*."""
+        stride = self.stride
+        upper_key = self.layer[self.upper] * stride + pos[self.upper]
+        edges = np.sort(upper_key * stride + pos[self.lower])
+        # Between the same two layers, edges cross where, in the order of
+        # their upper ends, the lower ends go backwards.
+        edge_layer = edges // (stride * stride)
+        lower = edges % stride
+        count = len(edges)
+        starts = np.flatnonzero(np.r_[True, edge_layer[1:] != edge_layer[:-1]])
+        ends = np.r_[starts[1:], count]
+        later = np.repeat(ends, np.diff(np.r_[starts, count])) - np.arange(count) - 1
+        pairs = int(later.sum())
+        if pairs > _PAIR_LIMIT * count:
+            return _inversions(edge_layer * stride + lower)
+        first = np.repeat(np.arange(count), later)
+        offset = np.repeat(np.cumsum(later) - later, later)
+        second = first + 1 + np.arange(pairs) - offset
+        return int(np.count_nonzero(lower[first] > lower[second]))
+
+    def reduce_crossings(self):
+        """Return the in-layer positions of the best ordering found."""
+        pos = self._positions(self.initial_key / (self.size + 1))
+        if not len(self.upper):
+            return pos
+        degree = np.bincount(self.upper, minlength=self.size) + np.bincount(
+            self.lower, minlength=self.size
+        )
+        has_neighbours = degree > 0
+        odd = self.layer % 2 == 1
+        best, best_pos = self.crossings(pos), pos
+        stale = 0
+        for _ in range(_ROUNDS):
+            if not best or stale >= _PATIENCE:
+                break
+            for movable in (odd, ~odd):
+                # Odd layers only neighbour even ones: re-sorting all of them
+                # against fixed neighbours is one barycenter sweep.
+                total = np.bincount(
+                    self.upper, weights=pos[self.lower], minlength=self.size
+                )
+                total += np.bincount(
+                    self.lower, weights=pos[self.upper], minlength=self.size
+                )
+                barycenter = np.divide(
+                    total, degree, where=has_neighbours, out=pos * 1.0
+                )
+                pos = self._positions(np.where(movable, barycenter, pos), pos)
+            crossings = self.crossings(pos)
+            if crossings < best:
+                best, best_pos, stale = crossings, pos, 0
+            else:
+                stale += 1
+        return best_pos
+
+    # --- coordinate assignment (Brandes–Köpf) ---------------------------------
+
+    def assign_coordinates(self, pos, heights, gap):
+        """Return the in-layer centre coordinate of every node."""
+        marked = self._type1_conflicts(pos)
+        candidates = []
+        for towards_upper in (True, False):
+            for mirrored in (False, True):
+                p = self.layer_size[self.layer] - 1 - pos if mirrored else pos
+                by_position = self._by_position(p)
+                root = self._align(p, by_position, marked, towards_upper)
+                y = self._compact(by_position, root, heights, gap)
+                candidates.append((-y if mirrored else y, mirrored))
+
+        # Shift every candidate onto the narrowest one, by its leading side.
+        extents = [
+            ((y - heights / 2).min(), (y + heights / 2).max()) for y, _ in candidates
+        ]
+        low, high = min(extents, key=lambda extent: extent[1] - extent[0])
+        aligned = [
+            y + (high - extent[1] if mirrored else low - extent[0])
+            for (y, mirrored), extent in zip(candidates, extents)
+        ]
+        ordered = np.sort(np.stack(aligned), axis=0)
+        return (ordered[1] + ordered[2]) / 2
+
+    def _type1_conflicts(self, pos):
+        """Mark the edges crossing an inner segment (one between two dummies).
+
+        Such an edge is never aligned, so long edges are kept straight.
+        """
+        inner = self.is_dummy[self.upper] & self.is_dummy[self.lower]
+        if not inner.any():
+            return np.zeros(len(self.upper), dtype=bool)
+        edge_layer = self.layer[self.upper]
+        upper_key = edge_layer * self.stride + pos[self.upper]
+        lower_key = edge_layer * self.stride + pos[self.lower]
+
+        order = np.argsort(upper_key[inner])
+        inner_upper = upper_key[inner][order]
+        inner_lower = lower_key[inner][order]
+        # Keys of a layer sit above every key of the layers before it, so the
+        # running maximum (minimum) never leaks across layers.
+        max_lower_before = np.maximum.accumulate(inner_lower)
+        min_lower_after = np.minimum.accumulate(inner_lower[::-1])[::-1]
+        before = np.searchsorted(inner_upper, upper_key, side="left")
+        after = np.searchsorted(inner_upper, upper_key, side="right")
+        last = len(inner_upper) - 1
+        crosses_before = (before > 0) & (
+            max_lower_before[np.maximum(before - 1, 0)] > lower_key
+        )
+        crosses_after = (after <= last) & (
+            min_lower_after[np.minimum(after, last)] < lower_key
+        )
+        return ~inner & (crosses_before | crosses_after)
+
+    def _align(self, p, by_position, marked, towards_upper):
+        """Align nodes with a median neighbour; return the root of every block.
+
+        A node prefers its lower median neighbour (the upper one of an even
+        count if the lower edge is marked). It is aligned unless that would
+        cross an alignment further up its layer, i.e. unless the neighbour
+        does not lie past every earlier candidate.
+        """
+        root = np.arange(self.size)
+        if not len(self.upper):
+            return root
+        node, other = (
+            (self.lower, self.upper) if towards_upper else (self.upper, self.lower)
+        )
+        edge_order = np.argsort(node * self.stride + p[other])
+        degree = np.bincount(node, minlength=self.size)
+        first = np.cumsum(degree) - degree
+        has = degree > 0
+        low = edge_order[np.where(has, first + (degree - 1) // 2, 0)]
+        high = edge_order[np.where(has, first + degree // 2, 0)]
+        choice = np.where(marked[low] & (degree % 2 == 0), high, low)
+        valid = has & ~marked[choice]
+
+        base = self.layer[by_position] * self.stride
+        target = np.where(
+            valid[by_position], base + p[other[choice[by_position]]], base - 1
+        )
+        reached = np.maximum.accumulate(target)
+        aligned = np.zeros(self.size, dtype=bool)
+        aligned[by_position[1:]] = target[1:] > reached[:-1]
+        aligned[by_position[0]] = valid[by_position[0]]
+        aligned &= valid
+
+        root[aligned] = other[choice[aligned]]
+        while True:
+            jumped = root[root]
+            if np.array_equal(jumped, root):
+                return root
+            root = jumped
+
+    def _compact(self, by_position, root, heights, gap):
+        """Place blocks as high as the in-layer separation allows.
+
+        Each pass packs every layer from the top given the current block
+        coordinates (a running maximum), then moves every block down to its
+        lowest member. That settles most layouts in a few passes; blocks
+        pushing each other down in a long staircase would take a pass per
+        step, so those are finished by ``_longest_path``.
+        """
+        node_layer = self.layer[by_position]
+        node_root = root[by_position]
+        node_height = heights[by_position]
+        first = np.r_[True, node_layer[1:] != node_layer[:-1]]
+        separation = np.where(
+            first, 0.0, (node_height + np.r_[0.0, node_height[:-1]]) / 2 + gap
+        )
+        offset = np.cumsum(separation)
+        # Distance of every node from the top of its layer when packed.
+        offset -= np.maximum.accumulate(np.where(first, offset, 0.0))
+        # Lifts every layer above all values of the layers before it, so the
+        # running maximum restarts at each layer.
+        lift = node_layer * 2 * (separation.sum() + 1)
+
+        y = np.zeros(self.size)
+        for _ in range(_COMPACT_PASSES):
+            packed = np.maximum.accumulate(y[node_root] - offset + lift) - lift
+            placed = np.zeros(self.size)
+            np.maximum.at(placed, node_root, packed + offset)
+            if np.array_equal(placed, y):
+                return y[root]
+            y = placed
+        return _longest_path(
+            node_root[:-1][~first[1:]],
+            node_root[1:][~first[1:]],
+            separation[1:][~first[1:]],
+            y,
+        )[root]
+
+
+def _longest_path(above, below, separation, y):
+    """Raise *y* until ``y[below] >= y[above] + separation`` holds everywhere.
+
+    *y* must already be a lower bound of the result. Only the nodes that
+    take part in a constraint are walked, renumbered ``0..m-1``, with the
+    constraints of each in a CSR layout.
+    """
+    involved, ends = np.unique(np.concatenate((above, below)), return_inverse=True)
+    m = len(involved)
+    above, below = ends[: len(above)], ends[len(above) :]
+    order = np.argsort(above, kind="stable")
+    out_degree = np.bincount(above, minlength=m)
+    start = np.r_[0, np.cumsum(out_degree)].tolist()
+    below_sorted = below[order].tolist()
+    separation_sorted = separation[order].tolist()
+    in_degree = np.bincount(below, minlength=m).tolist()
+    local = y[involved].tolist()
+    ready = [v for v in range(m) if not in_degree[v]]
+    while ready:
+        node = ready.pop()
+        reach = local[node]
+        for k in range(start[node], start[node + 1]):
+            nxt = below_sorted[k]
+            if local[nxt] < reach + separation_sorted[k]:
+                local[nxt] = reach + separation_sorted[k]
+            in_degree[nxt] -= 1
+            if not in_degree[nxt]:
+                ready.append(nxt)
+    y = y.copy()
+    y[involved] = local
+    return y
+
+
+def _inversions(values):
+    """Count the pairs ``i < j`` with ``values[i] > values[j]``.
+
+    Bottom-up merge counting: at each level the sorted left half of every
+    block pair is searched for the elements of its right half.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    n = len(values)
+    if n < 2:
+        return 0
+    offset = int(values.max()) + 1
+    index = np.arange(n)
+    count = 0
+    width = 1
+    while width < n:
+        pair = index // (2 * width)
+        right = (index // width) % 2 == 1
+        keyed = pair * offset + values
+        left_keys = keyed[~right]
+        not_greater = np.searchsorted(left_keys, keyed[right], side="right")
+        count += int(((pair[right] + 1) * width - not_greater).sum())
+        values = np.sort(keyed) - pair * offset
+        width *= 2
+    return count
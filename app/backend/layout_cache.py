@@ -0,0 +1,136 @@
+import hashlib
+import json
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+
+from app import CACHE_HITS, CACHE_MISSES
+from app.backend.cache import RedisCache, fingerprint
+from app.backend.redis_client import get_redis
+
+# Module-level logger for this module
+logger = logging.getLogger(__name__)
+
+
+def layout_key(layout, elements_by_id, flows, params):
+    """Canonical key of a layout call: its graph with the names taken out.
+
+    Nodes are numbered in input order and flows refer to them by number (-1
+    for an unknown node), so two models that differ only in labels and ids
+    share a key. The engines do break ties by id (``layered`` sorts each
+    column by it), so the rank of every id among the others is part of the
+    key, not the ids themselves.
+    """
+    node_ids = list(elements_by_id)
+    index = {nid: i for i, nid in enumerate(node_ids)}
+    digest = hashlib.sha256(fingerprint(layout, sorted(params.items())).encode())
+    sizes = [len(node_ids)]
+    for size in elements_by_id.values():
+        sizes += (size["w"], size["h"])
+    digest.update(array("q", sizes).tobytes())
+    edges = [
+        index.get(flow.get(end, ""), -1)
+        for flow in flows
+        for end in ("source", "target")
+    ]
+    digest.update(array("q", [len(edges)] + edges).tobytes())
+    ranks = sorted(range(len(node_ids)), key=node_ids.__getitem__)
+    digest.update(array("q", ranks).tobytes())
+    return digest.hexdigest()
+
+
+class LayoutCache:
+    """Two-level cache of layout results keyed on ``layout_key``.
+
+    Entries are the ``(x, y)`` of every node in input order. The in-process
+    tier keeps the ``LAYOUT_CACHE_MAX_ENTRIES`` most recently used ones; with
+    ``LAYOUT_CACHE_REDIS_ENABLED`` a shared ``t2p:layout:<key>`` tier
+    (``LAYOUT_CACHE_TTL_SECONDS``, ``LAYOUT_CACHE_REDIS_MAX_ENTRIES``) sits
+    behind it, so a layout computed by one worker serves all of them. Hits
+    and misses are counted with ``cache="layout_local"`` and ``cache="layout"``.
+
+    A limit of 0 disables the cache, Redis included.
+    """
+
+    # Process-local LRU tier shared by every request thread.
+    _entries = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self):
+        config = current_app.config
+        self.max_entries = int(config.get("LAYOUT_CACHE_MAX_ENTRIES", 1024))
+        client = None
+        if self.enabled and config.get("LAYOUT_CACHE_REDIS_ENABLED", False):
+            client = get_redis()
+        self.shared = RedisCache(
+            "layout",
+            client,
+            ttl=config.get("LAYOUT_CACHE_TTL_SECONDS", 86400),
+            max_entries=config.get("LAYOUT_CACHE_REDIS_MAX_ENTRIES", 10000),
+        )
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def get(self, key):
+        """Return the cached coordinates for *key*, or ``None`` on a miss."""
+        with self._lock:
+            coords = self._entries.get(key)
+            if coords is not None:
+                self._entries.move_to_end(key)
+        if coords is not None:
+            CACHE_HITS.labels(cache="layout_local").inc()
+            return coords
+        CACHE_MISSES.labels(cache="layout_local").inc()
+
+        raw = self.shared.get(key)
+        if raw is None:
+            return None
+        try:
+            coords = [tuple(xy) for xy in json.loads(raw)]
+        except (ValueError, TypeError) as e:
+            logger.warning("Ignoring unreadable cached layout", extra={"error": str(e)})
+            return None
+        self._store(key, coords)
+        return coords
+
+    def set(self, key, coords):
+        self._store(key, coords)
+        self.shared.set(key, json.dumps(coords, separators=(",", ":")))
+
+    def _store(self, key, coords):
+        with self._lock:
+            self._entries[key] = coords
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def cached_layout(layout, engine, elements_by_id, flows, **params):
+    """Return ``engine(elements_by_id, flows, **params)``, reusing earlier results.
+
+    *layout* is the engine's name in the key. Outside an app context, e.g. in
+    scripts and benchmarks, the engine is simply called.
+    """
+    if not elements_by_id or not has_app_context():
+        return engine(elements_by_id, flows, **params)
+    cache = LayoutCache()
+    if not cache.enabled:
+        return engine(elements_by_id, flows, **params)
+
+    key = layout_key(layout, elements_by_id, flows, params)
+    coords = cache.get(key)
+    if coords is not None and len(coords) == len(elements_by_id):
+        return {
+            nid: {"x": x, "y": y, "w": size["w"], "h": size["h"]}
+            for (nid, size), (x, y) in zip(elements_by_id.items(), coords)
+        }
+    positions = engine(elements_by_id, flows, **params)
+    cache.set(
+        key, [(positions[nid]["x"], positions[nid]["y"]) for nid in elements_by_id]
+    )
+    return positions
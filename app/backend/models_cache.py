@@ -0,0 +1,249 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from flask import current_app
+from redis.exceptions import RedisError
+
+from app import CACHE_HITS, CACHE_MISSES
+from app.backend.cache import KEY_PREFIX, fingerprint
+from app.backend.redis_client import get_redis
+
+# Module-level logger for this module
+logger = logging.getLogger(__name__)
+
+_ENTRY_KEY = f"{KEY_PREFIX}:models"
+_REFRESH_LOCK_KEY = f"{KEY_PREFIX}:models:refresh"
+# Upper bound on one background refresh; another worker may retry after it.
+_REFRESH_LOCK_SECONDS = 30
+
+
+class ModelsEntry:
+    """A fetched models list with its ETag and fetch time (epoch seconds)."""
+
+    def __init__(self, models, fetched_at, etag=None):
+        self.models = models
+        self.fetched_at = fetched_at
+        self.etag = etag or fingerprint(models)[:32]
+
+    def age(self, now=None):
+        return (now if now is not None else time.time()) - self.fetched_at
+
+    def to_json(self):
+        return json.dumps(
+            {"models": self.models, "fetched_at": self.fetched_at, "etag": self.etag}
+        )
+
+    @classmethod
+    def from_json(cls, raw):
+        data = json.loads(raw)
+        return cls(data["models"], data["fetched_at"], data["etag"])
+
+
+class ModelsCache:
+    """Two-level cache of the connector's model registry (``GET /models``).
+
+    An in-process L1 entry sits in front of a shared Redis entry ``t2p:models``,
+    so most requests cost neither a connector nor a Redis round-trip. Entries
+    are fresh for ``MODELS_CACHE_TTL_SECONDS``. For ``MODELS_CACHE_STALE_SECONDS``
+    beyond that they are still served while one worker refreshes them in the
+    background (stale-while-revalidate). A cold or expired cache fetches
+    synchronously; if that fetch fails, whatever entry this process still holds
+    is served instead of an error (stale-if-error).
+
+    A TTL of 0 disables caching; Redis being disabled or unreachable reduces
+    it to the per-process L1.
+    """
+
+    # Process-local L1 entry and refresh state.
+    _l1 = None
+    _lock = threading.Lock()
+    _refreshing = False
+    # Background refresh tasks of the asyncio serving mode.
+    _tasks = set()
+
+    def __init__(self):
+        config = current_app.config
+        self.ttl = float(config.get("MODELS_CACHE_TTL_SECONDS", 300))
+        self.stale_ttl = float(config.get("MODELS_CACHE_STALE_SECONDS", 86400))
+        self.client = get_redis() if self.enabled else None
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    def max_age(self, entry):
+        """Seconds a client may reuse *entry* without revalidating."""
+        if not self.enabled:
+            return 0
+        return max(int(self.ttl - entry.age()), 0)
+
+    def get(self, fetch):
+        """Return the current ``ModelsEntry``, calling ``fetch()`` when needed.
+
+        ``fetch`` returns the models list or raises; it is only re-raised when
+        there is nothing cached to fall back on.
+        """
+        if not self.enabled:
+            return ModelsEntry(fetch(), time.time())
+
+        entry = self._lookup()
+        if entry is not None:
+            if entry.age() >= self.ttl and self._claim_refresh():
+                self._refresh_in_thread(fetch)
+            return entry
+
+        try:
+            return self._store(ModelsEntry(fetch(), time.time()))
+        except Exception:
+            stale = self._stale_entry()
+            if stale is None:
+                raise
+            return stale
+
+    async def get_async(self, fetch):
+        """Coroutine form of ``get`` for the asyncio serving mode.
+
+        ``fetch`` is a coroutine function; a background refresh runs as a task
+        on the event loop instead of a thread.
+        """
+        if not self.enabled:
+            return ModelsEntry(await fetch(), time.time())
+
+        entry = self._lookup()
+        if entry is not None:
+            if entry.age() >= self.ttl and self._claim_refresh():
+                task = asyncio.get_running_loop().create_task(
+                    self._refresh_async(fetch)
+                )
+                # The loop keeps only weak references to tasks.
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return entry
+
+        try:
+            return self._store(ModelsEntry(await fetch(), time.time()))
+        except Exception:
+            stale = self._stale_entry()
+            if stale is None:
+                raise
+            return stale
+
+    def _lookup(self):
+        """Return a servable (fresh or stale) entry and count the hit or miss."""
+        entry = self._read()
+        if entry is not None and entry.age() < self.ttl + self.stale_ttl:
+            CACHE_HITS.labels(cache="models").inc()
+            return entry
+        CACHE_MISSES.labels(cache="models").inc()
+        return None
+
+    def _stale_entry(self):
+        """Return this process's last entry after a failed fetch, if any."""
+        stale = type(self)._l1
+        if stale is not None:
+            logger.warning(
+                "Serving stale models list after a failed refresh",
+                extra={"age_seconds": round(stale.age())},
+                exc_info=True,
+            )
+        return stale
+
+    def _read(self):
+        """Return the newest entry from L1 or Redis (``None`` if neither has one)."""
+        entry = type(self)._l1
+        if entry is not None and entry.age() < self.ttl:
+            return entry
+        if self.client is None:
+            return entry
+        try:
+            raw = self.client.get(_ENTRY_KEY)
+        except RedisError as e:
+            logger.warning("Models cache read failed", extra={"error": str(e)})
+            return entry
+        if raw is None:
+            return entry
+        try:
+            shared = ModelsEntry.from_json(raw)
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed models cache entry")
+            return entry
+        if entry is None or shared.fetched_at > entry.fetched_at:
+            self._store_l1(shared)
+            return shared
+        return entry
+
+    def _store_l1(self, entry):
+        with self._lock:
+            current = type(self)._l1
+            if current is None or entry.fetched_at >= current.fetched_at:
+                type(self)._l1 = entry
+
+    def _store(self, entry):
+        """Publish a freshly fetched *entry* to L1 and Redis and return it."""
+        self._store_l1(entry)
+        if self.client is not None:
+            try:
+                self.client.set(
+                    _ENTRY_KEY, entry.to_json(), ex=int(self.ttl + self.stale_ttl)
+                )
+            except RedisError as e:
+                logger.warning("Models cache write failed", extra={"error": str(e)})
+        return entry
+
+    def _claim_refresh(self):
+        """Claim the one background refresh per process and, via Redis, per fleet."""
+        cls = type(self)
+        with self._lock:
+            if cls._refreshing:
+                return False
+            cls._refreshing = True
+
+        if self.client is not None:
+            try:
+                acquired = self.client.set(
+                    _REFRESH_LOCK_KEY, "1", nx=True, ex=_REFRESH_LOCK_SECONDS
+                )
+            except RedisError:
+                acquired = True
+            if not acquired:
+                # Another worker is refreshing; its result reaches us via Redis.
+                with self._lock:
+                    cls._refreshing = False
+                return False
+        return True
+
+    def _release_refresh(self):
+        with self._lock:
+            type(self)._refreshing = False
+        if self.client is not None:
+            try:
+                self.client.delete(_REFRESH_LOCK_KEY)
+            except RedisError:
+                pass
+
+    def _refresh_in_thread(self, fetch):
+        app = current_app._get_current_object()
+
+        def _run():
+            with app.app_context():
+                try:
+                    self._store(ModelsEntry(fetch(), time.time()))
+                    logger.info("Models list refreshed in the background")
+                except Exception:
+                    logger.warning("Background models refresh failed", exc_info=True)
+                finally:
+                    self._release_refresh()
+
+        threading.Thread(target=_run, name="t2p-models-refresh", daemon=True).start()
+
+    async def _refresh_async(self, fetch):
+        try:
+            self._store(ModelsEntry(await fetch(), time.time()))
+            logger.info("Models list refreshed in the background")
+        except Exception:
+            logger.warning("Background models refresh failed", exc_info=True)
+        finally:
+            self._release_refresh()
@@ -1,18 +1,38 @@
 import json
 import logging
 import time
+import httpx
 import requests
 from flask import current_app
 
+from app.backend.deadline import DeadlineExceeded, clamp, expired
+from app.backend.http_session import get_async_client, get_session
+
 # Configure a logger for this module
 logger = logging.getLogger(__name__)
 
+# Failures of the transformer call itself, from either client; the route
+# layer maps them to ``transform_error``.
+TRANSFORM_ERRORS = (requests.exceptions.RequestException, httpx.HTTPError)
+
+
+def is_outage(exc):
+    """Return whether *exc*, one of ``TRANSFORM_ERRORS``, means the transformer
+    is unavailable: a connection error, a timeout or a 5xx response.
+
+    A 4xx response is the transformer rejecting the BPMN it was given, which
+    says nothing about its health.
+    """
+    response = getattr(exc, "response", None)
+    return response is None or response.status_code >= 500
+
 
 class ModelTransformer:
     def __init__(self):
         self.transformer_url = (
             current_app.config["T2P_TRANSFORMER_BASE_URL"] + "/transform"
         )
+        self.timeout = float(current_app.config.get("TRANSFORMER_TIMEOUT_SECONDS", 60))
         logger.debug(
             "ModelTransformer initialized",
             extra={"transformer_url": self.transformer_url},
@@ -25,6 +45,7 @@ class ModelTransformer:
         :return: The transformed BPMN XML.
         :raises requests.exceptions.HTTPError: If the transformer service returns a 4xx or 5xx error.
         :raises requests.exceptions.RequestException: For other network or request-related issues.
+        :raises DeadlineExceeded: If the request deadline passes first.
         """
         start_time = time.time()
         logger.info(
@@ -38,6 +59,8 @@ class ModelTransformer:
         )
 
         query_params = directionParams
+        # Never wait past the request deadline.
+        timeout = clamp(self.timeout)
 
         try:
             logger.debug(
@@ -45,7 +68,7 @@ class ModelTransformer:
                 extra={
                     "url": self.transformer_url,
                     "params": query_params,
-                    "timeout": 60,
+                    "timeout": timeout,
                 },
             )
 
@@ -69,12 +92,12 @@ class ModelTransformer:
                 },
             )
 
-            response = requests.post(
+            response = get_session().post(
                 self.transformer_url,
                 params=query_params,
                 data=form_data,  # Use 'data' for x-www-form-urlencoded
                 headers=headers,
-                timeout=60,  # Set a reasonable timeout (e.g., 60 seconds)
+                timeout=timeout,
                 verify=False,  # Disable SSL certificate verification
             )
 
@@ -140,5 +163,83 @@ class ModelTransformer:
                 },
             )
             logger.exception("RequestException during transformation")
+            if isinstance(e_req, requests.exceptions.Timeout) and expired():
+                raise DeadlineExceeded() from e_req
             # Re-raise the exception to be handled by the caller (app.py)
             raise
+
+
+class AsyncModelTransformer(ModelTransformer):
+    """``ModelTransformer`` for the asyncio serving mode (see ``app/asgi.py``).
+
+    Posts through the shared ``httpx.AsyncClient`` and raises ``httpx``
+    errors where the synchronous client raises ``requests`` ones; both are in
+    ``TRANSFORM_ERRORS``.
+    """
+
+    async def transform(self, bpmn_xml, directionParams=None):
+        """Async ``ModelTransformer.transform``."""
+        start_time = time.time()
+        logger.info(
+            "Starting transformation",
+            extra={
+                "direction": directionParams.get("direction")
+                if directionParams
+                else None,
+                "bpmn_xml_length": len(bpmn_xml) if isinstance(bpmn_xml, str) else None,
+            },
+        )
+
+        try:
+            response = await get_async_client().post(
+                self.transformer_url,
+                params=directionParams,
+                data={"bpmn": bpmn_xml},
+                timeout=clamp(self.timeout),
+            )
+            logger.info(
+                "Transformation service responded",
+                extra={
+                    "status": response.status_code,
+                    "duration_seconds": round(time.time() - start_time, 4),
+                },
+            )
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e_http:
+            logger.error(
+                f"Transformer service returned HTTP error: {e_http.response.status_code} "
+                f"- URL: {self.transformer_url}",
+                extra={
+                    "status_code": e_http.response.status_code,
+                    "url": self.transformer_url,
+                    "duration_seconds": round(time.time() - start_time, 4),
+                    "response_preview": e_http.response.text[:500]
+                    if e_http.response.text
+                    else None,
+                },
+            )
+            raise
+        except httpx.HTTPError as e_req:
+            logger.error(
+                f"HTTPError during transformation: {str(e_req)} - URL: {self.transformer_url}",
+                extra={
+                    "url": self.transformer_url,
+                    "duration_seconds": round(time.time() - start_time, 4),
+                    "error_type": type(e_req).__name__,
+                },
+            )
+            if isinstance(e_req, httpx.TimeoutException) and expired():
+                raise DeadlineExceeded() from e_req
+            raise
+
+        pnml_output = json.loads(response.text)["pnml"]
+        logger.info(
+            "Transformation completed successfully",
+            extra={
+                "pnml_length": len(pnml_output)
+                if isinstance(pnml_output, str)
+                else None,
+                "total_duration_seconds": round(time.time() - start_time, 4),
+            },
+        )
+        return pnml_output
@@ -0,0 +1,44 @@
+import logging
+import threading
+
+import redis
+from flask import current_app
+
+# Module-level logger for this module
+logger = logging.getLogger(__name__)
+
+# Guards lazy creation of the per-app client across gunicorn threads.
+_client_lock = threading.Lock()
+
+
+def get_redis():
+    """Return the process-wide Redis client for the current app, or ``None``.
+
+    The client is created lazily from ``REDIS_URL`` on first use and stored in
+    ``app.extensions["redis"]`` so every request thread of a worker shares one
+    connection pool. ``None`` means Redis is disabled (``REDIS_ENABLED``);
+    callers treat that exactly like a cache miss or an unavailable backend.
+
+    Creating the client does not connect; an unreachable server surfaces as a
+    ``redis.exceptions.RedisError`` on the first command, which callers catch
+    so that Redis is never on the critical path of a request.
+    """
+    app = current_app._get_current_object()
+    if "redis" in app.extensions:
+        return app.extensions["redis"]
+
+    with _client_lock:
+        if "redis" not in app.extensions:
+            client = None
+            if app.config.get("REDIS_ENABLED", False):
+                timeout = app.config.get("REDIS_SOCKET_TIMEOUT_SECONDS", 0.5)
+                client = redis.Redis.from_url(
+                    app.config["REDIS_URL"],
+                    socket_timeout=timeout,
+                    socket_connect_timeout=timeout,
+                )
+                logger.debug(
+                    "Redis client initialized", extra={"socket_timeout": timeout}
+                )
+            app.extensions["redis"] = client
+    return app.extensions["redis"]
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import threading
+import time
+import uuid
+
+from flask import current_app
+from redis.exceptions import RedisError, WatchError
+
+from app import COALESCED_REQUESTS
+from app.backend.cache import KEY_PREFIX
+from app.backend.deadline import clamp
+from app.backend.redis_client import get_redis
+from app.backend.timing import stage
+
+# Module-level logger for this module
+logger = logging.getLogger(__name__)
+
+# How long a finished leader's result stays readable for followers in other
+# workers that subscribed just after it was published.
+_RESULT_TTL_SECONDS = 30
+# Upper bound on one blocking pub/sub read, so followers notice a crashed
+# leader (its lock expiring) without waiting for the full timeout.
+_POLL_SECONDS = 1.0
+
+
+class _Call:
+    """One in-flight call in this process that followers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.ok = False
+
+
+class SingleFlight:
+    """Coalesce identical concurrent calls so only one of them does the work.
+
+    ``do(key, fn)`` runs ``fn`` for the first caller with *key* (the leader);
+    concurrent callers with the same key wait for the leader and receive its
+    result. Within a process followers wait on a ``threading.Event``. Across
+    gunicorn workers, the process-local leader takes a Redis lock
+    ``t2p:inflight:<name>:<key>``; leaders in other workers then wait for a
+    notification on the pub/sub channel of the same name and read the result
+    from ``<lock>:result``.
+
+    Only successful results are shared. If the leader fails, times out or
+    disappears, each follower runs ``fn`` itself, so an error caused by one
+    caller (e.g. a rejected API key) is never handed to another. Redis errors
+    degrade to process-local coalescing.
+
+    Configured by ``SINGLE_FLIGHT_ENABLED`` and ``SINGLE_FLIGHT_TIMEOUT_SECONDS``
+    (how long followers wait, and the lock's lifetime). Followers never wait
+    past their own request deadline.
+    """
+
+    # In-flight calls of this process, keyed by "<name>:<key>".
+    _calls = {}
+    _calls_lock = threading.Lock()
+    # In-flight calls of the asyncio serving mode: futures of ``(ok, result)``.
+    _async_calls = {}
+
+    def __init__(self, name):
+        config = current_app.config
+        self.name = name
+        self.enabled = bool(config.get("SINGLE_FLIGHT_ENABLED", False))
+        self.timeout = float(config.get("SINGLE_FLIGHT_TIMEOUT_SECONDS", 180))
+        self.client = get_redis() if self.enabled else None
+
+    def do(self, key, fn):
+        """Return ``fn()``, sharing one execution among concurrent callers of *key*."""
+        if not self.enabled:
+            return fn()
+
+        call_key = f"{self.name}:{key}"
+        with self._calls_lock:
+            call = self._calls.get(call_key)
+            leader = call is None
+            if leader:
+                call = self._calls[call_key] = _Call()
+
+        if not leader:
+            with stage("coalesced_wait"):
+                call.done.wait(clamp(self.timeout))
+            if call.ok:
+                COALESCED_REQUESTS.labels(name=self.name, outcome="shared_local").inc()
+                return call.result
+            COALESCED_REQUESTS.labels(name=self.name, outcome="fallback").inc()
+            return fn()
+
+        try:
+            call.result = self._do_shared(key, fn)
+            call.ok = True
+            return call.result
+        finally:
+            with self._calls_lock:
+                self._calls.pop(call_key, None)
+            call.done.set()
+
+    async def do_async(self, key, fn):
+        """Coroutine form of ``do``: return ``await fn()``, shared per event loop.
+
+        Followers await the leader's result instead of a thread event. Unlike
+        ``do`` this does not coordinate across workers: waiting on Redis
+        pub/sub would block the event loop.
+        """
+        if not self.enabled:
+            return await fn()
+
+        call_key = f"{self.name}:{key}"
+        future = self._async_calls.get(call_key)
+        if future is not None:
+            with stage("coalesced_wait"):
+                try:
+                    ok, result = await asyncio.wait_for(
+                        asyncio.shield(future), clamp(self.timeout)
+                    )
+                except asyncio.TimeoutError:
+                    ok, result = False, None
+            if ok:
+                COALESCED_REQUESTS.labels(name=self.name, outcome="shared_local").inc()
+                return result
+            COALESCED_REQUESTS.labels(name=self.name, outcome="fallback").inc()
+            return await fn()
+
+        future = asyncio.get_running_loop().create_future()
+        self._async_calls[call_key] = future
+        COALESCED_REQUESTS.labels(name=self.name, outcome="leader").inc()
+        ok, result = False, None
+        try:
+            result = await fn()
+            ok = True
+            return result
+        finally:
+            self._async_calls.pop(call_key, None)
+            future.set_result((ok, result))
+
+    # --- cross-worker coordination ------------------------------------------
+
+    def _lock_key(self, key):
+        return f"{KEY_PREFIX}:inflight:{self.name}:{key}"
+
+    def _do_shared(self, key, fn):
+        if self.client is None:
+            COALESCED_REQUESTS.labels(name=self.name, outcome="leader").inc()
+            return fn()
+
+        lock_key = self._lock_key(key)
+        token = uuid.uuid4().hex
+        try:
+            acquired = self.client.set(
+                lock_key, token, nx=True, px=int(self.timeout * 1000)
+            )
+        except RedisError as e:
+            logger.warning(
+                "Single-flight lock unavailable",
+                extra={"flight": self.name, "error": str(e)},
+            )
+            acquired = True
+            token = None
+
+        if not acquired:
+            with stage("coalesced_wait"):
+                result = self._wait_remote(lock_key)
+            if result is not None:
+                COALESCED_REQUESTS.labels(name=self.name, outcome="shared_remote").inc()
+                return result
+            COALESCED_REQUESTS.labels(name=self.name, outcome="fallback").inc()
+            return fn()
+
+        COALESCED_REQUESTS.labels(name=self.name, outcome="leader").inc()
+        result = None
+        try:
+            result = fn()
+            return result
+        finally:
+            if token is not None:
+                self._publish(lock_key, token, result)
+
+    def _publish(self, lock_key, token, result):
+        """Hand *result* (``None`` on failure) to remote followers and unlock."""
+        try:
+            pipe = self.client.pipeline()
+            if result is not None:
+                pipe.set(f"{lock_key}:result", result, ex=_RESULT_TTL_SECONDS)
+            pipe.publish(lock_key, "done" if result is not None else "failed")
+            pipe.execute()
+
+            with self.client.pipeline() as pipe:
+                pipe.watch(lock_key)
+                current = pipe.get(lock_key)
+                if current is not None and current.decode("utf-8") == token:
+                    pipe.multi()
+                    pipe.delete(lock_key)
+                    pipe.execute()
+        except WatchError:
+            pass
+        except RedisError as e:
+            logger.warning(
+                "Single-flight release failed",
+                extra={"flight": self.name, "error": str(e)},
+            )
+
+    def _wait_remote(self, lock_key):
+        """Wait for another worker's leader; return its result or ``None``."""
+        result_key = f"{lock_key}:result"
+        deadline = time.monotonic() + clamp(self.timeout)
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(lock_key)
+            while True:
+                # Checked after subscribing, so a result published in between
+                # is not missed.
+                value = self.client.get(result_key)
+                if value is not None:
+                    return value.decode("utf-8")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.client.exists(lock_key):
+                    return None
+                message = pubsub.get_message(timeout=min(remaining, _POLL_SECONDS))
+                if message is not None and message.get("data") in (b"failed", "failed"):
+                    return None
+        except RedisError as e:
+            logger.warning(
+                "Single-flight wait failed",
+                extra={"flight": self.name, "error": str(e)},
+            )
+            return None
+        finally:
+            try:
+                pubsub.close()
+            except RedisError:
+                pass
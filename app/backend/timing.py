@@ -0,0 +1,132 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from app.__init__ import STAGE_DURATION
+
+# Module-level logger for this module
+logger = logging.getLogger(__name__)
+
+# Timings of the pipeline run in progress on this thread/task, if any.
+_current = ContextVar("t2p_pipeline_timings", default=None)
+
+
+def _label(value):
+    return value if isinstance(value, str) and value else "unknown"
+
+
+class PipelineTimings:
+    """Stage durations of one generate pipeline run.
+
+    Durations are summed per stage name (the PNML layout runs twice, the
+    few-shot fallback repeats the whole pipeline) and kept in first-seen order.
+    ``total`` is set when the run ends.
+
+    ``provider`` and ``model`` label the run's metrics once ``label_pipeline``
+    has set them, and are ``"unknown"`` until then.
+
+    A *listener*, if given, is called as ``listener(event, data)`` when a stage
+    starts or finishes (event ``"stage"``) and for every ``emit``; streamed
+    responses use it to report progress while the pipeline runs.
+    """
+
+    def __init__(self, listener=None):
+        self.stages = {}
+        self.total = None
+        self.provider = None
+        self.model = None
+        self.listener = listener
+        self._started = time.perf_counter()
+
+    def notify(self, event, data):
+        if self.listener is not None:
+            self.listener(event, data)
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def finish(self):
+        self.total = time.perf_counter() - self._started
+
+    def observe(self, target):
+        """Record every stage in the ``t2p_pipeline_stage_duration_seconds`` histogram."""
+        for name, seconds in self.stages.items():
+            STAGE_DURATION.labels(
+                stage=name,
+                provider=_label(self.provider),
+                model=_label(self.model),
+                target=target,
+            ).observe(seconds)
+
+    def milliseconds(self):
+        """Return the stages and, once finished, ``total`` in milliseconds."""
+        durations = {
+            name: round(seconds * 1000, 1) for name, seconds in self.stages.items()
+        }
+        if self.total is not None:
+            durations["total"] = round(self.total * 1000, 1)
+        return durations
+
+    def server_timing(self):
+        """Render the stages as a ``Server-Timing`` header value (milliseconds)."""
+        metrics = [
+            f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()
+        ]
+        if self.total is not None:
+            metrics.append(f"total;dur={self.total * 1000:.1f}")
+        return ", ".join(metrics)
+
+
+@contextmanager
+def track_pipeline(listener=None):
+    """Collect the stages run inside the block into a new ``PipelineTimings``."""
+    timings = PipelineTimings(listener)
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        timings.finish()
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name):
+    """Time the block as pipeline stage *name*; a no-op outside ``track_pipeline``."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    timings.notify("stage", {"stage": name, "state": "started"})
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        timings.add(name, seconds)
+        timings.notify(
+            "stage",
+            {
+                "stage": name,
+                "state": "finished",
+                "duration_ms": round(seconds * 1000, 1),
+            },
+        )
+
+
+def label_pipeline(provider, model):
+    """Label the current run's metrics with *provider* and *model*.
+
+    Call this only once the connector has accepted them: until then they are
+    arbitrary client input, and as labels would grow the metric without bound.
+    """
+    timings = _current.get()
+    if timings is not None:
+        timings.provider, timings.model = provider, model
+
+
+def emit(event, **data):
+    """Report an intermediate pipeline result to the listener, if there is one."""
+    timings = _current.get()
+    if timings is not None:
+        timings.notify(event, data)
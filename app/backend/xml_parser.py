@@ -1,7 +1,11 @@
 import xml.etree.ElementTree as ET
 import logging
 import re
-from collections import deque
+from collections import Counter, deque
+
+from app.backend.graph import NODE, PLACE, TRANSITION, Graph
+from app.backend.layout import sugiyama_layout
+from app.backend.layout_cache import cached_layout
 
 logger = logging.getLogger(__name__)
 
@@ -39,12 +43,25 @@ ET.register_namespace("di", _NS["di"])
 ET.register_namespace("dc", _NS["dc"])
 ET.register_namespace("xsi", _NS["xsi"])
 
+_SCHEMA_LOCATION = (
+    "http://www.omg.org/spec/BPMN/20100524/MODEL "
+    "https://www.omg.org/spec/BPMN/20100501/BPMN20.xsd"
+)
+_TARGET_NAMESPACE = "http://example.bpmn.com/schema/bpmn"
+
 
 _TASK_PREFIX_RE = re.compile(r"^\[(?:UserTask|ServiceTask)\]\s*", re.IGNORECASE)
 _WS_RE = re.compile(r"\s+")
 _PUNCT_RE = re.compile(r"[^a-z0-9\-\s]")
 
 
+class UnknownLayoutError(ValueError):
+    """A request named a layout engine that is not in ``LAYOUTS``.
+
+    The route layer maps it to a ``400 invalid_request`` response.
+    """
+
+
 class PnmlStructureError(ValueError):
     """A PNML net violates structural connectivity constraints.
 
@@ -54,6 +71,151 @@ class PnmlStructureError(ValueError):
     """
 
 
+class PnmlDocument:
+    """A PNML net parsed once and post-processed in place.
+
+    The transformer's PNML goes through several steps — graph sanitizing,
+    place renaming, label normalization, layout, BPMN-guided repair and
+    connectivity validation. Each step operates on the shared element tree, so
+    a request pays for one parse and one serialization however many steps run::
+
+        document = PnmlDocument.parse(pnml_xml)
+        document.assign_coordinates()
+        document.repair_connectivity(bpmn_xml)
+        document.assign_coordinates()
+        document.validate_connectivity()
+        pnml_xml = document.to_string()
+
+    The string-in/string-out functions (``assign_pnml_coordinates``,
+    ``repair_pnml_connectivity_from_bpmn``, ``validate_pnml_connectivity``)
+    are thin wrappers over the same steps.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        # Detect Clark-notation namespace prefix, e.g. '{http://www.pnml.org/...}'.
+        raw_tag = root.tag
+        self.ns_prefix = (
+            "{" + raw_tag[1 : raw_tag.index("}")] + "}"
+            if raw_tag.startswith("{")
+            else ""
+        )
+        # Register the namespace so ET.tostring() preserves the default namespace.
+        if self.ns_prefix:
+            ET.register_namespace("", self.ns_prefix[1:-1])
+        # ``(graph, arcs)`` of the net, built when a step first needs it and
+        # dropped when a step changes the net's structure.
+        self._net = None
+
+    @classmethod
+    def parse(cls, pnml_xml):
+        """Parse *pnml_xml*; return ``None`` if it is not a non-empty XML string."""
+        if not pnml_xml or not isinstance(pnml_xml, str):
+            return None
+        try:
+            return cls(ET.fromstring(pnml_xml))
+        except ET.ParseError:
+            return None
+
+    def net(self):
+        """Return ``(graph, arcs)`` for the net as it stands; see ``_pnml_graph``."""
+        if self._net is None:
+            self._net = _pnml_graph(self.root, self.ns_prefix)
+        return self._net
+
+    def sanitize(self):
+        """Enforce a bipartite graph and drop orphan places/transitions."""
+        if _sanitize_pnml_graph(self.root, self.ns_prefix, self.net()):
+            self._net = None
+
+    def rename_places(self):
+        """Rename places to P1..Pn and re-derive arc ids."""
+        id_map = _rename_places_and_update_arcs(self.root, self.ns_prefix)
+        if self._net is not None and id_map:
+            graph = self._net[0]
+            # A place id shared with a transition renames only the place.
+            shared = any(
+                graph.kind[graph.index[old_id]] & TRANSITION for old_id in id_map
+            )
+            if shared or not graph.rename(id_map):
+                self._net = None
+
+    def normalize_labels(self):
+        """Strip transformer decorations from transition labels."""
+        _normalize_transition_labels(self.root, self.ns_prefix)
+
+    def layout(self, layout="layered"):
+        """Assign centre coordinates; ``False`` if there is nothing to lay out."""
+        return _layout_pnml(self.root, self.ns_prefix, layout)
+
+    def assign_coordinates(self, layout="layered"):
+        """Sanitize, rename, normalize and lay out the net, in that order.
+
+        *layout* names the engine in ``LAYOUTS``. Returns ``False``, leaving
+        the net untouched, when sanitizing would leave no places or
+        transitions to lay out.
+        """
+        graph, _ = self.net()
+        kind = graph.kind
+        if not any(
+            src != tgt and kind[src] & kind[tgt] & NODE
+            for src, tgt in zip(graph.src, graph.tgt)
+        ):
+            # Every node would be an orphan: keep them for the repair step.
+            return False
+        self.sanitize()
+        self.rename_places()
+        self.normalize_labels()
+        return self.layout(layout)
+
+    def repair_connectivity(self, bpmn):
+        """Add the relays and anchors implied by the BPMN's sequence flows.
+
+        *bpmn* is the source BPMN as a string or an already parsed root.
+        Returns ``False`` if it cannot be parsed or the net has no transitions.
+        """
+        if isinstance(bpmn, str):
+            try:
+                bpmn = ET.fromstring(bpmn)
+            except ET.ParseError:
+                return False
+        added = _repair_pnml_connectivity(self.root, self.ns_prefix, bpmn, self.net())
+        if added:
+            self._net = None
+        return added is not None
+
+    def validate_connectivity(self):
+        """Raise ``PnmlStructureError`` if a transition lacks an in/out arc."""
+        _validate_pnml_connectivity(self.root, self.ns_prefix, self.net())
+
+    def to_string(self):
+        """Serialize the net, indented, without an XML declaration."""
+        ET.indent(ET.ElementTree(self.root), space="  ", level=0)
+        return ET.tostring(self.root, encoding="unicode")
+
+
+def _pnml_graph(root, ns_prefix):
+    """Intern the places, transitions and arcs below *root* into a ``Graph``.
+
+    Returns ``(graph, arcs)`` where edge ``i`` of the graph is ``arcs[i]``.
+    Every arc is kept: an endpoint that names no place or transition, or is
+    missing (interned as ``""``), becomes a node of kind 0.
+    """
+    nodes = [
+        (node.get("id"), NODE | kind)
+        for tag_name, kind in (("place", PLACE), ("transition", TRANSITION))
+        for node in root.iter(f"{ns_prefix}{tag_name}")
+        if node.get("id")
+    ]
+    arcs = list(root.iter(f"{ns_prefix}arc"))
+    graph = Graph(
+        nodes,
+        ((arc.get("source") or "", arc.get("target") or "") for arc in arcs),
+        keep_unknown=True,
+    )
+    return graph, arcs
+
+
 def repair_pnml_connectivity_from_bpmn(pnml_xml, bpmn_xml):
     """Repair PNML transition connectivity using BPMN sequence-flow intent.
 
@@ -82,47 +244,36 @@ def repair_pnml_connectivity_from_bpmn(pnml_xml, bpmn_xml):
     if not isinstance(bpmn_xml, str) or not bpmn_xml:
         return pnml_xml
 
-    try:
-        pnml_root = ET.fromstring(pnml_xml)
-    except ET.ParseError:
+    document = PnmlDocument.parse(pnml_xml)
+    if document is None:
         return pnml_xml
-
-    try:
-        bpmn_root = ET.fromstring(bpmn_xml)
-    except ET.ParseError:
+    if not document.repair_connectivity(bpmn_xml):
         return pnml_xml
+    return document.to_string()
 
-    pnml_raw_tag = pnml_root.tag
-    pnml_ns_prefix = (
-        "{" + pnml_raw_tag[1 : pnml_raw_tag.index("}")] + "}"
-        if pnml_raw_tag.startswith("{")
-        else ""
-    )
 
-    if pnml_ns_prefix:
-        ET.register_namespace("", pnml_ns_prefix[1:-1])
+def _repair_pnml_connectivity(pnml_root, pnml_ns_prefix, bpmn_root, net=None):
+    """Inject the place/arc structures BPMN flows imply; see the public wrapper.
+
+    *net* is the ``_pnml_graph`` of *pnml_root* if the caller has it. Returns
+    ``None`` without touching the tree when the net has no transitions, and
+    the number of places added otherwise.
+    """
 
     def _pnml_tag(local_name):
         return f"{pnml_ns_prefix}{local_name}"
 
-    net = pnml_root.find(f".//{_pnml_tag('net')}")
-    if net is None:
-        net = pnml_root
-
-    transition_ids = {
-        t.get("id")
-        for t in pnml_root.iter(_pnml_tag("transition"))
-        if t.get("id")
-    }
-    place_ids = {
-        p.get("id") for p in pnml_root.iter(_pnml_tag("place")) if p.get("id")
-    }
+    net_element = pnml_root.find(f".//{_pnml_tag('net')}")
+    if net_element is None:
+        net_element = pnml_root
 
-    if not transition_ids:
-        return pnml_xml
+    graph, arc_elements = net or _pnml_graph(pnml_root, pnml_ns_prefix)
+    kind, index = graph.kind, graph.index
+    transitions = graph.nodes(TRANSITION)
+    if not transitions:
+        return None
 
-    arc_elements = list(pnml_root.iter(_pnml_tag("arc")))
-    used_ids = set(transition_ids) | set(place_ids)
+    used_ids = {graph.ids[v] for v in graph.nodes(NODE)}
     used_arc_ids = {
         arc.get("id")
         for arc in arc_elements
@@ -138,85 +289,106 @@ def repair_pnml_connectivity_from_bpmn(pnml_xml, bpmn_xml):
         used_set.add(candidate)
         return candidate
 
-    outgoing_places = {}
-    incoming_places = {}
-    for arc in arc_elements:
-        source = arc.get("source")
-        target = arc.get("target")
-        if source in transition_ids and target in place_ids:
-            outgoing_places.setdefault(source, set()).add(target)
-        if source in place_ids and target in transition_ids:
-            incoming_places.setdefault(target, set()).add(source)
-
+    # Whether a transition has an arc to / from some place, and the
+    # transition pairs already joined through a place; repairs keep both
+    # up to date.
+    has_outbound = bytearray(len(graph))
+    has_inbound = bytearray(len(graph))
     relay_pairs = set()
-    for transition_id, out_places in outgoing_places.items():
-        for place_id in out_places:
-            for target_transition in (
-                t
-                for t in transition_ids
-                if place_id in incoming_places.get(t, set())
-            ):
-                relay_pairs.add((transition_id, target_transition))
+    for transition in transitions:
+        for place in graph.successors(transition):
+            if kind[place] & PLACE:
+                has_outbound[transition] = 1
+                relay_pairs.update(
+                    (transition, consumer)
+                    for consumer in graph.successors(place)
+                    if kind[consumer] & TRANSITION
+                )
+        has_inbound[transition] = any(
+            kind[place] & PLACE for place in graph.predecessors(transition)
+        )
+
+    added = []
 
     def _add_place(base_id):
         place_id = _next_unique(base_id, used_ids)
-        ET.SubElement(net, _pnml_tag("place"), id=place_id)
-        place_ids.add(place_id)
+        added.append(ET.SubElement(net_element, _pnml_tag("place"), id=place_id))
         return place_id
 
     def _add_arc(source, target):
         arc_id = _next_unique(f"{source}TO{target}", used_arc_ids)
-        ET.SubElement(net, _pnml_tag("arc"), id=arc_id, source=source, target=target)
+        ET.SubElement(
+            net_element, _pnml_tag("arc"), id=arc_id, source=source, target=target
+        )
 
-    def _ensure_relay(src_transition, tgt_transition, flow_id):
-        if (src_transition, tgt_transition) in relay_pairs:
+    def _ensure_relay(src, tgt, flow_id):
+        if (src, tgt) in relay_pairs:
             return
+        src_transition, tgt_transition = graph.ids[src], graph.ids[tgt]
         bridge_place = _add_place(
             f"REPAIR_PLACE_{src_transition}_TO_{tgt_transition}_{flow_id}"
         )
         _add_arc(src_transition, bridge_place)
         _add_arc(bridge_place, tgt_transition)
-        relay_pairs.add((src_transition, tgt_transition))
-        outgoing_places.setdefault(src_transition, set()).add(bridge_place)
-        incoming_places.setdefault(tgt_transition, set()).add(bridge_place)
+        relay_pairs.add((src, tgt))
+        has_outbound[src] = 1
+        has_inbound[tgt] = 1
 
-    def _ensure_outbound_anchor(src_transition, flow_id):
-        anchors = outgoing_places.get(src_transition, set())
-        if anchors:
+    def _ensure_outbound_anchor(src, flow_id):
+        if has_outbound[src]:
             return
+        src_transition = graph.ids[src]
         bridge_place = _add_place(f"REPAIR_OUT_{src_transition}_{flow_id}")
         _add_arc(src_transition, bridge_place)
-        outgoing_places.setdefault(src_transition, set()).add(bridge_place)
+        has_outbound[src] = 1
 
-    def _ensure_inbound_anchor(tgt_transition, flow_id):
-        anchors = incoming_places.get(tgt_transition, set())
-        if anchors:
+    def _ensure_inbound_anchor(tgt, flow_id):
+        if has_inbound[tgt]:
             return
+        tgt_transition = graph.ids[tgt]
         bridge_place = _add_place(f"REPAIR_IN_{flow_id}_TO_{tgt_transition}")
         _add_arc(bridge_place, tgt_transition)
-        incoming_places.setdefault(tgt_transition, set()).add(bridge_place)
+        has_inbound[tgt] = 1
 
-    bpmn_ns = {"bpmn": _NS["bpmn"]}
-    flows = bpmn_root.findall(".//bpmn:sequenceFlow", bpmn_ns)
-    for index, flow in enumerate(flows, start=1):
-        flow_id = flow.get("id") or f"flow{index}"
+    def _transition(node_id):
+        v = index.get(node_id)
+        return v if v is not None and kind[v] & TRANSITION else None
+
+    flows = bpmn_root.iter(f"{{{_NS['bpmn']}}}sequenceFlow")
+    for position, flow in enumerate(flows, start=1):
+        flow_id = flow.get("id") or f"flow{position}"
         source = flow.get("sourceRef")
         target = flow.get("targetRef")
         if not source or not target:
             continue
 
-        src_is_transition = source in transition_ids
-        tgt_is_transition = target in transition_ids
+        src = _transition(source)
+        tgt = _transition(target)
+
+        if src is not None and tgt is not None:
+            _ensure_relay(src, tgt, flow_id)
+        elif src is not None:
+            _ensure_outbound_anchor(src, flow_id)
+        elif tgt is not None:
+            _ensure_inbound_anchor(tgt, flow_id)
+
+    return len(added)
 
-        if src_is_transition and tgt_is_transition:
-            _ensure_relay(source, target, flow_id)
-        elif src_is_transition:
-            _ensure_outbound_anchor(source, flow_id)
-        elif tgt_is_transition:
-            _ensure_inbound_anchor(target, flow_id)
 
-    ET.indent(ET.ElementTree(pnml_root), space="  ", level=0)
-    return ET.tostring(pnml_root, encoding="unicode")
+def _detach(elements, parent_of):
+    """Remove *elements* from their parents, rebuilding each child list once.
+
+    ``parent_of`` maps element -> parent and is updated in place. Calling
+    ``parent.remove()`` per element is a linear scan of the child list, so
+    batching keeps bulk removals linear in document size.
+    """
+    doomed_by_parent = {}
+    for element in elements:
+        parent = parent_of.pop(element, None)
+        if parent is not None:
+            doomed_by_parent.setdefault(parent, set()).add(element)
+    for parent, doomed in doomed_by_parent.items():
+        parent[:] = [child for child in parent if child not in doomed]
 
 
 def sanitize_bpmn_for_transform(bpmn_xml):
@@ -240,6 +412,7 @@ def sanitize_bpmn_for_transform(bpmn_xml):
 
     seen_pairs = set()
     removed_flow_ids = set()
+    duplicate_flows = []
 
     for flow in root.findall(".//bpmn:sequenceFlow", ns):
         source = flow.get("sourceRef")
@@ -251,100 +424,131 @@ def sanitize_bpmn_for_transform(bpmn_xml):
             flow_id = flow.get("id")
             if flow_id:
                 removed_flow_ids.add(flow_id)
-            parent = parent_map.get(flow)
-            if parent is not None:
-                parent.remove(flow)
+            duplicate_flows.append(flow)
             continue
         seen_pairs.add(pair)
-
-    def _remove_di_edges_for_flow_ids(flow_ids):
-        if not flow_ids:
-            return
-        local_parent_map = {child: parent for parent in root.iter() for child in parent}
-        for edge in root.findall(".//bpmndi:BPMNEdge", ns):
-            if edge.get("bpmnElement") not in flow_ids:
-                continue
-            parent = local_parent_map.get(edge)
-            if parent is not None:
-                parent.remove(edge)
-
-    if removed_flow_ids:
-        _remove_di_edges_for_flow_ids(removed_flow_ids)
+    _detach(duplicate_flows, parent_map)
 
     # Collapse gateway passthroughs (exactly 1 inbound and 1 outbound flow).
     # These add no routing semantics and can trigger transformer-side failures.
+    removed_gateway_ids = set()
     process = root.find(".//bpmn:process", ns)
     if process is not None:
-        changed = True
-        while changed:
-            changed = False
-            children = list(process)
-            seq_flows = [el for el in children if el.tag.endswith("sequenceFlow")]
-            gateways = [
-                el
-                for el in children
-                if el.tag.endswith("exclusiveGateway") or el.tag.endswith("parallelGateway")
-            ]
-
-            flow_ids = {f.get("id") for f in seq_flows if f.get("id")}
-
-            for gateway in gateways:
-                gid = gateway.get("id")
-                if not gid:
-                    continue
-
-                inbound = [f for f in seq_flows if f.get("targetRef") == gid]
-                outbound = [f for f in seq_flows if f.get("sourceRef") == gid]
-                if len(inbound) != 1 or len(outbound) != 1:
-                    continue
-
-                in_flow = inbound[0]
-                out_flow = outbound[0]
-                src = in_flow.get("sourceRef")
-                tgt = out_flow.get("targetRef")
-                if not src or not tgt or src == tgt:
-                    continue
-
-                # Reuse the inbound flow id when possible to keep IDs stable.
-                new_flow_id = in_flow.get("id") or f"flow_{src}_to_{tgt}"
-                if new_flow_id in flow_ids and new_flow_id != in_flow.get("id"):
-                    suffix = 2
-                    base = new_flow_id
-                    while f"{base}_{suffix}" in flow_ids:
-                        suffix += 1
-                    new_flow_id = f"{base}_{suffix}"
-
-                # Remove old flows and gateway.
-                process.remove(in_flow)
-                process.remove(out_flow)
-                process.remove(gateway)
-
-                # Insert direct flow replacement.
-                ET.SubElement(
-                    process,
-                    f"{{{_NS['bpmn']}}}sequenceFlow",
-                    attrib={"id": new_flow_id, "sourceRef": src, "targetRef": tgt},
-                )
-
-                # Remove DI edges for old flows and shape for removed gateway.
-                removed = {fid for fid in (in_flow.get("id"), out_flow.get("id")) if fid}
-                _remove_di_edges_for_flow_ids(removed)
-
-                local_parent_map = {child: parent for parent in root.iter() for child in parent}
-                for shape in root.findall(".//bpmndi:BPMNShape", ns):
-                    if shape.get("bpmnElement") != gid:
-                        continue
-                    parent = local_parent_map.get(shape)
-                    if parent is not None:
-                        parent.remove(shape)
+        removed_gateway_ids = _collapse_passthrough_gateways(
+            process, parent_map, removed_flow_ids
+        )
 
-                changed = True
-                break
+    # Drop the DI of every removed flow and gateway in one sweep.
+    _detach(
+        [
+            edge
+            for edge in root.iter(f"{{{_NS['bpmndi']}}}BPMNEdge")
+            if edge.get("bpmnElement") in removed_flow_ids
+        ]
+        + [
+            shape
+            for shape in root.iter(f"{{{_NS['bpmndi']}}}BPMNShape")
+            if shape.get("bpmnElement") in removed_gateway_ids
+        ],
+        parent_map,
+    )
 
     ET.indent(ET.ElementTree(root), space="  ", level=0)
     return ET.tostring(root, encoding="utf-8", xml_declaration=True).decode("utf-8")
 
 
+def _collapse_passthrough_gateways(process, parent_map, removed_flow_ids):
+    """Replace every 1-in/1-out gateway of *process* with one direct flow.
+
+    Works on in/out adjacency indexes in a single pass over the gateways in
+    document order. Collapsing a gateway keeps the out-degree of its source and
+    the in-degree of its target unchanged, so no other gateway changes
+    eligibility, and one pass yields the same result as repeatedly collapsing
+    the first eligible gateway. A chain of passthrough gateways folds into a
+    single flow as each collapse rewires the next gateway's inbound flow.
+
+    Replacement flows reuse the inbound flow id and are appended to the process
+    in collapse order. Ids of the removed flows are added to
+    *removed_flow_ids*; the ids of removed gateways are returned.
+    """
+    flow_tag = f"{{{_NS['bpmn']}}}sequenceFlow"
+    inbound = {}
+    outbound = {}
+    flow_ids = Counter()
+    gateways = []
+    for child in process:
+        if child.tag.endswith("sequenceFlow"):
+            inbound.setdefault(child.get("targetRef"), []).append(child)
+            outbound.setdefault(child.get("sourceRef"), []).append(child)
+            if child.get("id"):
+                flow_ids[child.get("id")] += 1
+        elif child.tag.endswith("exclusiveGateway") or child.tag.endswith(
+            "parallelGateway"
+        ):
+            gateways.append(child)
+
+    removed = set()
+    added_flows = []
+    removed_gateway_ids = set()
+
+    for gateway in gateways:
+        gid = gateway.get("id")
+        if not gid:
+            continue
+
+        gateway_in = inbound.get(gid, ())
+        gateway_out = outbound.get(gid, ())
+        if len(gateway_in) != 1 or len(gateway_out) != 1:
+            continue
+
+        in_flow = gateway_in[0]
+        out_flow = gateway_out[0]
+        src = in_flow.get("sourceRef")
+        tgt = out_flow.get("targetRef")
+        if not src or not tgt or src == tgt:
+            continue
+
+        # Reuse the inbound flow id when possible to keep IDs stable.
+        new_flow_id = in_flow.get("id") or f"flow_{src}_to_{tgt}"
+        if flow_ids[new_flow_id] > 0 and new_flow_id != in_flow.get("id"):
+            suffix = 2
+            base = new_flow_id
+            while flow_ids[f"{base}_{suffix}"] > 0:
+                suffix += 1
+            new_flow_id = f"{base}_{suffix}"
+
+        # Unlink the old flows and gateway from the indexes.
+        outbound[src].remove(in_flow)
+        inbound[tgt].remove(out_flow)
+        del inbound[gid], outbound[gid]
+        for old in (in_flow, out_flow):
+            old_id = old.get("id")
+            if old_id:
+                flow_ids[old_id] -= 1
+                removed_flow_ids.add(old_id)
+        removed.update((in_flow, out_flow, gateway))
+        removed_gateway_ids.add(gid)
+
+        # Link the direct replacement flow in their place.
+        new_flow = ET.Element(
+            flow_tag, attrib={"id": new_flow_id, "sourceRef": src, "targetRef": tgt}
+        )
+        outbound[src].append(new_flow)
+        inbound[tgt].append(new_flow)
+        flow_ids[new_flow_id] += 1
+        added_flows.append(new_flow)
+
+    if removed:
+        for element in removed:
+            parent_map.pop(element, None)
+        process[:] = [child for child in process if child not in removed] + [
+            flow for flow in added_flows if flow not in removed
+        ]
+        for flow in process:
+            parent_map[flow] = process
+    return removed_gateway_ids
+
+
 def validate_pnml_connectivity(pnml_xml):
     """Validate PNML structural connectivity constraints on transitions.
 
@@ -367,38 +571,22 @@ def validate_pnml_connectivity(pnml_xml):
     if not pnml_xml or not isinstance(pnml_xml, str):
         return
 
-    try:
-        root = ET.fromstring(pnml_xml)
-    except ET.ParseError:
+    document = PnmlDocument.parse(pnml_xml)
+    if document is None:
         return  # structural parse errors are handled elsewhere
+    document.validate_connectivity()
 
-    raw_tag = root.tag
-    ns_prefix = (
-        "{" + raw_tag[1 : raw_tag.index("}")] + "}" if raw_tag.startswith("{") else ""
-    )
-
-    transition_ids = {
-        t.get("id")
-        for t in root.iter(f"{ns_prefix}transition")
-        if t.get("id")
-    }
-
-    inbound: dict = {tid: 0 for tid in transition_ids}
-    outbound: dict = {tid: 0 for tid in transition_ids}
 
-    for arc in root.iter(f"{ns_prefix}arc"):
-        source = arc.get("source")
-        target = arc.get("target")
-        if target in transition_ids:
-            inbound[target] += 1
-        if source in transition_ids:
-            outbound[source] += 1
+def _validate_pnml_connectivity(root, ns_prefix, net=None):
+    """Raise ``PnmlStructureError`` for transitions missing an in/out arc."""
+    graph, _ = net or _pnml_graph(root, ns_prefix)
 
     violations = []
-    for tid in sorted(transition_ids):
-        if inbound[tid] == 0:
+    for v in sorted(graph.nodes(TRANSITION), key=graph.ids.__getitem__):
+        tid = graph.ids[v]
+        if not graph.in_degree(v):
             violations.append(f"transition '{tid}' has no inbound arc")
-        if outbound[tid] == 0:
+        if not graph.out_degree(v):
             violations.append(f"transition '{tid}' has no outbound arc")
 
     if violations:
@@ -424,10 +612,13 @@ def _normalize_transition_label(text):
 
 
 def _rename_places_and_update_arcs(root, ns_prefix):
-    """Rename place IDs to P1..Pn and update arc source/target references."""
+    """Rename place IDs to P1..Pn and update arc source/target references.
+
+    Returns the ``{old id: new id}`` mapping.
+    """
     places = [place for place in root.iter(f"{ns_prefix}place") if place.get("id")]
     if not places:
-        return
+        return {}
 
     # Preserve XML order for stable, human-friendly numbering.
     id_map = {place.get("id"): f"P{idx}" for idx, place in enumerate(places, start=1)}
@@ -456,6 +647,7 @@ def _rename_places_and_update_arcs(root, ns_prefix):
                 suffix += 1
             arc.set("id", new_id)
             used_arc_ids.add(new_id)
+    return id_map
 
 
 def _normalize_transition_labels(root, ns_prefix):
@@ -474,7 +666,7 @@ def _normalize_transition_labels(root, ns_prefix):
             text_el.text = normalized
 
 
-def _sanitize_pnml_graph(root, ns_prefix):
+def _sanitize_pnml_graph(root, ns_prefix, net=None):
     """Enforce a bipartite PNML graph and remove orphan places/transitions.
 
     Rules applied:
@@ -482,29 +674,27 @@ def _sanitize_pnml_graph(root, ns_prefix):
     - Replace transition->transition arcs with transition->place->transition.
     - Replace place->place arcs with place->transition->place.
     - Remove orphan places/transitions (no incident arcs).
+
+    Removals go through a parent index built once up front, so the pass stays
+    linear in document size however many arcs need rewriting. *net* is the
+    ``_pnml_graph`` of *root* if the caller has it. Returns whether the net
+    changed.
     """
 
     def _tag(local_name):
         return f"{ns_prefix}{local_name}"
 
-    net = root.find(f".//{_tag('net')}")
-    if net is None:
-        net = root
-
-    def _collect_node_ids(tag_name):
-        return {
-            node.get("id")
-            for node in root.iter(_tag(tag_name))
-            if isinstance(node.get("id"), str) and node.get("id")
-        }
+    net_element = root.find(f".//{_tag('net')}")
+    if net_element is None:
+        net_element = root
 
-    place_ids = _collect_node_ids("place")
-    transition_ids = _collect_node_ids("transition")
+    graph, arcs = net or _pnml_graph(root, ns_prefix)
+    ids, kind = graph.ids, graph.kind
 
-    used_ids = set(place_ids) | set(transition_ids)
+    used_ids = {ids[v] for v in graph.nodes(NODE)}
     used_arc_ids = {
         arc.get("id")
-        for arc in root.iter(_tag("arc"))
+        for arc in arcs
         if isinstance(arc.get("id"), str) and arc.get("id")
     }
 
@@ -517,79 +707,63 @@ def _sanitize_pnml_graph(root, ns_prefix):
         used_set.add(candidate)
         return candidate
 
+    def _append(tag, **attrib):
+        return ET.SubElement(net_element, _tag(tag), **attrib)
+
     def _add_place(base_id):
         place_id = _next_unique(base_id, used_ids)
-        ET.SubElement(net, _tag("place"), id=place_id)
-        place_ids.add(place_id)
+        _append("place", id=place_id)
         return place_id
 
     def _add_transition(base_id):
         transition_id = _next_unique(base_id, used_ids)
-        transition = ET.SubElement(net, _tag("transition"), id=transition_id)
+        transition = _append("transition", id=transition_id)
         name = ET.SubElement(transition, _tag("name"))
         text = ET.SubElement(name, _tag("text"))
         text.text = "silent"
-        transition_ids.add(transition_id)
         return transition_id
 
     def _add_arc(source, target):
         arc_id = _next_unique(f"{source}TO{target}", used_arc_ids)
-        ET.SubElement(net, _tag("arc"), id=arc_id, source=source, target=target)
-
-    def _remove_element(element):
-        for parent in root.iter():
-            for child in list(parent):
-                if child is element:
-                    parent.remove(child)
-                    return
-
-    for arc in list(root.iter(_tag("arc"))):
-        source = arc.get("source")
-        target = arc.get("target")
-        if (
-            not source
-            or not target
-            or source == target
-            or source not in used_ids
-            or target not in used_ids
-        ):
-            _remove_element(arc)
+        _append("arc", id=arc_id, source=source, target=target)
+
+    # Nodes left with an incident arc; the bridges replacing an arc keep
+    # its endpoints linked, and are never orphans themselves.
+    linked = bytearray(len(graph))
+    dropped_arcs = []
+    for arc, src, tgt in zip(arcs, graph.src, graph.tgt):
+        if src == tgt or not kind[src] & NODE or not kind[tgt] & NODE:
+            dropped_arcs.append(arc)
             continue
+        linked[src] = linked[tgt] = 1
 
-        source_is_place = source in place_ids
-        target_is_place = target in place_ids
-        source_is_transition = source in transition_ids
-        target_is_transition = target in transition_ids
-
-        if source_is_transition and target_is_transition:
-            _remove_element(arc)
+        source, target = ids[src], ids[tgt]
+        if kind[src] & TRANSITION and kind[tgt] & TRANSITION:
+            dropped_arcs.append(arc)
             bridge_place = _add_place(f"BRIDGE_PLACE_{source}_TO_{target}")
             _add_arc(source, bridge_place)
             _add_arc(bridge_place, target)
-        elif source_is_place and target_is_place:
-            _remove_element(arc)
+        elif kind[src] & PLACE and kind[tgt] & PLACE:
+            dropped_arcs.append(arc)
             bridge_transition = _add_transition(f"bridgeTransition_{source}_TO_{target}")
             _add_arc(source, bridge_transition)
             _add_arc(bridge_transition, target)
 
-    incident_count = {node_id: 0 for node_id in used_ids}
-    for arc in root.iter(_tag("arc")):
-        source = arc.get("source")
-        target = arc.get("target")
-        if source in incident_count:
-            incident_count[source] += 1
-        if target in incident_count:
-            incident_count[target] += 1
-
-    for place in list(root.iter(_tag("place"))):
-        place_id = place.get("id")
-        if place_id and incident_count.get(place_id, 0) == 0:
-            _remove_element(place)
+    orphans = []
+    for tag_name in ("place", "transition"):
+        for node in root.iter(_tag(tag_name)):
+            v = graph.index.get(node.get("id"))
+            if v is not None and kind[v] & NODE and not linked[v]:
+                orphans.append(node)
+    if not dropped_arcs and not orphans:
+        return False
 
-    for transition in list(root.iter(_tag("transition"))):
-        transition_id = transition.get("id")
-        if transition_id and incident_count.get(transition_id, 0) == 0:
-            _remove_element(transition)
+    # Element -> parent, so removals never have to search the tree. Nodes may
+    # sit below <page> elements rather than directly under <net>.
+    parent_of = {child: parent for parent in root.iter() for child in parent}
+    _detach(dropped_arcs, parent_of)
+    _detach(orphans, parent_of)
+    return True
 
 
 def _layered_layout(
@@ -617,47 +791,48 @@ def _layered_layout(
     if not node_ids:
         return {}
 
-    # Build adjacency lists.
-    successors: dict[str, list[str]] = {nid: [] for nid in node_ids}
-    predecessors: dict[str, list[str]] = {nid: [] for nid in node_ids}
-    for flow in flows:
-        src, tgt = flow.get("source", ""), flow.get("target", "")
-        if src in successors and tgt in predecessors:
-            successors[src].append(tgt)
-            predecessors[tgt].append(src)
+    graph = Graph(
+        ((nid, NODE) for nid in node_ids),
+        ((flow.get("source", ""), flow.get("target", "")) for flow in flows),
+    )
+    n = len(graph)
 
     # Kahn's topological sort for a correct longest-path computation.
-    in_degree = {nid: len(predecessors[nid]) for nid in node_ids}
-    topo_queue: deque[str] = deque(nid for nid in node_ids if in_degree[nid] == 0)
-    topo_order: list[str] = []
-    in_degree_work = dict(in_degree)
+    in_start, out_start, out_nodes = graph.in_start, graph.out_start, graph.out_nodes
+    in_degree_work = [in_start[v + 1] - in_start[v] for v in range(n)]
+    topo_queue: deque[int] = deque(v for v in range(n) if in_degree_work[v] == 0)
+    topo_order: list[int] = []
     while topo_queue:
         node = topo_queue.popleft()
         topo_order.append(node)
-        for nxt in successors[node]:
+        for nxt in out_nodes[out_start[node] : out_start[node + 1]]:
             in_degree_work[nxt] -= 1
             if in_degree_work[nxt] == 0:
                 topo_queue.append(nxt)
 
     # Longest-path layer assignment for acyclic nodes.
-    node_layer: dict[str, int] = {nid: 0 for nid in node_ids}
-    topo_set = set(topo_order)
-    for nid in topo_order:
-        for nxt in successors[nid]:
-            node_layer[nxt] = max(node_layer[nxt], node_layer[nid] + 1)
+    node_layer = [0] * n
+    for node in topo_order:
+        nxt_layer = node_layer[node] + 1
+        for nxt in out_nodes[out_start[node] : out_start[node + 1]]:
+            if node_layer[nxt] < nxt_layer:
+                node_layer[nxt] = nxt_layer
 
     # Append cyclic / disconnected nodes after the main graph.
-    if len(topo_order) < len(node_ids):
-        max_layer = max(node_layer.values(), default=0) + 1
-        for nid in node_ids:
-            if nid not in topo_set:
-                node_layer[nid] = max_layer
+    if len(topo_order) < n:
+        in_topo = bytearray(n)
+        for node in topo_order:
+            in_topo[node] = 1
+        max_layer = max(node_layer, default=0) + 1
+        for v in range(n):
+            if not in_topo[v]:
+                node_layer[v] = max_layer
                 max_layer += 1
 
     # Group nodes by layer, sort within each group for stable output.
     layer_groups: dict[int, list[str]] = {}
-    for nid in node_ids:
-        layer_groups.setdefault(node_layer[nid], []).append(nid)
+    for nid, lyr in zip(node_ids, node_layer):
+        layer_groups.setdefault(lyr, []).append(nid)
     for lyr in layer_groups:
         layer_groups[lyr].sort()
 
@@ -687,7 +862,11 @@ def _layered_layout(
     return positions
 
 
-def assign_pnml_coordinates(pnml_xml):
+# Layout engines by the name a generate request selects them with.
+LAYOUTS = {"layered": _layered_layout, "sugiyama": sugiyama_layout}
+
+
+def assign_pnml_coordinates(pnml_xml, layout="layered"):
     """Parse a PNML XML string and assign proper layout coordinates to all
     places and transitions.
 
@@ -699,6 +878,7 @@ def assign_pnml_coordinates(pnml_xml):
 
     Args:
         pnml_xml: PNML XML string (with or without ``<?xml ...?>`` declaration).
+        layout: name of the layout engine in ``LAYOUTS``.
 
     Returns:
         Updated PNML XML string.
@@ -706,26 +886,20 @@ def assign_pnml_coordinates(pnml_xml):
     if not pnml_xml or not isinstance(pnml_xml, str):
         return pnml_xml
 
-    try:
-        root = ET.fromstring(pnml_xml)
-    except ET.ParseError:
+    document = PnmlDocument.parse(pnml_xml)
+    if document is None:
         logger.warning("assign_pnml_coordinates: not valid XML – layout skipped")
         return pnml_xml
+    if not document.assign_coordinates(layout):
+        return pnml_xml  # nothing to lay out
+    return document.to_string()
 
-    # Detect Clark-notation namespace prefix, e.g. '{http://www.pnml.org/...}'.
-    raw_tag = root.tag
-    ns_prefix = (
-        "{" + raw_tag[1 : raw_tag.index("}")] + "}" if raw_tag.startswith("{") else ""
-    )
-
-    # Register the namespace so ET.tostring() preserves the default namespace.
-    if ns_prefix:
-        ET.register_namespace("", ns_prefix[1:-1])
 
-    _sanitize_pnml_graph(root, ns_prefix)
-    _rename_places_and_update_arcs(root, ns_prefix)
-    _normalize_transition_labels(root, ns_prefix)
+def _layout_pnml(root, ns_prefix, layout="layered"):
+    """Write centre ``<graphics><position>`` coordinates for every node.
 
+    Returns ``False`` when the net has no places or transitions.
+    """
     # Collect all places and transitions from the entire tree (handles
     # nested <pnml><net><page>... hierarchies).
     elements_by_id: dict[str, dict] = {}
@@ -744,7 +918,7 @@ def assign_pnml_coordinates(pnml_xml):
             elem_xml_map[tid] = trans
 
     if not elements_by_id:
-        return pnml_xml  # nothing to lay out
+        return False  # nothing to lay out
 
     flows = [
         {"source": arc.get("source", ""), "target": arc.get("target", "")}
@@ -752,8 +926,15 @@ def assign_pnml_coordinates(pnml_xml):
         if arc.get("source") and arc.get("target")
     ]
 
-    positions = _layered_layout(
-        elements_by_id, flows, h_gap=80, v_gap=50, x_offset=100, y_offset=100
+    positions = cached_layout(
+        layout,
+        LAYOUTS[layout],
+        elements_by_id,
+        flows,
+        h_gap=80,
+        v_gap=50,
+        x_offset=100,
+        y_offset=100,
     )
 
     for nid, pos in positions.items():
@@ -775,8 +956,7 @@ def assign_pnml_coordinates(pnml_xml):
         position_el.set("x", str(cx))
         position_el.set("y", str(cy))
 
-    ET.indent(ET.ElementTree(root), space="  ", level=0)
-    return ET.tostring(root, encoding="unicode")
+    return True
 
 
 def _build_semantic_process(model):
@@ -788,8 +968,8 @@ def _build_semantic_process(model):
     definitions = ET.Element(
         f"{{{_NS['bpmn']}}}definitions",
         attrib={
-            f"{{{_NS['xsi']}}}schemaLocation": "http://www.omg.org/spec/BPMN/20100524/MODEL https://www.omg.org/spec/BPMN/20100501/BPMN20.xsd",
-            "targetNamespace": "http://example.bpmn.com/schema/bpmn",
+            f"{{{_NS['xsi']}}}schemaLocation": _SCHEMA_LOCATION,
+            "targetNamespace": _TARGET_NAMESPACE,
         },
     )
     process = ET.SubElement(
@@ -835,6 +1015,28 @@ def _build_semantic_process(model):
     return definitions
 
 
+def _bpmn_layout(model, layout="layered"):
+    """Size every node of *model* and return its positions from *layout*."""
+    sizes: dict[str, dict] = {}
+    for event in model["events"]:
+        sizes[event["id"]] = {"w": _BPMN_EVENT_W, "h": _BPMN_EVENT_H}
+    for task in model["tasks"]:
+        sizes[task["id"]] = {"w": _BPMN_TASK_W, "h": _BPMN_TASK_H}
+    for gateway in model["gateways"]:
+        sizes[gateway["id"]] = {"w": _BPMN_GATEWAY_W, "h": _BPMN_GATEWAY_H}
+
+    return cached_layout(
+        layout,
+        LAYOUTS[layout],
+        sizes,
+        model["flows"],
+        h_gap=80,
+        v_gap=50,
+        x_offset=50,
+        y_offset=50,
+    )
+
+
 def _add_diagram(definitions, model):
     """Add the BPMN diagram interchange (layout + shapes + edges).
 
@@ -852,17 +1054,7 @@ def _add_diagram(definitions, model):
         attrib={"id": "BPMNPlane_1", "bpmnElement": "Process_1"},
     )
 
-    sizes: dict[str, dict] = {}
-    for event in model["events"]:
-        sizes[event["id"]] = {"w": _BPMN_EVENT_W, "h": _BPMN_EVENT_H}
-    for task in model["tasks"]:
-        sizes[task["id"]] = {"w": _BPMN_TASK_W, "h": _BPMN_TASK_H}
-    for gateway in model["gateways"]:
-        sizes[gateway["id"]] = {"w": _BPMN_GATEWAY_W, "h": _BPMN_GATEWAY_H}
-
-    positions = _layered_layout(
-        sizes, model["flows"], h_gap=80, v_gap=50, x_offset=50, y_offset=50
-    )
+    positions = _bpmn_layout(model)
 
     for element in model["tasks"] + model["events"] + model["gateways"]:
         bpmn_shape = ET.SubElement(
@@ -903,16 +1095,112 @@ def _add_diagram(definitions, model):
             )
 
 
-def json_to_bpmn(model):
-    """Convert a validated logical process model into BPMN 2.0 XML.
+# ---------------------------------------------------------------------------
+# Streaming BPMN writer
+# ---------------------------------------------------------------------------
 
-    Builds the semantic process, lays it out and draws the diagram, then
-    returns the serialized XML string.
+# Attribute escaping identical to ElementTree's serializer.
+_ATTR_ESCAPES = str.maketrans(
+    {
+        "&": "&amp;",
+        "<": "&lt;",
+        ">": "&gt;",
+        '"': "&quot;",
+        "\r": "&#13;",
+        "\n": "&#10;",
+        "\t": "&#09;",
+    }
+)
+
+
+def _attr(value):
+    return value.translate(_ATTR_ESCAPES)
+
+
+def _iter_bpmn_chunks(model, positions):
+    """Yield the indented BPMN document for *model* as string chunks.
+
+    Writes straight from the model dict and the layout *positions* without
+    building an element tree. The output is byte-identical to serializing the
+    tree of ``_build_semantic_process`` + ``_add_diagram`` after ``ET.indent``
+    (see ``_json_to_bpmn_etree``): namespaces are declared on the root in
+    prefix order and only when used, empty elements close with `` />``.
     """
-    logger.info(
-        "Converting model to BPMN",
-        extra={k: len(model[k]) for k in ("events", "tasks", "gateways", "flows")},
+    nodes = model["tasks"] + model["events"] + model["gateways"]
+    flows = model["flows"]
+
+    yield "<?xml version='1.0' encoding='utf-8'?>\n"
+    yield f'<definitions xmlns="{_NS["bpmn"]}" xmlns:bpmndi="{_NS["bpmndi"]}"'
+    if nodes:
+        yield f' xmlns:dc="{_NS["dc"]}"'
+    if flows:
+        yield f' xmlns:di="{_NS["di"]}"'
+    yield (
+        f' xmlns:xsi="{_NS["xsi"]}" xsi:schemaLocation="{_SCHEMA_LOCATION}"'
+        f' targetNamespace="{_TARGET_NAMESPACE}">\n'
     )
+
+    if not (model["events"] or model["tasks"] or model["gateways"] or flows):
+        yield '  <process id="Process_1" isExecutable="false" />\n'
+    else:
+        yield '  <process id="Process_1" isExecutable="false">\n'
+        for event in model["events"]:
+            event_type = _EVENT_TYPE_MAP.get(event["type"], "intermediateCatchEvent")
+            yield (
+                f'    <{event_type} id="{_attr(event["id"])}"'
+                f' name="{_attr(event["name"])}" />\n'
+            )
+        for element in model["tasks"] + model["gateways"]:
+            element_type = element["type"][0].lower() + element["type"][1:]
+            yield (
+                f'    <{element_type} id="{_attr(element["id"])}"'
+                f' name="{_attr(element["name"])}" />\n'
+            )
+        for flow in flows:
+            yield (
+                f'    <sequenceFlow id="{_attr(flow["id"])}"'
+                f' sourceRef="{_attr(flow["source"])}"'
+                f' targetRef="{_attr(flow["target"])}" />\n'
+            )
+        yield "  </process>\n"
+
+    yield '  <bpmndi:BPMNDiagram id="BPMNDiagram_1">\n'
+    if not (nodes or flows):
+        yield '    <bpmndi:BPMNPlane id="BPMNPlane_1" bpmnElement="Process_1" />\n'
+    else:
+        yield '    <bpmndi:BPMNPlane id="BPMNPlane_1" bpmnElement="Process_1">\n'
+        for element in nodes:
+            element_id = _attr(element["id"])
+            pos = positions[element["id"]]
+            yield (
+                f'      <bpmndi:BPMNShape id="{element_id}_di"'
+                f' bpmnElement="{element_id}">\n'
+                f'        <dc:Bounds x="{pos["x"]}" y="{pos["y"]}"'
+                f' width="{pos["w"]}" height="{pos["h"]}" />\n'
+                "      </bpmndi:BPMNShape>\n"
+            )
+        for flow in flows:
+            flow_id = _attr(flow["id"])
+            src = positions[flow["source"]]
+            tgt = positions[flow["target"]]
+            # Right-centre of the source to left-centre of the target.
+            yield (
+                f'      <bpmndi:BPMNEdge id="{flow_id}_di" bpmnElement="{flow_id}">\n'
+                f'        <di:waypoint x="{src["x"] + src["w"]}"'
+                f' y="{src["y"] + src["h"] // 2}" />\n'
+                f'        <di:waypoint x="{tgt["x"]}" y="{tgt["y"] + tgt["h"] // 2}" />\n'
+                "      </bpmndi:BPMNEdge>\n"
+            )
+        yield "    </bpmndi:BPMNPlane>\n"
+    yield "  </bpmndi:BPMNDiagram>\n"
+    yield "</definitions>"
+
+
+def _json_to_bpmn_etree(model):
+    """Reference ElementTree implementation of ``json_to_bpmn``.
+
+    Kept as the specification the streaming writer is tested against.
+    """
     definitions = _build_semantic_process(model)
     _add_diagram(definitions, model)
 
@@ -921,3 +1209,16 @@ def json_to_bpmn(model):
     return ET.tostring(definitions, encoding="utf-8", xml_declaration=True).decode(
         "utf-8"
     )
+
+
+def json_to_bpmn(model, layout="layered"):
+    """Convert a validated logical process model into BPMN 2.0 XML.
+
+    Lays the model out with the *layout* engine, then streams the semantic
+    process and the diagram straight into the returned XML string.
+    """
+    logger.info(
+        "Converting model to BPMN",
+        extra={k: len(model[k]) for k in ("events", "tasks", "gateways", "flows")},
+    )
+    return "".join(_iter_bpmn_chunks(model, _bpmn_layout(model, layout)))
@@ -0,0 +1,65 @@
+"""Benchmark decoding a connector reply: stdlib ``json`` vs. ``fastjson``.
+
+A ``/generate`` reply is an envelope whose ``raw_response`` is the model as
+a JSON string, so it is parsed twice: the envelope in ``connector_client``,
+the model in ``bpmn_builder``. Times both steps for models of ``N`` tasks
+(see ``bench_json_to_bpmn.build_model``) with each backend.
+
+Usage::
+
+    python -m benchmarks.bench_decode
+    python -m benchmarks.bench_decode --sizes 50 500 --repeat 200
+"""
+
+import argparse
+import gc
+import json
+import time
+
+from app.backend import fastjson
+from benchmarks.bench_json_to_bpmn import build_model
+
+
+def _stdlib(body):
+    return json.loads(json.loads(body)["raw_response"])
+
+
+def _fast(body):
+    return fastjson.loads(fastjson.loads(body)["raw_response"])
+
+
+def _best(fn, body, repeat):
+    best = float("inf")
+    gc.collect()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(body)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes, repeat):
+    print(f"backend: {fastjson.BACKEND}")
+    print(f"{'tasks':>6} {'KiB':>8} {'json us':>10} {'fast us':>10} {'speedup':>8}")
+    for size in sizes:
+        model = build_model(size)
+        body = json.dumps({"raw_response": json.dumps(model)}).encode()
+        assert _fast(body) == _stdlib(body) == model
+        stdlib = _best(_stdlib, body, repeat)
+        fast = _best(_fast, body, repeat)
+        print(
+            f"{size:>6} {len(body) / 1024:>8.1f} {stdlib * 1e6:>10.1f} "
+            f"{fast * 1e6:>10.1f} {stdlib / fast:>7.1f}x"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200, 1000])
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args(argv)
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
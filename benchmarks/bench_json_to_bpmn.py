@@ -0,0 +1,91 @@
+"""Benchmark BPMN serialization: streaming writer vs. ElementTree reference.
+
+Builds a serial model of ``N`` tasks with an exclusive split/join every few
+tasks and times ``json_to_bpmn`` (layout + streaming writer) against
+``_json_to_bpmn_etree`` (layout + tree + ``ET.indent`` + ``ET.tostring``).
+
+Usage::
+
+    python -m benchmarks.bench_json_to_bpmn
+    python -m benchmarks.bench_json_to_bpmn --sizes 50 500 --repeat 20
+"""
+
+import argparse
+import gc
+import logging
+import time
+
+from app.backend.xml_parser import _bpmn_layout, _json_to_bpmn_etree, json_to_bpmn
+
+
+def build_model(size):
+    """Return a logical process model with *size* tasks."""
+    events = [
+        {"id": "start", "type": "Start", "name": "Start"},
+        {"id": "end", "type": "End", "name": "End"},
+    ]
+    tasks = [
+        {"id": f"t{i}", "type": "UserTask", "name": f"Task {i} & review"}
+        for i in range(size)
+    ]
+    gateways = []
+    flows = [{"id": "f_start", "source": "start", "target": "t0"}]
+    for i in range(size - 1):
+        if i % 5 == 0 and i + 2 < size:
+            split, join = f"g{i}_split", f"g{i}_join"
+            gateways += [
+                {"id": split, "type": "ExclusiveGateway", "name": "?"},
+                {"id": join, "type": "ExclusiveGateway", "name": ""},
+            ]
+            flows += [
+                {"id": f"f{i}_a", "source": f"t{i}", "target": split},
+                {"id": f"f{i}_b", "source": split, "target": f"t{i + 1}"},
+                {"id": f"f{i}_c", "source": split, "target": join},
+                {"id": f"f{i}_d", "source": f"t{i + 1}", "target": join},
+                {"id": f"f{i}_e", "source": join, "target": f"t{i + 2}"},
+            ]
+        elif i % 5 != 1:
+            flows.append({"id": f"f{i}", "source": f"t{i}", "target": f"t{i + 1}"})
+    flows.append({"id": "f_end", "source": f"t{size - 1}", "target": "end"})
+    return {"events": events, "tasks": tasks, "gateways": gateways, "flows": flows}
+
+
+def _best(fn, model, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn(model)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes, repeat):
+    print(
+        f"{'tasks':>6} {'layout ms':>10} {'etree ms':>10} {'stream ms':>10} "
+        f"{'speedup':>8}"
+    )
+    for size in sizes:
+        model = build_model(size)
+        assert json_to_bpmn(model) == _json_to_bpmn_etree(model)
+        layout = _best(_bpmn_layout, model, repeat)
+        etree = _best(_json_to_bpmn_etree, model, repeat)
+        stream = _best(json_to_bpmn, model, repeat)
+        print(
+            f"{size:>6} {layout * 1000:>10.2f} {etree * 1000:>10.2f} "
+            f"{stream * 1000:>10.2f} {etree / stream:>7.1f}x"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200, 1000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+    # json_to_bpmn logs every conversion at INFO.
+    logging.disable(logging.INFO)
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Benchmark the layout engines: ``layered`` vs. ``sugiyama``.
+
+Builds a process of review blocks — a task, an exclusive split into two
+parallel tasks, and a join that loops back to the block's task every third
+block — and times both engines of ``xml_parser.LAYOUTS`` on it. It also
+reports the diagram width and the number of crossings between the straight
+edges the BPMN writer draws (right centre of the source to left centre of the
+target).
+
+Usage::
+
+    python -m benchmarks.bench_layout
+    python -m benchmarks.bench_layout --sizes 100 2000 --repeat 20
+"""
+
+import argparse
+import gc
+import time
+
+from app.backend.xml_parser import LAYOUTS, _bpmn_layout
+
+
+def build_process(size):
+    """Return a model of about *size* nodes made of looping review blocks."""
+    events = [
+        {"id": "start", "type": "Start", "name": "Start"},
+        {"id": "end", "type": "End", "name": "End"},
+    ]
+    tasks, gateways, flows = [], [], []
+    previous = "start"
+    for i in range(max(1, (size - 2) // 5)):
+        task, split, left, right, join = (
+            f"t{i}",
+            f"s{i}",
+            f"l{i}",
+            f"r{i}",
+            f"j{i}",
+        )
+        tasks += [
+            {"id": node, "type": "UserTask", "name": node}
+            for node in (task, left, right)
+        ]
+        gateways += [
+            {"id": node, "type": "ExclusiveGateway", "name": ""}
+            for node in (split, join)
+        ]
+        edges = [(previous, task), (task, split), (split, left), (split, right)]
+        edges += [(left, join), (right, join)]
+        if i % 3 == 2:
+            edges.append((join, task))
+        flows += [
+            {"id": f"f{src}_{tgt}", "source": src, "target": tgt} for src, tgt in edges
+        ]
+        previous = join
+    flows.append({"id": "f_end", "source": previous, "target": "end"})
+    return {"events": events, "tasks": tasks, "gateways": gateways, "flows": flows}
+
+
+def crossings(model, positions):
+    """Count the pairs of drawn edges that cross."""
+    segments = []
+    for flow in model["flows"]:
+        src, tgt = positions[flow["source"]], positions[flow["target"]]
+        start = (src["x"] + src["w"], src["y"] + src["h"] / 2)
+        end = (tgt["x"], tgt["y"] + tgt["h"] / 2)
+        segments.append((start, end) if start[0] <= end[0] else (end, start))
+    segments.sort()
+
+    def _side(a, b, c):
+        return (c[1] - a[1]) * (b[0] - a[0]) - (b[1] - a[1]) * (c[0] - a[0])
+
+    count = 0
+    for i, (a, b) in enumerate(segments):
+        for c, d in segments[i + 1 :]:
+            if c[0] > b[0]:
+                break
+            if len({a, b, c, d}) < 4:
+                continue
+            straddles = _side(a, c, d) * _side(b, c, d) < 0
+            if straddles and _side(a, b, c) * _side(a, b, d) < 0:
+                count += 1
+    return count
+
+
+def _best(layout, model, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        _bpmn_layout(model, layout)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes, repeat):
+    print(f"{'nodes':>6} {'engine':>9} {'ms':>8} {'width px':>9} {'crossings':>10}")
+    for size in sizes:
+        model = build_process(size)
+        nodes = sum(len(model[group]) for group in ("events", "tasks", "gateways"))
+        for layout in LAYOUTS:
+            elapsed = _best(layout, model, repeat) * 1000
+            positions = _bpmn_layout(model, layout)
+            width = max(pos["x"] + pos["w"] for pos in positions.values())
+            print(
+                f"{nodes:>6} {layout:>9} {elapsed:>8.2f} {width:>9} "
+                f"{crossings(model, positions):>10}"
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 200, 1000, 2000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
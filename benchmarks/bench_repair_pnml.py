@@ -0,0 +1,90 @@
+"""Benchmark PNML connectivity repair against the source BPMN.
+
+Builds a BPMN model of ``N`` tasks (a serial backbone with an exclusive
+split/join every few tasks, the shape of the employee-onboarding and
+insurance-claim samples scaled up) and a PNML net for it in which one relay
+place in ten is missing, then times ``_repair_pnml_connectivity``. The
+per-transition cost should stay flat as ``N`` grows.
+
+Usage::
+
+    python -m benchmarks.bench_repair_pnml
+    python -m benchmarks.bench_repair_pnml --sizes 1000 10000 --repeat 5
+"""
+
+import argparse
+import gc
+import time
+import xml.etree.ElementTree as ET
+
+from app.backend.xml_parser import _repair_pnml_connectivity
+
+BPMN_NS = "http://www.omg.org/spec/BPMN/20100524/MODEL"
+PNML_NS = "http://www.pnml.org/version-2009/grammar/pnml"
+
+
+def build_edges(size):
+    """Return the ``(source, target)`` task edges of a model with *size* tasks."""
+    edges = []
+    for i in range(size - 1):
+        edges.append((f"t{i}", f"t{i + 1}"))
+        if i % 5 == 0 and i + 2 < size:
+            # Exclusive branch skipping the next task.
+            edges.append((f"t{i}", f"t{i + 2}"))
+    return edges
+
+
+def build_bpmn(edges):
+    ns = f"{{{BPMN_NS}}}"
+    root = ET.Element(f"{ns}definitions")
+    process = ET.SubElement(root, f"{ns}process", id="p1")
+    for i, (source, target) in enumerate(edges):
+        ET.SubElement(
+            process, f"{ns}sequenceFlow", id=f"f{i}", sourceRef=source, targetRef=target
+        )
+    return root
+
+
+def build_pnml(size, edges):
+    ns = f"{{{PNML_NS}}}"
+    root = ET.Element(f"{ns}pnml")
+    net = ET.SubElement(root, f"{ns}net", id="net")
+    for i in range(size):
+        ET.SubElement(net, f"{ns}transition", id=f"t{i}")
+    for i, (source, target) in enumerate(edges):
+        if i % 10 == 0:
+            continue  # relay dropped by the transformer
+        place = f"p{i}"
+        ET.SubElement(net, f"{ns}place", id=place)
+        ET.SubElement(net, f"{ns}arc", id=f"a{i}_in", source=source, target=place)
+        ET.SubElement(net, f"{ns}arc", id=f"a{i}_out", source=place, target=target)
+    return root
+
+
+def run(sizes, repeat):
+    print(f"{'transitions':>11} {'best ms':>10} {'us/transition':>14}")
+    for size in sizes:
+        edges = build_edges(size)
+        bpmn_root = build_bpmn(edges)
+        best = float("inf")
+        for _ in range(repeat):
+            pnml_root = build_pnml(size, edges)
+            gc.collect()
+            start = time.perf_counter()
+            _repair_pnml_connectivity(pnml_root, f"{{{PNML_NS}}}", bpmn_root)
+            best = min(best, time.perf_counter() - start)
+        print(f"{size:>11} {best * 1000:>10.1f} {best / size * 1e6:>14.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[500, 1000, 2500, 5000, 10000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
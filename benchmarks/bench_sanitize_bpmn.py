@@ -0,0 +1,82 @@
+"""Benchmark BPMN gateway passthrough collapse on long gateway chains.
+
+Builds a process of ``CHAINS`` task->task paths, each routed through
+``N / CHAINS`` passthrough gateways with DI shapes and edges, then times
+``sanitize_bpmn_for_transform`` (parse, collapse, serialize). Every gateway
+collapses, so the chains fold into one flow each. The per-gateway cost should
+stay flat as ``N`` grows.
+
+Usage::
+
+    python -m benchmarks.bench_sanitize_bpmn
+    python -m benchmarks.bench_sanitize_bpmn --sizes 1000 10000 --chains 10
+"""
+
+import argparse
+import gc
+import time
+
+from app.backend.xml_parser import sanitize_bpmn_for_transform
+
+
+def build_model(gateways, chains):
+    """Return BPMN XML with *chains* paths sharing *gateways* passthroughs."""
+    semantic = []
+    shapes = []
+    edges = []
+    per_chain = max(gateways // chains, 1)
+    for c in range(chains):
+        nodes = [f"c{c}_start"] + [f"c{c}_g{i}" for i in range(per_chain)]
+        nodes.append(f"c{c}_end")
+        semantic.append(f"<task id='c{c}_start'/><task id='c{c}_end'/>")
+        for i in range(per_chain):
+            tag = "exclusiveGateway" if i % 2 else "parallelGateway"
+            semantic.append(f"<{tag} id='c{c}_g{i}'/>")
+            shapes.append(
+                f"<bpmndi:BPMNShape id='c{c}_g{i}_di' bpmnElement='c{c}_g{i}'/>"
+            )
+        for i, (source, target) in enumerate(zip(nodes, nodes[1:])):
+            flow_id = f"c{c}_f{i}"
+            semantic.append(
+                f"<sequenceFlow id='{flow_id}' sourceRef='{source}' "
+                f"targetRef='{target}'/>"
+            )
+            edges.append(
+                f"<bpmndi:BPMNEdge id='{flow_id}_di' bpmnElement='{flow_id}'/>"
+            )
+    return (
+        "<definitions xmlns='http://www.omg.org/spec/BPMN/20100524/MODEL' "
+        "xmlns:bpmndi='http://www.omg.org/spec/BPMN/20100524/DI'>"
+        f"<process id='p1'>{''.join(semantic)}</process>"
+        "<bpmndi:BPMNDiagram id='d1'><bpmndi:BPMNPlane id='pl1' bpmnElement='p1'>"
+        f"{''.join(shapes)}{''.join(edges)}"
+        "</bpmndi:BPMNPlane></bpmndi:BPMNDiagram></definitions>"
+    )
+
+
+def run(sizes, chains, repeat):
+    print(f"{'gateways':>8} {'best ms':>10} {'us/gateway':>11}")
+    for size in sizes:
+        model = build_model(size, chains)
+        best = float("inf")
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            sanitize_bpmn_for_transform(model)
+            best = min(best, time.perf_counter() - start)
+        print(f"{size:>8} {best * 1000:>10.1f} {best / size * 1e6:>11.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[500, 1000, 2500, 5000, 10000]
+    )
+    parser.add_argument("--chains", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    run(args.sizes, args.chains, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark the PNML graph sanitizer on synthetic transformer output.
+
+Builds nets with ``N`` transitions where every other arc violates the
+bipartite rule (transition->transition or place->place) and a share of the
+nodes are orphans, then times ``_sanitize_pnml_graph``. The per-node cost
+should stay flat as ``N`` grows; a rising column means a quadratic pass crept
+back in.
+
+Usage::
+
+    python -m benchmarks.bench_sanitize_pnml
+    python -m benchmarks.bench_sanitize_pnml --sizes 1000 10000 50000 --repeat 5
+"""
+
+import argparse
+import gc
+import time
+import xml.etree.ElementTree as ET
+
+from app.backend.xml_parser import _sanitize_pnml_graph
+
+PNML_NS = "http://www.pnml.org/version-2009/grammar/pnml"
+
+
+def build_net(size):
+    """Return a PNML root with *size* transitions and as many places."""
+    ns = f"{{{PNML_NS}}}"
+    root = ET.Element(f"{ns}pnml")
+    net = ET.SubElement(root, f"{ns}net", id="net")
+    for i in range(size):
+        ET.SubElement(net, f"{ns}transition", id=f"t{i}")
+        ET.SubElement(net, f"{ns}place", id=f"p{i}")
+    for i in range(size - 1):
+        if i % 4 == 0:
+            # transition -> transition: replaced by a bridge place
+            source, target = f"t{i}", f"t{i + 1}"
+        elif i % 4 == 1:
+            # place -> place: replaced by a bridge transition
+            source, target = f"p{i}", f"p{i + 1}"
+        elif i % 4 == 2:
+            # dangling endpoint: dropped
+            source, target = f"t{i}", f"missing{i}"
+        else:
+            source, target = f"t{i}", f"p{i}"
+        ET.SubElement(net, f"{ns}arc", id=f"a{i}", source=source, target=target)
+    return root
+
+
+def run(sizes, repeat):
+    print(f"{'nodes':>8} {'best ms':>10} {'us/node':>10}")
+    for size in sizes:
+        best = float("inf")
+        for _ in range(repeat):
+            root = build_net(size)
+            gc.collect()
+            start = time.perf_counter()
+            _sanitize_pnml_graph(root, f"{{{PNML_NS}}}")
+            best = min(best, time.perf_counter() - start)
+        nodes = 2 * size
+        print(f"{nodes:>8} {best * 1000:>10.1f} {best / nodes * 1e6:>10.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 2500, 5000, 10000, 20000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
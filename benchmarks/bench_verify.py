@@ -0,0 +1,88 @@
+"""Benchmark model validation: full single-pass check vs. endpoints only.
+
+Times ``bpmn_builder._verify``, which checks the whole model's shape, ids
+and references, against the check it replaced, which only resolved flow
+endpoints, and against ``json_to_bpmn`` for scale. Then times rejecting a
+model whose last task has an empty type: the old path only failed inside
+the writer, after the layout; the new one fails before building anything.
+
+Usage::
+
+    python -m benchmarks.bench_verify
+    python -m benchmarks.bench_verify --sizes 50 500 --repeat 50
+"""
+
+import argparse
+import gc
+import logging
+import time
+
+from app.backend.bpmn_builder import _NODE_GROUPS, InvalidModelError, _verify
+from app.backend.xml_parser import json_to_bpmn
+from benchmarks.bench_json_to_bpmn import build_model
+
+
+def _verify_endpoints(model):
+    """The previous ``_verify``: every flow end must be a node id."""
+    node_ids = {el["id"] for group in _NODE_GROUPS for el in model[group]}
+    for flow in model["flows"]:
+        for end in ("source", "target"):
+            if flow[end] not in node_ids:
+                raise InvalidModelError(f"Unknown node '{flow[end]}'.")
+
+
+def _old_path(model):
+    _verify_endpoints(model)
+    return json_to_bpmn(model)
+
+
+def _new_path(model):
+    _verify(model)
+    return json_to_bpmn(model)
+
+
+def _best(fn, model, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        try:
+            fn(model)
+        except (InvalidModelError, IndexError):
+            pass
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes, repeat):
+    print(
+        f"{'tasks':>6} {'old us':>9} {'new us':>9} {'build us':>10} "
+        f"{'reject old us':>14} {'reject new us':>14}"
+    )
+    for size in sizes:
+        model = build_model(size)
+        broken = build_model(size)
+        broken["tasks"][-1]["type"] = ""
+        old = _best(_verify_endpoints, model, repeat)
+        new = _best(_verify, model, repeat)
+        build = _best(json_to_bpmn, model, repeat)
+        reject_old = _best(_old_path, broken, repeat)
+        reject_new = _best(_new_path, broken, repeat)
+        print(
+            f"{size:>6} {old * 1e6:>9.1f} {new * 1e6:>9.1f} {build * 1e6:>10.1f} "
+            f"{reject_old * 1e6:>14.1f} {reject_new * 1e6:>14.1f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+    # json_to_bpmn logs every conversion at INFO.
+    logging.disable(logging.INFO)
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
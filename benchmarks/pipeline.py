@@ -0,0 +1,251 @@
+"""End-to-end benchmark of the generate pipeline against local stand-ins.
+
+Serves the application on a local threaded server, points it at the connector
+and transformer stand-ins from ``tests/stubs.py`` and drives
+``/v2/generate/bpmn`` and ``/v2/generate/pnml`` with the sample texts in
+``tests/process_texts`` from a pool of client threads. With zero stand-in
+latency, what is measured is this service's own overhead. Per-stage timings
+come from the ``Server-Timing`` header of each response.
+
+Run it through the Flask CLI (``flask bench --help``); the functions here can
+also be called directly.
+"""
+
+import json
+import math
+import platform
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+
+import requests
+
+from tests.stubs import create_connector_app, create_transformer_app, serve
+
+PROCESS_TEXT_DIR = Path(__file__).resolve().parent.parent / "tests" / "process_texts"
+TARGETS = ("bpmn", "pnml")
+
+
+def load_texts():
+    """Return the sample process descriptions, ordered by file name."""
+    return [
+        path.read_text(encoding="utf-8").strip()
+        for path in sorted(PROCESS_TEXT_DIR.glob("*.txt"))
+    ]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list (``None`` when empty)."""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(samples_ms):
+    """Summarize millisecond samples into count/mean/p50/p95/p99/max."""
+    ordered = sorted(samples_ms)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered), 3),
+        "p50": round(percentile(ordered, 50), 3),
+        "p95": round(percentile(ordered, 95), 3),
+        "p99": round(percentile(ordered, 99), 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def parse_server_timing(header):
+    """Parse a ``Server-Timing`` header into ``{name: milliseconds}``."""
+    stages = {}
+    for entry in (header or "").split(","):
+        name, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if name and key == "dur":
+                stages[name] = float(value)
+    return stages
+
+
+def _drive(base_url, target, texts, total, concurrency, authorization):
+    """Send *total* requests for *target*.
+
+    Returns the latencies (ms) of successful requests, the per-stage samples
+    (ms) reported in their ``Server-Timing`` headers, the error counts and the
+    wall-clock duration.
+    """
+    url = f"{base_url}/v2/generate/{target}"
+    local = threading.local()
+    latencies = []
+    stages = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+
+    def _one(index):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        body = {
+            "text": texts[index % len(texts)],
+            "provider": "openai",
+            "model": "gpt-4o",
+        }
+        start = time.perf_counter()
+        try:
+            response = session.post(
+                url, json=body, headers={"Authorization": authorization}, timeout=120
+            )
+            outcome = response.status_code
+        except requests.exceptions.RequestException as exc:
+            response = None
+            outcome = type(exc).__name__
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            if outcome != 200:
+                errors[str(outcome)] += 1
+                return
+            latencies.append(elapsed)
+            timing = parse_server_timing(response.headers.get("Server-Timing"))
+            for name, duration in timing.items():
+                stages[name].append(duration)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(_one, range(total)))
+    wall = time.perf_counter() - started
+    return latencies, dict(stages), dict(errors), wall
+
+
+def run_benchmark(
+    app,
+    targets=TARGETS,
+    requests_per_target=200,
+    concurrency=4,
+    tasks=1,
+    warmup=10,
+    connector_latency=0.0,
+    transformer_latency=0.0,
+    drop_every=0,
+    use_cache=False,
+):
+    """Benchmark *targets* on *app* and return the results as a dict.
+
+    *app*'s upstream URLs and caching are overridden for the duration of the
+    run and restored afterwards.
+    """
+    texts = load_texts()
+    overrides = {
+        "CONNECTOR_INTERNAL_ASYNC_ENABLED": False,
+        # Stage timings are read from the responses' Server-Timing headers.
+        "SERVER_TIMING_ENABLED": True,
+        "GENERATE_CACHE_ENABLED": use_cache,
+    }
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests_per_target": requests_per_target,
+            "concurrency": concurrency,
+            "tasks": tasks,
+            "warmup": warmup,
+            "connector_latency_ms": connector_latency * 1000,
+            "transformer_latency_ms": transformer_latency * 1000,
+            "drop_every": drop_every,
+            "cache": use_cache,
+        },
+        "targets": {},
+    }
+
+    with ExitStack() as stack:
+        connector_url = stack.enter_context(
+            serve(create_connector_app(tasks=tasks, latency=connector_latency))
+        )
+        transformer_url = stack.enter_context(
+            serve(
+                create_transformer_app(
+                    latency=transformer_latency, drop_every=drop_every
+                )
+            )
+        )
+        overrides["T2P_LLM_API_CONNECTOR_URL"] = connector_url
+        overrides["T2P_TRANSFORMER_BASE_URL"] = transformer_url
+        saved = {key: app.config.get(key) for key in overrides}
+        app.config.update(overrides)
+        stack.callback(app.config.update, saved)
+        base_url = stack.enter_context(serve(app))
+
+        for target in targets:
+            _drive(base_url, target, texts, warmup, concurrency, "Bearer bench")
+            latencies, stages, errors, wall = _drive(
+                base_url,
+                target,
+                texts,
+                requests_per_target,
+                concurrency,
+                "Bearer bench",
+            )
+            results["targets"][target] = {
+                "latency_ms": summarize(latencies),
+                "throughput_rps": round(len(latencies) / wall, 2) if wall else None,
+                "errors": errors,
+                "stages_ms": {
+                    name: summarize(samples) for name, samples in stages.items()
+                },
+            }
+    return results
+
+
+def save_results(results, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return path
+
+
+def _change(current, baseline):
+    if current is None or not baseline:
+        return ""
+    return f" ({(current - baseline) / baseline * 100:+.1f}%)"
+
+
+def format_report(results, baseline=None):
+    """Render *results* as a text table, with % change against *baseline*."""
+    lines = []
+    meta = results["meta"]
+    lines.append(
+        f"requests/target={meta['requests_per_target']} "
+        f"concurrency={meta['concurrency']} tasks={meta['tasks']} "
+        f"cache={meta['cache']}"
+    )
+    for target, data in results["targets"].items():
+        base = (baseline or {}).get("targets", {}).get(target, {})
+        latency = data["latency_ms"]
+        base_latency = base.get("latency_ms", {})
+        lines.append("")
+        lines.append(
+            f"/v2/generate/{target}: {latency.get('count', 0)} ok, "
+            f"errors={data['errors'] or 0}, "
+            f"{data['throughput_rps']} req/s"
+            f"{_change(data['throughput_rps'], base.get('throughput_rps'))}"
+        )
+        for key in ("p50", "p95", "p99"):
+            if key in latency:
+                lines.append(
+                    f"  {key:<4} {latency[key]:>9.2f} ms"
+                    f"{_change(latency[key], base_latency.get(key))}"
+                )
+        if data["stages_ms"]:
+            lines.append(f"  {'stage':<16} {'calls':>6} {'mean ms':>9} {'p95 ms':>9}")
+            for stage, stats in data["stages_ms"].items():
+                lines.append(
+                    f"  {stage:<16} {stats['count']:>6} {stats['mean']:>9.3f} "
+                    f"{stats['p95']:>9.3f}"
+                )
+    return "\n".join(lines)
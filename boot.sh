@@ -7,6 +7,18 @@ export REDIS_URL="${REDIS_URL:-redis://${REDIS_HOST}:${REDIS_PORT}/0}"
 GUNICORN_WORKERS="${GUNICORN_WORKERS:-2}"
 GUNICORN_THREADS="${GUNICORN_THREADS:-4}"
 GUNICORN_TIMEOUT="${GUNICORN_TIMEOUT:-120}"
+# wsgi: threaded Flask workers; asgi: asyncio workers serving the v2 generate
+# and models endpoints as coroutines (see app/asgi.py).
+SERVER_MODE="${SERVER_MODE:-wsgi}"
+
+case "$SERVER_MODE" in
+	wsgi) set -- --threads "$GUNICORN_THREADS" flasky:app ;;
+	asgi) set -- --worker-class uvicorn_worker.UvicornWorker flasky:asgi_app ;;
+	*)
+		echo "Unknown SERVER_MODE '$SERVER_MODE' (expected wsgi or asgi)" >&2
+		exit 1
+		;;
+esac
 
 redis-server /home/flasky/redis.conf &
 REDIS_PID=$!
@@ -36,11 +48,10 @@ done
 gunicorn \
 	-b :5000 \
 	--workers "$GUNICORN_WORKERS" \
-	--threads "$GUNICORN_THREADS" \
 	--timeout "$GUNICORN_TIMEOUT" \
 	--access-logfile - \
 	--error-logfile - \
-	flasky:app &
+	"$@" &
 GUNICORN_PID=$!
 
 wait "$GUNICORN_PID"
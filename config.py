@@ -31,6 +31,65 @@ class Config:
     CONNECTOR_ASYNC_MAX_WAIT_SECONDS = float(
         os.environ.get("CONNECTOR_ASYNC_MAX_WAIT_SECONDS") or 120
     )
+    # "fixed", "adaptive" or "long_poll" (see ConnectorClient)
+    CONNECTOR_ASYNC_WAIT_MODE = (
+        os.environ.get("CONNECTOR_ASYNC_WAIT_MODE") or "adaptive"
+    ).lower()
+    CONNECTOR_ASYNC_INITIAL_POLL_SECONDS = float(
+        os.environ.get("CONNECTOR_ASYNC_INITIAL_POLL_SECONDS") or 0.1
+    )
+    CONNECTOR_ASYNC_LONG_POLL_SECONDS = float(
+        os.environ.get("CONNECTOR_ASYNC_LONG_POLL_SECONDS") or 25
+    )
+    # Hedging of idempotent connector requests (GET /models, job status polls)
+    CONNECTOR_HEDGING_ENABLED = (
+        os.environ.get("CONNECTOR_HEDGING_ENABLED", "false").lower()
+        in {"1", "true", "yes", "on"}
+    )
+    CONNECTOR_HEDGE_MIN_DELAY_SECONDS = float(
+        os.environ.get("CONNECTOR_HEDGE_MIN_DELAY_SECONDS") or 0.05
+    )
+    CONNECTOR_HEDGE_DEFAULT_DELAY_SECONDS = float(
+        os.environ.get("CONNECTOR_HEDGE_DEFAULT_DELAY_SECONDS") or 1.0
+    )
+    TRANSFORMER_TIMEOUT_SECONDS = float(
+        os.environ.get("TRANSFORMER_TIMEOUT_SECONDS") or 60
+    )
+    # End-to-end budget of one generate pipeline run; 0 disables the deadline.
+    REQUEST_DEADLINE_SECONDS = float(
+        os.environ.get("REQUEST_DEADLINE_SECONDS") or 150
+    )
+
+    # Background generation jobs (POST /v2/jobs/generate)
+    JOBS_MAX_WORKERS = int(os.environ.get("JOBS_MAX_WORKERS") or 4)
+    JOBS_MAX_PENDING = int(os.environ.get("JOBS_MAX_PENDING") or 32)
+    JOBS_TTL_SECONDS = int(os.environ.get("JOBS_TTL_SECONDS") or 3600)
+
+    # Progress streams of /v2/generate/* run at once per worker (sync serving)
+    STREAM_MAX_CONCURRENCY = int(os.environ.get("STREAM_MAX_CONCURRENCY") or 4)
+
+    # POST /v2/generate/batch: items per request and items generated at once
+    BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS") or 500)
+    BATCH_MAX_CONCURRENCY = int(os.environ.get("BATCH_MAX_CONCURRENCY") or 8)
+
+    # Pooled keep-alive HTTP session shared by the connector and transformer
+    # clients (see app/backend/http_session.py)
+    HTTP_POOL_CONNECTIONS = int(os.environ.get("HTTP_POOL_CONNECTIONS") or 4)
+    HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE") or 16)
+    HTTP_RETRIES = int(os.environ.get("HTTP_RETRIES") or 2)
+    HTTP_RETRY_BACKOFF_SECONDS = float(
+        os.environ.get("HTTP_RETRY_BACKOFF_SECONDS") or 0.2
+    )
+    # Connection limit of the asyncio serving mode's client (see app/asgi.py)
+    ASYNC_HTTP_MAX_CONNECTIONS = int(
+        os.environ.get("ASYNC_HTTP_MAX_CONNECTIONS") or 256
+    )
+
+    # Per-stage timing of generate responses in a Server-Timing header
+    SERVER_TIMING_ENABLED = (
+        os.environ.get("SERVER_TIMING_ENABLED", "true").lower()
+        in {"1", "true", "yes", "on"}
+    )
 
     # Server configuration
     T2P_FLASK_PORT = int(os.environ.get("FLASK_PORT") or 5000)
@@ -43,6 +102,106 @@ class Config:
     REDIS_URL = os.environ.get("REDIS_URL") or (
         f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
     )
+    REDIS_ENABLED = os.environ.get("REDIS_ENABLED", "true").lower() in {
+        "1", "true", "yes", "on"
+    }
+    REDIS_SOCKET_TIMEOUT_SECONDS = float(
+        os.environ.get("REDIS_SOCKET_TIMEOUT_SECONDS") or 0.5
+    )
+
+    # Result cache for generated BPMN (see app/backend/cache.py)
+    GENERATE_CACHE_ENABLED = (
+        os.environ.get("GENERATE_CACHE_ENABLED", "true").lower()
+        in {"1", "true", "yes", "on"}
+    )
+    GENERATE_CACHE_TTL_SECONDS = int(
+        os.environ.get("GENERATE_CACHE_TTL_SECONDS") or 86400
+    )
+    GENERATE_CACHE_MAX_ENTRIES = int(
+        os.environ.get("GENERATE_CACHE_MAX_ENTRIES") or 10000
+    )
+
+    # Cache of transformer output for /v2/generate/pnml (see app/backend/cache.py)
+    TRANSFORM_CACHE_ENABLED = (
+        os.environ.get("TRANSFORM_CACHE_ENABLED", "true").lower()
+        in {"1", "true", "yes", "on"}
+    )
+    TRANSFORM_CACHE_TTL_SECONDS = int(
+        os.environ.get("TRANSFORM_CACHE_TTL_SECONDS") or 86400
+    )
+    TRANSFORM_CACHE_MAX_ENTRIES = int(
+        os.environ.get("TRANSFORM_CACHE_MAX_ENTRIES") or 10000
+    )
+
+    # Cache of diagram layouts keyed on the graph's topology (see
+    # app/backend/layout_cache.py); a limit of 0 disables it.
+    LAYOUT_CACHE_MAX_ENTRIES = int(os.environ.get("LAYOUT_CACHE_MAX_ENTRIES") or 1024)
+    LAYOUT_CACHE_REDIS_ENABLED = (
+        os.environ.get("LAYOUT_CACHE_REDIS_ENABLED", "true").lower()
+        in {"1", "true", "yes", "on"}
+    )
+    LAYOUT_CACHE_TTL_SECONDS = int(os.environ.get("LAYOUT_CACHE_TTL_SECONDS") or 86400)
+    LAYOUT_CACHE_REDIS_MAX_ENTRIES = int(
+        os.environ.get("LAYOUT_CACHE_REDIS_MAX_ENTRIES") or 10000
+    )
+
+    # Cache of the connector's model registry for GET /v2/models (see
+    # app/backend/models_cache.py); a TTL of 0 disables it.
+    MODELS_CACHE_TTL_SECONDS = float(
+        os.environ.get("MODELS_CACHE_TTL_SECONDS") or 300
+    )
+    MODELS_CACHE_STALE_SECONDS = float(
+        os.environ.get("MODELS_CACHE_STALE_SECONDS") or 86400
+    )
+
+    # Coalescing of identical concurrent generate calls (see
+    # app/backend/singleflight.py); also bounds how long followers wait.
+    SINGLE_FLIGHT_ENABLED = (
+        os.environ.get("SINGLE_FLIGHT_ENABLED", "true").lower()
+        in {"1", "true", "yes", "on"}
+    )
+    SINGLE_FLIGHT_TIMEOUT_SECONDS = float(
+        os.environ.get("SINGLE_FLIGHT_TIMEOUT_SECONDS") or 180
+    )
+
+    # Admission control of connector calls per provider/model (see
+    # app/backend/admission.py). ADMISSION_LIMITS overrides the default limit,
+    # e.g. "openai/gpt-4o=2,anthropic=8".
+    ADMISSION_ENABLED = (
+        os.environ.get("ADMISSION_ENABLED", "true").lower()
+        in {"1", "true", "yes", "on"}
+    )
+    ADMISSION_MAX_CONCURRENCY = int(os.environ.get("ADMISSION_MAX_CONCURRENCY") or 4)
+    ADMISSION_LIMITS = os.environ.get("ADMISSION_LIMITS") or ""
+    ADMISSION_MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE") or 4)
+    ADMISSION_QUEUE_TIMEOUT_SECONDS = float(
+        os.environ.get("ADMISSION_QUEUE_TIMEOUT_SECONDS") or 10
+    )
+    ADMISSION_LEASE_SECONDS = float(os.environ.get("ADMISSION_LEASE_SECONDS") or 300)
+
+    # Circuit breakers around the connector and transformer (see
+    # app/backend/circuit_breaker.py). A call slower than its *_SLOW_CALL_SECONDS
+    # counts as failed.
+    CIRCUIT_BREAKER_ENABLED = (
+        os.environ.get("CIRCUIT_BREAKER_ENABLED", "true").lower()
+        in {"1", "true", "yes", "on"}
+    )
+    CIRCUIT_BREAKER_WINDOW_SECONDS = float(
+        os.environ.get("CIRCUIT_BREAKER_WINDOW_SECONDS") or 60
+    )
+    CIRCUIT_BREAKER_MIN_CALLS = int(os.environ.get("CIRCUIT_BREAKER_MIN_CALLS") or 5)
+    CIRCUIT_BREAKER_FAILURE_RATE = float(
+        os.environ.get("CIRCUIT_BREAKER_FAILURE_RATE") or 0.5
+    )
+    CIRCUIT_BREAKER_OPEN_SECONDS = float(
+        os.environ.get("CIRCUIT_BREAKER_OPEN_SECONDS") or 30
+    )
+    CONNECTOR_SLOW_CALL_SECONDS = float(
+        os.environ.get("CONNECTOR_SLOW_CALL_SECONDS") or 150
+    )
+    TRANSFORMER_SLOW_CALL_SECONDS = float(
+        os.environ.get("TRANSFORMER_SLOW_CALL_SECONDS") or 20
+    )
 
     # Security
     SSL_REDIRECT = False
@@ -66,6 +225,14 @@ class TestingConfig(Config):
     WTF_CSRF_ENABLED = False
     CONNECTOR_INTERNAL_ASYNC_ENABLED = False
     CONNECTOR_INTERNAL_ASYNC_FALLBACK_TO_SYNC = True
+    REDIS_ENABLED = False
+    GENERATE_CACHE_ENABLED = False
+    TRANSFORM_CACHE_ENABLED = False
+    LAYOUT_CACHE_MAX_ENTRIES = 0
+    SINGLE_FLIGHT_ENABLED = False
+    MODELS_CACHE_TTL_SECONDS = 0
+    ADMISSION_ENABLED = False
+    CIRCUIT_BREAKER_ENABLED = False
 
 
 class ProductionConfig(Config):
@@ -1,4 +1,5 @@
 from app import create_app, REQUEST_COUNT, REQUEST_LATENCY, API_CALL_DURATION
+from app.asgi import create_asgi_app
 import click
 import pytest
 import logging
@@ -9,6 +10,8 @@ logger = logging.getLogger(__name__)
 # registering the same metric names multiple times (which causes CollectorRegistry errors).
 app = create_app()
 logger.debug("Flask app created in flasky.py", extra={"app_name": app.name})
+# Entry point of the asyncio serving mode (SERVER_MODE=asgi in boot.sh).
+asgi_app = create_asgi_app(app)
 
 
 @app.cli.command("test")
@@ -22,3 +25,80 @@ def test_command(cov):
     result = pytest.main(args)
     logger.info("Test suite finished", extra={"exit_code": result})
     raise SystemExit(result)
+
+
+@app.cli.command("bench")
+@click.option(
+    "--target",
+    "targets",
+    type=click.Choice(["bpmn", "pnml"]),
+    multiple=True,
+    help="Zu messende Endpunkte (Standard: beide).",
+)
+@click.option(
+    "--requests",
+    "requests_per_target",
+    default=200,
+    show_default=True,
+    help="Anfragen pro Endpunkt.",
+)
+@click.option(
+    "--concurrency", default=4, show_default=True, help="Parallele Client-Threads."
+)
+@click.option(
+    "--tasks",
+    default=1,
+    show_default=True,
+    help="Anzahl Tasks im Modell des Connector-Stubs.",
+)
+@click.option(
+    "--warmup",
+    default=10,
+    show_default=True,
+    help="Nicht gemessene Aufwärm-Anfragen pro Endpunkt.",
+)
+@click.option(
+    "--connector-latency",
+    default=0.0,
+    show_default=True,
+    help="Simulierte LLM-Latenz in Sekunden.",
+)
+@click.option(
+    "--transformer-latency",
+    default=0.0,
+    show_default=True,
+    help="Simulierte Transformer-Latenz in Sekunden.",
+)
+@click.option(
+    "--drop-every",
+    default=0,
+    show_default=True,
+    help="Jede n-te Stelle im Transformer-PNML weglassen (Reparatur messen).",
+)
+@click.option("--cache", is_flag=True, help="Ergebnis-Cache aktiviert lassen.")
+@click.option(
+    "--output", type=click.Path(dir_okay=False), help="Ergebnisse als JSON speichern."
+)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Früheres JSON-Ergebnis zum Vergleich.",
+)
+def bench_command(targets, baseline, output, cache, **options):
+    """Miss die Pipeline-Latenz gegen lokale Connector-/Transformer-Stubs."""
+    import json
+
+    from benchmarks.pipeline import TARGETS, format_report, run_benchmark, save_results
+
+    # Request logging would dominate the service overhead being measured.
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    results = run_benchmark(app, targets=targets or TARGETS, use_cache=cache, **options)
+    previous = None
+    if baseline:
+        with open(baseline, encoding="utf-8") as fh:
+            previous = json.load(fh)
+    click.echo(format_report(results, previous))
+    if output:
+        click.echo(f"\nResults saved to {save_results(results, output)}")
@@ -2,53 +2,19 @@
 Shared pytest fixtures and configuration
 """
 
-import json
 import os
-import socket
 import sys
-import threading
 from pathlib import Path
 from unittest.mock import Mock
 
 import pytest
-from flask import Flask, jsonify, request
-from werkzeug.serving import make_server
 
 # Add the project root to the path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-_PROCESS_TEXT_DIR = Path(__file__).resolve().parent / "process_texts"
-
-
-def _build_mock_raw_response(user_text):
-    normalized_text = user_text.lower()
-    if "atm" in normalized_text:
-        task_name = "ATM Withdrawal"
-    elif "bicycle" in normalized_text or "bike" in normalized_text:
-        task_name = "Bicycle Repair"
-    else:
-        task_name = "Ice Cream Service"
-
-    return json.dumps(
-        {
-            "events": [
-                {"id": "start", "type": "startEvent", "name": "Start"},
-                {"id": "end", "type": "endEvent", "name": "End"},
-            ],
-            "tasks": [{"id": "task1", "name": task_name, "type": "UserTask"}],
-            "gateways": [],
-            "flows": [
-                {"id": "flow1", "type": "SequenceFlow", "source": "start", "target": "task1"},
-                {"id": "flow2", "type": "SequenceFlow", "source": "task1", "target": "end"},
-            ],
-        }
-    )
+from tests.stubs import create_connector_app, serve  # noqa: E402
 
-
-def _reserve_local_port(host):
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-        sock.bind((host, 0))
-        return sock.getsockname()[1]
+_PROCESS_TEXT_DIR = Path(__file__).resolve().parent / "process_texts"
 
 
 @pytest.fixture(scope="session")
@@ -189,56 +155,10 @@ def process_texts():
 def mock_connector_server():
     """Run a local Flask connector stub on an ephemeral port."""
     host = os.environ.get("T2P_TEST_CONNECTOR_HOST", "127.0.0.1")
-    port = _reserve_local_port(host)
     received_requests = {"generate": [], "models": 0}
 
-    connector_app = Flask("mock_connector")
-
-    @connector_app.post("/generate")
-    def generate():
-        payload = request.get_json(silent=True) or {}
-        received_requests["generate"].append(payload)
-
-        if payload.get("provider") is None or payload.get("model") is None:
-            return (
-                jsonify(
-                    {
-                        "error": {
-                            "code": "invalid_request",
-                            "message": "Missing provider or model.",
-                        }
-                    }
-                ),
-                400,
-            )
-
-        user_text = payload.get("user_text", "")
-        return jsonify({"raw_response": _build_mock_raw_response(user_text)}), 200
-
-    @connector_app.get("/models")
-    def models():
-        received_requests["models"] += 1
-        return (
-            jsonify(
-                {
-                    "models": [
-                        {"provider": "openai", "model": "gpt-4o"},
-                        {"provider": "anthropic", "model": "claude-3.5-sonnet"},
-                    ]
-                }
-            ),
-            200,
-        )
-
-    server = make_server(host, port, connector_app)
-    thread = threading.Thread(target=server.serve_forever, daemon=True)
-    thread.start()
-
-    yield {
-        "base_url": f"http://{host}:{port}",
-        "received_requests": received_requests,
-    }
-
-    server.shutdown()
-    server.server_close()
-    thread.join(timeout=5)
+    with serve(create_connector_app(received_requests), host=host) as base_url:
+        yield {
+            "base_url": base_url,
+            "received_requests": received_requests,
+        }
@@ -0,0 +1,230 @@
+"""Local stand-ins for the LLM API connector and the PNML transformer.
+
+Used by the test fixtures in ``conftest.py`` and by the pipeline benchmark
+(``flask bench``), so both exercise the service against the same upstream
+behaviour without network access or LLM cost.
+"""
+
+import json
+import threading
+import time
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+
+from flask import Flask, jsonify, request
+from werkzeug.serving import make_server
+
+_BPMN_NS = "{http://www.omg.org/spec/BPMN/20100524/MODEL}"
+_PNML_NS = "http://www.pnml.org/version-2009/grammar/pnml"
+
+
+def build_raw_response(user_text, tasks=1):
+    """Return a connector ``raw_response`` model for *user_text*.
+
+    With ``tasks=1`` the model is start -> task1 -> end. Larger models chain
+    ``tasks`` user tasks and make every fifth task optional through an
+    exclusive split/join, roughly the shape of the sample process texts.
+    """
+    normalized_text = user_text.lower()
+    if "atm" in normalized_text:
+        task_name = "ATM Withdrawal"
+    elif "bicycle" in normalized_text or "bike" in normalized_text:
+        task_name = "Bicycle Repair"
+    else:
+        task_name = "Ice Cream Service"
+
+    task_list = [
+        {
+            "id": f"task{i}",
+            "name": task_name if tasks == 1 else f"{task_name} {i}",
+            "type": "UserTask",
+        }
+        for i in range(1, tasks + 1)
+    ]
+    gateways = []
+    flows = []
+
+    def _link(source, target):
+        flows.append(
+            {
+                "id": f"flow{len(flows) + 1}",
+                "type": "SequenceFlow",
+                "source": source,
+                "target": target,
+            }
+        )
+
+    previous = "start"
+    for i in range(1, tasks + 1):
+        if i % 5 == 0 and i < tasks:
+            split, join = f"gateway{i}_split", f"gateway{i}_join"
+            gateways += [
+                {"id": split, "type": "ExclusiveGateway", "name": f"Step {i} needed?"},
+                {"id": join, "type": "ExclusiveGateway", "name": ""},
+            ]
+            _link(previous, split)
+            _link(split, f"task{i}")
+            _link(split, join)
+            _link(f"task{i}", join)
+            previous = join
+        else:
+            _link(previous, f"task{i}")
+            previous = f"task{i}"
+    _link(previous, "end")
+
+    return json.dumps(
+        {
+            "events": [
+                {"id": "start", "type": "startEvent", "name": "Start"},
+                {"id": "end", "type": "endEvent", "name": "End"},
+            ],
+            "tasks": task_list,
+            "gateways": gateways,
+            "flows": flows,
+        }
+    )
+
+
+def bpmn_to_pnml(bpmn_xml, drop_every=0):
+    """Translate BPMN to a workflow-net PNML, as the transformer would.
+
+    Every flow node becomes a transition and every sequence flow a place
+    between its endpoints; start and end events get a source/sink place.
+    ``drop_every=n`` leaves out every n-th flow place to mimic the
+    transformer's occasional missing relays, which the service repairs.
+    """
+    root = ET.fromstring(bpmn_xml)
+    pnml = ET.Element(f"{{{_PNML_NS}}}pnml")
+    net = ET.SubElement(pnml, f"{{{_PNML_NS}}}net", id="net1")
+
+    def _add(tag, **attrib):
+        return ET.SubElement(net, f"{{{_PNML_NS}}}{tag}", **attrib)
+
+    def _add_transition(node_id, label):
+        transition = _add("transition", id=node_id)
+        name = ET.SubElement(transition, f"{{{_PNML_NS}}}name")
+        ET.SubElement(name, f"{{{_PNML_NS}}}text").text = label
+
+    for process in root.iter(f"{_BPMN_NS}process"):
+        for index, element in enumerate(process, start=1):
+            local = element.tag.rsplit("}", 1)[-1]
+            element_id = element.get("id")
+            if local == "sequenceFlow":
+                if drop_every and index % drop_every == 0:
+                    continue
+                place = f"p_{element_id}"
+                _add("place", id=place)
+                _add(
+                    "arc",
+                    id=f"{place}_in",
+                    source=element.get("sourceRef"),
+                    target=place,
+                )
+                _add(
+                    "arc",
+                    id=f"{place}_out",
+                    source=place,
+                    target=element.get("targetRef"),
+                )
+                continue
+            _add_transition(element_id, element.get("name") or local)
+            if local == "startEvent":
+                _add("place", id=f"source_{element_id}")
+                _add(
+                    "arc",
+                    id=f"a_source_{element_id}",
+                    source=f"source_{element_id}",
+                    target=element_id,
+                )
+            elif local == "endEvent":
+                _add("place", id=f"sink_{element_id}")
+                _add(
+                    "arc",
+                    id=f"a_sink_{element_id}",
+                    source=element_id,
+                    target=f"sink_{element_id}",
+                )
+
+    return ET.tostring(pnml, encoding="unicode")
+
+
+def create_connector_app(received_requests=None, tasks=1, latency=0.0):
+    """Build a connector stand-in serving ``POST /generate`` and ``GET /models``.
+
+    Requests are appended to ``received_requests["generate"]`` and counted in
+    ``received_requests["models"]`` when a dict is given. *latency* seconds
+    are slept per generate call to stand in for the LLM.
+    """
+    if received_requests is None:
+        received_requests = {"generate": [], "models": 0}
+    connector_app = Flask("mock_connector")
+
+    @connector_app.post("/generate")
+    def generate():
+        payload = request.get_json(silent=True) or {}
+        received_requests["generate"].append(payload)
+
+        if payload.get("provider") is None or payload.get("model") is None:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "invalid_request",
+                            "message": "Missing provider or model.",
+                        }
+                    }
+                ),
+                400,
+            )
+
+        if latency:
+            time.sleep(latency)
+        user_text = payload.get("user_text", "")
+        return jsonify({"raw_response": build_raw_response(user_text, tasks)}), 200
+
+    @connector_app.get("/models")
+    def models():
+        received_requests["models"] += 1
+        return (
+            jsonify(
+                {
+                    "models": [
+                        {"provider": "openai", "model": "gpt-4o"},
+                        {"provider": "anthropic", "model": "claude-3.5-sonnet"},
+                    ]
+                }
+            ),
+            200,
+        )
+
+    return connector_app
+
+
+def create_transformer_app(latency=0.0, drop_every=0):
+    """Build a transformer stand-in serving ``POST /transform``."""
+    transformer_app = Flask("mock_transformer")
+
+    @transformer_app.post("/transform")
+    def transform():
+        if request.args.get("direction") != "bpmntopnml":
+            return jsonify({"error": "Unsupported direction."}), 400
+        if latency:
+            time.sleep(latency)
+        pnml = bpmn_to_pnml(request.form.get("bpmn", ""), drop_every)
+        return jsonify({"pnml": pnml}), 200
+
+    return transformer_app
+
+
+@contextmanager
+def serve(wsgi_app, host="127.0.0.1"):
+    """Serve *wsgi_app* on an ephemeral port in a thread; yield its base URL."""
+    server = make_server(host, 0, wsgi_app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
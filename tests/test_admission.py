@@ -0,0 +1,271 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+from prometheus_client import REGISTRY
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app import create_app
+from app.backend.admission import AdmissionController, OverloadedError, parse_limits
+from app.backend.deadline import DeadlineExceeded, request_deadline
+from tests.sample_models import RAW_MODEL_JSON
+
+AUTH = {"Authorization": "Bearer secret-token"}
+BODY = {"text": "describe a process", "provider": "openai", "model": "gpt-4o"}
+SLOTS_KEY = "t2p:admission:openai/gpt-4o"
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.config["ADMISSION_ENABLED"] = True
+    app.config["ADMISSION_MAX_CONCURRENCY"] = 1
+    app.config["ADMISSION_MAX_QUEUE"] = 1
+    app.config["ADMISSION_QUEUE_TIMEOUT_SECONDS"] = 2
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def redis_client(app):
+    client = fakeredis.FakeRedis()
+    app.config["REDIS_ENABLED"] = True
+    app.extensions["redis"] = client
+    return client
+
+
+def _rejected(limit, reason):
+    value = REGISTRY.get_sample_value(
+        "t2p_admission_rejected_total", {"limit": limit, "reason": reason}
+    )
+    return value or 0
+
+
+def _controller(app, provider="openai", model="gpt-4o"):
+    return AdmissionController(provider, model)
+
+
+def test_parse_limits_skips_malformed_entries():
+    assert parse_limits("openai/gpt-4o=2, anthropic=8,broken,x=y,") == {
+        "openai/gpt-4o": 2,
+        "anthropic": 8,
+    }
+
+
+def test_most_specific_limit_entry_wins(app):
+    app.config["ADMISSION_LIMITS"] = "openai/gpt-4o=2,openai=6"
+
+    exact = _controller(app)
+    provider = _controller(app, model="gpt-4o-mini")
+    other = _controller(app, provider="anthropic", model="claude")
+
+    assert (exact.scope, exact.label, exact.limit) == (
+        "openai/gpt-4o",
+        "openai/gpt-4o",
+        2,
+    )
+    assert (provider.scope, provider.label, provider.limit) == ("openai", "openai", 6)
+    assert (other.scope, other.label, other.limit) == ("anthropic/claude", "default", 1)
+
+
+def test_queued_call_is_admitted_when_a_slot_frees(app):
+    controller = _controller(app)
+    admitted = threading.Event()
+
+    def _second():
+        with app.app_context(), controller.slot():
+            admitted.set()
+
+    with controller.slot():
+        thread = threading.Thread(target=_second)
+        thread.start()
+        time.sleep(0.05)
+        assert not admitted.is_set()
+    thread.join(timeout=2)
+
+    assert admitted.is_set()
+
+
+def test_full_queue_is_rejected_immediately(app):
+    app.config["ADMISSION_MAX_QUEUE"] = 0
+    controller = _controller(app)
+    before = _rejected("default", "queue_full")
+
+    with controller.slot():
+        started = time.monotonic()
+        with pytest.raises(OverloadedError) as excinfo:
+            with controller.slot():
+                pass
+
+    assert time.monotonic() - started < 0.5
+    assert excinfo.value.retry_after == 2
+    assert _rejected("default", "queue_full") == before + 1
+
+
+def test_queued_call_gives_up_at_the_deadline(app):
+    app.config["ADMISSION_QUEUE_TIMEOUT_SECONDS"] = 0.1
+    controller = _controller(app)
+    before = _rejected("default", "timeout")
+
+    with controller.slot():
+        with pytest.raises(OverloadedError):
+            with controller.slot():
+                pass
+
+    assert _rejected("default", "timeout") == before + 1
+    # The rejected call left the queue and the slot was returned.
+    with controller.slot():
+        pass
+
+
+def test_idle_scopes_are_dropped(app):
+    app.config["ADMISSION_MAX_QUEUE"] = 0
+    controllers = [
+        _controller(app, provider=f"provider-{i}", model="any") for i in range(50)
+    ]
+    for controller in controllers:
+        with controller.slot():
+            assert controller.scope in AdmissionController._scopes
+
+    first = controllers[0]
+    with pytest.raises(OverloadedError):
+        with first.slot(), first.slot():
+            pass
+
+    assert not AdmissionController._scopes
+
+
+def test_queued_call_gives_up_at_the_request_deadline(app):
+    app.config["ADMISSION_QUEUE_TIMEOUT_SECONDS"] = 10
+    controller = _controller(app)
+    before = _rejected("default", "deadline")
+
+    with controller.slot():
+        started = time.monotonic()
+        with request_deadline(0.1), pytest.raises(DeadlineExceeded):
+            with controller.slot():
+                pass
+
+    assert time.monotonic() - started < 1
+    assert _rejected("default", "deadline") == before + 1
+
+
+def test_async_queued_call_gives_up_at_the_request_deadline(app):
+    app.config["ADMISSION_QUEUE_TIMEOUT_SECONDS"] = 10
+    controller = _controller(app)
+
+    async def _queued():
+        with request_deadline(0.1):
+            async with controller.slot_async():
+                pass
+
+    with controller.slot():
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            asyncio.run(_queued())
+
+    assert time.monotonic() - started < 1
+
+
+def test_slots_are_shared_through_redis(app, redis_client):
+    app.config["ADMISSION_QUEUE_TIMEOUT_SECONDS"] = 0.1
+    # A slot held by another worker, and an expired one from a crashed worker.
+    redis_client.zadd(SLOTS_KEY, {"other-worker": time.time() + 60})
+    redis_client.zadd(SLOTS_KEY, {"crashed-worker": time.time() - 1})
+
+    with pytest.raises(OverloadedError):
+        with _controller(app).slot():
+            pass
+
+    redis_client.zrem(SLOTS_KEY, "other-worker")
+    with _controller(app).slot():
+        (member,) = redis_client.zrange(SLOTS_KEY, 0, -1)
+        assert member not in (b"other-worker", b"crashed-worker")
+    assert redis_client.zcard(SLOTS_KEY) == 0
+
+
+def test_redis_round_trip_does_not_hold_the_scope_lock(app, redis_client):
+    app.config["ADMISSION_QUEUE_TIMEOUT_SECONDS"] = 0.5
+    controller = _controller(app)
+    polling, resume = threading.Event(), threading.Event()
+    attempts = []
+
+    def _full_scope():
+        attempts.append(None)
+        if len(attempts) == 2:
+            # The first retry of the queued call is still waiting on Redis.
+            polling.set()
+            resume.wait(2)
+        return None
+
+    def _queued():
+        with app.app_context(), pytest.raises(OverloadedError):
+            with controller.slot():
+                pass
+
+    with patch.object(controller, "_try_acquire_shared", side_effect=_full_scope):
+        thread = threading.Thread(target=_queued)
+        thread.start()
+        assert polling.wait(2)
+        state = AdmissionController._scopes[controller.scope]
+        locked = state.cond.acquire(timeout=0.2)
+        if locked:
+            state.cond.release()
+        resume.set()
+        thread.join(timeout=2)
+
+    assert locked
+
+
+def test_redis_outage_falls_back_to_per_process_limits(app, redis_client):
+    app.config["ADMISSION_QUEUE_TIMEOUT_SECONDS"] = 0.1
+    controller = _controller(app)
+
+    with patch.object(
+        redis_client, "pipeline", side_effect=RedisConnectionError("down")
+    ):
+        with controller.slot():
+            with pytest.raises(OverloadedError):
+                with controller.slot():
+                    pass
+
+
+def test_async_slot_waits_without_blocking_the_loop(app):
+    controller = _controller(app)
+    order = []
+
+    async def _call(name, hold):
+        async with controller.slot_async():
+            order.append(name)
+            await asyncio.sleep(hold)
+
+    async def _run():
+        await asyncio.gather(_call("first", 0.1), _call("second", 0))
+
+    asyncio.run(_run())
+
+    assert order == ["first", "second"]
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_saturated_provider_returns_503_with_retry_after(mock_cc, app):
+    app.config["ADMISSION_MAX_QUEUE"] = 0
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+    client = app.test_client()
+
+    with _controller(app).slot():
+        rejected = client.post("/v2/generate/bpmn", json=BODY, headers=AUTH)
+        other_model = client.post(
+            "/v2/generate/bpmn", json={**BODY, "model": "gpt-4o-mini"}, headers=AUTH
+        )
+    admitted = client.post("/v2/generate/bpmn", json=BODY, headers=AUTH)
+
+    assert rejected.status_code == 503
+    assert rejected.get_json()["error"]["code"] == "overloaded"
+    assert rejected.headers["Retry-After"] == "2"
+    assert other_model.status_code == 200
+    assert admitted.status_code == 200
+    assert "admission;dur=" in admitted.headers["Server-Timing"]
@@ -0,0 +1,274 @@
+import asyncio
+import json
+import time
+from contextlib import ExitStack
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app import create_app
+from app.asgi import create_asgi_app
+from app.backend import http_session
+from app.backend.connector_client import AsyncConnectorClient
+from tests.stubs import create_connector_app, create_transformer_app, serve
+
+AUTH = {"Authorization": "Bearer secret-token"}
+BODY = {"text": "describe a process", "provider": "openai", "model": "gpt-4o"}
+
+
+@pytest.fixture
+def app():
+    return create_app("testing")
+
+
+@pytest.fixture
+def upstream(app):
+    """Point *app* at local connector and transformer stubs."""
+    received = {"generate": [], "models": 0}
+
+    def _start(connector_latency=0.0):
+        connector_url = stack.enter_context(
+            serve(create_connector_app(received, latency=connector_latency))
+        )
+        transformer_url = stack.enter_context(serve(create_transformer_app()))
+        app.config["T2P_LLM_API_CONNECTOR_URL"] = connector_url
+        app.config["T2P_TRANSFORMER_BASE_URL"] = transformer_url
+        return received
+
+    with ExitStack() as stack:
+        yield _start
+
+
+async def _requests(app, *calls):
+    transport = httpx.ASGITransport(app=create_asgi_app(app))
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://t2p"
+        ) as client:
+            return await asyncio.gather(
+                *(
+                    client.request(method, path, **kwargs)
+                    for method, path, kwargs in calls
+                )
+            )
+    finally:
+        await http_session.close_async_client()
+
+
+def _request(app, method, path, **kwargs):
+    return asyncio.run(_requests(app, (method, path, kwargs)))[0]
+
+
+# --- async routes -----------------------------------------------------------
+
+
+def test_generate_bpmn_matches_wsgi_response(app, upstream):
+    upstream()
+
+    resp = _request(app, "POST", "/v2/generate/bpmn", json=BODY, headers=AUTH)
+    expected = app.test_client().post("/v2/generate/bpmn", json=BODY, headers=AUTH)
+
+    assert resp.status_code == 200
+    assert resp.json() == expected.get_json()
+    assert "connector;dur=" in resp.headers["Server-Timing"]
+    assert resp.headers["Timing-Allow-Origin"] == "*"
+
+
+def test_generate_pnml_uses_async_transformer(app, upstream):
+    upstream()
+
+    resp = _request(app, "POST", "/v2/generate/pnml", json=BODY, headers=AUTH)
+
+    assert resp.status_code == 200
+    assert "<pnml" in resp.json()["result"]
+    assert "transformer;dur=" in resp.headers["Server-Timing"]
+
+
+def test_connector_client_error_is_relayed(app, upstream):
+    upstream()
+
+    resp = _request(app, "POST", "/v2/generate/bpmn", json={"text": "t"}, headers=AUTH)
+
+    assert resp.status_code == 400
+    assert resp.json()["error"]["code"] == "invalid_request"
+
+
+def test_unreachable_transformer_is_a_transform_error(app, upstream):
+    upstream()
+    app.config["T2P_TRANSFORMER_BASE_URL"] = "http://127.0.0.1:9"
+    app.config["HTTP_RETRIES"] = 0
+
+    resp = _request(app, "POST", "/v2/generate/pnml", json=BODY, headers=AUTH)
+
+    assert resp.status_code == 500
+    assert resp.json()["error"]["code"] == "transform_error"
+
+
+def test_cors_headers_are_applied(app, upstream):
+    upstream()
+
+    resp = _request(
+        app,
+        "POST",
+        "/v2/generate/bpmn",
+        json=BODY,
+        headers={**AUTH, "Origin": "http://editor.example"},
+    )
+
+    assert resp.headers["Access-Control-Allow-Origin"] == "http://editor.example"
+    assert "Server-Timing" in resp.headers["Access-Control-Expose-Headers"]
+
+
+def test_generate_pnml_streams_progress(app, upstream):
+    upstream()
+
+    resp = _request(
+        app,
+        "POST",
+        "/v2/generate/pnml",
+        json=BODY,
+        headers={**AUTH, "Accept": "application/x-ndjson"},
+    )
+
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in resp.text.splitlines()]
+    events = [r["event"] for r in records if r["event"] != "stage"]
+    assert events == ["bpmn", "result"]
+    assert "<pnml" in records[-1]["result"]
+    assert "transformer" in records[-1]["timings"]
+
+
+def test_models_support_conditional_requests(app, upstream):
+    upstream()
+
+    first = _request(app, "GET", "/v2/models")
+    second = _request(
+        app, "GET", "/v2/models", headers={"If-None-Match": first.headers["ETag"]}
+    )
+
+    assert first.status_code == 200
+    assert first.json()["models"][0] == {"provider": "openai", "model": "gpt-4o"}
+    assert second.status_code == 304
+
+
+def test_one_loop_keeps_many_llm_calls_in_flight(app, upstream):
+    received = upstream(connector_latency=0.3)
+    calls = [
+        (
+            "POST",
+            "/v2/generate/bpmn",
+            {"json": {**BODY, "text": f"process {i}"}, "headers": AUTH},
+        )
+        for i in range(20)
+    ]
+
+    started = time.perf_counter()
+    responses = asyncio.run(_requests(app, *calls))
+    elapsed = time.perf_counter() - started
+
+    assert [r.status_code for r in responses] == [200] * 20
+    assert len(received["generate"]) == 20
+    # Sequentially this would take 6s; all calls must overlap on one loop.
+    assert elapsed < 2
+
+
+# --- WSGI fallback and lifespan ---------------------------------------------
+
+
+def test_other_routes_are_served_by_the_wsgi_app(app):
+    health = _request(app, "GET", "/v2/health")
+    metrics = _request(app, "GET", "/metrics")
+
+    assert health.status_code == 200
+    assert health.json() == {"status": "ok"}
+    assert b"t2p_" in metrics.content
+
+
+def test_lifespan_shutdown_closes_async_client(app):
+    async def _run():
+        with app.app_context():
+            client = http_session.get_async_client()
+        messages = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+        sent = []
+
+        async def receive():
+            return next(messages)
+
+        async def send(message):
+            sent.append(message["type"])
+
+        await create_asgi_app(app)({"type": "lifespan"}, receive, send)
+        return client, sent
+
+    client, sent = asyncio.run(_run())
+
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+    assert client.is_closed
+
+
+# --- AsyncConnectorClient ---------------------------------------------------
+
+
+def test_async_client_waits_for_internal_job(app):
+    statuses = iter(
+        [
+            {"job_id": "job-1", "status": "running"},
+            {
+                "job_id": "job-1",
+                "status": "succeeded",
+                "result": {"raw_response": "RAW"},
+            },
+        ]
+    )
+    seen = []
+
+    def _handler(request):
+        seen.append((request.method, request.url.path))
+        if request.method == "POST":
+            return httpx.Response(202, json={"job_id": "job-1"})
+        return httpx.Response(200, json=next(statuses))
+
+    app.config["T2P_LLM_API_CONNECTOR_URL"] = "http://connector"
+    app.config["CONNECTOR_INTERNAL_ASYNC_ENABLED"] = True
+    app.config["CONNECTOR_ASYNC_INITIAL_POLL_SECONDS"] = 0.001
+
+    async def _run():
+        mock = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+        with (
+            app.app_context(),
+            patch("app.backend.connector_client.get_async_client", return_value=mock),
+        ):
+            return await AsyncConnectorClient().generate(
+                "Bearer t", "text", "openai", "gpt-4o"
+            )
+
+    assert asyncio.run(_run()) == "RAW"
+    assert seen == [
+        ("POST", "/internal/jobs/generate"),
+        ("GET", "/internal/jobs/job-1"),
+        ("GET", "/internal/jobs/job-1"),
+    ]
+
+
+def test_async_client_falls_back_when_internal_jobs_are_missing(app):
+    def _handler(request):
+        if request.url.path == "/generate":
+            assert json.loads(request.content)["prompting_strategy"] == "few_shot"
+            return httpx.Response(200, json={"raw_response": "RAW FROM SYNC"})
+        return httpx.Response(404)
+
+    app.config["T2P_LLM_API_CONNECTOR_URL"] = "http://connector"
+    app.config["CONNECTOR_INTERNAL_ASYNC_ENABLED"] = True
+
+    async def _run():
+        mock = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+        with (
+            app.app_context(),
+            patch("app.backend.connector_client.get_async_client", return_value=mock),
+        ):
+            return await AsyncConnectorClient().generate(
+                "Bearer t", "text", "openai", "gpt-4o", prompting_strategy="few_shot"
+            )
+
+    assert asyncio.run(_run()) == "RAW FROM SYNC"
@@ -1,4 +1,5 @@
 import json
+from unittest.mock import patch
 
 import pytest
 
@@ -79,3 +80,36 @@ def test_valid_model_returns_wellformed_xml():
     import xml.etree.ElementTree as ET
 
     ET.fromstring(raw_response_to_bpmn(VALID_MODEL))
+
+
+def _with(group, element):
+    model = json.loads(VALID_MODEL)
+    model[group].append(element)
+    return model
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        [],
+        {"events": [], "tasks": [], "gateways": []},
+        {**json.loads(VALID_MODEL), "tasks": None},
+        _with("tasks", "task"),
+        _with("tasks", {"id": "t1", "name": "Check"}),
+        _with("tasks", {"id": "t1", "type": "", "name": "Check"}),
+        _with("tasks", {"id": "t1", "type": "User Task", "name": "Check"}),
+        _with("gateways", {"id": "g1", "type": "ExclusiveGateway", "name": None}),
+        _with("events", {"id": "", "type": "endEvent", "name": "End"}),
+        _with("events", {"id": "start", "type": "startEvent", "name": "Again"}),
+        _with("flows", {"id": "start", "source": "start", "target": "end"}),
+        _with("flows", {"id": "f2", "source": "start"}),
+        _with("flows", {"id": "f2", "source": ["start"], "target": "end"}),
+    ],
+)
+def test_malformed_model_is_rejected_before_building(model):
+    # Shape errors fail fast with InvalidModelError, not a KeyError or
+    # IndexError from inside the writer after the layout has run.
+    with patch("app.backend.bpmn_builder.json_to_bpmn") as build:
+        with pytest.raises(InvalidModelError):
+            raw_response_to_bpmn(json.dumps(model))
+    build.assert_not_called()
@@ -0,0 +1,240 @@
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app import create_app
+from app.backend.connector_client import ConnectorClientError
+from app.backend.cache import RedisCache, generation_key, transform_key
+from tests.sample_models import RAW_MODEL_JSON
+from tests.stubs import bpmn_to_pnml
+
+AUTH = {"Authorization": "Bearer secret-token"}
+TOKEN = AUTH["Authorization"]
+BODY = {"text": "describe a process", "provider": "openai", "model": "gpt-4o"}
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+
+@pytest.fixture
+def app(redis_client):
+    app = create_app("testing")
+    app.config["REDIS_ENABLED"] = True
+    app.config["GENERATE_CACHE_ENABLED"] = True
+    app.config["TRANSFORM_CACHE_ENABLED"] = True
+    app.extensions["redis"] = redis_client
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def _metric(app, name, cache):
+    metric = app.extensions["metrics"][name]
+    return metric.labels(cache=cache)._value.get()
+
+
+# --- key --------------------------------------------------------------------
+
+
+def test_generation_key_ignores_whitespace_differences():
+    a = generation_key(TOKEN, "Check  the\norder. ", "openai", "gpt-4o", None)
+    b = generation_key(TOKEN, "Check the order.", "openai", "gpt-4o", "zero_shot")
+    assert a == b
+
+
+def test_generation_key_distinguishes_every_parameter():
+    base = generation_key(TOKEN, "text", "openai", "gpt-4o", None)
+    assert base != generation_key(TOKEN, "other", "openai", "gpt-4o", None)
+    assert base != generation_key(TOKEN, "text", "anthropic", "gpt-4o", None)
+    assert base != generation_key(TOKEN, "text", "openai", "gpt-4o-mini", None)
+    assert base != generation_key(TOKEN, "text", "openai", "gpt-4o", "few_shot")
+    assert base != generation_key(TOKEN, "text", "openai", "gpt-4o", None, "sugiyama")
+
+
+def test_generation_key_is_scoped_to_the_credential():
+    base = generation_key(TOKEN, "text", "openai", "gpt-4o", None)
+    assert base != generation_key("Bearer other", "text", "openai", "gpt-4o", None)
+    assert TOKEN not in base
+    assert generation_key("", "text", "openai", "gpt-4o", None) is None
+    assert generation_key(None, "text", "openai", "gpt-4o", None) is None
+
+
+def test_generation_key_is_none_for_non_string_text():
+    assert generation_key(TOKEN, None, "openai", "gpt-4o", None) is None
+    assert generation_key(TOKEN, "   ", "openai", "gpt-4o", None) is None
+
+
+def test_transform_key_ignores_serialization_differences():
+    a = transform_key('<a xmlns="urn:x" id="1" name="n">\n  <b/>\n</a>', "bpmntopnml")
+    b = transform_key(
+        '<x:a xmlns:x="urn:x" name="n" id="1"><x:b></x:b></x:a>', "bpmntopnml"
+    )
+    assert a == b
+    assert a != transform_key('<a xmlns="urn:x" id="2" name="n"><b/></a>', "bpmntopnml")
+    assert a != transform_key('<a xmlns="urn:x" id="1" name="n"><b/></a>', "pnmltobpmn")
+
+
+def test_transform_key_is_none_for_non_xml():
+    assert transform_key("not xml", "bpmntopnml") is None
+    assert transform_key(None, "bpmntopnml") is None
+
+
+# --- RedisCache -------------------------------------------------------------
+
+
+def test_redis_cache_round_trip_with_ttl(app, redis_client):
+    with app.app_context():
+        cache = RedisCache("unit", redis_client, ttl=60, max_entries=10)
+        assert cache.get("k") is None
+        cache.set("k", "value")
+        assert cache.get("k") == "value"
+    assert 0 < redis_client.ttl("t2p:unit:k") <= 60
+
+
+def test_redis_cache_evicts_least_recently_used(app, redis_client):
+    with app.app_context():
+        cache = RedisCache("unit", redis_client, ttl=60, max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")  # "b" is now the least recently used entry
+        cache.set("c", "3")
+
+        assert cache.get("a") == "1"
+        assert cache.get("b") is None
+        assert cache.get("c") == "3"
+    assert redis_client.zcard("t2p:unit:lru") == 2
+
+
+def test_redis_cache_treats_redis_errors_as_miss(app, redis_client):
+    with app.app_context():
+        cache = RedisCache("unit", redis_client, ttl=60, max_entries=10)
+        with patch.object(
+            redis_client, "get", side_effect=RedisConnectionError("down")
+        ):
+            assert cache.get("k") is None
+        with patch.object(
+            redis_client, "pipeline", side_effect=RedisConnectionError("down")
+        ):
+            cache.set("k", "value")  # must not raise
+
+
+# --- /v2/generate -----------------------------------------------------------
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_resubmitted_text_is_served_from_cache(mock_cc, app, client):
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+    hits = _metric(app, "CACHE_HITS", "bpmn")
+    misses = _metric(app, "CACHE_MISSES", "bpmn")
+
+    first = client.post("/v2/generate/bpmn", json=BODY, headers=AUTH)
+    second = client.post(
+        "/v2/generate/bpmn",
+        json={**BODY, "text": "  describe   a process\n"},
+        headers=AUTH,
+    )
+
+    assert first.status_code == second.status_code == 200
+    assert first.get_json() == second.get_json()
+    mock_cc.return_value.generate.assert_called_once()
+    assert _metric(app, "CACHE_HITS", "bpmn") == hits + 1
+    assert _metric(app, "CACHE_MISSES", "bpmn") == misses + 1
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_different_model_is_a_cache_miss(mock_cc, client):
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+
+    client.post("/v2/generate/bpmn", json=BODY, headers=AUTH)
+    client.post(
+        "/v2/generate/bpmn", json={**BODY, "model": "gpt-4o-mini"}, headers=AUTH
+    )
+
+    assert mock_cc.return_value.generate.call_count == 2
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_unauthenticated_request_bypasses_cache(mock_cc, client):
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+    client.post("/v2/generate/bpmn", json=BODY, headers=AUTH)
+
+    client.post("/v2/generate/bpmn", json=BODY)
+
+    assert mock_cc.return_value.generate.call_count == 2
+    assert mock_cc.return_value.generate.call_args.kwargs["authorization"] == ""
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_other_credential_is_not_served_a_cached_result(mock_cc, client):
+    # A cached result must not let an unchecked key skip the connector's 401.
+    mock_cc.return_value.generate.side_effect = [
+        RAW_MODEL_JSON,
+        ConnectorClientError(401, {"error": {"code": "unauthorized"}}),
+    ]
+    client.post("/v2/generate/bpmn", json=BODY, headers=AUTH)
+
+    response = client.post(
+        "/v2/generate/bpmn", json=BODY, headers={"Authorization": "Bearer bogus"}
+    )
+
+    assert response.status_code == 401
+    assert mock_cc.return_value.generate.call_count == 2
+    assert (
+        mock_cc.return_value.generate.call_args.kwargs["authorization"]
+        == "Bearer bogus"
+    )
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_invalid_model_is_not_cached(mock_cc, client):
+    mock_cc.return_value.generate.side_effect = ["not a json model", RAW_MODEL_JSON]
+
+    first = client.post("/v2/generate/bpmn", json=BODY, headers=AUTH)
+    second = client.post("/v2/generate/bpmn", json=BODY, headers=AUTH)
+
+    assert first.status_code == 500
+    assert second.status_code == 200
+    assert mock_cc.return_value.generate.call_count == 2
+
+
+# --- transformer ------------------------------------------------------------
+
+
+@patch("app.api.routes.ModelTransformer")
+@patch("app.api.routes.ConnectorClient")
+def test_repeated_bpmn_skips_transformer(mock_cc, mock_mt, app, client):
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+    mock_mt.return_value.transform.side_effect = lambda xml, params: bpmn_to_pnml(xml)
+    hits = _metric(app, "CACHE_HITS", "pnml")
+
+    first = client.post("/v2/generate/pnml", json=BODY, headers=AUTH)
+    # Different text, so the BPMN cache misses, but the LLM returns the same model.
+    second = client.post(
+        "/v2/generate/pnml", json={**BODY, "text": "another process"}, headers=AUTH
+    )
+
+    assert first.status_code == second.status_code == 200
+    assert first.get_json() == second.get_json()
+    assert mock_cc.return_value.generate.call_count == 2
+    mock_mt.return_value.transform.assert_called_once()
+    assert _metric(app, "CACHE_HITS", "pnml") == hits + 1
+    assert "transformer" not in second.headers["Server-Timing"]
+
+
+@patch("app.api.routes.ModelTransformer")
+@patch("app.api.routes.ConnectorClient")
+def test_non_xml_transformer_output_is_not_cached(mock_cc, mock_mt, client):
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+    mock_mt.return_value.transform.return_value = "PNML"
+
+    client.post("/v2/generate/pnml", json=BODY, headers=AUTH)
+    client.post("/v2/generate/pnml", json=BODY, headers=AUTH)
+
+    assert mock_mt.return_value.transform.call_count == 2
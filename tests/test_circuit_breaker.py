@@ -0,0 +1,238 @@
+import threading
+import time
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+import requests
+from prometheus_client import REGISTRY
+
+from app import create_app
+from app.backend.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    _LocalStore,
+)
+from app.backend.connector_client import ConnectorError
+from tests.sample_models import RAW_MODEL_JSON
+
+AUTH = {"Authorization": "Bearer secret-token"}
+BODY = {"text": "describe a process", "provider": "openai", "model": "gpt-4o"}
+
+
+class Down(Exception):
+    pass
+
+
+@pytest.fixture
+def app(monkeypatch):
+    # Every test starts with closed, empty process-local circuits.
+    monkeypatch.setattr(_LocalStore, "_breakers", {})
+    app = create_app("testing")
+    app.config["CIRCUIT_BREAKER_ENABLED"] = True
+    app.config["CIRCUIT_BREAKER_MIN_CALLS"] = 2
+    app.config["CIRCUIT_BREAKER_FAILURE_RATE"] = 0.5
+    app.config["CIRCUIT_BREAKER_OPEN_SECONDS"] = 30
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def redis_client(app):
+    client = fakeredis.FakeRedis()
+    app.config["REDIS_ENABLED"] = True
+    app.extensions["redis"] = client
+    return client
+
+
+def _breaker(name="unit", slow_call_seconds=10):
+    return CircuitBreaker(name, failures=Down, slow_call_seconds=slow_call_seconds)
+
+
+def _fail(breaker):
+    with pytest.raises(Down):
+        with breaker.call():
+            raise Down()
+
+
+def _succeed(breaker):
+    with breaker.call():
+        pass
+
+
+def _state(name):
+    return REGISTRY.get_sample_value("t2p_circuit_breaker_state", {"name": name})
+
+
+def test_circuit_opens_at_the_failure_rate(app):
+    breaker = _breaker()
+    _succeed(breaker)
+    _succeed(breaker)
+    _fail(breaker)
+    breaker.check()
+    _fail(breaker)
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        with breaker.call():
+            pytest.fail("an open circuit must not call the dependency")
+
+    assert 0 < excinfo.value.retry_after <= 30
+    assert _state("unit") == 2
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+
+def test_other_errors_and_too_few_calls_keep_it_closed(app):
+    breaker = _breaker()
+    _fail(breaker)
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            with breaker.call():
+                raise ValueError("rejected request, not an outage")
+
+    _succeed(breaker)
+    assert _state("unit") == 0
+
+
+def test_slow_calls_count_as_failures(app):
+    breaker = _breaker(slow_call_seconds=0)
+    _succeed(breaker)
+    _succeed(breaker)
+
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+
+def test_half_open_circuit_lets_one_probe_through(app):
+    app.config["CIRCUIT_BREAKER_OPEN_SECONDS"] = 0.05
+    breaker = _breaker()
+    _fail(breaker)
+    _fail(breaker)
+    time.sleep(0.06)
+    in_probe = threading.Event()
+    release = threading.Event()
+
+    def _probe():
+        with app.app_context(), breaker.call():
+            in_probe.set()
+            release.wait(2)
+
+    thread = threading.Thread(target=_probe)
+    thread.start()
+    in_probe.wait(2)
+    try:
+        assert _state("unit") == 1
+        with pytest.raises(CircuitOpenError):
+            _succeed(breaker)
+    finally:
+        release.set()
+        thread.join(timeout=2)
+
+    assert _state("unit") == 0
+    _succeed(breaker)
+
+
+def test_failed_probe_reopens_the_circuit(app):
+    app.config["CIRCUIT_BREAKER_OPEN_SECONDS"] = 0.05
+    breaker = _breaker()
+    _fail(breaker)
+    _fail(breaker)
+    time.sleep(0.06)
+
+    _fail(breaker)
+
+    assert _state("unit") == 2
+    with pytest.raises(CircuitOpenError):
+        _succeed(breaker)
+
+
+def test_circuit_state_is_shared_through_redis(app, redis_client):
+    _fail(_breaker())
+    _fail(_breaker())
+
+    assert redis_client.hget("t2p:breaker:unit", "state") == b"open"
+    # Another worker reads the same circuit.
+    with patch.object(_LocalStore, "_breakers", {}):
+        with pytest.raises(CircuitOpenError):
+            _succeed(_breaker())
+
+
+# --- routes -----------------------------------------------------------------
+
+
+@patch("app.api.routes.ModelTransformer")
+@patch("app.api.routes.ConnectorClient")
+def test_open_transformer_circuit_fails_pnml_before_the_llm_call(mock_cc, mock_mt, app):
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+    mock_mt.return_value.transform.side_effect = requests.exceptions.ConnectionError(
+        "transformer down"
+    )
+    client = app.test_client()
+
+    for _ in range(2):
+        resp = client.post("/v2/generate/pnml", json=BODY, headers=AUTH)
+        assert resp.status_code == 500
+    resp = client.post("/v2/generate/pnml", json=BODY, headers=AUTH)
+
+    assert resp.status_code == 503
+    assert resp.get_json()["error"]["code"] == "upstream_unavailable"
+    assert int(resp.headers["Retry-After"]) > 0
+    assert mock_cc.return_value.generate.call_count == 2
+    assert mock_mt.return_value.transform.call_count == 2
+    # BPMN generation does not need the transformer.
+    assert client.post("/v2/generate/bpmn", json=BODY, headers=AUTH).status_code == 200
+
+
+@patch("app.api.routes.ModelTransformer")
+@patch("app.api.routes.ConnectorClient")
+def test_rejected_bpmn_keeps_the_transformer_circuit_closed(mock_cc, mock_mt, app):
+    app.config["CIRCUIT_BREAKER_MIN_CALLS"] = 1
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+    rejected = requests.Response()
+    rejected.status_code = 422
+    mock_mt.return_value.transform.side_effect = requests.exceptions.HTTPError(
+        "422 Unprocessable Entity", response=rejected
+    )
+    client = app.test_client()
+
+    for _ in range(4):
+        resp = client.post("/v2/generate/pnml", json=BODY, headers=AUTH)
+        assert resp.get_json()["error"]["code"] == "transform_error"
+
+    assert mock_mt.return_value.transform.call_count == 4
+    assert _state("transformer") == 0
+
+
+@patch("app.api.routes.ModelTransformer")
+@patch("app.api.routes.ConnectorClient")
+def test_open_circuit_skips_the_few_shot_regeneration(mock_cc, mock_mt, app):
+    app.config["CIRCUIT_BREAKER_MIN_CALLS"] = 1
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+    mock_mt.return_value.transform.side_effect = requests.exceptions.ConnectionError(
+        "transformer down"
+    )
+
+    resp = app.test_client().post(
+        "/v2/generate/pnml",
+        json={**BODY, "prompting_strategy": "few_shot"},
+        headers=AUTH,
+    )
+
+    assert resp.status_code == 503
+    mock_cc.return_value.generate.assert_called_once()
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_models_report_an_open_connector_circuit(mock_cc, app):
+    app.config["CIRCUIT_BREAKER_MIN_CALLS"] = 1
+    mock_cc.return_value.list_models.side_effect = ConnectorError("down")
+    client = app.test_client()
+
+    first = client.get("/v2/models")
+    second = client.get("/v2/models")
+
+    assert first.status_code == 500
+    assert second.status_code == 503
+    assert second.get_json()["error"]["code"] == "upstream_unavailable"
+    assert second.headers["Retry-After"]
+    mock_cc.return_value.list_models.assert_called_once()
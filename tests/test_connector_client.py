@@ -1,10 +1,17 @@
+import json
+import time
+
 import pytest
-from unittest.mock import patch
+import requests
+from unittest.mock import Mock, patch
+from prometheus_client import REGISTRY
 from app import create_app
 from app.backend.connector_client import (
     ConnectorClient,
     ConnectorError,
     ConnectorClientError,
+    _Latencies,
+    _wait_mode,
 )
 
 
@@ -22,10 +29,10 @@ def connector(app):
 # --- generate -------------------------------------------------------------
 
 
-@patch("app.backend.connector_client.requests.post")
+@patch("requests.Session.post")
 def test_generate_success_returns_raw_response(mock_post, connector, app):
     mock_post.return_value.status_code = 200
-    mock_post.return_value.json.return_value = {"raw_response": "RAW BPMN JSON"}
+    mock_post.return_value.content = b'{"raw_response": "RAW BPMN JSON"}'
 
     with app.app_context():
         result = connector.generate(
@@ -38,12 +45,12 @@ def test_generate_success_returns_raw_response(mock_post, connector, app):
     assert result == "RAW BPMN JSON"
 
 
-@patch("app.backend.connector_client.requests.post")
+@patch("requests.Session.post")
 def test_generate_sends_contract_request(mock_post, connector, app):
     """The outbound request must match the connector contract exactly:
     Authorization forwarded verbatim, body fields present, no api_key."""
     mock_post.return_value.status_code = 200
-    mock_post.return_value.json.return_value = {"raw_response": "ok"}
+    mock_post.return_value.content = b'{"raw_response": "ok"}'
 
     with app.app_context():
         connector.generate(
@@ -72,10 +79,10 @@ def test_generate_sends_contract_request(mock_post, connector, app):
     assert kwargs.get("timeout") is not None
 
 
-@patch("app.backend.connector_client.requests.post")
+@patch("requests.Session.post")
 def test_generate_forwards_prompting_strategy_when_provided(mock_post, connector, app):
     mock_post.return_value.status_code = 200
-    mock_post.return_value.json.return_value = {"raw_response": "ok"}
+    mock_post.return_value.content = b'{"raw_response": "ok"}'
 
     with app.app_context():
         connector.generate(
@@ -95,7 +102,7 @@ def test_generate_forwards_prompting_strategy_when_provided(mock_post, connector
     }
 
 
-@patch("app.backend.connector_client.requests.post")
+@patch("requests.Session.post")
 def test_generate_5xx_raises_upstream_error(mock_post, connector, app):
     mock_post.return_value.status_code = 500
     mock_post.return_value.text = "Internal Server Error"
@@ -107,7 +114,7 @@ def test_generate_5xx_raises_upstream_error(mock_post, connector, app):
     assert "status 500" in str(exc_info.value)
 
 
-@patch("app.backend.connector_client.requests.post")
+@patch("requests.Session.post")
 def test_generate_4xx_raises_client_error(mock_post, connector, app):
     # A 4xx from the connector (e.g. invalid provider) is a relayable client
     # error, not an upstream failure.
@@ -124,7 +131,7 @@ def test_generate_4xx_raises_client_error(mock_post, connector, app):
     assert exc_info.value.error_body["error"]["code"] == "invalid_provider"
 
 
-@patch("app.backend.connector_client.requests.post")
+@patch("requests.Session.post")
 def test_generate_429_raises_client_error_with_rate_limited_body(
     mock_post, connector, app
 ):
@@ -144,7 +151,7 @@ def test_generate_429_raises_client_error_with_rate_limited_body(
     assert exc_info.value.error_body["error"]["code"] == "rate_limited"
 
 
-@patch("app.backend.connector_client.requests.post")
+@patch("requests.Session.post")
 def test_generate_request_exception_raises(mock_post, connector, app):
     from requests.exceptions import RequestException
 
@@ -157,10 +164,10 @@ def test_generate_request_exception_raises(mock_post, connector, app):
     assert "Failed to reach" in str(exc_info.value)
 
 
-@patch("app.backend.connector_client.requests.post")
+@patch("requests.Session.post")
 def test_generate_invalid_json_raises(mock_post, connector, app):
     mock_post.return_value.status_code = 200
-    mock_post.return_value.json.side_effect = ValueError("no json")
+    mock_post.return_value.content = b"<html>Bad Gateway</html>"
 
     with app.app_context():
         with pytest.raises(ConnectorError) as exc_info:
@@ -169,10 +176,10 @@ def test_generate_invalid_json_raises(mock_post, connector, app):
     assert "invalid JSON" in str(exc_info.value)
 
 
-@patch("app.backend.connector_client.requests.post")
+@patch("requests.Session.post")
 def test_generate_missing_raw_response_raises(mock_post, connector, app):
     mock_post.return_value.status_code = 200
-    mock_post.return_value.json.return_value = {"unexpected": "shape"}
+    mock_post.return_value.content = b'{"unexpected": "shape"}'
 
     with app.app_context():
         with pytest.raises(ConnectorError) as exc_info:
@@ -184,7 +191,7 @@ def test_generate_missing_raw_response_raises(mock_post, connector, app):
 # --- list_models ----------------------------------------------------------
 
 
-@patch("app.backend.connector_client.requests.get")
+@patch("requests.Session.get")
 def test_list_models_success_returns_list(mock_get, connector, app):
     models = [{"provider": "openai", "model": "gpt-4o"}]
     mock_get.return_value.status_code = 200
@@ -197,7 +204,7 @@ def test_list_models_success_returns_list(mock_get, connector, app):
     assert mock_get.call_args.args[0].endswith("/models")
 
 
-@patch("app.backend.connector_client.requests.get")
+@patch("requests.Session.get")
 def test_list_models_non_200_raises(mock_get, connector, app):
     mock_get.return_value.status_code = 503
 
@@ -206,7 +213,7 @@ def test_list_models_non_200_raises(mock_get, connector, app):
             connector.list_models()
 
 
-@patch("app.backend.connector_client.requests.get")
+@patch("requests.Session.get")
 def test_list_models_request_exception_raises(mock_get, connector, app):
     from requests.exceptions import ConnectionError
 
@@ -217,7 +224,7 @@ def test_list_models_request_exception_raises(mock_get, connector, app):
             connector.list_models()
 
 
-@patch("app.backend.connector_client.requests.get")
+@patch("requests.Session.get")
 def test_list_models_missing_field_raises(mock_get, connector, app):
     mock_get.return_value.status_code = 200
     mock_get.return_value.json.return_value = {"unexpected": "shape"}
@@ -229,7 +236,7 @@ def test_list_models_missing_field_raises(mock_get, connector, app):
     assert "models" in str(exc_info.value)
 
 
-@patch("app.backend.connector_client.requests.get")
+@patch("requests.Session.get")
 def test_list_models_invalid_json_raises(mock_get, connector, app):
     # A 200 with an unparseable body is an upstream failure, not a usable list.
     mock_get.return_value.status_code = 200
@@ -242,7 +249,7 @@ def test_list_models_invalid_json_raises(mock_get, connector, app):
     assert "invalid JSON" in str(exc_info.value)
 
 
-@patch("app.backend.connector_client.requests.post")
+@patch("requests.Session.post")
 def test_generate_4xx_with_non_json_body_still_relays_status(mock_post, connector, app):
     # A 4xx whose body is not JSON (e.g. an HTML error page or empty body) must
     # still be relayed as a client error with its status preserved, so the route
@@ -259,7 +266,7 @@ def test_generate_4xx_with_non_json_body_still_relays_status(mock_post, connecto
     assert exc_info.value.error_body is None
 
 
-@patch("app.backend.connector_client.requests.post")
+@patch("requests.Session.post")
 def test_generate_status_500_is_upstream_not_client_error(mock_post, connector, app):
     # The 4xx/5xx split is a boundary: a 5xx is an upstream failure the caller
     # cannot fix by changing input, so it must be ConnectorError, not a relayable
@@ -272,8 +279,8 @@ def test_generate_status_500_is_upstream_not_client_error(mock_post, connector,
 
 
 @patch("app.backend.connector_client.time.sleep", return_value=None)
-@patch("app.backend.connector_client.requests.get")
-@patch("app.backend.connector_client.requests.post")
+@patch("requests.Session.get")
+@patch("requests.Session.post")
 def test_generate_internal_async_submit_poll_success(
     mock_post, mock_get, _mock_sleep, connector, app
 ):
@@ -282,15 +289,19 @@ def test_generate_internal_async_submit_poll_success(
 
     running = type("Resp", (), {})()
     running.status_code = 200
-    running.json = lambda: {"job_id": "job-123", "status": "running"}
+    running.headers = {}
+    running.content = b'{"job_id": "job-123", "status": "running"}'
 
     done = type("Resp", (), {})()
     done.status_code = 200
-    done.json = lambda: {
-        "job_id": "job-123",
-        "status": "succeeded",
-        "result": {"raw_response": "RAW BPMN JSON"},
-    }
+    done.headers = {}
+    done.content = json.dumps(
+        {
+            "job_id": "job-123",
+            "status": "succeeded",
+            "result": {"raw_response": "RAW BPMN JSON"},
+        }
+    ).encode()
 
     mock_get.side_effect = [running, done]
 
@@ -356,3 +367,289 @@ def test_generate_internal_async_404_falls_back_to_sync(
     assert result == "RAW FROM SYNC"
     mock_async.assert_called_once()
     mock_sync.assert_called_once()
+
+
+# --- internal async wait modes ----------------------------------------------
+
+
+def _status_response(body, headers=None):
+    response = type("Resp", (), {})()
+    response.status_code = 200
+    response.headers = headers or {}
+    response.content = json.dumps(body).encode()
+    return response
+
+
+def _async_app_config(app, wait_mode):
+    app.config["CONNECTOR_INTERNAL_ASYNC_ENABLED"] = True
+    app.config["CONNECTOR_ASYNC_WAIT_MODE"] = wait_mode
+    app.config["CONNECTOR_ASYNC_INITIAL_POLL_SECONDS"] = 0.1
+    app.config["CONNECTOR_ASYNC_POLL_INTERVAL_SECONDS"] = 5
+    app.config["CONNECTOR_ASYNC_MAX_WAIT_SECONDS"] = 60
+
+
+_RUNNING = {"job_id": "job-1", "status": "running"}
+_DONE = {
+    "job_id": "job-1",
+    "status": "succeeded",
+    "result": {"raw_response": "RAW"},
+}
+
+
+def test_backoff_delay_grows_with_jitter_up_to_cap():
+    from app.backend.connector_client import _backoff_delay
+
+    for _ in range(50):
+        assert 0.05 <= _backoff_delay(0, 0.1, 5) <= 0.1
+        assert 0.1 <= _backoff_delay(1, 0.1, 5) <= 0.2
+        assert 2.5 <= _backoff_delay(20, 0.1, 5) <= 5
+
+
+@patch("app.backend.connector_client.time.sleep", return_value=None)
+@patch("requests.Session.get")
+@patch("requests.Session.post")
+def test_adaptive_wait_starts_fast_and_backs_off(
+    mock_post, mock_get, mock_sleep, connector, app
+):
+    mock_post.return_value.status_code = 202
+    mock_post.return_value.json.return_value = {"job_id": "job-1"}
+    mock_get.side_effect = [
+        _status_response(_RUNNING),
+        _status_response(_RUNNING),
+        _status_response(_RUNNING),
+        _status_response(_DONE),
+    ]
+
+    with app.app_context():
+        _async_app_config(app, "adaptive")
+        assert connector.generate("Bearer t", "text", "openai", "gpt-4o") == "RAW"
+
+    delays = [call.args[0] for call in mock_sleep.call_args_list]
+    assert len(delays) == 3
+    assert delays[0] <= 0.1
+    assert 0.1 <= delays[1] <= 0.2
+    assert 0.2 <= delays[2] <= 0.4
+
+
+@patch("app.backend.connector_client.time.sleep", return_value=None)
+@patch("requests.Session.get")
+@patch("requests.Session.post")
+def test_adaptive_wait_honours_retry_after_and_eta_hints(
+    mock_post, mock_get, mock_sleep, connector, app
+):
+    mock_post.return_value.status_code = 202
+    mock_post.return_value.json.return_value = {"job_id": "job-1"}
+    mock_get.side_effect = [
+        _status_response(_RUNNING, headers={"Retry-After": "2"}),
+        _status_response({**_RUNNING, "eta_seconds": 0.75}),
+        _status_response(_DONE),
+    ]
+
+    with app.app_context():
+        _async_app_config(app, "adaptive")
+        connector.generate("Bearer t", "text", "openai", "gpt-4o")
+
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [2.0, 0.75]
+
+
+@patch("app.backend.connector_client.time.sleep", return_value=None)
+@patch("requests.Session.get")
+@patch("requests.Session.post")
+def test_adaptive_wait_clamps_hints_to_the_backoff_bounds(
+    mock_post, mock_get, mock_sleep, connector, app
+):
+    mock_post.return_value.status_code = 202
+    mock_post.return_value.json.return_value = {"job_id": "job-1"}
+    mock_get.side_effect = [
+        _status_response(_RUNNING, headers={"Retry-After": "3600"}),
+        _status_response({**_RUNNING, "eta_seconds": 0}),
+        _status_response(_DONE),
+    ]
+
+    with app.app_context():
+        _async_app_config(app, "adaptive")
+        connector.generate("Bearer t", "text", "openai", "gpt-4o")
+
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [5.0, 0.1]
+
+
+@patch("app.backend.connector_client.time.sleep", return_value=None)
+@patch("requests.Session.get")
+@patch("requests.Session.post")
+def test_unknown_wait_mode_is_logged_and_waits_adaptively(
+    mock_post, mock_get, mock_sleep, connector, app, caplog
+):
+    mock_post.return_value.status_code = 202
+    mock_post.return_value.json.return_value = {"job_id": "job-1"}
+    mock_get.side_effect = [
+        _status_response(_RUNNING, headers={"Retry-After": "2"}),
+        _status_response(_DONE),
+    ]
+    # The warning is logged once per mode.
+    _wait_mode.cache_clear()
+
+    with app.app_context():
+        _async_app_config(app, "long-poll")
+        connector.generate("Bearer t", "text", "openai", "gpt-4o")
+
+    assert not mock_get.call_args.kwargs.get("params")
+    mock_sleep.assert_called_once_with(2.0)
+    assert any(
+        record.message == "Unknown connector wait mode; waiting adaptively"
+        and record.wait_mode == "long-poll"
+        for record in caplog.records
+    )
+
+
+@patch("app.backend.connector_client.time.sleep", return_value=None)
+@patch("requests.Session.get")
+@patch("requests.Session.post")
+def test_fixed_wait_keeps_the_configured_interval(
+    mock_post, mock_get, mock_sleep, connector, app
+):
+    mock_post.return_value.status_code = 202
+    mock_post.return_value.json.return_value = {"job_id": "job-1"}
+    mock_get.side_effect = [_status_response(_RUNNING), _status_response(_DONE)]
+
+    with app.app_context():
+        _async_app_config(app, "fixed")
+        connector.generate("Bearer t", "text", "openai", "gpt-4o")
+
+    mock_sleep.assert_called_once_with(5.0)
+
+
+@patch("app.backend.connector_client.time.sleep", return_value=None)
+@patch("requests.Session.get")
+@patch("requests.Session.post")
+def test_long_poll_asks_connector_to_hold_status_request(
+    mock_post, mock_get, _mock_sleep, connector, app
+):
+    mock_post.return_value.status_code = 202
+    mock_post.return_value.json.return_value = {"job_id": "job-1"}
+    mock_get.side_effect = [_status_response(_DONE)]
+
+    with app.app_context():
+        _async_app_config(app, "long_poll")
+        app.config["CONNECTOR_ASYNC_LONG_POLL_SECONDS"] = 20
+        connector.generate("Bearer t", "text", "openai", "gpt-4o")
+
+    kwargs = mock_get.call_args.kwargs
+    assert kwargs["params"] == {"wait": "20.000"}
+    # The read timeout must outlast the time the connector holds the request.
+    assert kwargs["timeout"] > 20
+
+
+@patch("app.backend.connector_client.time.sleep", return_value=None)
+@patch("requests.Session.get")
+@patch("requests.Session.post")
+def test_detection_lag_is_observed_from_completion_timestamp(
+    mock_post, mock_get, _mock_sleep, connector, app
+):
+    import time
+
+    mock_post.return_value.status_code = 202
+    mock_post.return_value.json.return_value = {"job_id": "job-1"}
+    mock_get.side_effect = [
+        _status_response({**_DONE, "completed_at": time.time() - 0.3})
+    ]
+    histogram = app.extensions["metrics"]["CONNECTOR_JOB_DETECTION_LAG"]
+    child = histogram.labels(wait_mode="adaptive")
+    before = child._sum.get()
+
+    with app.app_context():
+        _async_app_config(app, "adaptive")
+        connector.generate("Bearer t", "text", "openai", "gpt-4o")
+
+    assert 0.3 <= child._sum.get() - before < 5
+
+
+def test_completed_at_accepts_epoch_and_iso_8601():
+    from app.backend.connector_client import _completed_at
+
+    assert _completed_at({"completed_at": 1700000000}) == 1700000000.0
+    assert _completed_at({"finished_at": "2023-11-14T22:13:20Z"}) == 1700000000.0
+    assert _completed_at({"completed_at": "not a time"}) is None
+    assert _completed_at({}) is None
+
+
+# --- hedging ----------------------------------------------------------------
+
+
+def _models_response():
+    response = Mock()
+    response.status_code = 200
+    response.json.return_value = {"models": [{"provider": "openai", "model": "gpt-4o"}]}
+    return response
+
+
+def _hedge_count(call, outcome):
+    value = REGISTRY.get_sample_value(
+        "t2p_connector_hedged_requests_total", {"call": call, "outcome": outcome}
+    )
+    return value or 0
+
+
+@patch("requests.Session.get")
+def test_slow_model_list_request_is_hedged(mock_get, connector, app):
+    calls = []
+
+    def _get(*args, **kwargs):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            time.sleep(0.5)
+        return _models_response()
+
+    mock_get.side_effect = _get
+    app.config["CONNECTOR_HEDGING_ENABLED"] = True
+    app.config["CONNECTOR_HEDGE_DEFAULT_DELAY_SECONDS"] = 0.05
+    won = _hedge_count("models", "won")
+
+    with app.app_context():
+        started = time.monotonic()
+        models = connector.list_models()
+        elapsed = time.monotonic() - started
+
+    assert models == [{"provider": "openai", "model": "gpt-4o"}]
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 0.05
+    assert elapsed < 0.4
+    assert _hedge_count("models", "won") == won + 1
+
+
+@patch("requests.Session.get")
+def test_fast_requests_and_disabled_hedging_send_once(mock_get, connector, app):
+    mock_get.return_value = _models_response()
+
+    with app.app_context():
+        connector.list_models()
+        app.config["CONNECTOR_HEDGING_ENABLED"] = True
+        connector.list_models()
+
+    assert mock_get.call_count == 2
+
+
+@patch("requests.Session.get")
+def test_hedged_request_fails_only_if_both_attempts_fail(mock_get, connector, app):
+    def _get(*args, **kwargs):
+        time.sleep(0.1)
+        raise requests.exceptions.ConnectionError("refused")
+
+    mock_get.side_effect = _get
+    app.config["CONNECTOR_HEDGING_ENABLED"] = True
+    app.config["CONNECTOR_HEDGE_DEFAULT_DELAY_SECONDS"] = 0.01
+
+    with app.app_context(), pytest.raises(ConnectorError):
+        connector.list_models()
+
+    assert mock_get.call_count == 2
+
+
+def test_hedge_delay_follows_the_p95_latency(app):
+    latencies = _Latencies()
+    with app.app_context():
+        assert latencies.hedge_delay() == 1.0
+        for ms in range(1, 101):
+            latencies.add(ms / 1000)
+        assert latencies.hedge_delay() == pytest.approx(0.096)
+        app.config["CONNECTOR_HEDGE_MIN_DELAY_SECONDS"] = 0.5
+        assert latencies.hedge_delay() == 0.5
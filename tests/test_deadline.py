@@ -0,0 +1,111 @@
+import time
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from app import create_app
+from app.backend.connector_client import ConnectorClient, ConnectorError
+from app.backend.deadline import (
+    DeadlineExceeded,
+    clamp,
+    expired,
+    remaining,
+    request_deadline,
+)
+from app.backend.modeltransformer import ModelTransformer
+from tests.sample_models import RAW_MODEL_JSON
+
+AUTH = {"Authorization": "Bearer secret-token"}
+BODY = {"text": "describe a process", "provider": "openai", "model": "gpt-4o"}
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    with app.app_context():
+        yield app
+
+
+def test_no_deadline_leaves_timeouts_alone():
+    assert remaining() is None
+    assert clamp(60) == 60
+    with request_deadline(0):
+        assert clamp(60) == 60
+
+
+def test_nested_deadlines_only_shorten():
+    with request_deadline(10):
+        with request_deadline(60):
+            assert 9 < remaining() <= 10
+        with request_deadline(1):
+            assert clamp(60) <= 1
+        assert remaining() > 1
+    assert remaining() is None
+
+
+def test_clamp_refuses_to_start_after_the_deadline():
+    with request_deadline(0.01):
+        time.sleep(0.02)
+        assert expired()
+        with pytest.raises(DeadlineExceeded):
+            clamp(60)
+
+
+@patch("requests.Session.post")
+def test_connector_gets_the_remaining_budget(mock_post, app):
+    mock_post.return_value.status_code = 200
+    mock_post.return_value.content = b'{"raw_response": "RAW"}'
+
+    with request_deadline(5):
+        ConnectorClient().generate("Bearer t", "text", "openai", "gpt-4o")
+
+    assert 4 < mock_post.call_args.kwargs["timeout"] <= 5
+
+
+@patch("requests.Session.post")
+def test_timeout_at_the_deadline_is_not_a_connector_outage(mock_post, app):
+    def _timeout(*args, **kwargs):
+        time.sleep(kwargs["timeout"])
+        raise requests.exceptions.ReadTimeout("read timed out")
+
+    mock_post.side_effect = _timeout
+
+    with request_deadline(0.05), pytest.raises(DeadlineExceeded):
+        ConnectorClient().generate("Bearer t", "text", "openai", "gpt-4o")
+    mock_post.side_effect = requests.exceptions.ReadTimeout("read timed out")
+    with request_deadline(60), pytest.raises(ConnectorError):
+        ConnectorClient().generate("Bearer t", "text", "openai", "gpt-4o")
+
+
+@patch("requests.Session.post")
+def test_transformer_timeout_is_configurable_and_clamped(mock_post, app):
+    mock_post.return_value.status_code = 200
+    mock_post.return_value.text = '{"pnml": "<pnml/>"}'
+    app.config["TRANSFORMER_TIMEOUT_SECONDS"] = 30
+
+    ModelTransformer().transform("<definitions/>", {"direction": "bpmntopnml"})
+    assert mock_post.call_args.kwargs["timeout"] == 30
+
+    with request_deadline(2):
+        ModelTransformer().transform("<definitions/>", {"direction": "bpmntopnml"})
+    assert mock_post.call_args.kwargs["timeout"] <= 2
+
+
+@patch("requests.Session.post")
+@patch("app.api.routes.ConnectorClient")
+def test_pipeline_past_its_deadline_returns_504(mock_cc, mock_post, app):
+    app.config["REQUEST_DEADLINE_SECONDS"] = 0.05
+
+    def _slow_generate(**kwargs):
+        time.sleep(0.06)
+        return RAW_MODEL_JSON
+
+    mock_cc.return_value.generate.side_effect = _slow_generate
+
+    resp = app.test_client().post("/v2/generate/pnml", json=BODY, headers=AUTH)
+
+    assert resp.status_code == 504
+    assert resp.get_json()["error"]["code"] == "deadline_exceeded"
+    # The transformer was never called: its hop had no budget left.
+    mock_post.assert_not_called()
@@ -0,0 +1,76 @@
+import datetime
+import decimal
+import json
+
+import pytest
+from flask import jsonify, request
+
+from app import create_app
+from app.backend import fastjson
+from app.backend.bpmn_builder import InvalidModelError, raw_response_to_bpmn
+from tests.sample_models import RAW_MODEL_JSON
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(fastjson, "orjson", None)
+    elif fastjson.orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+
+@pytest.fixture
+def app(backend):
+    app = create_app("testing")
+    with app.test_request_context():
+        yield app
+
+
+def test_loads_accepts_text_and_bytes(backend):
+    model = json.loads(RAW_MODEL_JSON)
+
+    assert fastjson.loads(RAW_MODEL_JSON) == model
+    assert fastjson.loads(RAW_MODEL_JSON.encode()) == model
+    with pytest.raises(ValueError):
+        fastjson.loads(b"<html>Bad Gateway</html>")
+
+
+def test_connector_reply_is_decoded_by_either_backend(backend):
+    assert raw_response_to_bpmn(RAW_MODEL_JSON).startswith("<?xml")
+    with pytest.raises(InvalidModelError):
+        raw_response_to_bpmn('{"events": [')
+    with pytest.raises(InvalidModelError):
+        raw_response_to_bpmn(None)
+
+
+def test_responses_match_the_default_provider(app):
+    body = {
+        "b": [1, 2.5, None, True],
+        "a": {"when": datetime.date(2024, 1, 2), "amount": decimal.Decimal("1.10")},
+    }
+    response = jsonify(body)
+
+    assert response.mimetype == "application/json"
+    assert response.get_data() == (
+        b'{"a":{"amount":"1.10","when":"Tue, 02 Jan 2024 00:00:00 GMT"},'
+        b'"b":[1,2.5,null,true]}\n'
+    )
+
+
+def test_what_orjson_cannot_encode_falls_back_to_the_stdlib(app):
+    big = 2**70
+
+    assert jsonify({"n": big}).get_json() == {"n": big}
+    assert app.json.dumps({"n": big}) == '{"n": 1180591620717411303424}'
+
+
+def test_debug_responses_are_indented(app):
+    app.json.compact = False
+
+    assert jsonify({"a": 1}).get_data() == b'{\n  "a": 1\n}\n'
+
+
+def test_request_bodies_are_decoded(app):
+    with app.test_request_context(json={"text": "Prüfen"}):
+        assert request.get_json() == {"text": "Prüfen"}
@@ -0,0 +1,69 @@
+from app.backend.graph import NODE, PLACE, TRANSITION, Graph
+from app.backend.xml_parser import PnmlDocument
+
+
+def _graph(**kwargs):
+    nodes = [("p1", NODE | PLACE), ("t1", NODE | TRANSITION), ("p2", NODE | PLACE)]
+    edges = [("p1", "t1"), ("t1", "p2"), ("p1", "p2"), ("p2", "t1")]
+    return Graph(nodes, edges, **kwargs)
+
+
+def test_adjacency_follows_edge_order():
+    graph = _graph()
+    p1, t1, p2 = (graph.index[nid] for nid in ("p1", "t1", "p2"))
+
+    assert list(graph.src) == [p1, t1, p1, p2]
+    assert list(graph.tgt) == [t1, p2, p2, t1]
+    assert list(graph.successors(p1)) == [t1, p2]
+    assert list(graph.predecessors(t1)) == [p1, p2]
+    assert graph.out_degree(t1) == 1
+    assert graph.in_degree(p1) == 0
+
+
+def test_edges_to_unknown_nodes_are_dropped_or_kept():
+    edges = [("a", "b"), ("a", "x"), ("y", "b")]
+
+    graph = Graph([("a", NODE), ("b", NODE)], edges)
+    assert len(graph) == 2
+    assert list(graph.src) == [0]
+    assert list(graph.tgt) == [1]
+
+    graph = Graph([("a", NODE), ("b", NODE)], edges, keep_unknown=True)
+    assert graph.ids == ["a", "b", "x", "y"]
+    assert list(graph.kind) == [NODE, NODE, 0, 0]
+    assert list(graph.src) == [0, 0, 3]
+    assert list(graph.tgt) == [1, 2, 1]
+
+
+def test_repeated_ids_combine_their_kinds():
+    graph = Graph([("n", NODE | PLACE), ("m", NODE), ("n", NODE | TRANSITION)], [])
+
+    assert graph.ids == ["n", "m"]
+    assert graph.nodes(PLACE | TRANSITION) == [0]
+    assert graph.nodes(NODE) == [0, 1]
+
+
+def test_rename_keeps_the_structure_and_refuses_collisions():
+    graph = _graph()
+
+    assert graph.rename({"p1": "place_a"})
+    assert graph.index["place_a"] == 0
+    assert "p1" not in graph.index
+    assert not graph.rename({"place_a": "p2"})
+    assert graph.ids == ["place_a", "t1", "p2"]
+
+
+def test_pnml_document_reuses_its_graph_until_the_net_changes():
+    document = PnmlDocument.parse(
+        "<pnml><net id='n1'>"
+        "<place id='p1'/><transition id='t1'/><place id='p2'/>"
+        "<arc id='a1' source='p1' target='t1'/>"
+        "<arc id='a2' source='t1' target='p2'/>"
+        "</net></pnml>"
+    )
+    graph, arcs = document.net()
+
+    document.sanitize()
+    document.rename_places()
+    assert document.net()[0] is graph
+    assert graph.ids == ["P1", "P2", "t1"]
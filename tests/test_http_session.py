@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+
+from app import create_app
+from app.backend import http_session
+from app.backend.connector_client import ConnectorClient
+
+
+@pytest.fixture
+def app(monkeypatch):
+    # Start every test from a fresh process-wide session.
+    monkeypatch.setattr(http_session, "_session", None)
+    app = create_app("testing")
+    app.config["HTTP_POOL_MAXSIZE"] = 3
+    app.config["HTTP_RETRIES"] = 5
+    app.config["HTTP_RETRY_BACKOFF_SECONDS"] = 0
+    return app
+
+
+def test_session_is_shared_across_threads(app):
+    sessions = []
+
+    def _grab():
+        with app.app_context():
+            sessions.append(http_session.get_session())
+
+    threads = [threading.Thread(target=_grab) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(session) for session in sessions}) == 1
+
+
+def test_session_uses_configured_pool_and_retries(app):
+    with app.app_context():
+        session = http_session.get_session()
+
+    adapter = session.get_adapter("https://connector.example")
+    assert adapter._pool_maxsize == 3
+    assert adapter.max_retries.connect == 5
+    # Only connection failures are retried; responses are never resent.
+    assert adapter.max_retries.read == 0
+    assert adapter.max_retries.status == 0
+
+
+def test_session_is_recreated_after_fork(app, monkeypatch):
+    with app.app_context():
+        parent = http_session.get_session()
+        monkeypatch.setattr(http_session, "_session_pid", -1)
+        child = http_session.get_session()
+
+    assert child is not parent
+
+
+def test_session_refuses_upstream_cookies(app):
+    with app.app_context():
+        session = http_session.get_session()
+
+    assert session.cookies.get_policy().allowed_domains() == ()
+
+
+def test_connector_calls_reuse_one_connection(app, mock_connector_server):
+    app.config["T2P_LLM_API_CONNECTOR_URL"] = mock_connector_server["base_url"]
+
+    with app.app_context():
+        client = ConnectorClient()
+        client.list_models()
+        client.list_models()
+        client.list_models()
+
+    pools = dict(http_session._pools())
+    assert len(pools) == 1
+    (pool,) = pools.values()
+    assert pool.num_requests == 3
+    assert pool.num_connections == 1
+
+
+def test_pool_utilisation_is_exported(app, mock_connector_server):
+    app.config["T2P_LLM_API_CONNECTOR_URL"] = mock_connector_server["base_url"]
+    with app.app_context():
+        ConnectorClient().list_models()
+
+    metrics = app.test_client().get("/metrics").data.decode("utf-8")
+
+    host = mock_connector_server["base_url"]
+    assert f't2p_http_pool_max_connections{{host="{host}"}} 3.0' in metrics
+    assert f't2p_http_pool_in_use_connections{{host="{host}"}} 0.0' in metrics
+    assert f't2p_http_pool_requests_total{{host="{host}"}} 1.0' in metrics
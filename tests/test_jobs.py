@@ -0,0 +1,209 @@
+import threading
+import time
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+
+from app import create_app
+from app.backend.connector_client import ConnectorClientError
+from app.backend.jobs import JobRunner, JobStore
+from tests.sample_models import RAW_MODEL_JSON
+
+AUTH = {"Authorization": "Bearer secret-token"}
+BODY = {"text": "describe a process", "provider": "openai", "model": "gpt-4o"}
+
+
+@pytest.fixture
+def app():
+    return create_app("testing")
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def _wait_for_job(client, location, headers=AUTH, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(location, headers=headers).get_json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job at {location} did not finish")
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_submit_returns_202_and_job_completes(mock_cc, client):
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+
+    resp = client.post("/v2/jobs/generate", json=BODY, headers=AUTH)
+
+    assert resp.status_code == 202
+    body = resp.get_json()
+    assert body["status"] == "queued"
+    assert body["target"] == "bpmn"
+    assert resp.headers["Location"] == f"/v2/jobs/{body['job_id']}"
+
+    job = _wait_for_job(client, resp.headers["Location"])
+    assert job["status"] == "succeeded"
+    assert "<definitions" in job["result"]
+    mock_cc.return_value.generate.assert_called_once_with(
+        authorization="Bearer secret-token",
+        user_text="describe a process",
+        provider="openai",
+        model="gpt-4o",
+        prompting_strategy=None,
+    )
+
+
+@patch("app.api.routes.ModelTransformer")
+@patch("app.api.routes.ConnectorClient")
+def test_pnml_job_runs_transformation(mock_cc, mock_mt, client):
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+    mock_mt.return_value.transform.return_value = "PNML"
+
+    resp = client.post(
+        "/v2/jobs/generate", json={**BODY, "target": "pnml"}, headers=AUTH
+    )
+    job = _wait_for_job(client, resp.headers["Location"])
+
+    assert job == {
+        "job_id": resp.get_json()["job_id"],
+        "status": "succeeded",
+        "target": "pnml",
+        "result": "PNML",
+    }
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_failed_job_reports_v2_error(mock_cc, client):
+    mock_cc.return_value.generate.side_effect = ConnectorClientError(
+        401, {"error": {"code": "unauthorized", "message": "Missing token."}}
+    )
+
+    resp = client.post("/v2/jobs/generate", json=BODY)
+    job = _wait_for_job(client, resp.headers["Location"], headers={})
+
+    assert job["status"] == "failed"
+    assert job["error"] == {"code": "unauthorized", "message": "Missing token."}
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_pending_job_reports_running_with_retry_after(mock_cc, client):
+    release = threading.Event()
+
+    def _slow_generate(**kwargs):
+        release.wait(5)
+        return RAW_MODEL_JSON
+
+    mock_cc.return_value.generate.side_effect = _slow_generate
+
+    resp = client.post("/v2/jobs/generate", json=BODY, headers=AUTH)
+    pending = client.get(resp.headers["Location"], headers=AUTH)
+    release.set()
+
+    assert pending.status_code == 200
+    assert pending.get_json()["status"] in ("queued", "running")
+    assert pending.headers["Retry-After"] == "1"
+    assert _wait_for_job(client, resp.headers["Location"])["status"] == "succeeded"
+
+
+def test_invalid_target_returns_400(client):
+    resp = client.post(
+        "/v2/jobs/generate", json={**BODY, "target": "svg"}, headers=AUTH
+    )
+
+    assert resp.status_code == 400
+    assert resp.get_json()["error"]["code"] == "invalid_request"
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_job_is_only_served_to_the_credential_that_submitted_it(mock_cc, client):
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+
+    resp = client.post("/v2/jobs/generate", json=BODY, headers=AUTH)
+    location = resp.headers["Location"]
+    assert _wait_for_job(client, location)["status"] == "succeeded"
+
+    for headers in ({"Authorization": "Bearer someone-else"}, {}):
+        other = client.get(location, headers=headers)
+        assert other.status_code == 404
+        assert other.get_json()["error"]["code"] == "not_found"
+
+
+def test_unknown_job_returns_404(client):
+    resp = client.get("/v2/jobs/does-not-exist")
+
+    assert resp.status_code == 404
+    assert resp.get_json()["error"]["code"] == "not_found"
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_saturated_worker_pool_sheds_load(mock_cc, app, client):
+    release = threading.Event()
+    mock_cc.return_value.generate.side_effect = lambda **kwargs: (
+        release.wait(5) and RAW_MODEL_JSON
+    )
+    app.extensions["job_runner"] = JobRunner(max_workers=1, max_pending=1)
+
+    first = client.post("/v2/jobs/generate", json=BODY, headers=AUTH)
+    second = client.post("/v2/jobs/generate", json=BODY, headers=AUTH)
+    release.set()
+
+    assert first.status_code == 202
+    assert second.status_code == 503
+    assert second.get_json()["error"]["code"] == "overloaded"
+    assert second.headers["Retry-After"]
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_rejected_submission_records_no_job(mock_cc, app, client):
+    redis_client = fakeredis.FakeRedis()
+    app.config["REDIS_ENABLED"] = True
+    app.extensions["redis"] = redis_client
+    release = threading.Event()
+    mock_cc.return_value.generate.side_effect = lambda **kwargs: (
+        release.wait(5) and RAW_MODEL_JSON
+    )
+    app.extensions["job_runner"] = JobRunner(max_workers=1, max_pending=1)
+
+    first = client.post("/v2/jobs/generate", json=BODY, headers=AUTH)
+    second = client.post("/v2/jobs/generate", json=BODY, headers=AUTH)
+    release.set()
+
+    assert second.status_code == 503
+    assert "job_id" not in second.get_json()
+    assert redis_client.keys("t2p:job:*") == [
+        f"t2p:job:{first.get_json()['job_id']}".encode()
+    ]
+
+
+def test_memory_store_drops_expired_jobs(app):
+    app.config["JOBS_TTL_SECONDS"] = 60
+    with app.app_context():
+        store = JobStore()
+        stale = store.create("bpmn", "Bearer secret-token")
+        with patch("app.backend.jobs.time.time", return_value=time.time() + 61):
+            fresh = store.create("bpmn", "Bearer secret-token")
+
+            assert stale not in JobStore._memory
+            assert store.get(fresh, "Bearer secret-token")["status"] == "queued"
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_job_state_lives_in_redis_without_credentials(mock_cc, app, client):
+    redis_client = fakeredis.FakeRedis()
+    app.config["REDIS_ENABLED"] = True
+    app.extensions["redis"] = redis_client
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+
+    resp = client.post("/v2/jobs/generate", json=BODY, headers=AUTH)
+    job_id = resp.get_json()["job_id"]
+    _wait_for_job(client, resp.headers["Location"])
+
+    stored = redis_client.hgetall(f"t2p:job:{job_id}")
+    assert stored[b"status"] == b"succeeded"
+    assert 0 < redis_client.ttl(f"t2p:job:{job_id}") <= app.config["JOBS_TTL_SECONDS"]
+    assert not any(b"secret-token" in value for value in stored.values())
@@ -0,0 +1,120 @@
+import random
+
+import numpy as np
+
+from app.backend.layout import _inversions, sugiyama_layout
+from app.backend.xml_parser import _layered_layout
+
+TASK = {"w": 100, "h": 80}
+GATEWAY = {"w": 50, "h": 50}
+
+
+def _flows(*edges):
+    return [{"source": src, "target": tgt} for src, tgt in edges]
+
+
+def _crossings(positions, flows):
+    """Count crossings of the straight edges the BPMN writer draws."""
+    segments = []
+    for flow in flows:
+        src, tgt = positions[flow["source"]], positions[flow["target"]]
+        segments.append(
+            (
+                (src["x"] + src["w"], src["y"] + src["h"] / 2),
+                (tgt["x"], tgt["y"] + tgt["h"] / 2),
+            )
+        )
+
+    def _side(a, b, c):
+        return (c[1] - a[1]) * (b[0] - a[0]) - (b[1] - a[1]) * (c[0] - a[0])
+
+    count = 0
+    for i, (a, b) in enumerate(segments):
+        for c, d in segments[i + 1 :]:
+            if len({a, b, c, d}) == 4 and (
+                _side(a, c, d) * _side(b, c, d) < 0
+                and _side(a, b, c) * _side(a, b, d) < 0
+            ):
+                count += 1
+    return count
+
+
+def test_empty_model_has_no_positions():
+    assert sugiyama_layout({}, []) == {}
+
+
+def test_inversions_match_brute_force():
+    rng = np.random.default_rng(7)
+    for size in (0, 1, 2, 5, 33, 100):
+        values = rng.integers(0, 10, size)
+        expected = sum(
+            values[i] > values[j] for i in range(size) for j in range(i + 1, size)
+        )
+        assert _inversions(values) == expected
+
+
+def test_chain_is_laid_out_on_one_line():
+    nodes = {node: TASK for node in "abcd"}
+
+    positions = sugiyama_layout(nodes, _flows(("a", "b"), ("b", "c"), ("c", "d")))
+
+    assert [positions[node]["x"] for node in "abcd"] == [50, 230, 410, 590]
+    assert {positions[node]["y"] for node in "abcd"} == {50}
+
+
+def test_loop_stays_in_line_with_the_process():
+    """A rework loop is drawn backwards, not moved past the end of the process."""
+    nodes = {"start": TASK, "review": TASK, "rework": TASK, "end": TASK}
+    flows = _flows(
+        ("start", "review"),
+        ("review", "rework"),
+        ("rework", "review"),
+        ("review", "end"),
+    )
+
+    positions = sugiyama_layout(nodes, flows)
+
+    assert positions["start"]["x"] < positions["review"]["x"]
+    assert positions["review"]["x"] < positions["rework"]["x"]
+    assert positions["review"]["x"] < positions["end"]["x"]
+
+
+def test_nodes_sharing_a_column_do_not_overlap():
+    rng = random.Random(3)
+    for _ in range(50):
+        ids = [f"n{i}" for i in range(rng.randint(2, 30))]
+        nodes = {node: rng.choice([TASK, GATEWAY]) for node in ids}
+        flows = _flows(
+            *((rng.choice(ids), rng.choice(ids)) for _ in range(2 * len(ids)))
+        )
+
+        positions = sugiyama_layout(nodes, flows, v_gap=50)
+
+        assert set(positions) == set(ids)
+        assert min(pos["y"] for pos in positions.values()) == 50
+        columns = {}
+        for pos in positions.values():
+            columns.setdefault(pos["x"] + pos["w"] // 2, []).append(pos)
+        for column in columns.values():
+            column.sort(key=lambda pos: pos["y"])
+            for above, below in zip(column, column[1:]):
+                assert below["y"] - (above["y"] + above["h"]) >= 49
+
+
+def test_fewer_crossings_than_the_layered_layout():
+    """Two fan-outs whose targets are listed in opposite orders."""
+    nodes = {node: TASK for node in ("s", "a", "b", "c", "x", "y", "z")}
+    flows = _flows(
+        ("s", "a"),
+        ("s", "b"),
+        ("s", "c"),
+        ("a", "z"),
+        ("b", "y"),
+        ("c", "x"),
+    )
+
+    sugiyama = sugiyama_layout(nodes, flows)
+    layered = _layered_layout(nodes, flows)
+
+    assert _crossings(sugiyama, flows) == 0
+    assert _crossings(layered, flows) > 0
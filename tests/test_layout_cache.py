@@ -0,0 +1,178 @@
+from collections import OrderedDict
+from unittest.mock import MagicMock
+
+import fakeredis
+import pytest
+from prometheus_client import REGISTRY
+
+from app import create_app
+from app.backend.layout_cache import LayoutCache, cached_layout, layout_key
+from app.backend.xml_parser import (
+    PnmlDocument,
+    _layered_layout,
+    assign_pnml_coordinates,
+    json_to_bpmn,
+)
+
+TASK = {"w": 100, "h": 80}
+PARAMS = {"h_gap": 80, "v_gap": 50, "x_offset": 50, "y_offset": 50}
+
+
+def _model(prefix, names):
+    """A start event, tasks ``<prefix>1..`` in a chain, and an end event."""
+    ids = [f"{prefix}{i}" for i in range(1, len(names) + 1)]
+    chain = ["start"] + ids + ["end"]
+    return {
+        "events": [
+            {"id": "start", "type": "Start", "name": "Start"},
+            {"id": "end", "type": "End", "name": "End"},
+        ],
+        "tasks": [
+            {"id": tid, "type": "UserTask", "name": name}
+            for tid, name in zip(ids, names)
+        ],
+        "gateways": [],
+        "flows": [
+            {"id": f"f{i}", "source": src, "target": tgt}
+            for i, (src, tgt) in enumerate(zip(chain, chain[1:]))
+        ],
+    }
+
+
+def _count(metric, cache):
+    return REGISTRY.get_sample_value(metric, {"cache": cache}) or 0
+
+
+@pytest.fixture
+def app(monkeypatch):
+    # The in-process tier is shared; start every test from a cold cache.
+    monkeypatch.setattr(LayoutCache, "_entries", OrderedDict())
+    app = create_app("testing")
+    app.config["LAYOUT_CACHE_MAX_ENTRIES"] = 8
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def redis_client(app):
+    client = fakeredis.FakeRedis()
+    app.config["REDIS_ENABLED"] = True
+    app.config["LAYOUT_CACHE_REDIS_ENABLED"] = True
+    app.extensions["redis"] = client
+    return client
+
+
+def test_key_ignores_names_but_not_topology_or_parameters():
+    nodes = {"a": TASK, "b": TASK, "c": TASK}
+    renamed = {"x": TASK, "y": TASK, "z": TASK}
+    flows = [{"source": "a", "target": "b"}, {"source": "b", "target": "c"}]
+    renamed_flows = [
+        {"source": "x", "target": "y"},
+        {"source": "y", "target": "z"},
+    ]
+    key = layout_key("layered", nodes, flows, PARAMS)
+
+    assert key == layout_key("layered", renamed, renamed_flows, PARAMS)
+    assert key != layout_key("sugiyama", nodes, flows, PARAMS)
+    assert key != layout_key("layered", nodes, flows[:1], PARAMS)
+    assert key != layout_key("layered", nodes, flows, {**PARAMS, "v_gap": 10})
+    assert key != layout_key(
+        "layered", {"a": TASK, "b": TASK, "c": {"w": 50, "h": 50}}, flows, PARAMS
+    )
+    # Columns are sorted by id, so the order of the ids matters.
+    reordered = {"c": TASK, "b": TASK, "a": TASK}
+    assert key != layout_key("layered", reordered, flows, PARAMS)
+
+
+def test_models_differing_only_in_labels_share_a_layout(app):
+    first = _model("task", ["Check order", "Ship order"])
+    second = _model("step", ["Prüfen", "Versenden"])
+    app.config["LAYOUT_CACHE_MAX_ENTRIES"] = 0
+    expected = json_to_bpmn(second)
+    app.config["LAYOUT_CACHE_MAX_ENTRIES"] = 8
+    hits = _count("t2p_cache_hits_total", "layout_local")
+
+    json_to_bpmn(first)
+    cached = json_to_bpmn(second)
+
+    assert _count("t2p_cache_hits_total", "layout_local") == hits + 1
+    assert cached == expected
+
+
+def test_cached_positions_match_the_engine(app):
+    nodes = {"b": TASK, "a": {"w": 36, "h": 36}, "c": TASK}
+    flows = [{"source": "a", "target": "b"}, {"source": "a", "target": "c"}]
+    engine = MagicMock(wraps=_layered_layout)
+
+    computed = cached_layout("layered", engine, nodes, flows, **PARAMS)
+    cached = cached_layout("layered", engine, nodes, flows, **PARAMS)
+
+    engine.assert_called_once()
+    assert cached == computed
+
+
+def test_least_recently_used_layouts_are_evicted(app):
+    app.config["LAYOUT_CACHE_MAX_ENTRIES"] = 2
+    engine = MagicMock(wraps=_layered_layout)
+
+    def _layout(size):
+        nodes = {f"n{i}": TASK for i in range(size)}
+        return cached_layout("layered", engine, nodes, [], **PARAMS)
+
+    _layout(1)
+    _layout(2)
+    _layout(1)
+    _layout(3)  # evicts 2, the least recently used
+    _layout(1)
+    assert engine.call_count == 3
+    _layout(2)
+    assert engine.call_count == 4
+
+
+def test_disabled_cache_always_runs_the_engine(app):
+    app.config["LAYOUT_CACHE_MAX_ENTRIES"] = 0
+    engine = MagicMock(wraps=_layered_layout)
+
+    for _ in range(2):
+        cached_layout("layered", engine, {"a": TASK}, [], **PARAMS)
+
+    assert engine.call_count == 2
+    assert not LayoutCache._entries
+
+
+def test_layouts_are_shared_through_redis(app, redis_client, monkeypatch):
+    engine = MagicMock(wraps=_layered_layout)
+    nodes = {"a": TASK, "b": TASK}
+    flows = [{"source": "a", "target": "b"}]
+    computed = cached_layout("layered", engine, nodes, flows, **PARAMS)
+    hits = _count("t2p_cache_hits_total", "layout")
+
+    # Another worker starts with an empty in-process tier.
+    monkeypatch.setattr(LayoutCache, "_entries", OrderedDict())
+    cached = cached_layout("layered", engine, nodes, flows, **PARAMS)
+
+    assert cached == computed
+    engine.assert_called_once()
+    assert _count("t2p_cache_hits_total", "layout") == hits + 1
+    assert redis_client.zcard("t2p:layout:lru") == 1
+
+
+def test_second_pnml_layout_of_an_unchanged_net_is_a_hit(app):
+    pnml = (
+        "<pnml><net id='n1'>"
+        "<place id='p1'/><transition id='t1'/><place id='p2'/>"
+        "<arc id='a1' source='p1' target='t1'/>"
+        "<arc id='a2' source='t1' target='p2'/>"
+        "</net></pnml>"
+    )
+    app.config["LAYOUT_CACHE_MAX_ENTRIES"] = 0
+    expected = assign_pnml_coordinates(pnml)
+    app.config["LAYOUT_CACHE_MAX_ENTRIES"] = 8
+    document = PnmlDocument.parse(pnml)
+    hits = _count("t2p_cache_hits_total", "layout_local")
+
+    document.assign_coordinates()
+    document.assign_coordinates()
+
+    assert _count("t2p_cache_hits_total", "layout_local") == hits + 1
+    assert document.to_string() == expected
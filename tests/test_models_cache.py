@@ -0,0 +1,195 @@
+import threading
+import time
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+
+from app import create_app
+from app.backend.connector_client import ConnectorError
+from app.backend.models_cache import ModelsCache, ModelsEntry
+
+MODELS = [{"provider": "openai", "model": "gpt-4o"}]
+NEW_MODELS = MODELS + [{"provider": "anthropic", "model": "claude"}]
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+
+@pytest.fixture
+def app(redis_client, monkeypatch):
+    # The L1 entry is process-wide; start every test from a cold cache.
+    monkeypatch.setattr(ModelsCache, "_l1", None)
+    monkeypatch.setattr(ModelsCache, "_refreshing", False)
+    app = create_app("testing")
+    app.config["REDIS_ENABLED"] = True
+    app.config["MODELS_CACHE_TTL_SECONDS"] = 60
+    app.config["MODELS_CACHE_STALE_SECONDS"] = 600
+    app.extensions["redis"] = redis_client
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def _age_cache(redis_client, seconds):
+    """Pretend the cached entry was fetched *seconds* earlier."""
+    entry = ModelsCache._l1
+    aged = ModelsEntry(entry.models, entry.fetched_at - seconds, entry.etag)
+    ModelsCache._l1 = aged
+    redis_client.set("t2p:models", aged.to_json())
+
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return
+        time.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_models_are_fetched_once_within_ttl(mock_cc, client):
+    mock_cc.return_value.list_models.return_value = MODELS
+
+    first = client.get("/v2/models")
+    second = client.get("/v2/models")
+
+    assert first.get_json() == second.get_json() == {"models": MODELS}
+    mock_cc.return_value.list_models.assert_called_once()
+    assert first.headers["ETag"] == second.headers["ETag"]
+    assert "public" in first.headers["Cache-Control"]
+    assert 0 < first.cache_control.max_age <= 60
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_matching_if_none_match_returns_304(mock_cc, client):
+    mock_cc.return_value.list_models.return_value = MODELS
+    etag = client.get("/v2/models").headers["ETag"]
+
+    resp = client.get("/v2/models", headers={"If-None-Match": etag})
+
+    assert resp.status_code == 304
+    assert resp.data == b""
+    assert resp.headers["ETag"] == etag
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_entry_is_shared_through_redis(mock_cc, client, redis_client):
+    mock_cc.return_value.list_models.return_value = MODELS
+    client.get("/v2/models")
+
+    # Another worker starts with an empty L1 but finds the Redis entry.
+    ModelsCache._l1 = None
+    resp = client.get("/v2/models")
+
+    assert resp.get_json() == {"models": MODELS}
+    mock_cc.return_value.list_models.assert_called_once()
+    assert 0 < redis_client.ttl("t2p:models") <= 660
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_stale_entry_is_served_while_refreshing(mock_cc, client, redis_client):
+    mock_cc.return_value.list_models.return_value = MODELS
+    old_etag = client.get("/v2/models").headers["ETag"]
+    _age_cache(redis_client, 120)
+    release = threading.Event()
+    mock_cc.return_value.list_models.side_effect = lambda: (
+        release.wait(5) and NEW_MODELS
+    )
+
+    stale = client.get("/v2/models")
+    release.set()
+
+    assert stale.get_json() == {"models": MODELS}
+    assert stale.cache_control.max_age == 0
+    _wait_for(lambda: ModelsCache._l1.models == NEW_MODELS)
+    fresh = client.get("/v2/models")
+    assert fresh.get_json() == {"models": NEW_MODELS}
+    assert fresh.headers["ETag"] != old_etag
+    assert mock_cc.return_value.list_models.call_count == 2
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_only_one_worker_refreshes(mock_cc, client, redis_client):
+    mock_cc.return_value.list_models.return_value = MODELS
+    client.get("/v2/models")
+    _age_cache(redis_client, 120)
+    redis_client.set("t2p:models:refresh", "1")  # held by another worker
+
+    client.get("/v2/models")
+    client.get("/v2/models")
+
+    mock_cc.return_value.list_models.assert_called_once()
+    assert ModelsCache._refreshing is False
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_failed_background_refresh_keeps_stale_entry(mock_cc, client, redis_client):
+    mock_cc.return_value.list_models.return_value = MODELS
+    client.get("/v2/models")
+    _age_cache(redis_client, 120)
+    mock_cc.return_value.list_models.side_effect = ConnectorError("down")
+
+    resp = client.get("/v2/models")
+    _wait_for(lambda: ModelsCache._refreshing is False)
+
+    assert resp.status_code == 200
+    assert resp.get_json() == {"models": MODELS}
+    assert redis_client.get("t2p:models:refresh") is None
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_expired_entry_is_served_when_connector_fails(mock_cc, client, redis_client):
+    mock_cc.return_value.list_models.return_value = MODELS
+    client.get("/v2/models")
+    _age_cache(redis_client, 3600)
+    mock_cc.return_value.list_models.side_effect = ConnectorError("down")
+
+    resp = client.get("/v2/models")
+
+    assert resp.status_code == 200
+    assert resp.get_json() == {"models": MODELS}
+    assert resp.cache_control.max_age == 0
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_cold_cache_failure_still_returns_500(mock_cc, client):
+    mock_cc.return_value.list_models.side_effect = ConnectorError("down")
+
+    resp = client.get("/v2/models")
+
+    assert resp.status_code == 500
+    assert resp.get_json()["error"]["code"] == "upstream_error"
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_zero_ttl_disables_cache(mock_cc, app, client):
+    app.config["MODELS_CACHE_TTL_SECONDS"] = 0
+    mock_cc.return_value.list_models.return_value = MODELS
+
+    first = client.get("/v2/models")
+    client.get("/v2/models")
+
+    assert mock_cc.return_value.list_models.call_count == 2
+    assert first.cache_control.max_age == 0
+    assert ModelsCache._l1 is None
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_cache_hits_and_misses_are_counted(mock_cc, app, client):
+    mock_cc.return_value.list_models.return_value = MODELS
+    hits = app.extensions["metrics"]["CACHE_HITS"].labels(cache="models")
+    misses = app.extensions["metrics"]["CACHE_MISSES"].labels(cache="models")
+    hits_before, misses_before = hits._value.get(), misses._value.get()
+
+    client.get("/v2/models")
+    client.get("/v2/models")
+
+    assert misses._value.get() == misses_before + 1
+    assert hits._value.get() == hits_before + 1
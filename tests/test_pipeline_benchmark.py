@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from app import create_app
+from app.backend.bpmn_builder import raw_response_to_bpmn
+from app.backend.xml_parser import validate_pnml_connectivity
+from benchmarks.pipeline import (
+    format_report,
+    parse_server_timing,
+    percentile,
+    run_benchmark,
+    save_results,
+)
+from tests.stubs import bpmn_to_pnml, build_raw_response
+
+
+@pytest.fixture
+def app():
+    return create_app("testing")
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([7], 95) == 7
+    assert percentile([], 50) is None
+
+
+def test_parse_server_timing():
+    header = 'connector;dur=12.5, pnml_layout;desc="x";dur=0.4, cache'
+
+    assert parse_server_timing(header) == {"connector": 12.5, "pnml_layout": 0.4}
+    assert parse_server_timing(None) == {}
+
+
+@pytest.mark.parametrize("tasks", [1, 12])
+def test_stub_models_translate_to_connected_pnml(tasks):
+    bpmn = raw_response_to_bpmn(build_raw_response("atm withdrawal", tasks))
+
+    validate_pnml_connectivity(bpmn_to_pnml(bpmn))
+
+
+def test_run_benchmark_reports_latency_and_stages(app, tmp_path):
+    connector_url = app.config["T2P_LLM_API_CONNECTOR_URL"]
+
+    results = run_benchmark(
+        app, requests_per_target=6, concurrency=2, tasks=6, warmup=1, drop_every=3
+    )
+
+    for target in ("bpmn", "pnml"):
+        data = results["targets"][target]
+        assert data["errors"] == {}
+        assert data["latency_ms"]["count"] == 6
+        assert data["latency_ms"]["p50"] <= data["latency_ms"]["p99"]
+        assert data["throughput_rps"] > 0
+    assert set(results["targets"]["bpmn"]["stages_ms"]) == {
+        "connector",
+        "bpmn_build",
+        "total",
+    }
+    assert results["targets"]["pnml"]["stages_ms"]["pnml_repair"]["count"] == 6
+
+    # The app is restored once the run is over.
+    assert app.config["T2P_LLM_API_CONNECTOR_URL"] == connector_url
+    assert app.config["GENERATE_CACHE_ENABLED"] is False
+
+    path = save_results(results, tmp_path / "bench.json")
+    report = format_report(results, json.loads(path.read_text()))
+    assert "/v2/generate/pnml" in report
+    assert "(+0.0%)" in report
@@ -0,0 +1,314 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+
+from app import create_app
+from app.backend.singleflight import SingleFlight
+from tests.sample_models import RAW_MODEL_JSON
+
+AUTH = {"Authorization": "Bearer secret-token"}
+BODY = {"text": "describe a process", "provider": "openai", "model": "gpt-4o"}
+LOCK_KEY = "t2p:inflight:unit:k"
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.config["SINGLE_FLIGHT_ENABLED"] = True
+    app.config["SINGLE_FLIGHT_TIMEOUT_SECONDS"] = 5
+    return app
+
+
+@pytest.fixture
+def redis_client(app):
+    client = fakeredis.FakeRedis()
+    app.config["REDIS_ENABLED"] = True
+    app.extensions["redis"] = client
+    return client
+
+
+def _in_threads(app, count, target):
+    results = [None] * count
+
+    def _run(index):
+        with app.app_context():
+            results[index] = target()
+
+    threads = [threading.Thread(target=_run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def _join(threads):
+    for thread in threads:
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+
+
+def _wait_until(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+# --- within one process ------------------------------------------------------
+
+
+def test_concurrent_identical_calls_run_once(app):
+    release = threading.Event()
+    calls = []
+
+    def _work():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    threads, results = _in_threads(app, 8, lambda: SingleFlight("unit").do("k", _work))
+    _wait_until(lambda: len(calls) == 1)
+    time.sleep(0.05)
+    release.set()
+    _join(threads)
+
+    assert calls == [1]
+    assert results == ["result"] * 8
+
+
+def test_different_keys_are_not_coalesced(app):
+    with app.app_context():
+        flight = SingleFlight("unit")
+        assert flight.do("a", lambda: "a") == "a"
+        assert flight.do("b", lambda: "b") == "b"
+
+
+def test_failed_leader_is_not_shared(app):
+    release = threading.Event()
+    calls = []
+
+    def _work():
+        calls.append(threading.current_thread().name)
+        if len(calls) == 1:
+            release.wait(5)
+            raise RuntimeError("leader failed")
+        return "own result"
+
+    def _call():
+        try:
+            return SingleFlight("unit").do("k", _work)
+        except RuntimeError as e:
+            return str(e)
+
+    threads, results = _in_threads(app, 3, _call)
+    _wait_until(lambda: len(calls) == 1)
+    time.sleep(0.05)
+    release.set()
+    _join(threads)
+
+    assert sorted(results) == ["leader failed", "own result", "own result"]
+    assert len(calls) == 3
+
+
+def test_disabled_single_flight_calls_through(app):
+    app.config["SINGLE_FLIGHT_ENABLED"] = False
+    with app.app_context():
+        assert SingleFlight("unit").do("k", lambda: "direct") == "direct"
+
+
+# --- asyncio serving mode ----------------------------------------------------
+
+
+def test_concurrent_coroutines_share_one_call(app):
+    calls = []
+
+    async def _work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def _run():
+        with app.app_context():
+            flight = SingleFlight("unit")
+            return await asyncio.gather(
+                *(flight.do_async("k", _work) for _ in range(5))
+            )
+
+    assert asyncio.run(_run()) == ["result"] * 5
+    assert len(calls) == 1
+    assert SingleFlight._async_calls == {}
+
+
+def test_failed_async_leader_is_not_shared(app):
+    outcomes = iter([RuntimeError("leader failed"), "follower result"])
+
+    async def _work():
+        await asyncio.sleep(0.05)
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def _run():
+        with app.app_context():
+            flight = SingleFlight("unit")
+            return await asyncio.gather(
+                flight.do_async("k", _work),
+                flight.do_async("k", _work),
+                return_exceptions=True,
+            )
+
+    leader, follower = asyncio.run(_run())
+    assert isinstance(leader, RuntimeError)
+    assert follower == "follower result"
+
+
+# --- across workers ----------------------------------------------------------
+
+
+def test_leader_publishes_result_and_releases_lock(app, redis_client):
+    with app.app_context():
+        assert SingleFlight("unit").do("k", lambda: "result") == "result"
+
+    assert redis_client.get(f"{LOCK_KEY}:result") == b"result"
+    assert 0 < redis_client.ttl(f"{LOCK_KEY}:result") <= 30
+    assert not redis_client.exists(LOCK_KEY)
+
+
+def test_follower_receives_result_of_other_worker(app, redis_client):
+    # Another worker holds the lock and is running the call.
+    redis_client.set(LOCK_KEY, "other-worker", px=5000)
+    calls = []
+
+    threads, results = _in_threads(
+        app, 1, lambda: SingleFlight("unit").do("k", lambda: calls.append(1))
+    )
+    _wait_until(lambda: redis_client.pubsub_numsub(LOCK_KEY)[0][1] == 1)
+    redis_client.set(f"{LOCK_KEY}:result", "remote result", ex=30)
+    redis_client.publish(LOCK_KEY, "done")
+    _join(threads)
+
+    assert results == ["remote result"]
+    assert calls == []
+    # The other worker's lock is left alone.
+    assert redis_client.get(LOCK_KEY) == b"other-worker"
+
+
+def test_follower_runs_itself_when_other_worker_fails(app, redis_client):
+    redis_client.set(LOCK_KEY, "other-worker", px=5000)
+
+    threads, results = _in_threads(
+        app, 1, lambda: SingleFlight("unit").do("k", lambda: "own result")
+    )
+    _wait_until(lambda: redis_client.pubsub_numsub(LOCK_KEY)[0][1] == 1)
+    redis_client.publish(LOCK_KEY, "failed")
+    _join(threads)
+
+    assert results == ["own result"]
+
+
+def test_follower_runs_itself_when_lock_expires(app, redis_client):
+    redis_client.set(LOCK_KEY, "crashed-worker", px=50)
+
+    with app.app_context():
+        assert SingleFlight("unit").do("k", lambda: "own result") == "own result"
+
+
+def test_unavailable_redis_degrades_to_local_coalescing(app):
+    server = fakeredis.FakeServer()
+    server.connected = False
+    app.extensions["redis"] = fakeredis.FakeRedis(server=server)
+
+    with app.app_context():
+        assert SingleFlight("unit").do("k", lambda: "own result") == "own result"
+
+
+# --- /v2/generate ------------------------------------------------------------
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_identical_concurrent_requests_share_one_connector_call(mock_cc, app):
+    release = threading.Event()
+    mock_cc.return_value.generate.side_effect = lambda **kwargs: (
+        release.wait(5) and RAW_MODEL_JSON
+    )
+
+    responses = [None] * 4
+
+    def _post(index):
+        responses[index] = app.test_client().post(
+            "/v2/generate/bpmn", json=BODY, headers=AUTH
+        )
+
+    threads = [threading.Thread(target=_post, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    _wait_until(lambda: mock_cc.return_value.generate.call_count == 1)
+    time.sleep(0.05)
+    release.set()
+    _join(threads)
+
+    assert mock_cc.return_value.generate.call_count == 1
+    assert [r.status_code for r in responses] == [200] * 4
+    assert len({r.get_data() for r in responses}) == 1
+    followers = [r for r in responses if "coalesced_wait" in r.headers["Server-Timing"]]
+    assert len(followers) == 3
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_requests_with_other_credentials_are_not_coalesced(mock_cc, app):
+    # A follower with a bogus key must not receive the leader's result.
+    release = threading.Event()
+    mock_cc.return_value.generate.side_effect = lambda **kwargs: (
+        release.wait(5) and RAW_MODEL_JSON
+    )
+    headers = [AUTH, {"Authorization": "Bearer bogus"}]
+    responses = [None] * 2
+
+    def _post(index):
+        responses[index] = app.test_client().post(
+            "/v2/generate/bpmn", json=BODY, headers=headers[index]
+        )
+
+    threads = [threading.Thread(target=_post, args=(i,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    _wait_until(lambda: mock_cc.return_value.generate.call_count == 2)
+    release.set()
+    _join(threads)
+
+    credentials = {
+        call.kwargs["authorization"]
+        for call in mock_cc.return_value.generate.call_args_list
+    }
+    assert credentials == {"Bearer secret-token", "Bearer bogus"}
+    assert not any("coalesced_wait" in r.headers["Server-Timing"] for r in responses)
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_unauthenticated_requests_are_not_coalesced(mock_cc, app):
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+
+    with patch("app.api.routes.SingleFlight") as mock_flight:
+        app.test_client().post("/v2/generate/bpmn", json=BODY)
+
+    mock_flight.assert_not_called()
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_requests_succeed_while_redis_is_down(mock_cc, app):
+    # The default configuration enables single-flight; with Redis unreachable
+    # requests must go through uncoalesced, not fail.
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+    server = fakeredis.FakeServer()
+    server.connected = False
+    app.config["REDIS_ENABLED"] = True
+    app.extensions["redis"] = fakeredis.FakeRedis(server=server)
+
+    response = app.test_client().post("/v2/generate/bpmn", json=BODY, headers=AUTH)
+
+    assert response.status_code == 200
+    mock_cc.return_value.generate.assert_called_once()
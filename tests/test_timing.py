@@ -0,0 +1,188 @@
+import uuid
+from unittest.mock import patch
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app import create_app
+from app.backend.admission import OverloadedError
+from app.backend.circuit_breaker import CircuitOpenError
+from app.backend.connector_client import ConnectorClientError, ConnectorError
+from app.backend.timing import emit, stage, track_pipeline
+from tests.sample_models import RAW_MODEL_JSON
+
+AUTH = {"Authorization": "Bearer secret-token"}
+BODY = {"text": "describe a process", "provider": "openai", "model": "gpt-4o"}
+
+
+@pytest.fixture
+def app():
+    return create_app("testing")
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def _stage_count(stage_name, provider, model, target):
+    value = REGISTRY.get_sample_value(
+        "t2p_pipeline_stage_duration_seconds_count",
+        {"stage": stage_name, "provider": provider, "model": model, "target": target},
+    )
+    return value or 0
+
+
+def _server_timing(response):
+    return [
+        entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")
+    ]
+
+
+def test_stages_are_summed_per_name(app):
+    with app.app_context():
+        with track_pipeline() as timings:
+            with stage("layout"):
+                pass
+            with stage("repair"):
+                pass
+            with stage("layout"):
+                pass
+
+    assert list(timings.stages) == ["layout", "repair"]
+    assert timings.total >= sum(timings.stages.values())
+    assert timings.server_timing().startswith("layout;dur=")
+    assert timings.server_timing().endswith(f"total;dur={timings.total * 1000:.1f}")
+
+
+def test_stage_outside_pipeline_is_a_noop():
+    with stage("connector"):
+        pass
+
+
+def test_listener_receives_stage_and_emitted_events(app):
+    events = []
+    with app.app_context():
+        with track_pipeline(lambda event, data: events.append((event, data))):
+            with stage("connector"):
+                emit("bpmn", result="<definitions/>")
+
+    assert events[0] == ("stage", {"stage": "connector", "state": "started"})
+    assert events[1] == ("bpmn", {"result": "<definitions/>"})
+    assert events[2][1]["state"] == "finished"
+    assert events[2][1]["duration_ms"] >= 0
+
+
+def test_emit_outside_pipeline_is_a_noop():
+    emit("bpmn", result="<definitions/>")
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_bpmn_response_carries_server_timing(mock_cc, app, client):
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+    before = _stage_count("connector", "openai", "gpt-4o", "bpmn")
+
+    resp = client.post("/v2/generate/bpmn", json=BODY, headers=AUTH)
+
+    assert resp.status_code == 200
+    assert _server_timing(resp) == ["connector", "bpmn_build", "total"]
+    assert resp.headers["Timing-Allow-Origin"] == "*"
+    assert _stage_count("connector", "openai", "gpt-4o", "bpmn") == before + 1
+
+
+@patch("app.api.routes.ModelTransformer")
+@patch("app.api.routes.ConnectorClient")
+def test_pnml_response_breaks_down_every_stage(mock_cc, mock_mt, client):
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+    mock_mt.return_value.transform.return_value = (
+        "<pnml><net><place id='p1'/><transition id='start'/><place id='p2'/>"
+        "<arc id='a1' source='p1' target='start'/>"
+        "<arc id='a2' source='start' target='p2'/></net></pnml>"
+    )
+    before = _stage_count("pnml_layout", "openai", "gpt-4o", "pnml")
+
+    resp = client.post("/v2/generate/pnml", json=BODY, headers=AUTH)
+
+    assert resp.status_code == 200
+    assert _server_timing(resp) == [
+        "connector",
+        "bpmn_build",
+        "sanitize",
+        "transformer",
+        "pnml_layout",
+        "pnml_repair",
+        "pnml_validate",
+        "total",
+    ]
+    # Both layout passes count towards one observation per request.
+    assert _stage_count("pnml_layout", "openai", "gpt-4o", "pnml") == before + 1
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_rejected_request_keeps_client_input_out_of_labels(mock_cc, client):
+    mock_cc.return_value.generate.side_effect = ConnectorClientError(
+        400, {"error": {"code": "invalid_provider", "message": "Unknown provider."}}
+    )
+    before = _stage_count("connector", "unknown", "unknown", "bpmn")
+
+    resp = client.post(
+        "/v2/generate/bpmn",
+        json={**BODY, "provider": "made-up", "model": "anything"},
+        headers=AUTH,
+    )
+
+    assert resp.status_code == 400
+    assert "connector;dur=" in resp.headers["Server-Timing"]
+    assert _stage_count("connector", "unknown", "unknown", "bpmn") == before + 1
+    assert _stage_count("connector", "made-up", "anything", "bpmn") == 0
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        ConnectorError("connector returned 502"),
+        CircuitOpenError("connector", retry_after=5),
+        OverloadedError("Too many requests.", retry_after=1),
+    ],
+)
+@patch("app.api.routes.ConnectorClient")
+def test_failed_request_keeps_client_input_out_of_labels(mock_cc, client, error):
+    mock_cc.return_value.generate.side_effect = error
+    provider = f"provider-{uuid.uuid4().hex}"
+    before = _stage_count("connector", "unknown", "unknown", "bpmn")
+
+    resp = client.post(
+        "/v2/generate/bpmn", json={**BODY, "provider": provider}, headers=AUTH
+    )
+
+    assert resp.status_code in (500, 503)
+    assert _stage_count("connector", "unknown", "unknown", "bpmn") == before + 1
+    assert not any(
+        provider in sample.labels.values()
+        for metric in REGISTRY.collect()
+        for sample in metric.samples
+    )
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_server_timing_can_be_disabled(mock_cc, app, client):
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+    app.config["SERVER_TIMING_ENABLED"] = False
+
+    resp = client.post("/v2/generate/bpmn", json=BODY, headers=AUTH)
+
+    assert "Server-Timing" not in resp.headers
+
+
+def test_cors_exposes_server_timing(client):
+    resp = client.options(
+        "/v2/generate/bpmn",
+        headers={
+            "Origin": "https://woped.example",
+            "Access-Control-Request-Method": "POST",
+        },
+    )
+    get = client.get("/v2/health", headers={"Origin": "https://woped.example"})
+
+    assert resp.status_code == 200
+    assert "Server-Timing" in get.headers.get("Access-Control-Expose-Headers", "")
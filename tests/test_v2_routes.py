@@ -1,5 +1,14 @@
-from unittest.mock import patch
+import json
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
 from app.backend.connector_client import ConnectorError, ConnectorClientError
+from app.backend.jobs import JobRunner
+from app.backend.layout import sugiyama_layout
+from app.backend.xml_parser import LAYOUTS
 from tests.sample_models import RAW_MODEL_JSON
 
 
@@ -256,6 +265,51 @@ def test_v2_generate_invalid_model_returns_500(mock_cc, client):
     assert resp.get_json()["error"]["code"] == "invalid_model"
 
 
+@patch("app.api.routes.ConnectorClient")
+def test_v2_generate_malformed_model_returns_invalid_model(mock_cc, client):
+    # Valid JSON in the wrong shape (an empty task type) is caught by the
+    # validator instead of failing inside the BPMN writer.
+    mock_cc.return_value.generate.return_value = json.dumps(
+        {
+            "events": [],
+            "tasks": [{"id": "t1", "type": "", "name": "Check"}],
+            "gateways": [],
+            "flows": [],
+        }
+    )
+
+    resp = client.post("/v2/generate/bpmn", json=BODY, headers=AUTH)
+
+    assert resp.status_code == 500
+    assert resp.get_json()["error"]["code"] == "invalid_model"
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_v2_generate_bpmn_uses_the_requested_layout(mock_cc, client):
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+    engine = MagicMock(wraps=sugiyama_layout)
+
+    with patch.dict(LAYOUTS, {"sugiyama": engine}):
+        resp = client.post(
+            "/v2/generate/bpmn", json={**BODY, "layout": "sugiyama"}, headers=AUTH
+        )
+
+    assert resp.status_code == 200
+    assert "<definitions" in resp.get_json()["result"]
+    engine.assert_called_once()
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_v2_generate_unknown_layout_returns_400(mock_cc, client):
+    resp = client.post(
+        "/v2/generate/bpmn", json={**BODY, "layout": "circular"}, headers=AUTH
+    )
+
+    assert resp.status_code == 400
+    assert resp.get_json()["error"]["code"] == "invalid_request"
+    mock_cc.return_value.generate.assert_not_called()
+
+
 # --- /v2/models -----------------------------------------------------------
 
 
@@ -370,7 +424,7 @@ def test_legacy_pnml_uses_new_flow_and_preserves_response(mock_cc, mock_mt, clie
 # --- PNML connectivity validation -----------------------------------------
 
 
-@patch("app.api.routes.validate_pnml_connectivity")
+@patch("app.api.routes.PnmlDocument.validate_connectivity")
 @patch("app.api.routes.ModelTransformer")
 @patch("app.api.routes.ConnectorClient")
 def test_v2_generate_pnml_runs_connectivity_validation(mock_cc, mock_mt, mock_validate, client):
@@ -384,14 +438,13 @@ def test_v2_generate_pnml_runs_connectivity_validation(mock_cc, mock_mt, mock_va
     mock_validate.assert_called_once()
 
 
-@patch("app.api.routes.repair_pnml_connectivity_from_bpmn")
+@patch("app.api.routes.PnmlDocument.repair_connectivity")
 @patch("app.api.routes.ModelTransformer")
 @patch("app.api.routes.ConnectorClient")
 def test_v2_generate_pnml_runs_bpmn_guided_repair(mock_cc, mock_mt, mock_repair, client):
     """The PNML pipeline repairs connectivity using BPMN before final validation."""
     mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
     mock_mt.return_value.transform.return_value = "<pnml><net id='n1'/></pnml>"
-    mock_repair.side_effect = lambda pnml_xml, _bpmn_xml: pnml_xml
 
     resp = client.post("/v2/generate/pnml", json=BODY, headers=AUTH)
 
@@ -399,7 +452,7 @@ def test_v2_generate_pnml_runs_bpmn_guided_repair(mock_cc, mock_mt, mock_repair,
     mock_repair.assert_called_once()
 
 
-@patch("app.api.routes.validate_pnml_connectivity")
+@patch("app.api.routes.PnmlDocument.validate_connectivity")
 @patch("app.api.routes.ModelTransformer")
 @patch("app.api.routes.ConnectorClient")
 def test_v2_generate_pnml_connectivity_failure_returns_best_effort_pnml(
@@ -420,7 +473,7 @@ def test_v2_generate_pnml_connectivity_failure_returns_best_effort_pnml(
     assert "<pnml" in resp.get_json()["result"]
 
 
-@patch("app.api.routes.validate_pnml_connectivity")
+@patch("app.api.routes.PnmlDocument.validate_connectivity")
 @patch("app.api.routes.ModelTransformer")
 @patch("app.api.routes.ConnectorClient")
 def test_legacy_generate_pnml_connectivity_failure_returns_best_effort_pnml(
@@ -441,3 +494,258 @@ def test_legacy_generate_pnml_connectivity_failure_returns_best_effort_pnml(
 
     assert resp.status_code == 200
     assert "<pnml" in resp.get_json()["result"]
+
+
+# --- progress streaming --------------------------------------------------
+
+
+def _sse_events(resp):
+    events = []
+    for block in resp.get_data(as_text=True).split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        if "event" in lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@patch("app.api.routes.ModelTransformer")
+@patch("app.api.routes.ConnectorClient")
+def test_v2_generate_pnml_streams_sse_progress(mock_cc, mock_mt, client):
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+    mock_mt.return_value.transform.return_value = "PNML"
+
+    resp = client.post(
+        "/v2/generate/pnml",
+        json=BODY,
+        headers={**AUTH, "Accept": "text/event-stream"},
+    )
+
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/event-stream"
+    assert resp.headers["Cache-Control"] == "no-cache"
+    events = _sse_events(resp)
+    names = [name for name, _ in events]
+    assert names[-1] == "result"
+    assert events[-1][1]["result"] == "PNML"
+    assert "total" in events[-1][1]["timings"]
+    # The BPMN is reported before the transformer stage starts.
+    bpmn_at = names.index("bpmn")
+    assert "<definitions" in events[bpmn_at][1]["result"]
+    assert bpmn_at < events.index(
+        ("stage", {"stage": "transformer", "state": "started"})
+    )
+    assert events[0] == ("stage", {"stage": "connector", "state": "started"})
+    finished = [data for name, data in events if data.get("state") == "finished"]
+    assert {data["stage"] for data in finished} >= {"connector", "transformer"}
+    assert all(data["duration_ms"] >= 0 for data in finished)
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_v2_generate_streams_ndjson_when_requested(mock_cc, client):
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+
+    resp = client.post(
+        "/v2/generate/bpmn",
+        json=BODY,
+        headers={**AUTH, "Accept": "application/x-ndjson"},
+    )
+
+    assert resp.mimetype == "application/x-ndjson"
+    records = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert records[0] == {"event": "stage", "stage": "connector", "state": "started"}
+    # A BPMN request has no separate bpmn event; the result is the BPMN.
+    assert [r["event"] for r in records if r["event"] != "stage"] == ["result"]
+    assert "<definitions" in records[-1]["result"]
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_v2_generate_stream_reports_failures_as_error_event(mock_cc, client):
+    mock_cc.return_value.generate.side_effect = ConnectorClientError(
+        400, {"error": {"code": "invalid_provider", "message": "Unknown."}}
+    )
+
+    resp = client.post(
+        "/v2/generate/pnml",
+        json=BODY,
+        headers={**AUTH, "Accept": "text/event-stream"},
+    )
+
+    assert resp.status_code == 200
+    name, data = _sse_events(resp)[-1]
+    assert name == "error"
+    assert data["status"] == 400
+    assert data["error"] == {"code": "invalid_provider", "message": "Unknown."}
+
+
+def _slow_connector(mock_cc):
+    """Make the connector call wait until the returned event is set."""
+    release = threading.Event()
+    mock_cc.return_value.generate.side_effect = lambda **kwargs: (
+        release.wait(5) and RAW_MODEL_JSON
+    )
+    return release
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_v2_generate_refuses_streams_beyond_the_pool(mock_cc, app, client, monkeypatch):
+    monkeypatch.setitem(
+        app.extensions, "stream_runner", JobRunner(max_workers=1, max_pending=1)
+    )
+    release = _slow_connector(mock_cc)
+    headers = {**AUTH, "Accept": "application/x-ndjson"}
+
+    first = client.post("/v2/generate/bpmn", json=BODY, headers=headers, buffered=False)
+    second = client.post("/v2/generate/bpmn", json=BODY, headers=headers)
+    release.set()
+
+    assert second.status_code == 503
+    assert second.get_json()["error"]["code"] == "overloaded"
+    assert second.headers["Retry-After"]
+    assert json.loads(first.get_data(as_text=True).splitlines()[-1])["result"]
+
+
+@patch("app.api.routes.ModelTransformer")
+@patch("app.api.routes.ConnectorClient")
+def test_v2_generate_stream_stops_when_the_client_disconnects(
+    mock_cc, mock_mt, app, client, monkeypatch
+):
+    runner = JobRunner(max_workers=1, max_pending=1)
+    monkeypatch.setitem(app.extensions, "stream_runner", runner)
+    release = _slow_connector(mock_cc)
+
+    resp = client.post(
+        "/v2/generate/pnml",
+        json=BODY,
+        headers={**AUTH, "Accept": "application/x-ndjson"},
+        buffered=False,
+    )
+    first = json.loads(next(iter(resp.response)))
+    resp.close()
+    release.set()
+
+    assert first == {"event": "stage", "stage": "connector", "state": "started"}
+    # The run gives its slot back once it has stopped.
+    deadline = time.time() + 5
+    while not runner.reserve():
+        assert time.time() < deadline, "the stream run did not stop"
+        time.sleep(0.01)
+    runner.cancel()
+    mock_mt.return_value.transform.assert_not_called()
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_v2_generate_prefers_json_unless_a_stream_is_asked_for(mock_cc, client):
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+
+    resp = client.post(
+        "/v2/generate/bpmn",
+        json=BODY,
+        headers={**AUTH, "Accept": "application/json, text/event-stream;q=0.5"},
+    )
+
+    assert resp.mimetype == "application/json"
+    assert "<definitions" in resp.get_json()["result"]
+
+
+# --- /v2/generate/batch ---------------------------------------------------
+
+
+def _batch_records(resp):
+    records = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    return sorted(records, key=lambda record: record["index"])
+
+
+@patch("app.api.routes.ModelTransformer")
+@patch("app.api.routes.ConnectorClient")
+def test_v2_batch_streams_one_record_per_item(mock_cc, mock_mt, client):
+    mock_cc.return_value.generate.return_value = RAW_MODEL_JSON
+    mock_mt.return_value.transform.return_value = "PNML"
+    items = [BODY, {**BODY, "target": "pnml"}, {**BODY, "text": "another process"}]
+
+    resp = client.post("/v2/generate/batch", json={"items": items}, headers=AUTH)
+
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/x-ndjson"
+    records = _batch_records(resp)
+    assert [r["index"] for r in records] == [0, 1, 2]
+    assert [r["status"] for r in records] == [200, 200, 200]
+    assert "<definitions" in records[0]["result"]
+    assert records[1]["result"] == "PNML"
+    assert mock_cc.return_value.generate.call_count == 3
+    assert all(
+        call.kwargs["authorization"] == "Bearer secret-token"
+        for call in mock_cc.return_value.generate.call_args_list
+    )
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_v2_batch_item_failures_do_not_abort_the_batch(mock_cc, client):
+    def _generate(**kwargs):
+        if kwargs["user_text"] == "rejected":
+            raise ConnectorClientError(
+                400, {"error": {"code": "invalid_provider", "message": "Unknown."}}
+            )
+        if kwargs["user_text"] == "down":
+            raise ConnectorError("connector down")
+        return RAW_MODEL_JSON
+
+    mock_cc.return_value.generate.side_effect = _generate
+    items = [
+        {**BODY, "text": "rejected"},
+        BODY,
+        {**BODY, "text": "down"},
+        {**BODY, "target": "svg"},
+        "not an object",
+    ]
+
+    resp = client.post("/v2/generate/batch", json={"items": items}, headers=AUTH)
+
+    records = _batch_records(resp)
+    assert [r["status"] for r in records] == [400, 200, 500, 400, 400]
+    assert records[0]["error"] == {"code": "invalid_provider", "message": "Unknown."}
+    assert records[2]["error"]["code"] == "upstream_error"
+    assert records[3]["error"]["code"] == "invalid_request"
+    assert records[4]["error"]["code"] == "invalid_request"
+
+
+@patch("app.api.routes.ConnectorClient")
+def test_v2_batch_bounds_concurrency(mock_cc, app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "BATCH_MAX_CONCURRENCY", 2)
+    lock = threading.Lock()
+    running = {"now": 0, "max": 0}
+
+    def _generate(**kwargs):
+        with lock:
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+        time.sleep(0.02)
+        with lock:
+            running["now"] -= 1
+        return RAW_MODEL_JSON
+
+    mock_cc.return_value.generate.side_effect = _generate
+    items = [{**BODY, "text": f"process {i}"} for i in range(8)]
+
+    resp = client.post("/v2/generate/batch", json={"items": items}, headers=AUTH)
+
+    assert [r["status"] for r in _batch_records(resp)] == [200] * 8
+    assert running["max"] == 2
+
+
+@pytest.mark.parametrize(
+    "body",
+    [{}, {"items": []}, {"items": "text"}, ["not", "an", "object"]],
+)
+def test_v2_batch_rejects_invalid_item_lists(client, body):
+    resp = client.post("/v2/generate/batch", json=body, headers=AUTH)
+
+    assert resp.status_code == 400
+    assert resp.get_json()["error"]["code"] == "invalid_request"
+
+
+def test_v2_batch_rejects_oversized_batches(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "BATCH_MAX_ITEMS", 2)
+
+    resp = client.post("/v2/generate/batch", json={"items": [BODY] * 3}, headers=AUTH)
+
+    assert resp.status_code == 400
@@ -1,9 +1,13 @@
 import xml.etree.ElementTree as ET
+from unittest.mock import patch
 
 import pytest
 from app.backend.xml_parser import (
+    _NS,
+    _json_to_bpmn_etree,
     assign_pnml_coordinates,
     json_to_bpmn,
+    PnmlDocument,
     PnmlStructureError,
     repair_pnml_connectivity_from_bpmn,
     sanitize_bpmn_for_transform,
@@ -313,6 +317,103 @@ def test_special_characters_in_names_produce_wellformed_xml():
     assert 'R&D <review> "now"' in names
 
 
+_GOLDEN_BPMN = """<?xml version='1.0' encoding='utf-8'?>
+<definitions xmlns="http://www.omg.org/spec/BPMN/20100524/MODEL" \
+xmlns:bpmndi="http://www.omg.org/spec/BPMN/20100524/DI" \
+xmlns:dc="http://www.omg.org/spec/DD/20100524/DC" \
+xmlns:di="http://www.omg.org/spec/DD/20100524/DI" \
+xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" \
+xsi:schemaLocation="http://www.omg.org/spec/BPMN/20100524/MODEL \
+https://www.omg.org/spec/BPMN/20100501/BPMN20.xsd" \
+targetNamespace="http://example.bpmn.com/schema/bpmn">
+  <process id="Process_1" isExecutable="false">
+    <startEvent id="startEvent1" name="Process Start" />
+    <endEvent id="endEvent1" name="Process End" />
+    <serviceTask id="task1" name="Check for Known Outages" />
+    <sequenceFlow id="flow1" sourceRef="startEvent1" targetRef="task1" />
+    <sequenceFlow id="flow2" sourceRef="task1" targetRef="endEvent1" />
+  </process>
+  <bpmndi:BPMNDiagram id="BPMNDiagram_1">
+    <bpmndi:BPMNPlane id="BPMNPlane_1" bpmnElement="Process_1">
+      <bpmndi:BPMNShape id="task1_di" bpmnElement="task1">
+        <dc:Bounds x="166" y="50" width="100" height="80" />
+      </bpmndi:BPMNShape>
+      <bpmndi:BPMNShape id="startEvent1_di" bpmnElement="startEvent1">
+        <dc:Bounds x="50" y="50" width="36" height="36" />
+      </bpmndi:BPMNShape>
+      <bpmndi:BPMNShape id="endEvent1_di" bpmnElement="endEvent1">
+        <dc:Bounds x="346" y="50" width="36" height="36" />
+      </bpmndi:BPMNShape>
+      <bpmndi:BPMNEdge id="flow1_di" bpmnElement="flow1">
+        <di:waypoint x="86" y="68" />
+        <di:waypoint x="166" y="90" />
+      </bpmndi:BPMNEdge>
+      <bpmndi:BPMNEdge id="flow2_di" bpmnElement="flow2">
+        <di:waypoint x="266" y="90" />
+        <di:waypoint x="346" y="68" />
+      </bpmndi:BPMNEdge>
+    </bpmndi:BPMNPlane>
+  </bpmndi:BPMNDiagram>
+</definitions>"""
+
+
+@pytest.fixture
+def bpmn_default_namespace():
+    # PnmlDocument registers the PNML namespace as the default prefix, which
+    # changes how the ElementTree reference path serializes BPMN afterwards.
+    ET.register_namespace("", _NS["bpmn"])
+
+
+def test_json_to_bpmn_matches_golden_output(example_data):
+    assert json_to_bpmn(example_data) == _GOLDEN_BPMN
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        {"events": [], "tasks": [], "gateways": [], "flows": []},
+        {
+            "events": [{"id": "s", "type": "Start", "name": "Start"}],
+            "tasks": [],
+            "gateways": [],
+            "flows": [],
+        },
+        {
+            "events": [
+                {"id": "s", "type": "startEvent", "name": "a\tb\r\nc"},
+                {"id": "x", "type": "Timer", "name": "Wait 1 day"},
+            ],
+            "tasks": [
+                {"id": "t&1", "type": "UserTask", "name": 'R&D <review> "now"'},
+                {"id": "t2", "type": "ServiceTask", "name": "Prüfen €"},
+            ],
+            "gateways": [
+                {"id": "g1", "type": "ExclusiveGateway", "name": "ok?"},
+                {"id": "g2", "type": "ParallelGateway", "name": ""},
+            ],
+            "flows": [
+                {"id": "f1", "source": "s", "target": "g1"},
+                {"id": "f2", "source": "g1", "target": "t&1"},
+                {"id": "f3", "source": "g1", "target": "t2"},
+                {"id": "f4", "source": "t&1", "target": "g2"},
+                {"id": "f5", "source": "t2", "target": "g2"},
+                {"id": "f6", "source": "g2", "target": "x"},
+                {"id": "f7", "source": "x", "target": "g1"},
+            ],
+        },
+    ],
+    ids=["empty", "single-node", "gateways-cycle-escaping"],
+)
+def test_json_to_bpmn_is_byte_identical_to_elementtree(model, bpmn_default_namespace):
+    assert json_to_bpmn(model) == _json_to_bpmn_etree(model)
+
+
+def test_json_to_bpmn_is_byte_identical_to_elementtree_for_example(
+    example_data, bpmn_default_namespace
+):
+    assert json_to_bpmn(example_data) == _json_to_bpmn_etree(example_data)
+
+
 def test_unknown_event_type_maps_to_intermediate_catch_event():
     """Any event type that is not a start/end variant falls back to an
     intermediate catch event rather than producing an invalid tag."""
@@ -462,6 +563,42 @@ def test_assign_pnml_coordinates_enforces_transition_place_adjacency_and_no_orph
     assert all(adjacency.values())
 
 
+def test_assign_pnml_coordinates_removes_nodes_nested_in_pages():
+    """Orphans and dropped arcs below a <page> are removed from that page."""
+    pnml = (
+        "<pnml><net id='n1'><page id='pg1'>"
+        "<place id='orphanPlace'/>"
+        "<transition id='t1'/>"
+        "<place id='p1'/>"
+        "<arc id='a1' source='p1' target='t1'/>"
+        "<arc id='a2' source='t1' target='missing'/>"
+        "</page></net></pnml>"
+    )
+
+    root = ET.fromstring(assign_pnml_coordinates(pnml))
+    page = next(e for e in root.iter() if e.tag.split("}")[-1] == "page")
+
+    assert sorted(child.get("id") for child in page) == ["P1", "P1TOt1", "t1"]
+
+
+def test_assign_pnml_coordinates_sanitizes_large_nets():
+    """Thousands of bridge rewrites leave a bipartite net without orphans."""
+    size = 3000
+    nodes = "".join(f"<transition id='t{i}'/><place id='p{i}'/>" for i in range(size))
+    arcs = "".join(
+        f"<arc id='a{i}' source='t{i}' target='t{i + 1}'/>" for i in range(size - 1)
+    )
+    pnml = f"<pnml><net id='n1'>{nodes}{arcs}</net></pnml>"
+
+    root = ET.fromstring(assign_pnml_coordinates(pnml))
+    counts = _local_counts(root)
+
+    # Every original place is an orphan; one bridge place per arc replaces them.
+    assert counts["transition"] == size
+    assert counts["place"] == size - 1
+    assert counts["arc"] == 2 * (size - 1)
+
+
 # ---------------------------------------------------------------------------
 # validate_pnml_connectivity
 # ---------------------------------------------------------------------------
@@ -604,6 +741,35 @@ def test_repair_pnml_connectivity_from_bpmn_adds_missing_transition_relay():
     assert any(src in places and tgt == "t2" for src, tgt in arcs)
 
 
+def test_repair_pnml_connectivity_from_bpmn_reuses_relays_through_shared_places():
+    """Existing relays via a place with several consumers are not duplicated."""
+    bpmn = (
+        "<definitions xmlns='http://www.omg.org/spec/BPMN/20100524/MODEL'>"
+        "<process id='p1'>"
+        "<sequenceFlow id='f1' sourceRef='t1' targetRef='t2'/>"
+        "<sequenceFlow id='f2' sourceRef='t1' targetRef='t3'/>"
+        "<sequenceFlow id='f3' sourceRef='t2' targetRef='t3'/>"
+        "</process></definitions>"
+    )
+    pnml = (
+        "<pnml><net id='n1'>"
+        "<transition id='t1'/><transition id='t2'/><transition id='t3'/>"
+        "<place id='p_split'/>"
+        "<arc id='a1' source='t1' target='p_split'/>"
+        "<arc id='a2' source='p_split' target='t2'/>"
+        "<arc id='a3' source='p_split' target='t3'/>"
+        "</net></pnml>"
+    )
+
+    root = ET.fromstring(repair_pnml_connectivity_from_bpmn(pnml, bpmn))
+
+    places = [
+        p.get("id") for p in root.iter() if p.tag.split("}")[-1] == "place"
+    ]
+    # Only the missing t2 -> t3 relay is added.
+    assert places == ["p_split", "REPAIR_PLACE_t2_TO_t3_f3"]
+
+
 def test_repair_pnml_connectivity_from_bpmn_adds_anchors_for_event_side_flows():
     """Flows from/to non-transition BPMN nodes still create missing in/out anchors."""
     bpmn = (
@@ -714,3 +880,164 @@ def test_sanitize_bpmn_for_transform_collapses_passthrough_gateway():
     assert len(flows) == 1
     assert flows[0].get("sourceRef") == "s"
     assert flows[0].get("targetRef") == "t1"
+
+
+def test_sanitize_bpmn_for_transform_folds_gateway_chain_in_one_pass():
+    """A chain of passthrough gateways folds into one flow; a real split stays."""
+    bpmn = (
+        "<definitions xmlns='http://www.omg.org/spec/BPMN/20100524/MODEL' "
+        "xmlns:bpmndi='http://www.omg.org/spec/BPMN/20100524/DI'>"
+        "<process id='p1'>"
+        "<startEvent id='s'/><userTask id='t1'/><userTask id='t2'/>"
+        "<exclusiveGateway id='g1'/><parallelGateway id='g2'/>"
+        "<exclusiveGateway id='g3'/><exclusiveGateway id='split'/>"
+        "<sequenceFlow id='f1' sourceRef='s' targetRef='g1'/>"
+        "<sequenceFlow id='f2' sourceRef='g1' targetRef='g2'/>"
+        "<sequenceFlow id='f3' sourceRef='g2' targetRef='g3'/>"
+        "<sequenceFlow id='f4' sourceRef='g3' targetRef='split'/>"
+        "<sequenceFlow id='f5' sourceRef='split' targetRef='t1'/>"
+        "<sequenceFlow id='f6' sourceRef='split' targetRef='t2'/>"
+        "</process>"
+        "<bpmndi:BPMNDiagram id='d1'><bpmndi:BPMNPlane id='pl1' bpmnElement='p1'>"
+        + "".join(
+            f"<bpmndi:BPMNShape id='{n}_di' bpmnElement='{n}'/>"
+            for n in ("s", "t1", "t2", "g1", "g2", "g3", "split")
+        )
+        + "".join(
+            f"<bpmndi:BPMNEdge id='f{i}_di' bpmnElement='f{i}'/>" for i in range(1, 7)
+        )
+        + "</bpmndi:BPMNPlane></bpmndi:BPMNDiagram></definitions>"
+    )
+
+    root = ET.fromstring(sanitize_bpmn_for_transform(bpmn))
+    process = root.find("{http://www.omg.org/spec/BPMN/20100524/MODEL}process")
+
+    flows = [
+        (e.get("id"), e.get("sourceRef"), e.get("targetRef"))
+        for e in process
+        if e.tag.endswith("sequenceFlow")
+    ]
+    assert flows == [("f5", "split", "t1"), ("f6", "split", "t2"), ("f1", "s", "split")]
+    assert [e.get("id") for e in process if e.tag.endswith("Gateway")] == ["split"]
+
+    shapes = {e.get("bpmnElement") for e in root.iter(f"{{{_BPMNDI}}}BPMNShape")}
+    edges = {e.get("bpmnElement") for e in root.iter(f"{{{_BPMNDI}}}BPMNEdge")}
+    assert shapes == {"s", "t1", "t2", "split"}
+    assert edges == {"f5", "f6"}
+
+
+def test_sanitize_bpmn_for_transform_keeps_gateway_cycles():
+    """Collapsing would create a self-loop, so a two-gateway cycle is kept."""
+    bpmn = (
+        "<definitions xmlns='http://www.omg.org/spec/BPMN/20100524/MODEL'>"
+        "<process id='p1'>"
+        "<exclusiveGateway id='g1'/><exclusiveGateway id='g2'/>"
+        "<sequenceFlow id='f1' sourceRef='g1' targetRef='g2'/>"
+        "<sequenceFlow id='f2' sourceRef='g2' targetRef='g1'/>"
+        "</process></definitions>"
+    )
+
+    root = ET.fromstring(sanitize_bpmn_for_transform(bpmn))
+
+    counts = _local_counts(root)
+    assert counts["exclusiveGateway"] == 2
+    assert counts["sequenceFlow"] == 2
+
+
+# ---------------------------------------------------------------------------
+# PnmlDocument pipeline
+# ---------------------------------------------------------------------------
+
+_PIPELINE_BPMN = (
+    "<?xml version='1.0' encoding='UTF-8'?>"
+    "<definitions xmlns='http://www.omg.org/spec/BPMN/20100524/MODEL'>"
+    "<process id='p1'>"
+    "<sequenceFlow id='f0' sourceRef='start' targetRef='t1'/>"
+    "<sequenceFlow id='f1' sourceRef='t1' targetRef='t2'/>"
+    "<sequenceFlow id='f2' sourceRef='t2' targetRef='end'/>"
+    "</process></definitions>"
+)
+
+_PIPELINE_PNML = (
+    "<pnml xmlns='http://www.pnml.org/version-2009/grammar/pnml'><net id='n1'>"
+    "<transition id='t1'><name><text>[UserTask] Check Order!</text></name></transition>"
+    "<transition id='t2'/>"
+    "<place id='p_in'/><place id='p_out'/>"
+    "<arc id='a1' source='p_in' target='t1'/>"
+    "<arc id='a2' source='t2' target='p_out'/>"
+    "</net></pnml>"
+)
+
+
+def test_pnml_document_pipeline_matches_string_wrappers():
+    """The single-parse pipeline yields exactly what the chained wrappers do."""
+    expected = assign_pnml_coordinates(_PIPELINE_PNML)
+    expected = repair_pnml_connectivity_from_bpmn(expected, _PIPELINE_BPMN)
+    expected = assign_pnml_coordinates(expected)
+
+    document = PnmlDocument.parse(_PIPELINE_PNML)
+    document.assign_coordinates()
+    document.repair_connectivity(_PIPELINE_BPMN)
+    document.assign_coordinates()
+    document.validate_connectivity()
+
+    assert document.to_string() == expected
+
+
+def test_pnml_document_keeps_a_net_sanitizing_would_empty_for_repair():
+    # Every arc references a missing id, so sanitizing would drop every node.
+    # The net is left as it is, and the repair rebuilds it from the BPMN.
+    pnml = (
+        "<pnml><net id='n1'>"
+        "<transition id='start'/><transition id='t1'/>"
+        "<transition id='t2'/><transition id='end'/>"
+        "<arc id='a1' source='t1' target='ghost'/>"
+        "<arc id='a2' source='ghost' target='t2'/>"
+        "</net></pnml>"
+    )
+    document = PnmlDocument.parse(pnml)
+    untouched = document.to_string()
+
+    assert document.assign_coordinates() is False
+    assert document.to_string() == untouched
+
+    document.repair_connectivity(_PIPELINE_BPMN)
+    assert document.assign_coordinates()
+    root = ET.fromstring(document.to_string())
+    transitions = [t.get("id") for t in root.iter("transition")]
+    assert transitions == ["start", "t1", "t2", "end"]
+    assert len(list(root.iter("place"))) == 3
+
+
+def test_pnml_document_parses_and_serializes_once():
+    with patch(
+        "app.backend.xml_parser.ET.fromstring", wraps=ET.fromstring
+    ) as fromstring, patch(
+        "app.backend.xml_parser.ET.tostring", wraps=ET.tostring
+    ) as tostring:
+        document = PnmlDocument.parse(_PIPELINE_PNML)
+        document.assign_coordinates()
+        document.repair_connectivity(_PIPELINE_BPMN)
+        document.assign_coordinates()
+        document.validate_connectivity()
+        document.to_string()
+
+    # One parse for the PNML, one for the BPMN it is repaired against.
+    assert fromstring.call_count == 2
+    assert tostring.call_count == 1
+
+
+def test_pnml_document_parse_rejects_non_xml():
+    assert PnmlDocument.parse("not xml") is None
+    assert PnmlDocument.parse("") is None
+    assert PnmlDocument.parse(None) is None
+
+
+def test_pnml_document_validate_raises_on_tree():
+    document = PnmlDocument.parse(
+        "<pnml><net><transition id='t1'/><place id='p1'/>"
+        "<arc id='a1' source='p1' target='t1'/></net></pnml>"
+    )
+
+    with pytest.raises(PnmlStructureError, match="no outbound arc"):
+        document.validate_connectivity()